@@ -0,0 +1,41 @@
+"""Add corpus statistics tables for BM25 scoring
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Single row of corpus totals; filled by `make corpus-stats` or on first use
+    op.create_table('corpus_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chunk_count', sa.Integer(), nullable=False),
+        sa.Column('total_tokens', sa.BigInteger(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table('corpus_term_df',
+        sa.Column('term', sa.Text(), nullable=False),
+        sa.Column('document_frequency', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('term')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('corpus_term_df')
+    op.drop_table('corpus_stats')
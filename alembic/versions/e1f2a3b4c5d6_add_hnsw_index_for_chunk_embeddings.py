@@ -0,0 +1,31 @@
+"""Add HNSW index for document chunk embeddings
+
+Revision ID: e1f2a3b4c5d6
+Revises: 7a173d0ddcec
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, None] = '7a173d0ddcec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so ingestion can keep writing chunks; requires pgvector >= 0.5.0
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunk_embedding_hnsw "
+            "ON document_chunks USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chunk_embedding_hnsw")
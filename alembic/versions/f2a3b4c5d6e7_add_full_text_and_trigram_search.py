@@ -0,0 +1,50 @@
+"""Add full-text and trigram search indexes for document chunks
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Stored generated column: rewrites document_chunks once, then Postgres keeps it current
+    op.execute(
+        "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(chunk_text, ''))) STORED"
+    )
+
+    # Built concurrently so ingestion can keep writing chunks
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunk_search_vector "
+            "ON document_chunks USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunk_text_trgm "
+            "ON document_chunks USING gin (chunk_text gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_filename_trgm "
+            "ON documents USING gin (filename gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_document_filename_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chunk_text_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chunk_search_vector")
+
+    op.execute("ALTER TABLE document_chunks DROP COLUMN IF EXISTS search_vector")
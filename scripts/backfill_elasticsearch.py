@@ -6,12 +6,10 @@ This script handles migrating existing documents when enabling hybrid search.
 
 import argparse
 import asyncio
-import hashlib
 import os
 import sys
-from typing import Dict, Optional
+from typing import Dict
 
-from elasticsearch.helpers import bulk
 from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import sessionmaker
 
@@ -20,6 +18,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.config.settings import get_settings
 from src.models.entities import Document, DocumentChunk, DocumentRegistry
 from src.search.elasticsearch_client import ElasticsearchClient
+from src.search.es_bulk_indexer import BulkIndexer, iter_index_actions
 from src.search.es_index_manager import ElasticsearchIndexManager
 from src.utils.logging import get_logger
 
@@ -29,9 +28,13 @@ logger = get_logger(__name__)
 class ElasticsearchBackfiller:
     """Handles backfilling existing PostgreSQL documents to Elasticsearch."""
     
-    def __init__(self, dry_run: bool = True):
+    KINDS = ("documents", "chunks", "registry")
+    
+    def __init__(self, dry_run: bool = True, chunk_size: int = 500, thread_count: int = 4):
         self.settings = get_settings()
         self.dry_run = dry_run
+        self.chunk_size = chunk_size
+        self.thread_count = thread_count
         
         # Database setup
         self.engine = create_engine(self.settings.database_url)
@@ -67,12 +70,8 @@ class ElasticsearchBackfiller:
             logger.warning("No documents found in database")
             return {"documents": 0, "chunks": 0, "registry": 0}
         
-        # Backfill in batches
-        results = {
-            "documents": await self._backfill_documents(),
-            "chunks": await self._backfill_chunks(),
-            "registry": await self._backfill_registry()
-        }
+        # Stream every row through the bulk indexer (constant memory)
+        results = await asyncio.to_thread(self._stream_all)
         
         # Verify counts if not dry run
         if not self.dry_run:
@@ -80,161 +79,28 @@ class ElasticsearchBackfiller:
             
         return results
         
-    async def _backfill_documents(self) -> int:
-        """Backfill documents to Elasticsearch."""
-        logger.info("Backfilling documents...")
-        
-        batch_size = 100
-        total_processed = 0
-        
-        with self.SessionLocal() as session:
-            # Get total count for progress tracking
-            total_docs = session.scalar(select(func.count(Document.id)))
-            
-            for offset in range(0, total_docs, batch_size):
-                docs = session.execute(
-                    select(Document).offset(offset).limit(batch_size)
-                ).scalars().all()
-                
-                operations = []
-                for doc in docs:
-                    doc_id = hashlib.md5(f"{doc.id}".encode()).hexdigest()
-                    doc_source = {
-                        "id": str(doc.id),
-                        "content": doc.content[:10000] if doc.content else "",
-                        "content_type": doc.content_type,
-                        "filename": doc.filename,
-                        "title": doc.meta.get("title", doc.filename),
-                        "protocol_name": self._extract_protocol_name(doc),
-                        "form_name": self._extract_form_name(doc),
-                        "medical_specialties": doc.meta.get("medical_specialties", []),
-                        "tags": doc.meta.get("tags", []),
-                        "file_type": doc.file_type,
-                        "file_hash": doc.file_hash,
-                        "metadata": doc.meta,
-                        "created_at": doc.created_at.isoformat(),
-                        "updated_at": doc.updated_at.isoformat()
-                    }
-                    
-                    operations.append({
-                        "_index": f"{self.settings.elasticsearch_index_prefix}_documents",
-                        "_id": doc_id,
-                        "_source": doc_source
-                    })
-                    
-                if not self.dry_run and operations:
-                    es = self.es_client.get_client()
-                    success, failed = bulk(es, operations, chunk_size=50, raise_on_error=False)
-                    if failed:
-                        logger.error(f"Failed to index {len(failed)} documents")
-                    total_processed += success
-                else:
-                    total_processed += len(operations)
-                    
-                logger.info(f"Processed {total_processed}/{total_docs} documents")
-                
-        return total_processed
-        
-    async def _backfill_chunks(self) -> int:
-        """Backfill chunks to Elasticsearch."""
-        logger.info("Backfilling chunks...")
-        
-        batch_size = 200
-        total_processed = 0
-        
+    def _stream_all(self) -> Dict[str, int]:
+        """Index documents, chunks and registry entries; counts per kind."""
+        prefix = self.settings.elasticsearch_index_prefix
         with self.SessionLocal() as session:
-            total_chunks = session.scalar(select(func.count(DocumentChunk.id)))
+            actions = iter_index_actions(session, prefix)
+            if self.dry_run:
+                counts = dict.fromkeys(self.KINDS, 0)
+                for action in actions:
+                    counts[action["_index"][len(prefix) + 1:]] += 1
+                return counts
             
-            for offset in range(0, total_chunks, batch_size):
-                chunks = session.execute(
-                    select(DocumentChunk).offset(offset).limit(batch_size)
-                ).scalars().all()
-                
-                operations = []
-                for chunk in chunks:
-                    chunk_id = hashlib.md5(f"{chunk.id}".encode()).hexdigest()
-                    chunk_source = {
-                        "id": str(chunk.id),
-                        "document_id": str(chunk.document_id),
-                        "content": chunk.chunk_text,
-                        "chunk_index": chunk.chunk_index,
-                        "chunk_type": chunk.chunk_type,
-                        "medical_category": chunk.medical_category,
-                        "urgency_level": chunk.urgency_level,
-                        "contains_contact": chunk.contains_contact,
-                        "contains_dosage": chunk.contains_dosage,
-                        "page_number": chunk.page_number,
-                        "metadata": chunk.meta,
-                        "created_at": chunk.created_at.isoformat()
-                    }
-                    
-                    operations.append({
-                        "_index": f"{self.settings.elasticsearch_index_prefix}_chunks",
-                        "_id": chunk_id,
-                        "_source": chunk_source
-                    })
-                    
-                if not self.dry_run and operations:
-                    es = self.es_client.get_client()
-                    success, failed = bulk(es, operations, chunk_size=100, raise_on_error=False)
-                    if failed:
-                        logger.error(f"Failed to index {len(failed)} chunks")
-                    total_processed += success
-                else:
-                    total_processed += len(operations)
-                    
-                logger.info(f"Processed {total_processed}/{total_chunks} chunks")
-                
-        return total_processed
-        
-    async def _backfill_registry(self) -> int:
-        """Backfill registry entries to Elasticsearch."""
-        logger.info("Backfilling registry entries...")
-        
-        batch_size = 100
-        total_processed = 0
-        
-        with self.SessionLocal() as session:
-            total_registry = session.scalar(select(func.count(DocumentRegistry.id)))
+            indexer = BulkIndexer(
+                self.es_client.get_client(),
+                chunk_size=self.chunk_size,
+                thread_count=self.thread_count
+            )
+            stats = indexer.index(actions)
             
-            for offset in range(0, total_registry, batch_size):
-                registry_entries = session.execute(
-                    select(DocumentRegistry).offset(offset).limit(batch_size)
-                ).scalars().all()
-                
-                operations = []
-                for registry in registry_entries:
-                    registry_id = hashlib.md5(f"{registry.id}".encode()).hexdigest()
-                    registry_source = {
-                        "id": str(registry.id),
-                        "document_id": str(registry.document_id),
-                        "keywords": registry.keywords,
-                        "display_name": registry.display_name,
-                        "file_path": registry.file_path,
-                        "category": registry.category,
-                        "priority": registry.priority,
-                        "quick_access": registry.quick_access,
-                        "metadata": registry.meta
-                    }
-                    
-                    operations.append({
-                        "_index": f"{self.settings.elasticsearch_index_prefix}_registry",
-                        "_id": registry_id,
-                        "_source": registry_source
-                    })
-                    
-                if not self.dry_run and operations:
-                    es = self.es_client.get_client()
-                    success, failed = bulk(es, operations, chunk_size=50, raise_on_error=False)
-                    if failed:
-                        logger.error(f"Failed to index {len(failed)} registry entries")
-                    total_processed += success
-                else:
-                    total_processed += len(operations)
-                    
-                logger.info(f"Processed {total_processed}/{total_registry} registry entries")
-                
-        return total_processed
+        if stats.failed:
+            logger.error(f"Failed to index {stats.failed} items; first errors: {stats.errors[:5]}")
+        logger.info(f"Backfill throughput: {stats.docs_per_second:.0f} docs/s over {stats.elapsed:.1f}s")
+        return {kind: stats.by_index[f"{prefix}_{kind}"] for kind in self.KINDS}
         
     async def _verify_counts(self):
         """Verify that ES counts match database counts."""
@@ -265,32 +131,6 @@ class ElasticsearchBackfiller:
         # Warn if match rates are low
         if any(rate < 95.0 for rate in [doc_match_rate, chunk_match_rate, registry_match_rate]):
             logger.warning("Some indices have low match rates. Consider re-running backfill.")
-            
-    def _extract_protocol_name(self, document: Document) -> Optional[str]:
-        """Extract protocol name from document for exact matching."""
-        if document.content_type == "protocol":
-            title = document.meta.get("title", "").lower()
-            filename = document.filename.lower()
-            
-            protocol_keywords = ["protocol", "pathway", "algorithm", "guideline"]
-            for content in [title, filename]:
-                if any(keyword in content for keyword in protocol_keywords):
-                    name = content.replace(".pdf", "").replace("_", " ").strip()
-                    return name
-        return None
-        
-    def _extract_form_name(self, document: Document) -> Optional[str]:
-        """Extract form name from document for exact matching."""
-        if document.content_type == "form":
-            title = document.meta.get("title", "").lower()
-            filename = document.filename.lower()
-            
-            form_keywords = ["form", "consent", "checklist", "template"]
-            for content in [title, filename]:
-                if any(keyword in content for keyword in form_keywords):
-                    name = content.replace(".pdf", "").replace("_", " ").strip()
-                    return name
-        return None
 
 
 async def main():
@@ -300,11 +140,17 @@ async def main():
                       help="Actually perform backfill (default is dry run)")
     parser.add_argument("--force", action="store_true",
                       help="Force backfill even if indices already exist")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                      help="Actions per bulk request")
+    parser.add_argument("--threads", type=int, default=4,
+                      help="Concurrent bulk requests")
     
     args = parser.parse_args()
     
     try:
-        backfiller = ElasticsearchBackfiller(dry_run=not args.execute)
+        backfiller = ElasticsearchBackfiller(
+            dry_run=not args.execute, chunk_size=args.chunk_size, thread_count=args.threads
+        )
         results = await backfiller.backfill_all()
         
         print("\n" + "="*50)
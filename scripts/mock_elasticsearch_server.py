@@ -262,6 +262,79 @@ async def info_handler(request):
         "tagline": "You Know, for Search"
     })
 
+def _query_strings(node):
+    """All query strings in a search body (match, multi_match, query_string...)."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "query" and isinstance(value, str):
+                yield value
+            elif key in ("match", "match_phrase", "term") and isinstance(value, dict):
+                # Short form: {"match": {"field": "text"}}
+                for field_query in value.values():
+                    if isinstance(field_query, str):
+                        yield field_query
+                    else:
+                        yield from _query_strings(field_query)
+            else:
+                yield from _query_strings(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _query_strings(item)
+
+def _run_search(index_name, body):
+    """Score documents by query-term occurrences across their text fields."""
+    if index_name not in mock_documents:
+        return {
+            "error": {"type": "index_not_found_exception", "index": index_name},
+            "status": 404
+        }
+    
+    terms = {term for text in _query_strings(body.get("query", {})) for term in text.lower().split()}
+    hits = []
+    for doc_id, source in mock_documents[index_name].items():
+        text = " ".join(str(value) for value in source.values() if isinstance(value, (str, list))).lower()
+        score = float(sum(text.count(term) for term in terms))
+        if score > 0 or not terms:
+            hits.append({"_index": index_name, "_id": doc_id, "_score": score or 1.0, "_source": source})
+    
+    hits.sort(key=lambda hit: hit["_score"], reverse=True)
+    hits = hits[:body.get("size", 10)]
+    return {
+        "took": 1,
+        "timed_out": False,
+        "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+        "hits": {
+            "total": {"value": len(hits), "relation": "eq"},
+            "max_score": hits[0]["_score"] if hits else None,
+            "hits": hits
+        },
+        "status": 200
+    }
+
+async def search(request):
+    """Simulate a single-index search."""
+    body = await request.json() if request.body_exists else {}
+    if "size" in request.query:
+        body["size"] = int(request.query["size"])
+    result = _run_search(request.match_info['index'], body)
+    return web.json_response(result, status=result.pop("status"))
+
+async def multi_search(request):
+    """Simulate _msearch: NDJSON header/body pairs, one response per search."""
+    lines = [json.loads(line) for line in (await request.text()).splitlines() if line.strip()]
+    responses = [
+        _run_search(header.get("index"), body)
+        for header, body in zip(lines[0::2], lines[1::2])
+    ]
+    return web.json_response({"took": 1, "responses": responses})
+
+@web.middleware
+async def product_header(request, handler):
+    """elasticsearch-py 8 rejects servers that do not identify as Elasticsearch."""
+    response = await handler(request)
+    response.headers["X-Elastic-Product"] = "Elasticsearch"
+    return response
+
 async def default_handler(request):
     """Default handler for unmatched routes."""
     logger.warning(f"Unhandled request: {request.method} {request.path}")
@@ -272,11 +345,10 @@ async def default_handler(request):
 
 def create_app():
     """Create the mock Elasticsearch application."""
-    app = web.Application()
+    app = web.Application(middlewares=[product_header])
     
-    # Info endpoint
+    # Info endpoint (add_get also answers HEAD, which the client's ping uses)
     app.router.add_get('/', info_handler)
-    app.router.add_head('/', lambda r: web.Response(status=200))
     
     # Health and cluster endpoints
     app.router.add_get('/_cluster/health', health_check)
@@ -291,6 +363,9 @@ def create_app():
     # Document operations
     app.router.add_post('/_bulk', bulk_operation)
     app.router.add_get('/{index}/_count', count_documents)
+    app.router.add_route('POST', '/_msearch', multi_search)
+    app.router.add_route('POST', '/{index}/_search', search)
+    app.router.add_route('GET', '/{index}/_search', search)
     
     # Index statistics and optimization
     app.router.add_get('/{index}/_stats', index_stats)
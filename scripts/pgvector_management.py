@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+pgvector index management for ED Bot v8.
+Builds/rebuilds the HNSW index on chunk embeddings and benchmarks
+recall@k and latency for candidate ef_search settings.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine
+
+from src.ai.local_embeddings import embed_texts, to_pgvector
+from src.config.enhanced_settings import settings
+from src.models.vector_index_manager import VectorIndexManager
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description="pgvector index management for ED Bot v8")
+    parser.add_argument('--m', type=int, default=16, help='HNSW graph degree')
+    parser.add_argument('--ef-construction', type=int, default=64, help='HNSW build candidate list size')
+
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+
+    subparsers.add_parser('status', help='Show index definition, size and embedding coverage')
+    subparsers.add_parser('build', help='Create the HNSW index if missing (concurrently)')
+    subparsers.add_parser('rebuild', help='Drop and recreate the HNSW index (concurrently)')
+    subparsers.add_parser('drop', help='Drop the HNSW index')
+
+    bench_parser = subparsers.add_parser('benchmark', help='Recall@k and latency per ef_search vs exact search')
+    bench_parser.add_argument('--ef-search', type=int, nargs='+', default=[10, 20, 40, 80, 160],
+                              help='ef_search values to compare')
+    bench_parser.add_argument('--k', type=int, default=10, help='Neighbours per query')
+    bench_parser.add_argument('--sample-size', type=int, default=50,
+                              help='Stored chunk embeddings used as queries')
+    bench_parser.add_argument('--queries', nargs='+', help='Query texts to embed instead of sampling chunks')
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    try:
+        manager = VectorIndexManager(create_engine(settings.database_url), m=args.m,
+                                     ef_construction=args.ef_construction)
+
+        if args.command == 'status':
+            print(json.dumps(manager.status(), indent=2))
+        elif args.command == 'build':
+            manager.build()
+        elif args.command == 'rebuild':
+            manager.rebuild()
+        elif args.command == 'drop':
+            manager.drop()
+        elif args.command == 'benchmark':
+            query_embeddings = None
+            if args.queries:
+                query_embeddings = [to_pgvector(vector) for vector in embed_texts(args.queries)]
+            report = manager.benchmark(args.ef_search, k=args.k, sample_size=args.sample_size,
+                                       query_embeddings=query_embeddings)
+            print(f"{report['queries']} queries, k={report['k']}: exact search "
+                  f"p50 {report['exact_p50_ms']} ms, p95 {report['exact_p95_ms']} ms")
+            print(f"{'ef_search':>10} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+            for row in report['settings']:
+                print(f"{row['ef_search']:>10} {row['recall_at_k']:>9.3f} {row['p50_ms']:>8} {row['p95_ms']:>8}")
+
+    except KeyboardInterrupt:
+        print("\n⏹️  Operation cancelled")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"pgvector management operation failed: {e}")
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
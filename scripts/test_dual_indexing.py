@@ -187,8 +187,8 @@ class DualIndexingTester:
             # Check key classes exist in content
             assert 'class ElasticsearchBackfiller' in content
             assert 'backfill_all' in content
-            assert '_backfill_documents' in content
-            assert '_backfill_chunks' in content
+            assert 'iter_index_actions' in content
+            assert 'BulkIndexer' in content
             
             self.report("Backfill Script Configuration", True,
                       "Backfill script properly configured")
@@ -1,5 +1,6 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
@@ -137,6 +138,116 @@ class GPTOSSClient:
         metrics.record_error("llm_generation_failed", str(last_error))
         raise Exception(error_msg)
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Generate text using GPT-OSS 20B, yielding tokens as vLLM produces them.
+
+        Failed attempts are retried like generate() until the first token has
+        been yielded; after that an error is raised to the caller.
+        """
+        request_payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "temperature": temperature if temperature is not None else self.temperature,
+            "top_p": top_p if top_p is not None else self.top_p,
+            "max_tokens": max_tokens if max_tokens is not None else self.max_tokens,
+            "stream": True,
+        }
+
+        if stop:
+            request_payload["stop"] = stop
+
+        request_payload.update(kwargs)
+
+        last_error = None
+        for attempt in range(self.retry_attempts):
+            token_count = response_length = 0
+            try:
+                async for token in self._stream_request(request_payload):
+                    token_count += 1
+                    response_length += len(token)
+                    yield token
+
+                if not response_length:
+                    raise ValueError("Empty response from LLM")
+                break
+
+            except Exception as e:
+                if response_length:
+                    metrics.record_error("llm_stream_interrupted", str(e))
+                    raise
+                last_error = e
+                logger.warning(f"LLM streaming attempt {attempt + 1} failed: {e}")
+
+                if attempt < self.retry_attempts - 1:
+                    await asyncio.sleep(self.retry_delay * (2**attempt))
+        else:
+            error_msg = f"LLM streaming failed after {self.retry_attempts} attempts: {last_error}"
+            logger.error(error_msg)
+            metrics.record_error("llm_generation_failed", str(last_error))
+            raise Exception(error_msg)
+
+        # vLLM sends one event per generated token
+        metrics.record_llm_usage(token_count, self.model)
+        logger.info(
+            "LLM streaming generation successful",
+            extra_fields={
+                "model": self.model,
+                "prompt_length": len(prompt),
+                "response_length": response_length,
+                "attempt": attempt + 1,
+            },
+        )
+
+    async def _stream_request(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream a completion from the vLLM server as server-sent events."""
+        client = await self._get_client()
+
+        try:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/completions",
+                json=payload,
+                headers={"Content-Type": "application/json"},
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+
+                    chunk = json.loads(data)
+                    if chunk.get("error"):
+                        raise ValueError(chunk["error"].get("message", "LLM stream error"))
+                    for choice in chunk.get("choices", []):
+                        if choice.get("text"):
+                            yield choice["text"]
+
+        except httpx.HTTPStatusError as e:
+            error_detail = ""
+            try:
+                error_json = e.response.json()
+                error_detail = error_json.get("error", {}).get("message", str(e))
+            except Exception:
+                error_detail = str(e)
+
+            raise Exception(f"HTTP {e.response.status_code}: {error_detail}")
+
+        except httpx.RequestError as e:
+            raise Exception(f"Request error: {e}")
+
     async def _make_request(self, payload: Dict[str, Any]) -> str:
         """Make HTTP request to vLLM server."""
         client = await self._get_client()
@@ -1,5 +1,5 @@
 """Unified LLM client with automatic fallback support."""
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from src.config import settings
 from src.utils.logging import get_logger
@@ -12,6 +12,19 @@ from .ollama_client import OllamaClient
 logger = get_logger(__name__)
 
 
+async def stream_completion(client: Any, prompt: str, **kwargs) -> AsyncIterator[str]:
+    """Stream text from any LLM client.
+
+    Clients without generate_stream (Ollama, Azure) yield their whole
+    generate() result as a single chunk.
+    """
+    if hasattr(client, "generate_stream"):
+        async for token in client.generate_stream(prompt=prompt, **kwargs):
+            yield token
+    else:
+        yield await client.generate(prompt=prompt, **kwargs)
+
+
 class UnifiedLLMClient:
     """
     Unified LLM client with automatic fallback between backends.
@@ -233,6 +246,86 @@ class UnifiedLLMClient:
         metrics.record_error("llm_generation_all_failed", str(last_error))
         raise Exception(error_msg)
         
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream text from available LLM backends with automatic fallback.
+        
+        A backend that fails before producing any text falls back to the next
+        one; once text has been yielded a failure is raised to the caller.
+        
+        Args:
+            prompt: Input prompt for generation
+            temperature: Sampling temperature (0.0 for deterministic)
+            top_p: Top-p sampling parameter
+            max_tokens: Maximum tokens to generate
+            stop: Stop sequences
+            **kwargs: Additional backend-specific parameters
+            
+        Yields:
+            Generated text chunks
+            
+        Raises:
+            Exception: If all backends fail
+        """
+        backends = self._get_backend_priority()
+        last_error = None
+        
+        for backend in backends:
+            if backend not in self.clients:
+                continue
+                
+            response_length = 0
+            try:
+                logger.info(f"Attempting streaming generation with {backend}")
+                
+                async for token in stream_completion(
+                    self.clients[backend],
+                    prompt=prompt,
+                    temperature=temperature,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                    stop=stop,
+                    **kwargs
+                ):
+                    response_length += len(token)
+                    yield token
+                    
+                self._backend_health[backend] = True
+                logger.info(
+                    f"Streaming generation successful with {backend}",
+                    extra_fields={
+                        "backend": backend,
+                        "prompt_length": len(prompt),
+                        "response_length": response_length
+                    }
+                )
+                return
+                
+            except Exception as e:
+                last_error = e
+                self._backend_health[backend] = False
+                if response_length:
+                    logger.error(f"{backend} stream failed mid-response: {e}")
+                    raise
+                logger.warning(f"{backend} streaming generation failed: {e}")
+                
+                if not self.enable_fallback:
+                    break
+                    
+        # All backends failed
+        error_msg = f"All LLM backends failed. Last error: {last_error}"
+        logger.error(error_msg)
+        metrics.record_error("llm_generation_all_failed", str(last_error))
+        raise Exception(error_msg)
+        
     async def generate_with_chat(
         self,
         messages: List[Dict[str, str]],
@@ -0,0 +1,205 @@
+"""Offline CPU embedding backends for ED Bot v8.
+
+Produces the 384-dim vectors stored in ``document_chunks.embedding`` without
+network access or a GPU, so retrieval, ingestion and the semantic cache share
+one vector space on any machine.
+
+Two backends expose a sentence-transformers style ``encode``:
+- ``OnnxEmbeddingEncoder``: a 384-dim ONNX sentence model (e.g. an export of
+  all-MiniLM-L6-v2), used when ``local_embedding_model_path`` points at one and
+  onnxruntime/tokenizers are installed.
+- ``HashedNgramEncoder``: hashed character n-grams and words, sublinear TF
+  weighting and a seeded Gaussian random projection. No model files needed;
+  texts sharing surface forms ("STEMI protocol", "stemi protocols") land close.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.config.enhanced_settings import settings
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Matches DocumentChunk.embedding = Column(Vector(384))
+EMBEDDING_DIM = 384
+
+_WORD = re.compile(r"\w+")
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class HashedNgramEncoder:
+    """Hashed char-n-gram + random-projection text encoder."""
+
+    def __init__(
+        self,
+        dimension: int = EMBEDDING_DIM,
+        n_buckets: int = 2 ** 14,
+        ngram_range: tuple = (3, 5),
+        seed: int = 384,
+    ):
+        """Initialize encoder.
+
+        Args:
+            dimension: Output vector size
+            n_buckets: Hash buckets n-grams are folded into before projection
+            ngram_range: Smallest and largest character n-gram
+            seed: Projection seed; vectors are only comparable for equal seeds
+        """
+        self.dimension = dimension
+        self.n_buckets = n_buckets
+        self.ngram_range = ngram_range
+        self.seed = seed
+        self._projection: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def projection(self) -> np.ndarray:
+        # Built on first use: n_buckets x dimension float32 (~25 MB by default)
+        if self._projection is None:
+            with self._lock:
+                if self._projection is None:
+                    rng = np.random.default_rng(self.seed)
+                    projection = rng.standard_normal((self.n_buckets, self.dimension), dtype=np.float32)
+                    self._projection = projection / np.float32(math.sqrt(self.dimension))
+        return self._projection
+
+    def features(self, text: str) -> Counter:
+        """Character n-grams of each padded word, plus the words themselves."""
+        counts: Counter = Counter()
+        low, high = self.ngram_range
+        for word in _WORD.findall(text.lower()):
+            counts["w:" + word] += 1
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    counts[padded[i:i + n]] += 1
+        return counts
+
+    def _bucket(self, feature: str) -> int:
+        # Stable across processes, unlike hash()
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.n_buckets
+
+    def encode_one(self, text: str) -> np.ndarray:
+        counts = self.features(text)
+        if not counts:
+            return np.zeros(self.dimension, dtype=np.float32)
+
+        buckets = np.fromiter((self._bucket(f) for f in counts), dtype=np.int64, count=len(counts))
+        weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        vector = weights @ self.projection[buckets]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def encode(self, texts: Union[str, Sequence[str]]) -> np.ndarray:
+        """Unit-length float32 embedding(s), sentence-transformers style."""
+        if isinstance(texts, str):
+            return self.encode_one(texts)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self.encode_one(text) for text in texts])
+
+
+class OnnxEmbeddingEncoder:
+    """Mean-pooled ONNX sentence-embedding model run on CPU."""
+
+    def __init__(self, model_dir: str, max_length: int = 256):
+        """Load model.onnx and tokenizer.json from model_dir.
+
+        Raises:
+            RuntimeError: If onnxruntime/tokenizers are missing
+            FileNotFoundError: If the model files are missing
+        """
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime and tokenizers are required for the ONNX embedding backend")
+
+        path = Path(model_dir)
+        self.session = onnxruntime.InferenceSession(
+            str(path / "model.onnx"), providers=["CPUExecutionProvider"])
+        self.tokenizer = Tokenizer.from_file(str(path / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self._input_names = {inp.name for inp in self.session.get_inputs()}
+        self.dimension = self.encode(["dimension probe"]).shape[1]
+
+    def encode(self, texts: Union[str, Sequence[str]]) -> np.ndarray:
+        """Unit-length float32 embedding(s), sentence-transformers style."""
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        encodings = self.tokenizer.encode_batch(batch)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, inputs)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = _normalize_rows(pooled.astype(np.float32))
+        return embeddings[0] if single else embeddings
+
+
+# Global instance for easy access
+_local_embedding_model = None
+_local_embedding_lock = threading.Lock()
+
+
+def get_local_embedding_model():
+    """Process-wide offline encoder: ONNX if configured and usable, hashed n-grams otherwise."""
+    global _local_embedding_model
+    if _local_embedding_model is None:
+        with _local_embedding_lock:
+            if _local_embedding_model is None:
+                _local_embedding_model = _create_local_embedding_model()
+    return _local_embedding_model
+
+
+def _create_local_embedding_model():
+    model_dir = settings.local_embedding_model_path
+    if model_dir:
+        try:
+            encoder = OnnxEmbeddingEncoder(model_dir)
+            if encoder.dimension == EMBEDDING_DIM:
+                logger.info(f"Using ONNX embedding model from {model_dir}")
+                return encoder
+            logger.warning(
+                f"ONNX model produces {encoder.dimension}-dim vectors, expected {EMBEDDING_DIM}; "
+                "using hashed n-gram encoder")
+        except Exception as e:
+            logger.warning(f"ONNX embedding model unavailable ({e}); using hashed n-gram encoder")
+
+    return HashedNgramEncoder()
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embed texts with the local encoder as an (n, EMBEDDING_DIM) float32 matrix."""
+    return np.asarray(get_local_embedding_model().encode(texts), dtype=np.float32)
+
+
+def to_pgvector(embedding) -> str:
+    """pgvector text literal, e.g. '[0.1,0.2]', for binding with CAST(:param AS vector)."""
+    return "[" + ",".join(f"{x:.6g}" for x in np.asarray(embedding, dtype=np.float32).ravel()) + "]"
@@ -8,11 +8,18 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from ..cache.local_cache import InvalidationListener, get_local_cache
 from ..config.enhanced_settings import get_settings
 from ..models.async_database import init_async_database
 from ..observability.health import init_health_monitoring
 from ..observability.metrics import init_metrics
+from ..models.database import SessionLocal
+from ..pipeline.bm25_index import init_bm25_index
+from ..pipeline.corpus_stats import get_corpus_stats
+from ..pipeline.knowledge_base import init_knowledge_base
+from ..search.elasticsearch_client import close_async_elasticsearch_client
 from ..validation.hipaa import setup_hipaa_logging
+from .dependencies import close_llm_client
 from .endpoints import router
 from .endpoints.admin import router as admin_router
 from .endpoints.cache import router as cache_router
@@ -36,12 +43,37 @@ async def lifespan(app: FastAPI):
     init_async_database()
     logger.info("Async database connections initialized")
     
+    # Load the shared knowledge base once per worker
+    knowledge_base = init_knowledge_base(
+        reload_interval=settings.knowledge_base_reload_interval
+    )
+    knowledge_base.start_watching()
+    app.state.knowledge_base = knowledge_base
+    
+    # Build the in-memory BM25 chunk index in the background and keep it synced
+    bm25_index = init_bm25_index(
+        SessionLocal, reload_interval=settings.knowledge_base_reload_interval
+    )
+    bm25_index.start_watching()
+    
+    # Start loading the BM25 corpus statistics in the background
+    get_corpus_stats().snapshot()
+    
+    # Drop L1 cache entries other workers invalidate
+    invalidation_listener = InvalidationListener(get_local_cache())
+    invalidation_listener.start()
+    
     # Initialize observability systems
     init_metrics(settings)
     init_health_monitoring(settings)
     
     logger.info("Starting ED Bot v8 API with observability enabled")
     yield
+    await knowledge_base.stop_watching()
+    await bm25_index.stop_watching()
+    await invalidation_listener.stop()
+    await close_llm_client()
+    await close_async_elasticsearch_client()
     logger.info("Shutting down ED Bot v8 API")
 
 
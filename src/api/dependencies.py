@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import AsyncGenerator, Generator, Optional
 
@@ -7,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..cache.embedding_service import EmbeddingService, create_embedding_service
-from ..cache.redis_client import get_redis_client as get_async_redis_client
+from ..cache.redis_client import get_binary_redis_client
 from ..cache.semantic_cache import SemanticCache
 from ..config.enhanced_settings import EnhancedSettings
 from ..config.enhanced_settings import get_settings as get_enhanced_settings
@@ -16,7 +17,9 @@ from ..config.enhanced_settings import EnhancedSettings, get_settings
 from ..models.async_database import get_async_db_session
 from ..models.database import get_db_session as _get_db_session
 from ..pipeline.emergency_processor import EmergencyQueryProcessor
-from ..search.elasticsearch_client import ElasticsearchClient
+from ..pipeline.knowledge_base import KnowledgeBase
+from ..pipeline.knowledge_base import get_knowledge_base as _get_knowledge_base
+from ..search.elasticsearch_client import AsyncElasticsearchClient, get_async_elasticsearch_client
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +65,13 @@ def get_redis_client():
         )
 
 
-async def get_llm_client():
-    """Get LLM client - GPT-OSS only."""
+# Process-wide LLM client, created on first use and reused by every request
+_llm_client = None
+_llm_client_lock = asyncio.Lock()
+
+
+async def create_llm_client():
+    """Create a new LLM client - GPT-OSS only."""
     settings = get_settings()
 
     # Always use GPT-OSS (remove backend switching logic)
@@ -90,27 +98,51 @@ async def get_llm_client():
             raise
 
 
+async def get_llm_client():
+    """Get the shared LLM client, creating it (and health checking it) once."""
+    global _llm_client
+    if _llm_client is None:
+        async with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = await create_llm_client()
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Close the shared LLM client on shutdown."""
+    global _llm_client
+    client, _llm_client = _llm_client, None
+    if client is not None and hasattr(client, "close"):
+        await client.close()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Dependency to get the process-wide knowledge base loaded at startup"""
+    return _get_knowledge_base()
+
+
 async def get_query_processor(
     db: Session = Depends(get_db_session),
     redis_client=Depends(get_redis_client),
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
     semantic_cache=None  # Temporarily disabled - Depends(get_semantic_cache)
 ) -> EmergencyQueryProcessor:
     """Dependency to get emergency query processor with QA fallback support"""
     try:
         logger.info(
             "✅ Using Enhanced Emergency Query Processor with QA fallback")
-        return EmergencyQueryProcessor(db, redis_client)
+        return EmergencyQueryProcessor(db, redis_client, knowledge_base=knowledge_base)
     except Exception as e:
         logger.error(f"Emergency processor failed: {e}")
         # Even this fallback uses emergency processor
-        return EmergencyQueryProcessor(db, redis_client)
+        return EmergencyQueryProcessor(db, redis_client, knowledge_base=knowledge_base)
 
 
-def get_elasticsearch_client(settings: EnhancedSettings = Depends(get_settings)) -> Optional[ElasticsearchClient]:
-    """Get Elasticsearch client if hybrid search enabled"""
+def get_elasticsearch_client(settings: EnhancedSettings = Depends(get_settings)) -> Optional[AsyncElasticsearchClient]:
+    """Get the shared Elasticsearch client if hybrid search is enabled and available"""
     if settings.search_backend == "hybrid":
-        client = ElasticsearchClient(settings)
-        return client if client.get_client() else None
+        client = get_async_elasticsearch_client(settings)
+        return client if client.is_available() else None
     return None
 
 
@@ -135,8 +167,8 @@ async def get_semantic_cache(
         return None
 
     try:
-        # Get async Redis client
-        redis_client = await get_async_redis_client()
+        # Entries hold raw embedding and compressed body bytes
+        redis_client = await get_binary_redis_client()
 
         # Create semantic cache
         cache = SemanticCache(
@@ -1,8 +1,11 @@
 """Query endpoints for medical queries."""
 
+import json
 import logging
+from typing import Any, AsyncIterator, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from ...models.schemas import QueryRequest, QueryResponse
 from ...pipeline.emergency_processor import EmergencyQueryProcessor
@@ -34,6 +37,43 @@ async def process_query(
         )
 
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Frame one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/query/stream")
+async def stream_query(
+    request: QueryRequest, processor: EmergencyQueryProcessor = Depends(get_query_processor)
+):
+    """Stream a medical query answer as server-sent events.
+
+    Events: "sources" as soon as retrieval finishes, "token" for each piece
+    of the answer, then "done" with confidence and processing time. An
+    "error" event precedes "done" if generation fails mid-answer, and a
+    "replace" event carries the full answer that supersedes the streamed
+    tokens when the LLM answer is rejected once complete.
+    """
+    logger.info(f"Streaming query: {scrub_phi(request.query)}")
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in processor.stream_query(request.query):
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.error(f"Query streaming failed: {e}")
+            yield format_sse("error", {"message": "Query processing failed"})
+        finally:
+            # The session dependency has already exited once the body streams
+            processor.db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/health-simple")
 async def simple_health():
     """Simple health check for query endpoints"""
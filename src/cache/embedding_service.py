@@ -1,27 +1,56 @@
 """Embedding service for semantic cache.
 
 Provides a unified interface for generating embeddings for semantic similarity.
+
+Concurrent ``embed`` calls arriving within a short window are coalesced into a
+single model call, and recent embeddings are memoized by text digest, so the
+semantic cache's get and set for the same query embed it only once.
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from ..ai.local_embeddings import get_local_embedding_model
+from ..observability.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
     """Service for generating text embeddings."""
     
-    def __init__(self, embedding_model: Optional[Any] = None):
+    def __init__(
+        self,
+        embedding_model: Optional[Any] = None,
+        batch_window: float = 0.005,
+        max_batch_size: int = 32,
+        memo_size: int = 2048,
+    ):
         """Initialize embedding service.
         
         Args:
-            embedding_model: Optional embedding model (sentence transformer or OpenAI client)
+            embedding_model: Optional embedding model (sentence transformer or OpenAI client);
+                the offline local encoder is used when omitted
+            batch_window: Seconds to wait for more embed calls before calling the model
+            max_batch_size: Texts per model call
+            memo_size: Embeddings remembered, least recently used evicted first
         """
         self.embedding_model = embedding_model
-        
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.memo_size = memo_size
+
+        self._memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._stats = {"memo_hits": 0, "memo_misses": 0, "batches": 0, "texts_embedded": 0}
+
     async def embed(self, text: str) -> np.ndarray:
         """Generate embedding for text.
         
@@ -29,87 +58,181 @@ class EmbeddingService:
             text: Text to embed
             
         Returns:
-            Embedding vector as numpy array
+            Embedding vector as numpy array (read-only; copy before modifying)
         """
-        try:
-            # Use the configured embedding model
-            if self.embedding_model:
-                if hasattr(self.embedding_model, 'encode'):
-                    # Sentence transformer style
-                    embedding = self.embedding_model.encode(text)
-                    if isinstance(embedding, np.ndarray):
-                        return embedding
-                    else:
-                        return np.array(embedding)
-                elif hasattr(self.embedding_model, 'embeddings'):
-                    # OpenAI style
-                    response = self.embedding_model.embeddings.create(
-                        input=text,
-                        model="text-embedding-ada-002"
-                    )
-                    return np.array(response.data[0].embedding)
-                else:
-                    logger.warning("Unknown embedding model type, using fallback")
-            
-            # Fallback to a simple hash-based embedding for development
-            logger.warning("No embedding model available, using hash-based fallback")
-            return self._hash_embedding(text)
-                
-        except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
-            # Return hash-based fallback embedding
-            return self._hash_embedding(text)
-    
-    def _hash_embedding(self, text: str, dimension: int = 768) -> np.ndarray:
-        """Generate a deterministic hash-based embedding for fallback.
-        
-        This is used when no proper embedding model is available.
-        Note: This is not a real semantic embedding and should only be used
-        for development/testing purposes.
+        key = self._digest(text)
+        cached = self._memo_get(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Embed many texts, in max_batch_size model calls.
         
         Args:
-            text: Text to embed
-            dimension: Embedding dimension
+            texts: Texts to embed
             
         Returns:
-            Hash-based pseudo-embedding
+            Embeddings in the same order as texts
         """
-        import hashlib
-        
-        # Create multiple hash values to fill the dimension
-        embeddings = []
-        for i in range(0, dimension, 32):  # MD5 produces 32 hex chars
-            hash_input = f"{text}_{i}"
-            hash_value = hashlib.md5(hash_input.encode()).hexdigest()
-            # Convert hex to floats between -1 and 1
-            hash_floats = [
-                (int(hash_value[j:j+2], 16) - 127.5) / 127.5
-                for j in range(0, min(32, len(hash_value)), 2)
-            ]
-            embeddings.extend(hash_floats)
-        
-        # Truncate or pad to exact dimension
-        if len(embeddings) > dimension:
-            embeddings = embeddings[:dimension]
-        elif len(embeddings) < dimension:
-            embeddings.extend([0.0] * (dimension - len(embeddings)))
-        
-        # Normalize to unit vector
-        embedding = np.array(embeddings)
-        norm = np.linalg.norm(embedding)
-        if norm > 0:
-            embedding = embedding / norm
-            
+        keys = [self._digest(text) for text in texts]
+        embeddings: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in embeddings or key in missing:
+                continue
+            cached = self._memo_get(key)
+            if cached is not None:
+                embeddings[key] = cached
+            else:
+                missing[key] = text
+
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.max_batch_size):
+            batch_keys = missing_keys[start:start + self.max_batch_size]
+            vectors, memoize = await self._embed_batch([missing[key] for key in batch_keys])
+            for key, vector in zip(batch_keys, vectors):
+                embeddings[key] = self._memo_put(key, vector, memoize)
+
+        return [embeddings[key] for key in keys]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Memo and batching statistics."""
+        lookups = self._stats["memo_hits"] + self._stats["memo_misses"]
+        return {
+            **self._stats,
+            "memo_entries": len(self._memo),
+            "memo_hit_rate": self._stats["memo_hits"] / lookups if lookups else 0.0,
+            "mean_batch_size": (self._stats["texts_embedded"] / self._stats["batches"]
+                                if self._stats["batches"] else 0.0),
+        }
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        # Identical texts in one window are embedded once
+        texts: Dict[str, str] = {}
+        for key, text, _ in batch:
+            texts.setdefault(key, text)
+
+        try:
+            vectors, memoize = await self._embed_batch(list(texts.values()))
+            embeddings = {key: self._memo_put(key, vector, memoize) for key, vector in zip(texts, vectors)}
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, _, future in batch:
+            if not future.done():
+                future.set_result(embeddings[key])
+
+    async def _embed_batch(self, texts: List[str]) -> Tuple[List[np.ndarray], bool]:
+        """One model call for texts, falling back to the local encoder on failure.
+
+        Returns:
+            Embeddings, and whether they may be memoized (not after a model error)
+        """
+        start = time.perf_counter()
+        memoize = True
+        try:
+            vectors = await self._call_model(texts)
+        except Exception as e:
+            logger.error(f"Failed to generate embedding: {e}")
+            vectors = None
+            memoize = False
+
+        if vectors is None:
+            # Fall back to the offline encoder used for document chunks
+            vectors = list(await asyncio.to_thread(get_local_embedding_model().encode, texts))
+
+        self._stats["batches"] += 1
+        self._stats["texts_embedded"] += len(texts)
+        metrics.track_embedding_batch(len(texts), time.perf_counter() - start)
+        return vectors, memoize
+
+    async def _call_model(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        # Use the configured embedding model
+        if self.embedding_model:
+            # Single texts are passed as-is, batches as a list
+            model_input = texts[0] if len(texts) == 1 else texts
+            if hasattr(self.embedding_model, 'encode'):
+                # Sentence transformer style
+                embedding = await asyncio.to_thread(self.embedding_model.encode, model_input)
+                embedding = np.asarray(embedding)
+                return [embedding] if len(texts) == 1 else list(embedding)
+            elif hasattr(self.embedding_model, 'embeddings'):
+                # OpenAI style
+                response = await asyncio.to_thread(
+                    self.embedding_model.embeddings.create,
+                    input=model_input,
+                    model="text-embedding-ada-002"
+                )
+                return [np.array(item.embedding) for item in response.data]
+            else:
+                logger.warning("Unknown embedding model type, using local encoder")
+
+        return None
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _memo_get(self, key: str) -> Optional[np.ndarray]:
+        embedding = self._memo.get(key)
+        hit = embedding is not None
+        self._stats["memo_hits" if hit else "memo_misses"] += 1
+        metrics.track_embedding_memo(hit)
+        if hit:
+            self._memo.move_to_end(key)
+        return embedding
+
+    def _memo_put(self, key: str, embedding: np.ndarray, memoize: bool = True) -> np.ndarray:
+        embedding = np.asarray(embedding)
+        # Shared by every caller, so guard against in-place edits
+        embedding.setflags(write=False)
+        if memoize and self.memo_size > 0:
+            self._memo[key] = embedding
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
         return embedding
 
 
+# Shared so the memo and batching window span requests
+_embedding_service: Optional[EmbeddingService] = None
+
+
 def create_embedding_service(embedding_model: Optional[Any] = None) -> EmbeddingService:
     """Factory function to create embedding service.
     
+    Returns the process-wide service while its model is unchanged.
+    
     Args:
         embedding_model: Optional embedding model
         
     Returns:
         EmbeddingService instance
     """
-    return EmbeddingService(embedding_model)
\ No newline at end of file
+    global _embedding_service
+    if _embedding_service is None or _embedding_service.embedding_model is not embedding_model:
+        _embedding_service = EmbeddingService(embedding_model)
+    return _embedding_service
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""In-process L1 cache in front of Redis for ED Bot v8.
+
+A handful of protocols make up most traffic, so each worker keeps recently
+served responses in memory and only goes to Redis (L2) on an L1 miss. Entries
+are evicted least-recently-used once the cache is full and expire after at most
+``l1_ttl_seconds``, which bounds staleness even if an invalidation is missed.
+
+Invalidations are published on a Redis channel so every worker drops the same
+keys from its L1; ``InvalidationListener`` applies them in each worker.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from src.config.enhanced_settings import settings
+
+from .redis_client import call_redis, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "edbot:cache:invalidate"
+
+# Identifies this worker's own invalidation messages
+WORKER_ID = uuid.uuid4().hex
+
+
+class LocalCache:
+    """Size-bounded, TTL-aware LRU cache held in this worker's memory."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize local cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Maximum seconds an entry is served from memory
+            clock: Monotonic time source
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Sync retrieval stages run in worker threads alongside the event loop
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the live value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value, never longer than this cache's own TTL."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> int:
+        """Drop keys; returns how many were present."""
+        with self._lock:
+            return sum(self._entries.pop(key, None) is not None for key in keys)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Drop every key starting with prefix."""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def apply_invalidation(self, message: str) -> int:
+        """Apply an invalidation published by another worker."""
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed cache invalidation: {e}")
+            return 0
+
+        if data.get("origin") == WORKER_ID:
+            return 0
+
+        removed = self.delete(*data.get("keys", []))
+        if data.get("prefix") is not None:
+            removed += self.delete_prefix(data["prefix"])
+        return removed
+
+
+async def publish_invalidation(redis, keys: Iterable[str] = (), prefix: Optional[str] = None) -> None:
+    """Tell every other worker to drop keys (and/or a key prefix) from its L1."""
+    if redis is None:
+        return
+
+    message = json.dumps({"origin": WORKER_ID, "keys": list(keys), "prefix": prefix})
+    try:
+        await call_redis(redis.publish, INVALIDATION_CHANNEL, message)
+    except Exception as e:
+        logger.warning(f"Failed to publish cache invalidation: {e}")
+
+
+class InvalidationListener:
+    """Background task applying other workers' invalidations to the local cache."""
+
+    def __init__(self, local_cache: LocalCache, retry_interval: float = 30.0):
+        self.local_cache = local_cache
+        self.retry_interval = retry_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def listen(self) -> None:
+        """Subscribe to the invalidation channel, resubscribing after failures."""
+        while True:
+            try:
+                client = await get_redis_client()
+                pubsub = client._client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                logger.info("Listening for cache invalidations")
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.local_cache.apply_invalidation(message["data"])
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener unavailable: {e}")
+
+            # Invalidations may have been missed while disconnected
+            self.local_cache.clear()
+            await asyncio.sleep(self.retry_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global instance for easy access
+_local_cache: Optional[LocalCache] = None
+
+
+def get_local_cache() -> LocalCache:
+    """Get this worker's L1 cache."""
+    global _local_cache
+    if _local_cache is None:
+        cache_config = settings.cache_config
+        _local_cache = LocalCache(
+            max_entries=cache_config.l1_max_entries,
+            ttl=cache_config.l1_ttl_seconds,
+        )
+    return _local_cache
@@ -1,19 +1,25 @@
 import hashlib
 from typing import Any, Callable, Dict, Optional
 
+from src.cache.local_cache import LocalCache, get_local_cache, publish_invalidation
 from src.cache.redis_client import get_redis_client
 from src.config import settings
 from src.utils.logging import get_logger
+from src.observability.metrics import metrics as tier_metrics
 from src.utils.observability import metrics
 
 logger = get_logger(__name__)
 
 
 class CacheManager:
-    """Manage caching with query-type-specific policies."""
+    """Manage caching with query-type-specific policies.
 
-    def __init__(self):
+    Lookups check this worker's in-process L1 before the shared Redis L2.
+    """
+
+    def __init__(self, local_cache: Optional[LocalCache] = None):
         self.redis_client = None
+        self.local_cache = local_cache or get_local_cache()
 
     async def initialize(self):
         """Initialize cache manager."""
@@ -37,9 +43,17 @@ class CacheManager:
             await self.initialize()
 
         cache_key = self._generate_cache_key(query, query_type)
+        cached = self.local_cache.get(cache_key)
+        tier_metrics.track_cache_tier("l1", cached is not None)
+        if cached is not None:
+            metrics.increment_cache_hit()
+            return dict(cached)
+
         cached = await self.redis_client.get_json(cache_key)
+        tier_metrics.track_cache_tier("l2", bool(cached))
 
         if cached:
+            self.local_cache.set(cache_key, dict(cached))
             metrics.increment_cache_hit()
             logger.info(
                 "Cache hit",
@@ -77,6 +91,7 @@ class CacheManager:
         success = await self.redis_client.set_json(cache_key, response, ttl)
 
         if success:
+            self.local_cache.set(cache_key, dict(response), ttl)
             logger.info(
                 "Response cached",
                 extra_fields={
@@ -94,6 +109,10 @@ class CacheManager:
             await self.initialize()
 
         count = await self.redis_client.flush_pattern(f"query:{pattern}:*")
+
+        # L1 entries are plain keys; patterns here are query types
+        self.local_cache.delete_prefix(f"query:{pattern}:")
+        await publish_invalidation(self.redis_client._client, prefix=f"query:{pattern}:")
         logger.info(
             "Cache invalidated", extra_fields={"pattern": pattern, "count": count}
         )
@@ -159,6 +178,7 @@ class CacheManager:
         metrics_summary = metrics.get_metrics_summary()
 
         return {
+            "local": self.local_cache.get_stats(),
             "redis": info,
             "cache_metrics": metrics_summary.get("cache", {}),
             "ttl_settings": {
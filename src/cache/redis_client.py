@@ -1,4 +1,5 @@
 import asyncio
+import inspect
 import json
 from typing import Any, Dict, Optional
 
@@ -11,11 +12,20 @@ from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+async def call_redis(method, *args, **kwargs):
+    """Call a Redis command on either a redis.Redis or a redis.asyncio.Redis client."""
+    result = method(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
 class RedisClient:
     """Async Redis client wrapper."""
 
-    def __init__(self, url: Optional[str] = None):
+    def __init__(self, url: Optional[str] = None, decode_responses: bool = True):
         self.url = url or settings.redis_url
+        self.decode_responses = decode_responses
         self._client: Optional[aioredis.Redis] = None
         self._lock = asyncio.Lock()
 
@@ -27,7 +37,7 @@ class RedisClient:
                     self._client = await aioredis.from_url(
                         self.url,
                         encoding="utf-8",
-                        decode_responses=True,
+                        decode_responses=self.decode_responses,
                         socket_connect_timeout=5,
                         socket_timeout=5,
                         retry_on_timeout=True,
@@ -181,3 +191,16 @@ async def get_redis_client() -> RedisClient:
         _redis_client = RedisClient()
         await _redis_client.connect()
     return _redis_client
+
+
+# Client returning raw bytes, for binary values such as semantic cache entries
+_binary_redis_client: Optional[RedisClient] = None
+
+
+async def get_binary_redis_client() -> RedisClient:
+    """Get or create global Redis client that does not decode responses."""
+    global _binary_redis_client
+    if _binary_redis_client is None:
+        _binary_redis_client = RedisClient(decode_responses=False)
+        await _binary_redis_client.connect()
+    return _binary_redis_client
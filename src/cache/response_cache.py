@@ -0,0 +1,170 @@
+"""Exact-match response cache for ED Bot v8.
+
+Keys are a SHA-256 digest of the canonicalized query, so every worker (and
+every restart) computes the same key for the same question. Keys also carry
+the query type and the knowledge corpus version, so a corpus reload never
+serves answers built from the previous corpus.
+
+When given a LocalCache, lookups check the worker's in-process L1 before Redis
+(L2), and L2 hits are promoted into L1.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from src.config.enhanced_settings import settings
+from src.models.query_types import QueryType
+from src.observability.metrics import metrics
+
+from .local_cache import LocalCache, publish_invalidation
+from .redis_client import call_redis
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s.]")
+# Periods are punctuation unless they sit inside a number (e.g. 0.5 mg)
+_NON_DECIMAL_PERIOD = re.compile(r"(?<!\d)\.|\.(?!\d)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def canonicalize_query(query: str, abbreviation_expander=None) -> str:
+    """Normalize case, abbreviations, punctuation and whitespace of a query.
+
+    Args:
+        query: Raw user query
+        abbreviation_expander: Optional MedicalAbbreviationExpander; when given,
+            "DKA protocol" and "diabetic ketoacidosis protocol" share a key
+
+    Returns:
+        Canonical form of the query
+    """
+    canonical = query.lower()
+
+    if abbreviation_expander is not None:
+        try:
+            canonical = abbreviation_expander.expand_query(canonical)["expanded_query"].lower()
+        except Exception as e:
+            logger.warning(f"Abbreviation expansion failed for cache key: {e}")
+
+    canonical = _PUNCTUATION.sub(" ", canonical)
+    canonical = _NON_DECIMAL_PERIOD.sub(" ", canonical)
+    return _WHITESPACE.sub(" ", canonical).strip()
+
+
+class ResponseCache:
+    """Exact-match response cache shared by all workers through Redis."""
+
+    def __init__(
+        self,
+        redis,
+        corpus_version: str,
+        abbreviation_expander=None,
+        namespace: str = "response",
+        local_cache: Optional[LocalCache] = None,
+    ):
+        """Initialize response cache.
+
+        Args:
+            redis: Redis client (sync or asyncio)
+            corpus_version: Version of the knowledge the responses are built from
+            abbreviation_expander: Optional expander used when canonicalizing
+            namespace: Redis key namespace
+            local_cache: Optional in-process L1 consulted before Redis
+        """
+        self.redis = redis
+        self.corpus_version = corpus_version
+        self.abbreviation_expander = abbreviation_expander
+        self.namespace = namespace
+        self.local_cache = local_cache
+
+    def cache_key(self, query: str, query_type: QueryType) -> str:
+        """Stable Redis key for a query, its type and the corpus version."""
+        canonical = canonicalize_query(query, self.abbreviation_expander)
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{self.corpus_version}:{query_type.value}:{digest}"
+
+    def ttl_for(self, query_type: QueryType) -> int:
+        """TTL in seconds for a query type (0 means never cache)."""
+        cache_config = settings.cache_config
+        if query_type.name in cache_config.never_cache_types:
+            return 0
+        return cache_config.ttl_by_type.get(query_type.name, 0)
+
+    async def get(self, query: str, query_type: QueryType) -> Optional[Dict[str, Any]]:
+        """Return the cached response for this exact query, if any."""
+        ttl = self.ttl_for(query_type)
+        if ttl <= 0 or (self.redis is None and self.local_cache is None):
+            return None
+
+        key = self.cache_key(query, query_type)
+        if self.local_cache is not None:
+            cached = self.local_cache.get(key)
+            metrics.track_cache_tier("l1", cached is not None)
+            if cached is not None:
+                # Callers may pop fields; keep the L1 entry intact
+                return dict(cached)
+
+        if self.redis is None:
+            return None
+
+        cached = await self._get_from_redis(key)
+        metrics.track_cache_tier("l2", cached is not None)
+        if cached is not None and self.local_cache is not None:
+            self.local_cache.set(key, dict(cached), ttl)
+        return cached
+
+    async def _get_from_redis(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = await call_redis(self.redis.get, key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+        if not data:
+            return None
+
+        try:
+            return json.loads(data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Discarding undecodable response cache entry: {e}")
+            return None
+
+    async def set(self, query: str, query_type: QueryType, response: Dict[str, Any]) -> bool:
+        """Cache a response using the TTL policy for its query type."""
+        ttl = self.ttl_for(query_type)
+        if ttl <= 0 or (self.redis is None and self.local_cache is None):
+            return False
+
+        key = self.cache_key(query, query_type)
+        if self.local_cache is not None:
+            self.local_cache.set(key, dict(response), ttl)
+
+        if self.redis is None:
+            return True
+
+        try:
+            await call_redis(self.redis.setex, key, ttl, json.dumps(response))
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+            return False
+
+        logger.debug(f"Cached {query_type.value} response with TTL {ttl}s")
+        return True
+
+    async def invalidate(self, query: str, query_type: QueryType) -> None:
+        """Drop a cached response from Redis and from every worker's L1."""
+        key = self.cache_key(query, query_type)
+        if self.local_cache is not None:
+            self.local_cache.delete(key)
+
+        if self.redis is None:
+            return
+
+        try:
+            await call_redis(self.redis.delete, key)
+        except Exception as e:
+            logger.warning(f"Response cache delete failed: {e}")
+        await publish_invalidation(self.redis, keys=[key])
@@ -2,14 +2,28 @@
 
 Provides semantic similarity-based caching to reduce latency and LLM costs
 while maintaining medical safety and HIPAA compliance.
+
+Each entry is a Redis hash in a versioned, pickle-free layout: metadata as JSON,
+the query embedding as raw float16 bytes and the response body as
+zlib-compressed JSON, so the embedding can be read without decoding the body.
+
+Cached query embeddings are mirrored in a per-type Redis hash (the side index)
+and held in memory as a VectorIndex, so a lookup is one matrix-vector product
+plus a single read of the best entry. Workers reload the side index when its
+generation counter changes.
 """
 
 import hashlib
+import json
 import logging
-import pickle
-from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import re
+import struct
+import time
+import weakref
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import numpy as np
 from redis import Redis
@@ -18,8 +32,48 @@ from src.config.enhanced_settings import EnhancedSettings as Settings
 from src.models.query_types import QueryType
 from src.validation.hipaa import scrub_phi
 
+from .vector_index import EMBEDDING_DTYPE, VectorIndex, decode_index_entry, encode_index_entry
+
 logger = logging.getLogger(__name__)
 
+# Seconds between checks of another worker having changed a side index
+INDEX_SYNC_INTERVAL = 1.0
+
+# A number and the unit word after it ("0.3 mg", "2mg", "q4 hours")
+QUANTITY_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([a-zµ%/]+)?", re.IGNORECASE)
+
+
+@dataclass
+class _IndexState:
+    """In-memory mirror of one query type's side index."""
+
+    index: VectorIndex = field(default_factory=VectorIndex)
+    generation: Optional[int] = None
+    synced_at: float = float("-inf")
+
+
+# Indexes outlive the per-request SemanticCache; one set per Redis client
+_index_states: "weakref.WeakKeyDictionary[Any, Dict[str, _IndexState]]" = weakref.WeakKeyDictionary()
+
+
+def _quantities(query: str) -> List[Tuple[float, str]]:
+    """Numbers and their units in a query, so "0.3 mg" and "0.5 mg" never match."""
+    return sorted((float(number), (unit or "").lower()) for number, unit in QUANTITY_PATTERN.findall(query))
+
+
+def _as_text(value) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def _epoch(moment: datetime) -> float:
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_epoch(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
 
 @dataclass
 class CachedResponse:
@@ -37,6 +91,60 @@ class CachedResponse:
     similarity: float = 0.0  # Set when retrieved
 
 
+# Layout version of entry hashes; bump when the fields below change
+ENTRY_FORMAT_VERSION = 1
+
+
+def encode_cached_response(cached: CachedResponse) -> Dict[str, Any]:
+    """Hash fields for a cache entry.
+
+    Fields:
+        v: layout version
+        meta: JSON query, type, confidence and timestamps
+        embedding: raw float16 query embedding
+        body: zlib-compressed JSON response and sources
+        hits: hit counter (incremented in place)
+    """
+    embedding = np.ascontiguousarray(cached.query_embedding, dtype=EMBEDDING_DTYPE).ravel()
+    meta = {
+        "query": cached.query,
+        "query_type": cached.query_type,
+        "confidence": cached.confidence,
+        "created_at": _epoch(cached.created_at),
+        "expires_at": _epoch(cached.expires_at),
+    }
+    body = {"response": cached.response, "sources": cached.sources}
+    return {
+        "v": ENTRY_FORMAT_VERSION,
+        "meta": json.dumps(meta, separators=(",", ":")),
+        "embedding": embedding.tobytes(),
+        "body": zlib.compress(json.dumps(body, separators=(",", ":")).encode("utf-8")),
+        "hits": cached.hit_count,
+    }
+
+
+def decode_cached_response(fields: Mapping) -> CachedResponse:
+    """Inverse of encode_cached_response; raises ValueError for other layouts."""
+    fields = {_as_text(name): value for name, value in fields.items()}
+    version = int(_as_text(fields.get("v")) or 0)
+    if version != ENTRY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported semantic cache entry version {version}")
+
+    meta = json.loads(fields["meta"])
+    body = json.loads(zlib.decompress(fields["body"]))
+    return CachedResponse(
+        query=meta["query"],
+        query_embedding=np.frombuffer(fields["embedding"], dtype=EMBEDDING_DTYPE).astype(np.float32),
+        response=body["response"],
+        sources=body["sources"],
+        query_type=meta["query_type"],
+        confidence=meta["confidence"],
+        created_at=_from_epoch(meta["created_at"]),
+        expires_at=_from_epoch(meta["expires_at"]),
+        hit_count=int(_as_text(fields.get("hits")) or 0),
+    )
+
+
 class SemanticCache:
     """Semantic similarity-based cache for queries."""
 
@@ -124,6 +232,11 @@ class SemanticCache:
                 threshold
             )
 
+            if cached and _quantities(cached.query) != _quantities(scrubbed_query):
+                # Embeddings barely separate doses; an answer for another one is never served
+                logger.info(f"Cache miss for query type {query_type.value}: quantities differ")
+                cached = None
+
             if cached:
                 # Check if still valid
                 if cached.expires_at > datetime.utcnow():
@@ -230,74 +343,119 @@ class SemanticCache:
         Returns:
             Most similar cached response if above threshold
         """
-        # Get all cached entries for this query type
-        pattern = f"{self.namespace}:{query_type.value}:*"
+        index = await self._synced_index(query_type)
+        match = index.best_match(query_embedding)
+        if match is None:
+            return None
+
+        key, similarity = match
+        if similarity < threshold:
+            return None
 
         try:
-            # Use Redis SCAN to get keys
-            keys = []
-            cursor = 0
-            while True:
-                cursor, batch_keys = await self.redis.scan(
-                    cursor=cursor,
-                    match=pattern,
-                    count=100
-                )
-                keys.extend(batch_keys)
-                if cursor == 0:
-                    break
+            fields = await self.redis.hgetall(key)
+            cached = decode_cached_response(fields) if fields else None
         except Exception as e:
-            logger.error(f"Error scanning Redis keys: {e}")
+            # Entries written in an older layout are discarded
+            logger.warning(f"Discarding unreadable semantic cache entry {key}: {e}")
+            await self.redis.delete(key)
+            cached = None
+
+        if cached is None:
+            # Entry expired or was evicted in Redis; drop it from the index too
+            await self._remove_from_index(query_type.value, key)
             return None
 
-        best_match = None
-        best_similarity = 0
+        cached.similarity = similarity
+        return cached
 
-        for key in keys:
-            try:
-                # Deserialize cached entry
-                data = await self.redis.get(key)
-                if not data:
-                    continue
+    def _index_state(self, query_type: str) -> _IndexState:
+        states = _index_states.setdefault(self.redis, {})
+        return states.setdefault(f"{self.namespace}:{query_type}", _IndexState())
 
-                cached = pickle.loads(data)
+    def _entry_key(self, query_type: str, query: str) -> str:
+        key_hash = hashlib.md5(f"{query_type}:{query}".encode()).hexdigest()
+        return f"{self.namespace}:{query_type}:{key_hash}"
 
-                # Calculate cosine similarity
-                similarity = self._cosine_similarity(
-                    query_embedding,
-                    cached.query_embedding
-                )
+    def _index_key(self, query_type: str) -> str:
+        return f"{self.namespace}:index:{query_type}"
 
-                # Check if above threshold and best so far
-                if similarity >= threshold and similarity > best_similarity:
-                    best_match = cached
-                    best_match.similarity = similarity
-                    best_similarity = similarity
+    def _generation_key(self, query_type: str) -> str:
+        return f"{self.namespace}:index:{query_type}:generation"
 
-            except Exception as e:
-                logger.error(f"Error reading cache entry {key}: {e}")
-                continue
+    async def _synced_index(self, query_type: QueryType) -> VectorIndex:
+        """In-memory index for a query type, reloaded if another worker changed it."""
+        state = self._index_state(query_type.value)
+        now = time.monotonic()
+        if now - state.synced_at < INDEX_SYNC_INTERVAL:
+            return state.index
+        state.synced_at = now
+
+        try:
+            generation = int(_as_text(await self.redis.get(self._generation_key(query_type.value))) or 0)
+            if generation == state.generation:
+                return state.index
+
+            fields = await self.redis.hgetall(self._index_key(query_type.value))
+            entries, expired = [], []
+            wall_clock = time.time()
+            for key, value in fields.items():
+                try:
+                    embedding, expires_at = decode_index_entry(value)
+                except (TypeError, ValueError, struct.error):
+                    # Written in an older layout; treat like an expired row
+                    expires_at = 0.0
+                if expires_at > wall_clock:
+                    entries.append((_as_text(key), embedding, expires_at))
+                else:
+                    expired.append(key)
 
-        return best_match
+            if expired:
+                await self.redis.hdel(self._index_key(query_type.value), *expired)
+
+            state.index.replace_all(entries)
+            state.generation = generation
+            logger.debug(f"Loaded semantic index for {query_type.value}: {len(entries)} entries")
+        except Exception as e:
+            logger.error(f"Error syncing semantic index for {query_type.value}: {e}")
+
+        return state.index
+
+    async def _bump_generation(self, query_type: str, state: _IndexState) -> None:
+        generation = await self.redis.incr(self._generation_key(query_type))
+        # Still in sync only if nobody else wrote since our last load
+        if state.generation is not None and int(generation) == state.generation + 1:
+            state.generation = int(generation)
 
     async def _store(self, cached: CachedResponse):
-        """Store entry in Redis.
+        """Store entry in Redis and add it to the side index.
 
         Args:
             cached: Cache entry to store
         """
-        # Generate key
-        key_hash = hashlib.md5(
-            f"{cached.query_type}:{cached.query}".encode()
-        ).hexdigest()
-        key = f"{self.namespace}:{cached.query_type}:{key_hash}"
-
-        # Serialize and store
-        data = pickle.dumps(cached)
+        key = self._entry_key(cached.query_type, cached.query)
+        if not await self._write_entry(key, cached):
+            return
+
+        expires_at = _epoch(cached.expires_at)
+        await self.redis.hset(
+            self._index_key(cached.query_type), key,
+            encode_index_entry(cached.query_embedding, expires_at)
+        )
+        state = self._index_state(cached.query_type)
+        state.index.upsert(key, cached.query_embedding, expires_at)
+        await self._bump_generation(cached.query_type, state)
+
+    async def _write_entry(self, key: str, cached: CachedResponse) -> bool:
         ttl = int((cached.expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return False
 
-        if ttl > 0:
-            await self.redis.setex(key, ttl, data)
+        # Replace rather than merge, in case an older layout is stored at this key
+        await self.redis.delete(key)
+        await self.redis.hset(key, mapping=encode_cached_response(cached))
+        await self.redis.expire(key, ttl)
+        return True
 
     async def _remove(self, cached: CachedResponse):
         """Remove expired entry.
@@ -305,12 +463,15 @@ class SemanticCache:
         Args:
             cached: Cache entry to remove
         """
-        key_hash = hashlib.md5(
-            f"{cached.query_type}:{cached.query}".encode()
-        ).hexdigest()
-        key = f"{self.namespace}:{cached.query_type}:{key_hash}"
-
+        key = self._entry_key(cached.query_type, cached.query)
         await self.redis.delete(key)
+        await self._remove_from_index(cached.query_type, key)
+
+    async def _remove_from_index(self, query_type: str, key: str):
+        state = self._index_state(query_type)
+        state.index.remove(key)
+        await self.redis.hdel(self._index_key(query_type), key)
+        await self._bump_generation(query_type, state)
 
     async def _update_hit_count(self, cached: CachedResponse):
         """Update hit count for metrics.
@@ -318,8 +479,8 @@ class SemanticCache:
         Args:
             cached: Cache entry with updated hit count
         """
-        # Store updated entry
-        await self._store(cached)
+        # Counted in place; the entry and side index are left alone
+        await self.redis.hincrby(self._entry_key(cached.query_type, cached.query), "hits", 1)
 
     def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between embeddings.
@@ -405,6 +566,11 @@ class SemanticCache:
                 await self.redis.delete(*keys)
                 logger.info(
                     f"Invalidated {len(keys)} cache entries for {query_type.value}")
+
+            await self.redis.delete(self._index_key(query_type.value))
+            state = self._index_state(query_type.value)
+            state.index.clear()
+            await self._bump_generation(query_type.value, state)
         except Exception as e:
             logger.error(
                 f"Error invalidating cache for {query_type.value}: {e}")
@@ -440,13 +606,10 @@ class SemanticCache:
                 total_hits = 0
                 for key in keys:
                     try:
-                        data = await self.redis.get(key)
-                        if data:
-                            cached = pickle.loads(data)
-                            total_hits += cached.hit_count
-                    except (pickle.PickleError, AttributeError, KeyError) as e:
+                        total_hits += int(_as_text(await self.redis.hget(key, "hits")) or 0)
+                    except (TypeError, ValueError) as e:
                         # Skip corrupted or incompatible cache entries
-                        logger.debug(f"Failed to load cache entry {key}: {e}")
+                        logger.debug(f"Failed to read hits for cache entry {key}: {e}")
                         continue
 
                 stats[query_type.value] = {
@@ -0,0 +1,174 @@
+"""Single-flight coalescing of identical in-flight queries for ED Bot v8.
+
+When a code is called, many staff ask the same question within a second or two.
+The first request for a key runs the computation; every identical request that
+arrives while it is running awaits the same result instead of repeating it.
+
+Across workers the leader optionally holds a short Redis lock. A worker that
+finds the lock taken polls the shared response cache for the holder's answer,
+and computes on its own once the lock is released or the wait times out.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, ContextManager, Dict, Optional, Tuple, TypeVar
+
+from src.config.enhanced_settings import settings
+
+from .redis_client import call_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Coalescing scopes reported for requests that did not compute their own result
+LOCAL = "local"
+WORKER = "worker"
+
+
+class SingleFlight:
+    """Runs one computation per key at a time and shares its result."""
+
+    def __init__(
+        self,
+        lock_ttl: int = 15,
+        wait_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+        namespace: str = "inflight",
+    ):
+        """Initialize single-flight group.
+
+        Args:
+            lock_ttl: Seconds before an abandoned cross-worker lock expires
+            wait_timeout: Seconds to wait for another worker before computing locally
+            poll_interval: Seconds between polls of the shared result
+            namespace: Redis key namespace for cross-worker locks
+        """
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.namespace = namespace
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed in this process."""
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[..., Awaitable[T]],
+        redis=None,
+        lookup: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+        session_factory: Optional[Callable[[], ContextManager[Any]]] = None,
+    ) -> Tuple[T, Optional[str]]:
+        """Return the result for key, computing it only if nobody else is.
+
+        Args:
+            key: Coalescing key (identical requests must produce identical keys)
+            compute: Coroutine factory producing the result
+            redis: Optional Redis client (sync or asyncio) for cross-worker locking
+            lookup: Coroutine factory returning another worker's shared result, or None
+            session_factory: Optional context manager factory (e.g. get_db_session).
+                The computation then gets its own session, passed to compute and
+                closed when it finishes, since it can outlive the leading
+                request and that request's session
+
+        Returns:
+            Tuple of (result, scope) where scope is None if this call led the
+            computation, "local" if it joined one in this process, or "worker"
+            if the result came from another worker
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            result, _ = await asyncio.shield(task)
+            return result, LOCAL
+
+        task = asyncio.ensure_future(self._lead(key, compute, redis, lookup, session_factory))
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Shielded so a disconnecting leader does not cancel the followers' result
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved; awaiting callers still receive it
+            task.exception()
+
+    async def _lead(self, key, compute, redis, lookup, session_factory) -> Tuple[T, Optional[str]]:
+        if session_factory is not None:
+            with session_factory() as session:
+                return await self._lead(key, lambda: compute(session), redis, lookup, None)
+
+        if redis is None:
+            return await compute(), None
+
+        lock_key = f"{self.namespace}:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await call_redis(redis.set, lock_key, token, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            logger.warning(f"Coalescing lock unavailable, computing locally: {e}")
+            return await compute(), None
+
+        if not acquired and lookup is not None:
+            shared = await self._wait_for_worker(redis, lock_key, lookup)
+            if shared is not None:
+                return shared, WORKER
+
+        try:
+            return await compute(), None
+        finally:
+            if acquired:
+                await self._release(redis, lock_key, token)
+
+    async def _wait_for_worker(self, redis, lock_key: str, lookup) -> Optional[T]:
+        """Poll for the lock holder's result until it appears, the lock clears or we time out."""
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while time.monotonic() < deadline:
+                shared = await lookup()
+                if shared is not None:
+                    return shared
+                if not await call_redis(redis.get, lock_key):
+                    # Holder finished; its result may have landed just before release
+                    return await lookup()
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logger.warning(f"Waiting on coalescing lock failed: {e}")
+            return None
+
+        logger.warning(f"Timed out waiting for {lock_key}, computing locally")
+        return None
+
+    async def _release(self, redis, lock_key: str, token: str) -> None:
+        try:
+            holder = await call_redis(redis.get, lock_key)
+            if isinstance(holder, bytes):
+                holder = holder.decode("utf-8")
+            # Only release our own lock; an expired one may belong to another worker now
+            if holder == token:
+                await call_redis(redis.delete, lock_key)
+        except Exception as e:
+            logger.warning(f"Failed to release coalescing lock: {e}")
+
+
+# Global instance for easy access
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group."""
+    global _single_flight
+    if _single_flight is None:
+        cache_config = settings.cache_config
+        _single_flight = SingleFlight(
+            lock_ttl=cache_config.coalesce_lock_ttl,
+            wait_timeout=cache_config.coalesce_wait_timeout,
+        )
+    return _single_flight
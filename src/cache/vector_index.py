@@ -0,0 +1,134 @@
+"""In-memory vector index for the semantic cache.
+
+Holds one query type's cached query embeddings as a contiguous float32 matrix
+whose rows are normalized on insert, so finding the most similar cached query
+is a single matrix-vector product followed by an argmax.
+"""
+
+import logging
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stored embeddings are float16; the in-memory matrix is float32
+EMBEDDING_DTYPE = np.float16
+
+_EXPIRES_AT = struct.Struct("<d")
+
+
+def encode_index_entry(embedding: np.ndarray, expires_at: float) -> bytes:
+    """Compact binary index row: little-endian float64 expiry, then float16 vector."""
+    vector = np.ascontiguousarray(embedding, dtype=EMBEDDING_DTYPE).ravel()
+    return _EXPIRES_AT.pack(expires_at) + vector.tobytes()
+
+
+def decode_index_entry(value: bytes) -> Tuple[np.ndarray, float]:
+    """Inverse of encode_index_entry."""
+    (expires_at,) = _EXPIRES_AT.unpack_from(value)
+    vector = np.frombuffer(value, dtype=EMBEDDING_DTYPE, offset=_EXPIRES_AT.size)
+    return vector, expires_at
+
+
+class VectorIndex:
+    """Normalized float32 embedding matrix keyed by cache entry."""
+
+    def __init__(self, initial_capacity: int = 64):
+        self._initial_capacity = initial_capacity
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def clear(self) -> None:
+        self._matrix: Optional[np.ndarray] = None
+        self._expires = np.empty(0, dtype=np.float64)
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+
+    def upsert(self, key: str, embedding: np.ndarray, expires_at: float) -> None:
+        """Insert or replace the row for key."""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return
+
+        if self._matrix is not None and vector.shape[0] != self.dim:
+            # Embedding model changed; rows of the old dimension are unusable
+            logger.warning(f"Embedding dimension changed {self.dim} -> {vector.shape[0]}, clearing index")
+            self.clear()
+
+        row = self._rows.get(key)
+        if row is None:
+            row = self._size
+            self._reserve(row + 1, vector.shape[0])
+            self._keys.append(key)
+            self._rows[key] = row
+            self._size += 1
+
+        self._matrix[row] = vector / norm
+        self._expires[row] = expires_at
+
+    def remove(self, key: str) -> bool:
+        """Remove key's row by moving the last row into its place."""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+
+        last = self._size - 1
+        if row != last:
+            moved = self._keys[last]
+            self._matrix[row] = self._matrix[last]
+            self._expires[row] = self._expires[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+        self._size = last
+        return True
+
+    def replace_all(self, entries: Iterable[Tuple[str, np.ndarray, float]]) -> None:
+        """Rebuild the index from (key, embedding, expires_at) entries."""
+        self.clear()
+        for key, embedding, expires_at in entries:
+            self.upsert(key, embedding, expires_at)
+
+    def best_match(self, query_embedding: np.ndarray, now: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Key and cosine similarity of the closest unexpired row, or None."""
+        if self._size == 0:
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm == 0 or query.shape[0] != self.dim:
+            return None
+
+        scores = self._matrix[:self._size] @ (query / norm)
+        live = self._expires[:self._size] > (time.time() if now is None else now)
+        if not live.all():
+            scores = np.where(live, scores, -np.inf)
+
+        row = int(np.argmax(scores))
+        if not np.isfinite(scores[row]):
+            return None
+        return self._keys[row], float(scores[row])
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        if self._matrix is None:
+            capacity = max(self._initial_capacity, rows)
+            self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+            self._expires = np.zeros(capacity, dtype=np.float64)
+        elif rows > self._matrix.shape[0]:
+            capacity = max(rows, 2 * self._matrix.shape[0])
+            matrix = np.zeros((capacity, dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            expires = np.zeros(capacity, dtype=np.float64)
+            expires[:self._size] = self._expires[:self._size]
+            self._matrix, self._expires = matrix, expires
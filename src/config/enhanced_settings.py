@@ -127,6 +127,31 @@ class HybridSearchConfig(BaseSettings):
         description="Minimum similarity for hybrid result fusion"
     )
 
+    # pgvector ANN search breadth by query type (higher = better recall, slower)
+    hnsw_ef_search: Dict[str, int] = Field(
+        default={
+            "FORM_RETRIEVAL": 40,
+            "PROTOCOL_STEPS": 80,
+            "CONTACT_LOOKUP": 40,
+            "CRITERIA_CHECK": 100,
+            "DOSAGE_LOOKUP": 100,
+            "SUMMARY_REQUEST": 64
+        },
+        description="hnsw.ef_search applied to semantic search, by query type"
+    )
+
+    ivfflat_probes: Dict[str, int] = Field(
+        default={
+            "FORM_RETRIEVAL": 5,
+            "PROTOCOL_STEPS": 10,
+            "CONTACT_LOOKUP": 5,
+            "CRITERIA_CHECK": 15,
+            "DOSAGE_LOOKUP": 15,
+            "SUMMARY_REQUEST": 10
+        },
+        description="ivfflat.probes applied to semantic search, by query type"
+    )
+
 
 class CacheConfig(BaseSettings):
     """Semantic cache configuration"""
@@ -164,6 +189,33 @@ class CacheConfig(BaseSettings):
         description="Minimum response confidence required for caching"
     )
 
+    # In-process L1 in front of Redis
+    l1_max_entries: int = Field(
+        default=1024,
+        description="Maximum responses held in each worker's in-process cache"
+    )
+
+    l1_ttl_seconds: int = Field(
+        default=60,
+        description="Upper bound on how long a worker serves a response from memory"
+    )
+
+    # Coalescing of identical in-flight queries
+    coalesce_across_workers: bool = Field(
+        default=False,
+        description="Coordinate identical in-flight queries across workers with a Redis lock"
+    )
+
+    coalesce_lock_ttl: int = Field(
+        default=15,
+        description="Seconds before an abandoned cross-worker coalescing lock expires"
+    )
+
+    coalesce_wait_timeout: float = Field(
+        default=10.0,
+        description="Seconds to wait for another worker's result before computing locally"
+    )
+
 
 class TableExtractionConfig(BaseSettings):
     """Table extraction configuration"""
@@ -319,6 +371,22 @@ class EnhancedSettings(BaseSettings):
         description="Path to document storage"
     )
 
+    local_embedding_model_path: str = Field(
+        default="",
+        description="Optional ONNX sentence-embedding model directory (model.onnx + tokenizer.json); "
+                    "the hashed n-gram encoder is used when unset or unavailable"
+    )
+
+    embedding_batch_size: int = Field(
+        default=32,
+        description="Texts per embedding call in ingestion and backfills"
+    )
+
+    knowledge_base_reload_interval: int = Field(
+        default=30,
+        description="Seconds between knowledge base change checks (0 disables reload)"
+    )
+
     # Feature Flags
     features: FeatureFlags = Field(default_factory=FeatureFlags)
 
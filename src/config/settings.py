@@ -51,12 +51,38 @@ class Settings(BaseSettings):
         default=30,
         description="Elasticsearch request timeout in seconds"
     )
-    
+    elasticsearch_connections_per_node: int = Field(
+        default=10,
+        description="Pooled HTTP connections per Elasticsearch node for the shared async client"
+    )
+    elasticsearch_health_interval: int = Field(
+        default=15,
+        description="Seconds between background Elasticsearch availability checks"
+    )
+
     # Fusion weight overrides (optional)
     fusion_weights_json: Optional[str] = Field(
         default=None,
         description="JSON string of custom fusion weights per query type"
     )
+    hybrid_fusion_mode: Literal["rrf", "weighted"] = Field(
+        default="rrf",
+        description="Hybrid fusion: weighted reciprocal-rank fusion (rrf) or min-max normalized weighted scores"
+    )
+    hybrid_rrf_k: int = Field(
+        default=60,
+        description="RRF rank constant; larger values flatten the advantage of top ranks"
+    )
+
+    # Per-branch hybrid search deadlines; a late branch is dropped from the results
+    hybrid_keyword_deadline_ms: int = Field(
+        default=750,
+        description="Elasticsearch keyword branch deadline in milliseconds"
+    )
+    hybrid_semantic_deadline_ms: int = Field(
+        default=1500,
+        description="pgvector semantic branch deadline in milliseconds"
+    )
 
     # LLM Configuration - GPT-OSS ONLY
     llm_backend: str = "gpt-oss"  # Changed default to gpt-oss
@@ -0,0 +1,219 @@
+"""Resumable embedding backfill for existing chunks and tables.
+
+Walks ``document_chunks`` and ``extracted_tables`` in primary-key order
+(keyset pagination, so every page is an index range scan), embeds each page
+with one local-encoder call and writes the vectors back with a single
+``UPDATE ... FROM (VALUES ...)``. After each committed page the last id is
+checkpointed to a JSON file, so an interrupted run resumes where it stopped.
+
+Usage:
+    python -m src.ingestion.embedding_backfill
+    python -m src.ingestion.embedding_backfill --targets chunks --recompute
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.ai.local_embeddings import get_local_embedding_model, to_pgvector
+from src.config.enhanced_settings import settings
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = Path("embedding_backfill_checkpoint.json")
+
+
+@dataclass(frozen=True)
+class EmbeddingTarget:
+    """A table whose text column is embedded into a vector column."""
+
+    table: str
+    text_column: str
+    vector_column: str
+
+
+TARGETS: Dict[str, EmbeddingTarget] = {
+    "chunks": EmbeddingTarget("document_chunks", "chunk_text", "embedding"),
+    "tables": EmbeddingTarget("extracted_tables", "content_text", "content_vector"),
+}
+
+
+class EmbeddingBackfill:
+    """Fills missing (or, with recompute, all) embedding columns in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        batch_size: int = 32,
+        checkpoint_path: Path = DEFAULT_CHECKPOINT_PATH,
+        encoder: Optional[Any] = None,
+    ):
+        """Initialize backfill.
+
+        Args:
+            session_factory: Returns a SQLAlchemy session usable as a context manager
+            batch_size: Rows per page, embedding call and UPDATE
+            checkpoint_path: JSON file recording the last id written per target
+            encoder: Embedding model with ``encode`` (defaults to the local encoder)
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.checkpoint_path = Path(checkpoint_path)
+        self.encoder = encoder or get_local_embedding_model()
+        # A checkpoint written with a different encoder does not describe this run
+        self.model_name = type(self.encoder).__name__
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        if not self.checkpoint_path.exists():
+            return {}
+        try:
+            return json.loads(self.checkpoint_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return {}
+
+    def save_checkpoint(self, checkpoint: Dict[str, Dict[str, Any]]) -> None:
+        # Write-then-rename so an interrupted save never leaves a torn file
+        tmp_path = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(checkpoint, indent=2))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def run(self, targets: Sequence[str] = tuple(TARGETS), recompute: bool = False, reset: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Backfill each target, resuming from the checkpoint unless reset.
+
+        Args:
+            targets: Keys of TARGETS to process
+            recompute: Re-embed rows that already have a vector (e.g. after a model change)
+            reset: Ignore the existing checkpoint and start from the first id
+
+        Returns:
+            Per-target stats (rows, skipped, seconds, rows_per_second)
+        """
+        checkpoint = {} if reset else self.load_checkpoint()
+        results = {}
+        for name in targets:
+            state = checkpoint.get(name, {})
+            if state.get("model") != self.model_name or state.get("recompute") != recompute or state.get("completed"):
+                state = {}
+            state.update(model=self.model_name, recompute=recompute, completed=False)
+            checkpoint[name] = state
+            results[name] = self._backfill_target(TARGETS[name], state, checkpoint, recompute)
+        return results
+
+    def _backfill_target(
+        self, target: EmbeddingTarget, state: Dict[str, Any], checkpoint: Dict[str, Dict[str, Any]], recompute: bool
+    ) -> Dict[str, Any]:
+        if state.get("last_id") is not None:
+            logger.info(f"Resuming {target.table} after id {state['last_id']}")
+
+        rows_written = skipped = 0
+        start = time.perf_counter()
+        while True:
+            with self.session_factory() as session:
+                rows = session.execute(
+                    text(self._select_sql(target, state.get("last_id"), recompute)),
+                    {"last_id": state.get("last_id"), "batch_size": self.batch_size},
+                ).fetchall()
+                if not rows:
+                    break
+
+                pending = [(row[0], row[1]) for row in rows if row[1] and row[1].strip()]
+                skipped += len(rows) - len(pending)
+                if pending:
+                    vectors = self.encoder.encode([content for _, content in pending])
+                    session.execute(
+                        text(self._update_sql(target, len(pending))),
+                        self._update_params(pending, vectors),
+                    )
+                session.commit()
+
+            rows_written += len(pending)
+            state["last_id"] = rows[-1][0]
+            state["rows"] = state.get("rows", 0) + len(pending)
+            self.save_checkpoint(checkpoint)
+
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"{target.table}: {rows_written} rows embedded "
+                f"({rows_written / elapsed if elapsed else 0.0:.1f} rows/sec)"
+            )
+
+        state["completed"] = True
+        self.save_checkpoint(checkpoint)
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "rows": rows_written,
+            "skipped": skipped,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows_written / elapsed, 1) if elapsed else 0.0,
+        }
+        logger.info(f"Finished {target.table}: {stats}")
+        return stats
+
+    @staticmethod
+    def _select_sql(target: EmbeddingTarget, last_id: Optional[str], recompute: bool) -> str:
+        conditions = []
+        if last_id is not None:
+            conditions.append("id > :last_id")
+        if not recompute:
+            conditions.append(f"{target.vector_column} IS NULL")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return (
+            f"SELECT id, {target.text_column} FROM {target.table} "
+            f"{where} ORDER BY id LIMIT :batch_size"
+        )
+
+    @staticmethod
+    def _update_sql(target: EmbeddingTarget, count: int) -> str:
+        values = ", ".join(f"(:id_{i}, :embedding_{i})" for i in range(count))
+        return (
+            f"UPDATE {target.table} AS t "
+            f"SET {target.vector_column} = CAST(v.embedding AS vector) "
+            f"FROM (VALUES {values}) AS v(id, embedding) "
+            f"WHERE t.id = v.id"
+        )
+
+    @staticmethod
+    def _update_params(pending: List[tuple], vectors) -> Dict[str, str]:
+        params = {}
+        for i, ((row_id, _), vector) in enumerate(zip(pending, vectors)):
+            params[f"id_{i}"] = row_id
+            params[f"embedding_{i}"] = to_pgvector(vector)
+        return params
+
+
+def main():
+    """CLI entry point for the embedding backfill."""
+    parser = argparse.ArgumentParser(description="Backfill chunk and table embeddings")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS),
+                        help="Tables to backfill")
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size,
+                        help="Rows per embedding call and UPDATE")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT_PATH,
+                        help="Checkpoint file used to resume interrupted runs")
+    parser.add_argument("--recompute", action="store_true",
+                        help="Re-embed rows that already have a vector")
+    parser.add_argument("--reset", action="store_true", help="Ignore the existing checkpoint")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_url)
+    backfill = EmbeddingBackfill(
+        sessionmaker(bind=engine),
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+    )
+    results = backfill.run(args.targets, recompute=args.recompute, reset=args.reset)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,12 @@
 import argparse
 import asyncio
-import hashlib
 from pathlib import Path
 from typing import List, Optional
 
-from elasticsearch.helpers import bulk
 from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 
+from src.ai.local_embeddings import embed_texts
 from src.config import settings
 from src.config.settings import get_settings
 from src.ingestion.content_classifier import ContentClassifier, ParsedDocument
@@ -21,7 +20,9 @@ from src.models.entities import (
     ExtractedEntity,
     ExtractedTable,
 )
+from src.pipeline.corpus_stats import record_new_chunks
 from src.search.elasticsearch_client import ElasticsearchClient
+from src.search.es_bulk_indexer import BulkIndexer, BulkStats, iter_index_actions
 from src.search.es_index_manager import ElasticsearchIndexManager
 from src.utils.logging import get_logger
 from src.utils.observability import metrics, track_latency
@@ -173,8 +174,9 @@ class DocumentProcessor:
                 session.add(document)
                 session.flush()  # Get the document ID
 
-                # Store chunks
-                for chunk_data in parsed_doc.chunks:
+                # Store chunks with their 384-dim embeddings
+                embeddings = embed_texts([chunk_data["text"] for chunk_data in parsed_doc.chunks])
+                for chunk_data, embedding in zip(parsed_doc.chunks, embeddings):
                     chunk = DocumentChunk(
                         document_id=document.id,
                         chunk_text=chunk_data["text"],
@@ -186,6 +188,7 @@ class DocumentProcessor:
                         contains_dosage=chunk_data.get("contains_dosage", False),
                         page_number=chunk_data.get("page_number"),
                         meta=chunk_data.get("metadata", {}),
+                        embedding=embedding.tolist(),
                     )
                     session.add(chunk)
 
@@ -204,12 +207,8 @@ class DocumentProcessor:
 
                 # Store extracted tables (PRP 19)
                 if tables:
-                    for table_data in tables:
-                        # Generate embedding for table content
-                        table_embedding = None
-                        # TODO: Add embedding generation when needed
-                        # table_embedding = await self._generate_embedding(table_data["content_text"])
-                        
+                    table_embeddings = embed_texts([table_data["content_text"] for table_data in tables])
+                    for table_data, table_embedding in zip(tables, table_embeddings):
                         extracted_table = ExtractedTable(
                             document_id=document.id,
                             page_number=table_data["page_number"],
@@ -221,12 +220,15 @@ class DocumentProcessor:
                             rows=table_data["rows"],
                             units=table_data.get("units"),
                             content_text=table_data["content_text"],
-                            content_vector=table_embedding,
+                            content_vector=table_embedding.tolist(),
                             bbox=table_data.get("bbox"),
                             confidence=table_data.get("confidence", 1.0)
                         )
                         session.add(extracted_table)
 
+                # Keep the shared BM25 corpus statistics current, committed with the chunks
+                record_new_chunks(session, [chunk_data["text"] for chunk_data in parsed_doc.chunks])
+
                 session.commit()
 
                 logger.info(
@@ -255,129 +257,21 @@ class DocumentProcessor:
             return
 
         try:
-            # Get the stored document and chunks from database
-            with self.SessionLocal() as session:
-                stmt = select(Document).where(Document.id == document_id)
-                document = session.execute(stmt).scalar_one()
-                
-                stmt_chunks = select(DocumentChunk).where(DocumentChunk.document_id == document_id)
-                chunks = session.execute(stmt_chunks).scalars().all()
-                
-                stmt_registry = select(DocumentRegistry).where(DocumentRegistry.document_id == document_id)
-                registry = session.execute(stmt_registry).scalar_one_or_none()
-
-            # Prepare bulk index operations
-            operations = []
-            
-            # Index document
-            doc_id = hashlib.md5(f"{document.id}".encode()).hexdigest()
-            doc_source = {
-                "id": str(document.id),
-                "content": document.content[:10000] if document.content else "",  # Limit for ES
-                "content_type": document.content_type,
-                "filename": document.filename,
-                "title": document.meta.get("title", document.filename),
-                "protocol_name": self._extract_protocol_name(document),
-                "form_name": self._extract_form_name(document),
-                "medical_specialties": document.meta.get("medical_specialties", []),
-                "tags": document.meta.get("tags", []),
-                "file_type": document.file_type,
-                "file_hash": document.file_hash,
-                "metadata": document.meta,
-                "created_at": document.created_at.isoformat(),
-                "updated_at": document.updated_at.isoformat()
-            }
-            
-            operations.append({
-                "_index": f"{self.settings.elasticsearch_index_prefix}_documents",
-                "_id": doc_id,
-                "_source": doc_source
-            })
-            
-            # Index chunks
-            for chunk in chunks:
-                chunk_id = hashlib.md5(f"{chunk.id}".encode()).hexdigest()
-                chunk_source = {
-                    "id": str(chunk.id),
-                    "document_id": str(document.id),
-                    "content": chunk.chunk_text,
-                    "chunk_index": chunk.chunk_index,
-                    "chunk_type": chunk.chunk_type,
-                    "medical_category": chunk.medical_category,
-                    "urgency_level": chunk.urgency_level,
-                    "contains_contact": chunk.contains_contact,
-                    "contains_dosage": chunk.contains_dosage,
-                    "page_number": chunk.page_number,
-                    "metadata": chunk.meta,
-                    "created_at": chunk.created_at.isoformat()
-                }
-                
-                operations.append({
-                    "_index": f"{self.settings.elasticsearch_index_prefix}_chunks",
-                    "_id": chunk_id,
-                    "_source": chunk_source
-                })
-            
-            # Index registry entry if exists
-            if registry:
-                registry_id = hashlib.md5(f"{registry.id}".encode()).hexdigest()
-                registry_source = {
-                    "id": str(registry.id),
-                    "document_id": str(document.id),
-                    "keywords": registry.keywords,
-                    "display_name": registry.display_name,
-                    "file_path": registry.file_path,
-                    "category": registry.category,
-                    "priority": registry.priority,
-                    "quick_access": registry.quick_access,
-                    "metadata": registry.meta
-                }
-                
-                operations.append({
-                    "_index": f"{self.settings.elasticsearch_index_prefix}_registry",
-                    "_id": registry_id,
-                    "_source": registry_source
-                })
-                
-            # Bulk index
-            success, failed = bulk(es, operations, raise_on_error=False)
-            if failed:
-                logger.error(f"Failed to index {len(failed)} items to ES: {failed}")
+            stats = await asyncio.to_thread(self._bulk_index_document, es, document_id)
+            if stats.failed:
+                logger.error(f"Failed to index {stats.failed} items to ES: {stats.errors}")
             else:
-                logger.info(f"Indexed {success} items to Elasticsearch for document {document.filename}")
+                logger.info(f"Indexed {stats.indexed} items to Elasticsearch for document {parsed_doc.filename}")
                 
         except Exception as e:
             logger.error(f"ES indexing failed for document {document_id}: {e}")
             # Don't fail the entire ingestion if ES fails
 
-    def _extract_protocol_name(self, document: Document) -> Optional[str]:
-        """Extract protocol name from document for exact matching."""
-        if document.content_type == "protocol":
-            # Try to extract from title or filename
-            title = document.meta.get("title", "").lower()
-            filename = document.filename.lower()
-            
-            protocol_keywords = ["protocol", "pathway", "algorithm", "guideline"]
-            for content in [title, filename]:
-                if any(keyword in content for keyword in protocol_keywords):
-                    # Clean and return protocol name
-                    name = content.replace(".pdf", "").replace("_", " ").strip()
-                    return name
-        return None
-        
-    def _extract_form_name(self, document: Document) -> Optional[str]:
-        """Extract form name from document for exact matching."""
-        if document.content_type == "form":
-            title = document.meta.get("title", "").lower()
-            filename = document.filename.lower()
-            
-            form_keywords = ["form", "consent", "checklist", "template"]
-            for content in [title, filename]:
-                if any(keyword in content for keyword in form_keywords):
-                    # Clean and return form name
-                    name = content.replace(".pdf", "").replace("_", " ").strip()
-                    return name
-        return None
+    def _bulk_index_document(self, es, document_id: str) -> BulkStats:
+        """Stream one document's rows from Postgres into its three indices."""
+        with self.SessionLocal() as session:
+            actions = iter_index_actions(session, self.settings.elasticsearch_index_prefix, document_id)
+            return BulkIndexer(es, thread_count=1).index(actions)
 
     async def _update_registry(self, parsed_doc, content_type: Optional[str]):
         """Update document registry for quick lookup with enhanced classification."""
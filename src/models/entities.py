@@ -4,8 +4,10 @@ from datetime import datetime
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
+    Computed,
     DateTime,
     Float,
     ForeignKey,
@@ -15,8 +17,9 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 Base = declarative_base()
 
@@ -58,6 +61,7 @@ class Document(Base):
     __table_args__ = (
         Index("idx_document_content_type", "content_type"),
         Index("idx_document_filename", "filename"),
+        Index("idx_document_filename_trgm", "filename", postgresql_using="gin", postgresql_ops={"filename": "gin_trgm_ops"}),
         Index("idx_document_file_hash", "file_hash"),
     )
 
@@ -74,6 +78,8 @@ class DocumentChunk(Base):
     chunk_text = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)
     embedding = Column(Vector(384))  # Using 384-dim embeddings (e.g., all-MiniLM-L6-v2)
+    # Maintained by Postgres for full-text search; deferred so ORM loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(chunk_text, ''))", persisted=True)))
     chunk_type = Column(String)  # header|body|table|list
     medical_category = Column(String)  # cardiology|emergency|pharmacy|etc
     urgency_level = Column(String)  # routine|urgent|stat|emergent
@@ -101,6 +107,9 @@ class DocumentChunk(Base):
         Index("idx_chunk_contains_contact", "contains_contact"),
         Index("idx_chunk_contains_dosage", "contains_dosage"),
         Index("idx_chunk_page", "document_id", "page_number"),  # For page-based retrieval (PRP 17)
+        Index("idx_chunk_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_chunk_text_trgm", "chunk_text", postgresql_using="gin", postgresql_ops={"chunk_text": "gin_trgm_ops"}),
+        Index("idx_chunk_embedding_hnsw", "embedding", postgresql_using="hnsw", postgresql_with={"m": 16, "ef_construction": 64}, postgresql_ops={"embedding": "vector_cosine_ops"}),
         UniqueConstraint("document_id", "chunk_index", name="uq_document_chunk_index"),
     )
 
@@ -294,3 +303,24 @@ class ExtractedTable(Base):
         Index("idx_table_type", "table_type"),
         Index("idx_table_content_vector", "content_vector", postgresql_using="ivfflat", postgresql_ops={"content_vector": "vector_cosine_ops"}),
     )
+
+
+class CorpusStats(Base):
+    """Corpus totals for BM25 scoring, a single row kept current by ingestion."""
+
+    __tablename__ = "corpus_stats"
+
+    id = Column(Integer, primary_key=True, default=1)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(BigInteger, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every change
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CorpusTermDF(Base):
+    """Number of chunks containing each whitespace token, for BM25 IDF."""
+
+    __tablename__ = "corpus_term_df"
+
+    term = Column(Text, primary_key=True)
+    document_frequency = Column(Integer, nullable=False)
@@ -0,0 +1,222 @@
+"""
+Async retrieval repository for EDBotv8.
+Read-only document and chunk queries for the retrieval pipeline, executed on the
+pooled async engine so concurrent requests overlap their database waits.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Row
+
+from .async_database import get_database
+from .entities import Document, DocumentChunk, DocumentRegistry
+from .vector_index_manager import SET_ANN_PARAMS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Shared with the sync retrievers so both paths issue identical SQL
+DOCUMENT_CHUNK_TEXTS_SQL = text("""
+    SELECT dc.chunk_text
+    FROM documents d
+    JOIN document_chunks dc ON d.id = dc.document_id
+    WHERE d.filename = :filename
+    ORDER BY dc.chunk_index
+    LIMIT :limit
+""")
+
+CHUNKS_BY_FILENAME_PATTERN_SQL = text("""
+    SELECT dc.chunk_text, d.filename
+    FROM document_chunks dc
+    JOIN documents d ON dc.document_id = d.id
+    WHERE d.filename ILIKE :doc_pattern
+    AND LENGTH(dc.chunk_text) > :min_length
+    ORDER BY LENGTH(dc.chunk_text) DESC
+    LIMIT :limit
+""")
+
+# Nearest chunks by cosine distance (ordered by distance so the HNSW index can
+# serve it); a NULL content_type means no filter
+SEMANTIC_CHUNKS_SQL = text("""
+    SELECT 
+        dc.id,
+        dc.document_id,
+        dc.chunk_text,
+        dc.chunk_index,
+        dc.metadata,
+        d.filename,
+        d.content_type,
+        d.file_type,
+        dr.display_name,
+        dr.category,
+        1 - (dc.embedding <=> CAST(:query_embedding AS vector)) as similarity
+    FROM document_chunks dc
+    JOIN documents d ON dc.document_id = d.id
+    LEFT JOIN document_registry dr ON d.id = dr.document_id
+    WHERE dc.embedding IS NOT NULL
+    AND (CAST(:content_type AS text) IS NULL OR d.content_type = CAST(:content_type AS text))
+    AND 1 - (dc.embedding <=> CAST(:query_embedding AS vector)) >= :threshold
+    ORDER BY dc.embedding <=> CAST(:query_embedding AS vector)
+    LIMIT :k
+""")
+
+
+class RetrievalRepository:
+    """
+    Async data access for document retrieval.
+
+    Every call checks out its own short-lived session, so coroutines running
+    concurrently (e.g. under asyncio.gather) never share an AsyncSession.
+    """
+
+    def __init__(self, database: Callable = get_database):
+        self._database = database
+
+    async def search_chunks(self, statement: Any, params: Optional[Dict[str, Any]] = None) -> List[Row]:
+        """Run a retriever-built chunk search and return all rows."""
+        if isinstance(statement, str):
+            statement = text(statement)
+        async with self._database() as session:
+            result = await session.execute(statement, params or {})
+            return list(result.fetchall())
+
+    async def semantic_search_chunks(
+        self,
+        query_embedding: str,
+        k: int,
+        threshold: float,
+        content_type: Optional[str] = None,
+        ann_params: Optional[Dict[str, int]] = None
+    ) -> List[Row]:
+        """Nearest chunks to a pgvector literal, with ANN search breadth set for this transaction."""
+        async with self._database() as session:
+            if ann_params:
+                await session.execute(SET_ANN_PARAMS_SQL, {key: str(value) for key, value in ann_params.items()})
+            result = await session.execute(SEMANTIC_CHUNKS_SQL, {
+                "query_embedding": query_embedding,
+                "content_type": content_type,
+                "threshold": threshold,
+                "k": k
+            })
+            return list(result.fetchall())
+
+    async def get_document_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Document information with registry display name, or None if unknown."""
+        stmt = (
+            select(Document, DocumentRegistry)
+            .outerjoin(DocumentRegistry, DocumentRegistry.document_id == Document.id)
+            .where(Document.filename == filename)
+            .limit(1)
+        )
+        async with self._database() as session:
+            row = (await session.execute(stmt)).first()
+
+        if row is None:
+            return None
+
+        doc, registry = row
+        return {
+            "id": doc.id,
+            "filename": doc.filename,
+            "display_name": registry.display_name if registry else doc.filename,
+            "content_type": doc.content_type,
+            "file_type": doc.file_type,
+            "category": registry.category if registry else None,
+            "metadata": doc.meta
+        }
+
+    async def get_registry_entry(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Registry entry (display name, category, priority) for a document."""
+        stmt = select(DocumentRegistry).where(DocumentRegistry.document_id == document_id).limit(1)
+        async with self._database() as session:
+            registry = (await session.execute(stmt)).scalars().first()
+
+        if registry is None:
+            return None
+
+        return {
+            "document_id": registry.document_id,
+            "display_name": registry.display_name,
+            "category": registry.category,
+            "priority": registry.priority,
+            "query_type": registry.query_type,
+            "keywords": registry.keywords or []
+        }
+
+    async def get_chunk_context(
+        self,
+        document_id: str,
+        chunk_index: int,
+        context_window: int = 2
+    ) -> Dict[str, Any]:
+        """Chunks surrounding chunk_index plus the document's source information."""
+        chunks_stmt = (
+            select(DocumentChunk)
+            .where(
+                DocumentChunk.document_id == document_id,
+                DocumentChunk.chunk_index >= chunk_index - context_window,
+                DocumentChunk.chunk_index <= chunk_index + context_window
+            )
+            .order_by(DocumentChunk.chunk_index)
+        )
+        source_stmt = (
+            select(Document, DocumentRegistry)
+            .outerjoin(DocumentRegistry, DocumentRegistry.document_id == Document.id)
+            .where(Document.id == document_id)
+            .limit(1)
+        )
+
+        async with self._database() as session:
+            chunks = (await session.execute(chunks_stmt)).scalars().all()
+            if not chunks:
+                return {}
+            source_row = (await session.execute(source_stmt)).first()
+
+        doc, registry = source_row if source_row else (None, None)
+        return {
+            "document_id": document_id,
+            "context": "\n".join(chunk.chunk_text for chunk in chunks),
+            "chunks": [
+                {
+                    "index": chunk.chunk_index,
+                    "text": chunk.chunk_text,
+                    "metadata": chunk.meta
+                }
+                for chunk in chunks
+            ],
+            "source": {
+                "filename": doc.filename if doc else "unknown",
+                "display_name": registry.display_name if registry else doc.filename if doc else "unknown",
+                "content_type": doc.content_type if doc else None,
+                "category": registry.category if registry else None
+            }
+        }
+
+    async def get_document_chunk_texts(self, filename: str, limit: int = 3) -> List[str]:
+        """Leading chunk texts of a document, in chunk order."""
+        rows = await self.search_chunks(DOCUMENT_CHUNK_TEXTS_SQL, {"filename": filename, "limit": limit})
+        return [row[0] for row in rows]
+
+    async def get_chunks_by_filename_pattern(
+        self,
+        doc_pattern: str,
+        min_length: int = 100,
+        limit: int = 5
+    ) -> Sequence[Row]:
+        """Longest (chunk_text, filename) rows from documents whose filename contains doc_pattern."""
+        return await self.search_chunks(
+            CHUNKS_BY_FILENAME_PATTERN_SQL,
+            {"doc_pattern": f"%{doc_pattern}%", "min_length": min_length, "limit": limit}
+        )
+
+
+# Global instance for easy access
+_retrieval_repository: Optional[RetrievalRepository] = None
+
+
+def get_retrieval_repository() -> RetrievalRepository:
+    """Get the process-wide retrieval repository."""
+    global _retrieval_repository
+    if _retrieval_repository is None:
+        _retrieval_repository = RetrievalRepository()
+    return _retrieval_repository
@@ -0,0 +1,226 @@
+"""
+pgvector ANN index management for EDBotv8.
+Builds, rebuilds and inspects the HNSW index on document_chunks.embedding,
+applies the per-query-type ef_search/probes search breadth, and benchmarks
+recall@k against exact (sequential scan) search for candidate settings.
+"""
+import logging
+import statistics
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from sqlalchemy import text
+
+from src.config.enhanced_settings import settings
+
+from .query_types import QueryType
+
+logger = logging.getLogger(__name__)
+
+CHUNK_HNSW_INDEX = "idx_chunk_embedding_hnsw"
+
+# pgvector's own defaults, used for query types missing from settings
+DEFAULT_EF_SEARCH = 40
+DEFAULT_PROBES = 1
+
+SET_ANN_PARAMS_SQL = text(
+    "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+    "set_config('ivfflat.probes', :probes, true)"
+)
+
+# Keeps small tables on the index so the comparison measures it
+FORCE_INDEX_SQL = text("SELECT set_config('enable_seqscan', 'off', true)")
+
+FORCE_EXACT_SQL = text(
+    "SELECT set_config('enable_indexscan', 'off', true), "
+    "set_config('enable_bitmapscan', 'off', true)"
+)
+
+NEAREST_CHUNKS_SQL = text("""
+    SELECT id
+    FROM document_chunks
+    WHERE embedding IS NOT NULL
+    ORDER BY embedding <=> CAST(:query_embedding AS vector)
+    LIMIT :k
+""")
+
+SAMPLE_EMBEDDINGS_SQL = text("""
+    SELECT embedding::text
+    FROM document_chunks
+    WHERE embedding IS NOT NULL
+    ORDER BY random()
+    LIMIT :n
+""")
+
+
+def _query_type_name(query_type: Union[QueryType, str, None]) -> Optional[str]:
+    if isinstance(query_type, QueryType):
+        return query_type.name
+    return query_type
+
+
+def ann_search_params(query_type: Union[QueryType, str, None], k: int = 0) -> Dict[str, int]:
+    """ef_search/probes configured for a query type; ef_search is never below k."""
+    name = _query_type_name(query_type)
+    search_config = settings.hybrid_search
+    ef_search = search_config.hnsw_ef_search.get(name, DEFAULT_EF_SEARCH)
+    probes = search_config.ivfflat_probes.get(name, DEFAULT_PROBES)
+    # HNSW returns at most ef_search candidates
+    return {"ef_search": max(ef_search, k), "probes": probes}
+
+
+def apply_ann_search_params(session: Any, query_type: Union[QueryType, str, None], k: int = 0) -> Dict[str, int]:
+    """Set ef_search/probes for the rest of session's current transaction."""
+    params = ann_search_params(query_type, k)
+    session.execute(SET_ANN_PARAMS_SQL, {key: str(value) for key, value in params.items()})
+    return params
+
+
+def recall_at_k(exact: Sequence[Any], approximate: Sequence[Any]) -> float:
+    """Fraction of the exact top-k ids that the approximate search also returned."""
+    if not exact:
+        return 1.0
+    return len(set(exact) & set(approximate)) / len(exact)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class VectorIndexManager:
+    """Manages the HNSW index on document chunk embeddings."""
+
+    def __init__(self, engine: Any, m: int = 16, ef_construction: int = 64):
+        """
+        Args:
+            engine: Sync SQLAlchemy engine
+            m: HNSW graph degree
+            ef_construction: Candidate list size while building
+        """
+        self.engine = engine
+        self.m = m
+        self.ef_construction = ef_construction
+
+    def build_sql(self, concurrently: bool = True) -> str:
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {CHUNK_HNSW_INDEX} "
+            f"ON document_chunks USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(self.m)}, ef_construction = {int(self.ef_construction)})"
+        )
+
+    def _execute_autocommit(self, *statements: str) -> None:
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            for statement in statements:
+                conn.execute(text(statement))
+
+    def build(self, maintenance_work_mem: str = "512MB") -> None:
+        """Create the index if missing, without blocking chunk writes."""
+        logger.info(f"Building {CHUNK_HNSW_INDEX} (m={self.m}, ef_construction={self.ef_construction})")
+        start = time.perf_counter()
+        self._execute_autocommit(
+            f"SET maintenance_work_mem = '{maintenance_work_mem}'",
+            self.build_sql(),
+        )
+        logger.info(f"Built {CHUNK_HNSW_INDEX} in {time.perf_counter() - start:.1f}s")
+
+    def rebuild(self, maintenance_work_mem: str = "512MB") -> None:
+        """Drop and recreate the index, e.g. after changing m/ef_construction or a bulk backfill."""
+        logger.info(f"Rebuilding {CHUNK_HNSW_INDEX}")
+        self._execute_autocommit(f"DROP INDEX CONCURRENTLY IF EXISTS {CHUNK_HNSW_INDEX}")
+        self.build(maintenance_work_mem)
+
+    def drop(self) -> None:
+        self._execute_autocommit(f"DROP INDEX CONCURRENTLY IF EXISTS {CHUNK_HNSW_INDEX}")
+
+    def status(self) -> Dict[str, Any]:
+        """Index definition, size and validity, plus how many chunks have embeddings."""
+        with self.engine.connect() as conn:
+            index = conn.execute(text("""
+                SELECT pg_get_indexdef(i.indexrelid) AS definition,
+                       pg_size_pretty(pg_relation_size(i.indexrelid)) AS size,
+                       i.indisvalid AS valid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = :name
+            """), {"name": CHUNK_HNSW_INDEX}).first()
+            counts = conn.execute(text(
+                "SELECT count(*) AS chunks, count(embedding) AS embedded FROM document_chunks"
+            )).first()
+
+        return {
+            "index": CHUNK_HNSW_INDEX,
+            "exists": index is not None,
+            "valid": bool(index.valid) if index else False,
+            "definition": index.definition if index else None,
+            "size": index.size if index else None,
+            "chunks": counts.chunks,
+            "embedded_chunks": counts.embedded,
+        }
+
+    def benchmark(
+        self,
+        ef_search_values: Iterable[int] = (10, 20, 40, 80, 160),
+        k: int = 10,
+        sample_size: int = 50,
+        query_embeddings: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Recall@k and latency of index search for each ef_search, against exact search.
+
+        Args:
+            ef_search_values: Candidate hnsw.ef_search settings
+            k: Neighbours compared per query
+            sample_size: Stored chunk embeddings used as queries when none are given
+            query_embeddings: pgvector literals to query with
+
+        Returns:
+            Exact-search latency and, per setting, mean recall@k and p50/p95 latency (ms)
+        """
+        with self.engine.connect() as conn:
+            if query_embeddings is None:
+                query_embeddings = [row[0] for row in conn.execute(SAMPLE_EMBEDDINGS_SQL, {"n": sample_size})]
+            if not query_embeddings:
+                raise RuntimeError("No chunk embeddings to benchmark; run the embedding backfill first")
+
+            # Each block's settings are transaction-local and end at its commit
+            conn.commit()
+            exact, exact_latencies = [], []
+            conn.execute(FORCE_EXACT_SQL)
+            for embedding in query_embeddings:
+                ids, elapsed = self._nearest(conn, embedding, k)
+                exact.append(ids)
+                exact_latencies.append(elapsed)
+            conn.commit()
+
+            results = []
+            for ef_search in ef_search_values:
+                recalls, latencies = [], []
+                conn.execute(FORCE_INDEX_SQL)
+                conn.execute(SET_ANN_PARAMS_SQL, {"ef_search": str(ef_search), "probes": str(DEFAULT_PROBES)})
+                for embedding, exact_ids in zip(query_embeddings, exact):
+                    ids, elapsed = self._nearest(conn, embedding, k)
+                    recalls.append(recall_at_k(exact_ids, ids))
+                    latencies.append(elapsed)
+                conn.commit()
+                results.append({
+                    "ef_search": ef_search,
+                    "recall_at_k": round(statistics.mean(recalls), 4),
+                    "p50_ms": round(_percentile(latencies, 0.5), 2),
+                    "p95_ms": round(_percentile(latencies, 0.95), 2),
+                })
+
+        return {
+            "k": k,
+            "queries": len(query_embeddings),
+            "exact_p50_ms": round(_percentile(exact_latencies, 0.5), 2),
+            "exact_p95_ms": round(_percentile(exact_latencies, 0.95), 2),
+            "settings": results,
+        }
+
+    @staticmethod
+    def _nearest(conn: Any, embedding: str, k: int):
+        start = time.perf_counter()
+        ids = [row[0] for row in conn.execute(NEAREST_CHUNKS_SQL, {"query_embedding": embedding, "k": k})]
+        return ids, (time.perf_counter() - start) * 1000
@@ -43,7 +43,7 @@ import logging
 import time
 from contextlib import contextmanager
 from functools import wraps
-from typing import Dict
+from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +82,19 @@ hybrid_result_sources = Counter(
     ['query_type', 'source']  # source: 'keyword', 'semantic', 'both'
 )
 
+hybrid_branch_duration = Histogram(
+    'edbot_hybrid_branch_seconds',
+    'Hybrid search branch latency, capped at the branch deadline',
+    ['query_type', 'branch'],  # branch: 'keyword', 'semantic'
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0]
+)
+
+hybrid_branch_deadlines = Counter(
+    'edbot_hybrid_branch_deadline_exceeded_total',
+    'Hybrid search branches dropped for missing their deadline',
+    ['query_type', 'branch']
+)
+
 search_backend_status = Enum(
     'edbot_search_backend_status',
     'Current search backend status',
@@ -116,6 +129,24 @@ cache_hit_rate = Gauge(
     ['query_type']
 )
 
+cache_tier_requests = Counter(
+    'edbot_cache_tier_requests_total',
+    'Response cache lookups by tier',
+    ['tier', 'result']  # tier: 'l1' (in-process), 'l2' (Redis)
+)
+
+cache_tier_hit_rate = Gauge(
+    'edbot_cache_tier_hit_rate',
+    'Response cache hit rate by tier',
+    ['tier']
+)
+
+coalesced_requests = Counter(
+    'edbot_coalesced_requests_total',
+    'Requests served by an identical in-flight computation',
+    ['query_type', 'scope']  # scope: 'local', 'worker'
+)
+
 cache_similarity_scores = Histogram(
     'edbot_cache_similarity_scores',
     'Similarity scores for cache hits',
@@ -123,6 +154,32 @@ cache_similarity_scores = Histogram(
     buckets=[0.8, 0.85, 0.9, 0.93, 0.95, 0.97, 0.99, 1.0]
 )
 
+# Embedding Metrics
+embedding_batch_duration = Histogram(
+    'edbot_embedding_batch_duration_seconds',
+    'Embedding model call duration by batch size',
+    ['batch_size'],  # power-of-two bucket, e.g. '1', '8', '32'
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+embedding_texts = Counter(
+    'edbot_embedding_texts_total',
+    'Texts embedded by the model, by batch size',
+    ['batch_size']
+)
+
+embedding_memo_lookups = Counter(
+    'edbot_embedding_memo_lookups_total',
+    'Embedding memo lookups',
+    ['result']  # 'hit', 'miss'
+)
+
+prepared_statement_executions = Counter(
+    'edbot_prepared_statement_executions_total',
+    'Retrieval SQL executions, by whether the statement was already prepared on the connection',
+    ['statement', 'result']  # result: 'hit', 'miss'
+)
+
 # Table Extraction Metrics
 table_extraction_duration = Histogram(
     'edbot_table_extraction_seconds',
@@ -228,6 +285,7 @@ class MetricsCollector:
     def __init__(self, settings=None):
         self.settings = settings
         self.enabled = getattr(settings, 'enable_metrics', True) if settings else True
+        self._tier_lookups: Dict[str, List[int]] = {}
         
     @contextmanager
     def time_operation(self, metric: Histogram, labels: Dict[str, str]):
@@ -286,6 +344,15 @@ class MetricsCollector:
                 source=source
             ).inc(count)
             
+    def track_hybrid_branch(self, query_type: str, branch: str, duration: float, timed_out: bool):
+        """Track one hybrid search branch and whether it missed its deadline"""
+        if not self.enabled:
+            return
+
+        hybrid_branch_duration.labels(query_type=query_type, branch=branch).observe(duration)
+        if timed_out:
+            hybrid_branch_deadlines.labels(query_type=query_type, branch=branch).inc()
+
     def track_cache_operation(self, operation: str, query_type: str, 
                             hit: bool = None, similarity: float = None):
         """Track cache operations"""
@@ -305,6 +372,57 @@ class MetricsCollector:
                 query_type=query_type
             ).observe(similarity)
             
+    def track_cache_tier(self, tier: str, hit: bool):
+        """Track a lookup against one tier of the response cache"""
+        if not self.enabled:
+            return
+
+        lookups = self._tier_lookups.setdefault(tier, [0, 0])
+        lookups[0 if hit else 1] += 1
+
+        cache_tier_requests.labels(
+            tier=tier,
+            result="hit" if hit else "miss"
+        ).inc()
+        cache_tier_hit_rate.labels(tier=tier).set(lookups[0] / sum(lookups))
+
+    def track_coalesced_request(self, query_type: str, scope: str = "local"):
+        """Track a request that shared another request's computation"""
+        if not self.enabled:
+            return
+
+        coalesced_requests.labels(
+            query_type=query_type,
+            scope=scope
+        ).inc()
+
+    def track_embedding_batch(self, batch_size: int, duration: float):
+        """Track one embedding model call"""
+        if not self.enabled:
+            return
+
+        # Power-of-two buckets keep label cardinality bounded
+        bucket = str(1 << (batch_size - 1).bit_length())
+        embedding_batch_duration.labels(batch_size=bucket).observe(duration)
+        embedding_texts.labels(batch_size=bucket).inc(batch_size)
+
+    def track_embedding_memo(self, hit: bool):
+        """Track an embedding memo lookup"""
+        if not self.enabled:
+            return
+
+        embedding_memo_lookups.labels(result="hit" if hit else "miss").inc()
+
+    def track_prepared_statement(self, statement: str, hit: bool):
+        """Track one execution of a prepared retrieval statement"""
+        if not self.enabled:
+            return
+
+        prepared_statement_executions.labels(
+            statement=statement,
+            result="hit" if hit else "miss"
+        ).inc()
+
     def track_table_extraction(self, method: str, duration: float, 
                              table_count: int, table_type: str = "unknown",
                              confidence: float = 0.0):
@@ -0,0 +1,426 @@
+"""
+In-memory BM25 inverted index over document_chunks.
+
+Chunks are tokenized once into postings stored as compact arrays (CSR by term:
+int32 chunk rows and uint16 term frequencies) alongside chunk lengths and live
+document frequencies, so a query is scored with true IDF without touching
+Postgres. Chunks of added or replaced documents go into a small delta segment
+and removed chunks are masked, until a compaction folds both into new arrays.
+
+The API keeps one index per worker and re-syncs it from the documents table
+every reload interval; only documents whose updated_at changed are re-read.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+
+# Not indexed; they only add long postings lists (chunk lengths still count them)
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'shall',
+    'a', 'an', 'this', 'that', 'it', 'as', 'from', 'what', 'how', 'when', 'which',
+})
+
+DOCUMENT_VERSIONS_SQL = text("SELECT id, content_type, updated_at FROM documents")
+
+ALL_CHUNKS_SQL = text("""
+    SELECT id, document_id, chunk_text
+    FROM document_chunks
+    ORDER BY document_id, chunk_index
+""")
+
+DOCUMENT_CHUNKS_SQL = text("""
+    SELECT id, document_id, chunk_text
+    FROM document_chunks
+    WHERE document_id IN :document_ids
+    ORDER BY document_id, chunk_index
+""").bindparams(bindparam("document_ids", expanding=True))
+
+
+def tokenize(content: str) -> List[str]:
+    """Lowercased word tokens."""
+    return _TOKEN.findall(content.lower())
+
+
+def query_terms(query: str) -> List[str]:
+    """Unique indexable terms of a query, in order."""
+    return list(dict.fromkeys(t for t in tokenize(query) if t not in STOP_WORDS))
+
+
+@dataclass
+class BM25Hit:
+    """A scored chunk."""
+    chunk_id: str
+    document_id: str
+    score: float
+
+
+class BM25Index:
+    """BM25 over all chunks, held in this worker's memory."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        reload_interval: float = 30.0,
+        k1: float = 1.2,
+        b: float = 0.75,
+        compact_threshold: int = 50_000,
+    ):
+        """
+        Args:
+            session_factory: Returns a sync session (context manager) for syncing
+            reload_interval: Seconds between syncs while watching (0 disables)
+            k1: Term frequency saturation
+            b: Length normalization
+            compact_threshold: Delta postings (or masked chunks) that trigger a compaction
+        """
+        self.session_factory = session_factory
+        self.reload_interval = reload_interval
+        self.k1 = k1
+        self.b = b
+        self.compact_threshold = compact_threshold
+        self.ready = False
+        self._lock = threading.RLock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vocab: Dict[str, int] = {}
+            self._df = np.zeros(0, dtype=np.int32)
+            # Main segment: postings of term t are rows _indptr[t]:_indptr[t + 1]
+            self._indptr = np.zeros(1, dtype=np.int64)
+            self._post_rows = np.zeros(0, dtype=np.int32)
+            self._post_tfs = np.zeros(0, dtype=np.uint16)
+            # Postings added since the last compaction: term -> ([rows], [tfs])
+            self._delta: Dict[int, Tuple[List[int], List[int]]] = {}
+            self._delta_size = 0
+            # Per chunk row
+            self._chunk_ids: List[str] = []
+            self._chunk_documents: List[str] = []
+            self._chunk_terms: List[np.ndarray] = []
+            self._lengths = np.zeros(0, dtype=np.float32)
+            self._alive = np.zeros(0, dtype=bool)
+            self._content_types = np.zeros(0, dtype=np.int16)
+            self._type_codes: Dict[Optional[str], int] = {}
+            # Per document
+            self._document_rows: Dict[str, List[int]] = {}
+            self._document_versions: Dict[str, str] = {}
+            self._live = 0
+            self._dead = 0
+            self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self._total_length / self._live if self._live else 0.0
+
+    def idf(self, term: str) -> float:
+        """BM25 IDF (non-negative variant) of term over live chunks."""
+        with self._lock:
+            term_id = self._vocab.get(term.lower())
+            df = int(self._df[term_id]) if term_id is not None else 0
+            return math.log(1.0 + (self._live - df + 0.5) / (df + 0.5))
+
+    def build(
+        self,
+        chunks: Iterable[Tuple[str, str, str]],
+        content_types: Optional[Dict[str, Optional[str]]] = None,
+        versions: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Replace the index with (chunk_id, document_id, chunk_text) rows."""
+        content_types = content_types or {}
+        with self._lock:
+            self.clear()
+            term_ids: List[np.ndarray] = []
+            tf_values: List[np.ndarray] = []
+            for chunk_id, document_id, content in chunks:
+                row, terms, tfs = self._append_chunk(chunk_id, document_id, content,
+                                                     content_types.get(document_id), count_df=False)
+                term_ids.append(terms)
+                tf_values.append(tfs)
+
+            rows = np.repeat(np.arange(len(term_ids), dtype=np.int32), [len(t) for t in term_ids])
+            terms = np.concatenate(term_ids) if term_ids else np.zeros(0, dtype=np.int32)
+            # Each chunk lists a term once, so postings per term is its document frequency
+            self._df[:len(self._vocab)] = np.bincount(terms, minlength=len(self._vocab))
+            self._set_main_segment(
+                terms,
+                rows,
+                np.concatenate(tf_values) if tf_values else np.zeros(0, dtype=np.uint16),
+            )
+            self._document_versions = dict(versions or {})
+        logger.info(f"BM25 index built: {self._live} chunks, {len(self._vocab)} terms")
+
+    def add_document(
+        self,
+        document_id: str,
+        chunks: Sequence[Tuple[str, str]],
+        content_type: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> None:
+        """Index a document's (chunk_id, chunk_text) rows, replacing any previous version."""
+        with self._lock:
+            self.remove_document(document_id)
+            for chunk_id, content in chunks:
+                row, terms, tfs = self._append_chunk(chunk_id, document_id, content, content_type)
+                for term_id, tf in zip(terms.tolist(), tfs.tolist()):
+                    rows, tf_list = self._delta.setdefault(term_id, ([], []))
+                    rows.append(row)
+                    tf_list.append(tf)
+                self._delta_size += len(terms)
+            if version is not None:
+                self._document_versions[document_id] = version
+            self._maybe_compact()
+
+    def remove_document(self, document_id: str) -> int:
+        """Mask a document's chunks; returns how many were removed."""
+        with self._lock:
+            rows = self._document_rows.pop(document_id, [])
+            self._document_versions.pop(document_id, None)
+            for row in rows:
+                self._alive[row] = False
+                self._df[self._chunk_terms[row]] -= 1
+                self._total_length -= float(self._lengths[row])
+            self._live -= len(rows)
+            self._dead += len(rows)
+            if rows:
+                self._maybe_compact()
+            return len(rows)
+
+    def search(self, query: str, k: int = 10, content_type: Optional[str] = None) -> List[BM25Hit]:
+        """Top-k chunks for query by BM25 score, optionally within one content type."""
+        terms = query_terms(query)
+        with self._lock:
+            if not terms or not self._live:
+                return []
+
+            n_live = self._live
+            n_rows = len(self._chunk_ids)
+            lengths = self._lengths[:n_rows]
+            length_norm = self.k1 * (1.0 - self.b + self.b * lengths / np.float32(self.avg_doc_length))
+            scores = np.zeros(n_rows, dtype=np.float32)
+            for term in terms:
+                term_id = self._vocab.get(term)
+                if term_id is None or self._df[term_id] <= 0:
+                    continue
+                df = float(self._df[term_id])
+                idf = np.float32(math.log(1.0 + (n_live - df + 0.5) / (df + 0.5)))
+                rows, tfs = self._postings(term_id)
+                tfs = tfs.astype(np.float32)
+                scores[rows] += idf * tfs * np.float32(self.k1 + 1.0) / (tfs + length_norm[rows])
+
+            mask = self._alive[:n_rows]
+            if content_type is not None:
+                code = self._type_codes.get(content_type)
+                if code is None:
+                    return []
+                mask = mask & (self._content_types[:n_rows] == code)
+            scores[~mask] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [
+                BM25Hit(self._chunk_ids[row], self._chunk_documents[row], float(scores[row]))
+                for row in candidates.tolist()
+            ]
+
+    def sync(self) -> Dict[str, int]:
+        """Bring the index up to date with the documents table.
+
+        Returns:
+            Counts of documents added/replaced and removed
+        """
+        with self.session_factory() as session:
+            documents = {
+                row.id: (row.content_type, str(row.updated_at))
+                for row in session.execute(DOCUMENT_VERSIONS_SQL).fetchall()
+            }
+            if not self.ready:
+                chunks = [(row.id, row.document_id, row.chunk_text)
+                          for row in session.execute(ALL_CHUNKS_SQL).fetchall()]
+                self.build(
+                    chunks,
+                    content_types={doc_id: info[0] for doc_id, info in documents.items()},
+                    versions={doc_id: info[1] for doc_id, info in documents.items()},
+                )
+                self.ready = True
+                return {"updated": len(documents), "removed": 0}
+
+            changed = [doc_id for doc_id, (_, version) in documents.items()
+                       if self._document_versions.get(doc_id) != version]
+            removed = [doc_id for doc_id in list(self._document_versions) if doc_id not in documents]
+            chunks_by_document: Dict[str, List[Tuple[str, str]]] = {doc_id: [] for doc_id in changed}
+            if changed:
+                for row in session.execute(DOCUMENT_CHUNKS_SQL, {"document_ids": changed}).fetchall():
+                    chunks_by_document[row.document_id].append((row.id, row.chunk_text))
+
+        for doc_id in removed:
+            self.remove_document(doc_id)
+        for doc_id, chunks in chunks_by_document.items():
+            content_type, version = documents[doc_id]
+            self.add_document(doc_id, chunks, content_type=content_type, version=version)
+
+        if changed or removed:
+            logger.info(f"BM25 index synced: {len(changed)} documents updated, {len(removed)} removed")
+        return {"updated": len(changed), "removed": len(removed)}
+
+    async def watch(self) -> None:
+        """Build the index, then re-sync it every reload interval."""
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                logger.error(f"BM25 index sync failed: {e}")
+            if self.ready and self.reload_interval <= 0:
+                return
+            # Retry a failed initial build even when periodic syncs are disabled
+            await asyncio.sleep(self.reload_interval if self.reload_interval > 0 else 30.0)
+
+    def start_watching(self) -> None:
+        if self.session_factory is not None and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self.watch())
+
+    async def stop_watching(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def compact(self) -> None:
+        """Fold the delta segment into the main arrays and drop masked chunks."""
+        with self._lock:
+            alive_rows = np.flatnonzero(self._alive[:len(self._chunk_ids)])
+            remap = np.full(len(self._chunk_ids), -1, dtype=np.int64)
+            remap[alive_rows] = np.arange(len(alive_rows))
+
+            terms, rows, tfs = self._all_postings()
+            keep = self._alive[rows]
+            terms, rows, tfs = terms[keep], remap[rows[keep]].astype(np.int32), tfs[keep]
+
+            alive_list = alive_rows.tolist()
+            self._chunk_ids = [self._chunk_ids[r] for r in alive_list]
+            self._chunk_documents = [self._chunk_documents[r] for r in alive_list]
+            self._chunk_terms = [self._chunk_terms[r] for r in alive_list]
+            self._lengths = self._lengths[alive_rows]
+            self._content_types = self._content_types[alive_rows]
+            self._alive = np.ones(len(alive_rows), dtype=bool)
+            self._document_rows = {}
+            for row, document_id in enumerate(self._chunk_documents):
+                self._document_rows.setdefault(document_id, []).append(row)
+            self._dead = 0
+            self._set_main_segment(terms, rows, tfs)
+
+    def _append_chunk(
+        self, chunk_id: str, document_id: str, content: str, content_type: Optional[str], count_df: bool = True
+    ):
+        tokens = tokenize(content or "")
+        counts = Counter(t for t in tokens if t not in STOP_WORDS)
+        terms = np.fromiter((self._term_id(t) for t in counts), dtype=np.int32, count=len(counts))
+        tfs = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        tfs = np.minimum(tfs, np.iinfo(np.uint16).max).astype(np.uint16)
+
+        row = len(self._chunk_ids)
+        self._chunk_ids.append(chunk_id)
+        self._chunk_documents.append(document_id)
+        self._chunk_terms.append(terms)
+        self._reserve(row + 1)
+        self._lengths[row] = len(tokens)
+        self._alive[row] = True
+        self._content_types[row] = self._type_codes.setdefault(content_type, len(self._type_codes))
+        self._document_rows.setdefault(document_id, []).append(row)
+        if count_df:
+            self._df[terms] += 1
+        self._live += 1
+        self._total_length += len(tokens)
+        return row, terms, tfs
+
+    def _reserve(self, rows: int) -> None:
+        # Per-chunk arrays grow by doubling; only the first len(_chunk_ids) entries are used
+        capacity = len(self._lengths)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 1024)
+        for name in ("_lengths", "_alive", "_content_types"):
+            current = getattr(self, name)
+            grown = np.zeros(capacity, dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, name, grown)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = self._vocab[term] = len(self._vocab)
+            if term_id >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(max(1024, len(self._df)), dtype=np.int32)])
+        return term_id
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        if term_id + 1 < len(self._indptr):
+            start, end = self._indptr[term_id], self._indptr[term_id + 1]
+            rows, tfs = self._post_rows[start:end], self._post_tfs[start:end]
+        else:
+            rows, tfs = self._post_rows[:0], self._post_tfs[:0]
+        delta = self._delta.get(term_id)
+        if delta:
+            rows = np.concatenate([rows, np.asarray(delta[0], dtype=np.int32)])
+            tfs = np.concatenate([tfs, np.asarray(delta[1], dtype=np.uint16)])
+        return rows, tfs
+
+    def _all_postings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        terms = np.repeat(np.arange(len(self._indptr) - 1, dtype=np.int32), np.diff(self._indptr))
+        parts = [(terms, self._post_rows, self._post_tfs)]
+        for term_id, (rows, tfs) in self._delta.items():
+            parts.append((np.full(len(rows), term_id, dtype=np.int32),
+                          np.asarray(rows, dtype=np.int32), np.asarray(tfs, dtype=np.uint16)))
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def _set_main_segment(self, terms: np.ndarray, rows: np.ndarray, tfs: np.ndarray) -> None:
+        order = np.lexsort((rows, terms))
+        counts = np.bincount(terms, minlength=len(self._vocab))
+        self._indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._post_rows = rows[order].astype(np.int32)
+        self._post_tfs = tfs[order].astype(np.uint16)
+        self._delta = {}
+        self._delta_size = 0
+
+    def _maybe_compact(self) -> None:
+        if self._delta_size > self.compact_threshold or self._dead > max(self.compact_threshold, self._live):
+            self.compact()
+
+
+# Process-wide index, created by the API at startup
+_bm25_index: Optional[BM25Index] = None
+
+
+def init_bm25_index(session_factory: Callable[[], Any], reload_interval: float = 30.0) -> BM25Index:
+    """Create the process-wide chunk index; start_watching() builds and syncs it."""
+    global _bm25_index
+    _bm25_index = BM25Index(session_factory=session_factory, reload_interval=reload_interval)
+    return _bm25_index
+
+
+def get_bm25_index() -> Optional[BM25Index]:
+    """The process-wide index if one was created (None in scripts and tests)."""
+    return _bm25_index
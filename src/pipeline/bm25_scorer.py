@@ -8,13 +8,33 @@ import math
 import re
 from collections import Counter, defaultdict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import text
+import numpy as np
 from sqlalchemy.orm import Session
 
+from .corpus_stats import CorpusSnapshot, CorpusStats, get_corpus_stats
+
 logger = logging.getLogger(__name__)
 
+# Substrings whose presence marks clinical content for the medical boost
+MEDICAL_INDICATORS = (
+    'protocol', 'guideline', 'criteria', 'dose', 'dosage',
+    'mg', 'ml', 'units', 'emergency', 'treatment', 'medication'
+)
+MAX_MEDICAL_BOOST = 2.5
+
+
+def _join(texts: Sequence[str]) -> Tuple[str, np.ndarray]:
+    """Texts joined with newlines (a word and token boundary), and each text's start offset."""
+    return '\n'.join(texts), np.cumsum([0] + [len(content) + 1 for content in texts[:-1]])
+
+
+def _match_rows(pattern: re.Pattern, joined: str, starts: np.ndarray) -> np.ndarray:
+    """Index of the text containing each match of pattern in the joined texts."""
+    positions = [match.start() for match in pattern.finditer(joined)]
+    return np.searchsorted(starts, positions, side='right') - 1
+
 
 @dataclass
 class BM25Score:
@@ -27,6 +47,48 @@ class BM25Score:
     normalized_tf_scores: Dict[str, float]
 
 
+@dataclass
+class BM25BatchScores:
+    """BM25 scores and medical boosts for a batch of candidates, in candidate order."""
+    query_terms: List[str]
+    scores: np.ndarray  # (candidates,)
+    medical_boost: np.ndarray  # (candidates,)
+    term_frequencies: np.ndarray  # (candidates, query terms)
+    normalized_tf: np.ndarray  # (candidates, query terms)
+    idf: np.ndarray  # (query terms,)
+    document_lengths: np.ndarray  # (candidates,)
+    average_doc_length: float
+
+    @property
+    def final_scores(self) -> np.ndarray:
+        return self.scores * self.medical_boost
+
+    def ranking(self) -> np.ndarray:
+        """Candidate indices by BM25 score, highest first; ties keep candidate order."""
+        return np.argsort(-self.scores, kind='stable')
+
+    def detail(self, i: int) -> BM25Score:
+        """Per-term BM25Score breakdown for candidate i."""
+        term_frequencies = {}
+        idf_scores = {}
+        normalized_tf_scores = {}
+        for j, term in enumerate(self.query_terms):
+            tf = int(self.term_frequencies[i, j])
+            term_frequencies[term] = tf
+            if tf > 0:
+                idf_scores[term] = float(self.idf[j])
+                normalized_tf_scores[term] = float(self.normalized_tf[i, j])
+
+        return BM25Score(
+            score=float(self.scores[i]),
+            term_frequencies=term_frequencies,
+            document_length=int(self.document_lengths[i]),
+            average_doc_length=self.average_doc_length,
+            idf_scores=idf_scores,
+            normalized_tf_scores=normalized_tf_scores
+        )
+
+
 @dataclass
 class BM25Configuration:
     """BM25 parameters optimized for medical text."""
@@ -42,14 +104,26 @@ class BM25Scorer:
     Implements BM25 algorithm with medical domain awareness.
     """
     
-    def __init__(self, db: Session, config: BM25Configuration = None):
+    def __init__(self, db: Session, config: BM25Configuration = None, corpus_stats: Optional[CorpusStats] = None):
         self.db = db
         self.config = config or BM25Configuration()
         
+        # Shared, persisted collection statistics (only when backed by a database)
+        if corpus_stats is None and db is not None:
+            corpus_stats = get_corpus_stats()
+        self.corpus_stats = corpus_stats
+        
         # Medical terminology for enhanced scoring
         self.medical_terms = self._load_medical_terms()
         self.medical_abbreviations = self._load_medical_abbreviations()
         
+        # Whole-word abbreviation patterns, compiled once. The leading boundary is a
+        # lookbehind after the literal so the regex engine can skip ahead on the literal.
+        self._abbreviation_patterns = {
+            abbrev: re.compile(re.escape(abbrev) + r'(?<!\w' + re.escape(abbrev) + r')\b')
+            for abbrev in self.medical_abbreviations
+        }
+        
         # Document statistics cache
         self._doc_stats_cache = {}
         self._collection_stats = None
@@ -73,27 +147,14 @@ class BM25Scorer:
             if not candidate_chunks:
                 return []
             
-            # Get collection statistics
-            if not self._collection_stats:
-                self._collection_stats = self._calculate_collection_stats()
+            candidates = [
+                chunk for chunk in candidate_chunks
+                if len(chunk.get('chunk_text', '')) >= self.config.min_doc_length
+            ]
+            batch = self.score_batch(query_terms, [chunk.get('chunk_text', '') for chunk in candidates])
             
-            scored_results = []
-            avg_doc_length = self._collection_stats.get('avg_doc_length', 100.0)
-            
-            for chunk in candidate_chunks:
-                content = chunk.get('chunk_text', '')
-                if len(content) < self.config.min_doc_length:
-                    continue
-                
-                # Calculate BM25 score for this chunk
-                bm25_score = self._calculate_chunk_bm25(
-                    query_terms, content, avg_doc_length
-                )
-                
-                scored_results.append((chunk, bm25_score))
-                
-            # Sort by BM25 score (descending)
-            scored_results.sort(key=lambda x: x[1].score, reverse=True)
+            # Sorted by BM25 score (descending)
+            scored_results = [(candidates[i], batch.detail(i)) for i in batch.ranking()]
             
             logger.info(f"BM25 scoring completed for {len(scored_results)} chunks")
             return scored_results
@@ -103,11 +164,117 @@ class BM25Scorer:
             # Return original results with default scores
             return [(chunk, BM25Score(0.0, {}, 0, 0.0, {}, {})) for chunk in candidate_chunks]
     
+    def score_batch(
+        self,
+        query_terms: List[str],
+        texts: Sequence[str],
+        avg_doc_length: Optional[float] = None
+    ) -> BM25BatchScores:
+        """
+        Calculate BM25 scores and medical boosts for all candidates at once.
+        
+        Query-term occurrences are counted for all candidates in one regex pass
+        per term into a candidate x query-term matrix; BM25 and the medical
+        boost are then array operations.
+        
+        Args:
+            query_terms: Processed query terms
+            texts: Candidate chunk texts
+            avg_doc_length: Collection average in words (defaults to collection stats)
+            
+        Returns:
+            BM25BatchScores in candidate order
+        """
+        snapshot = self._corpus_snapshot()
+        if avg_doc_length is None:
+            if not self._collection_stats:
+                self._collection_stats = self._calculate_collection_stats()
+            avg_doc_length = self._collection_stats.get('avg_doc_length', 100.0)
+        
+        terms = [term.lower() for term in query_terms]
+        lowered = [content.lower() for content in texts]
+        document_lengths = np.array([len(content_lower.split()) for content_lower in lowered], dtype=float)
+        term_frequencies = self._term_counts(lowered, terms)
+        
+        # BM25 TF normalization, zero where the term is absent
+        k1, b = self.config.k1, self.config.b
+        length_norm = k1 * (1 - b + b * (document_lengths / avg_doc_length))
+        normalized_tf = np.divide(
+            term_frequencies * (k1 + 1),
+            term_frequencies + length_norm[:, None],
+            out=np.zeros_like(term_frequencies),
+            where=term_frequencies > 0
+        )
+        if snapshot is not None:
+            idf = np.array([snapshot.idf(term) for term in terms], dtype=float)
+        else:
+            idf = np.array([self._calculate_idf_approximation(term) for term in terms], dtype=float)
+        
+        return BM25BatchScores(
+            query_terms=list(query_terms),
+            scores=normalized_tf @ idf,
+            medical_boost=self._medical_boosts(texts, lowered, query_terms),
+            term_frequencies=term_frequencies,
+            normalized_tf=normalized_tf,
+            idf=idf,
+            document_lengths=document_lengths,
+            average_doc_length=avg_doc_length
+        )
+    
+    def _medical_boosts(
+        self, texts: Sequence[str], lowered: Sequence[str], query_terms: List[str]
+    ) -> np.ndarray:
+        """Medical terminology boost factor per candidate."""
+        boost = np.ones(len(texts))
+        
+        # Boost for medical abbreviations: exact match (+0.3) and full form (+0.2)
+        abbrevs = [term.upper() for term in query_terms if term.upper() in self.medical_abbreviations]
+        if abbrevs and texts:
+            full_forms = [self.medical_abbreviations[abbrev].lower() for abbrev in abbrevs]
+            exact = self._abbreviation_hits(texts, abbrevs)
+            full = np.array([[bool(form) and form in content for form in full_forms] for content in lowered])
+            boost += 0.3 * exact.sum(axis=1) + 0.2 * full.sum(axis=1)
+        
+        # Boost for medical context indicators
+        if texts:
+            indicators = np.array([[indicator in content for indicator in MEDICAL_INDICATORS] for content in lowered])
+            boost += 0.1 * indicators.sum(axis=1)
+        
+        # Cap the boost to prevent excessive weighting
+        return np.minimum(boost, MAX_MEDICAL_BOOST)
+    
+    def _term_counts(self, lowered: Sequence[str], terms: List[str]) -> np.ndarray:
+        """Whitespace-token occurrences of each term in each lowercased text."""
+        counts = np.zeros((len(lowered), len(terms)))
+        if not lowered:
+            return counts
+        joined, starts = _join(lowered)
+        columns = {}
+        for j, term in enumerate(terms):
+            if term not in columns:
+                columns[term] = np.zeros(len(lowered))
+                # Terms with whitespace can never equal a token
+                if term and not any(char.isspace() for char in term):
+                    escaped = re.escape(term)
+                    pattern = re.compile(escaped + r'(?<!\S' + escaped + r')(?!\S)')
+                    columns[term] = np.bincount(_match_rows(pattern, joined, starts), minlength=len(lowered))
+            counts[:, j] = columns[term]
+        return counts
+    
+    def _abbreviation_hits(self, texts: Sequence[str], abbrevs: List[str]) -> np.ndarray:
+        """Whether each text contains each abbreviation as a whole word (case-sensitive)."""
+        joined, starts = _join(texts)
+        hits = np.zeros((len(texts), len(abbrevs)), dtype=bool)
+        for j, abbrev in enumerate(abbrevs):
+            hits[_match_rows(self._abbreviation_patterns[abbrev], joined, starts), j] = True
+        return hits
+    
     def score_sql_results(
         self, 
         query: str, 
         db_results: List[Any], 
-        k: int = 10
+        k: int = 10,
+        include_details: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Score SQL database results using BM25 with medical optimizations.
@@ -116,6 +283,7 @@ class BM25Scorer:
             query: Original query string
             db_results: SQLAlchemy result objects
             k: Number of top results to return
+            include_details: Add the per-term BM25Score breakdown as 'bm25_metadata'
             
         Returns:
             List of enhanced result dictionaries with BM25 scores
@@ -145,31 +313,33 @@ class BM25Scorer:
                 }
                 candidate_chunks.append(chunk_dict)
             
-            # Calculate BM25 scores
-            scored_results = self.calculate_bm25_scores(query_terms, candidate_chunks)
+            # Calculate BM25 scores and medical boosts in one batch
+            candidate_chunks = [
+                chunk for chunk in candidate_chunks
+                if len(chunk['chunk_text']) >= self.config.min_doc_length
+            ]
+            batch = self.score_batch(query_terms, [chunk['chunk_text'] for chunk in candidate_chunks])
+            final_scores = batch.final_scores
             
             # Format results with enhanced metadata
             enhanced_results = []
-            for chunk_data, bm25_score in scored_results[:k]:
-                # Combine BM25 score with medical boosting
-                medical_boost = self._calculate_medical_boost(
-                    chunk_data['chunk_text'], query_terms
-                )
-                final_score = bm25_score.score * medical_boost
-                
+            for i in batch.ranking()[:k]:
+                final_score = float(final_scores[i])
                 enhanced_result = {
-                    **chunk_data,
-                    'bm25_score': bm25_score.score,
-                    'medical_boost': medical_boost,
+                    **candidate_chunks[i],
+                    'bm25_score': float(batch.scores[i]),
+                    'medical_boost': float(batch.medical_boost[i]),
                     'final_score': final_score,
                     'relevance': final_score,  # Override original relevance
-                    'bm25_metadata': {
-                        'term_frequencies': bm25_score.term_frequencies,
-                        'idf_scores': bm25_score.idf_scores,
-                        'document_length': bm25_score.document_length,
-                        'normalized_tf': bm25_score.normalized_tf_scores
-                    }
                 }
+                if include_details:
+                    detail = batch.detail(i)
+                    enhanced_result['bm25_metadata'] = {
+                        'term_frequencies': detail.term_frequencies,
+                        'idf_scores': detail.idf_scores,
+                        'document_length': detail.document_length,
+                        'normalized_tf': detail.normalized_tf_scores
+                    }
                 enhanced_results.append(enhanced_result)
             
             logger.info(f"Enhanced {len(enhanced_results)} results with BM25 scoring")
@@ -179,57 +349,6 @@ class BM25Scorer:
             logger.error(f"BM25 SQL result scoring failed: {e}")
             return self._format_default_results(db_results, k)
     
-    def _calculate_chunk_bm25(
-        self, 
-        query_terms: List[str], 
-        content: str, 
-        avg_doc_length: float
-    ) -> BM25Score:
-        """Calculate BM25 score for a single chunk."""
-        content_lower = content.lower()
-        doc_length = len(content.split())
-        
-        # Calculate term frequencies
-        content_terms = content_lower.split()
-        term_frequencies = {}
-        idf_scores = {}
-        normalized_tf_scores = {}
-        
-        total_score = 0.0
-        
-        for term in query_terms:
-            term_lower = term.lower()
-            
-            # Calculate term frequency in document
-            tf = content_terms.count(term_lower)
-            term_frequencies[term] = tf
-            
-            if tf > 0:
-                # Calculate IDF (using approximation for performance)
-                idf = self._calculate_idf_approximation(term_lower)
-                idf_scores[term] = idf
-                
-                # BM25 TF normalization
-                tf_normalized = (tf * (self.config.k1 + 1)) / (
-                    tf + self.config.k1 * (
-                        1 - self.config.b + 
-                        self.config.b * (doc_length / avg_doc_length)
-                    )
-                )
-                normalized_tf_scores[term] = tf_normalized
-                
-                # Add to total BM25 score
-                total_score += idf * tf_normalized
-        
-        return BM25Score(
-            score=total_score,
-            term_frequencies=term_frequencies,
-            document_length=doc_length,
-            average_doc_length=avg_doc_length,
-            idf_scores=idf_scores,
-            normalized_tf_scores=normalized_tf_scores
-        )
-    
     def _extract_query_terms(self, query: str) -> List[str]:
         """Extract and normalize query terms for BM25 scoring."""
         # Remove punctuation and normalize
@@ -281,63 +400,23 @@ class BM25Scorer:
         else:
             return base_idf
     
-    def _calculate_medical_boost(self, content: str, query_terms: List[str]) -> float:
-        """Calculate medical terminology boost factor."""
-        content_lower = content.lower()
-        boost_factor = 1.0
-        
-        # Boost for medical abbreviations
-        for term in query_terms:
-            if term.upper() in self.medical_abbreviations:
-                # Check for exact abbreviation match
-                if re.search(r'\b' + re.escape(term.upper()) + r'\b', content):
-                    boost_factor += 0.3
-                # Check for full form match
-                full_form = self.medical_abbreviations.get(term.upper(), '').lower()
-                if full_form and full_form in content_lower:
-                    boost_factor += 0.2
-        
-        # Boost for medical context indicators
-        medical_indicators = [
-            'protocol', 'guideline', 'criteria', 'dose', 'dosage', 
-            'mg', 'ml', 'units', 'emergency', 'treatment', 'medication'
-        ]
-        
-        indicator_matches = sum(1 for indicator in medical_indicators 
-                              if indicator in content_lower)
-        boost_factor += indicator_matches * 0.1
-        
-        # Cap the boost to prevent excessive weighting
-        return min(boost_factor, 2.5)
+    def _corpus_snapshot(self) -> Optional[CorpusSnapshot]:
+        """Shared corpus statistics, or None when unavailable or empty."""
+        if self.corpus_stats is None:
+            return None
+        snapshot = self.corpus_stats.snapshot()
+        if snapshot is None or not snapshot.chunk_count:
+            return None
+        return snapshot
     
     def _calculate_collection_stats(self) -> Dict[str, float]:
-        """Calculate document collection statistics for BM25."""
-        try:
-            # Try to get statistics if database connection is available
-            if self.db and hasattr(self.db, 'execute'):
-                stats_query = text("""
-                    SELECT 
-                        COUNT(*) as total_docs,
-                        AVG(LENGTH(chunk_text)) as avg_char_length,
-                        AVG(array_length(string_to_array(chunk_text, ' '), 1)) as avg_word_length
-                    FROM document_chunks 
-                    WHERE LENGTH(chunk_text) >= :min_length
-                """)
-                
-                result = self.db.execute(stats_query, {
-                    'min_length': self.config.min_doc_length
-                }).fetchone()
-                
-                if result and result.total_docs:
-                    logger.info(f"Retrieved collection stats: {result.total_docs} documents")
-                    return {
-                        'total_docs': float(result.total_docs or 1000),
-                        'avg_char_length': float(result.avg_char_length or 300),
-                        'avg_doc_length': float(result.avg_word_length or 75)
-                    }
-                    
-        except Exception as e:
-            logger.warning(f"Database collection stats failed, using fallback: {e}")
+        """Document collection statistics for BM25, from the shared corpus statistics."""
+        snapshot = self._corpus_snapshot()
+        if snapshot is not None:
+            return {
+                'total_docs': float(snapshot.chunk_count),
+                'avg_doc_length': snapshot.avg_doc_length
+            }
         
         # Use optimized fallback defaults for medical text
         logger.info("Using fallback collection statistics for BM25")
@@ -9,13 +9,14 @@ Process:
 4. Confidence Scoring (Reliability assessment)
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 from dataclasses import dataclass
 
 # Import our validation and retrieval systems
-from .ground_truth_validator import GroundTruthValidator, validate_medical_query
+from .ground_truth_validator import get_ground_truth_validator, validate_medical_query
 from .docs_rag_retriever import DocsRAGRetriever
 
 logger = logging.getLogger(__name__)
@@ -39,7 +40,8 @@ class BulletproofRetriever:
     
     def __init__(self, db: Session):
         self.db = db
-        self.ground_truth_validator = GroundTruthValidator()
+        # Shared validator over the process-wide ground truth store (no file reloads)
+        self.ground_truth_validator = get_ground_truth_validator()
         self.docs_rag_retriever = DocsRAGRetriever(db)
         
         # Medical safety keywords that require extra validation
@@ -68,6 +70,46 @@ class BulletproofRetriever:
         
         logger.info(f"🛡️ Bulletproof retrieval for: {query_cleaned}")
         
+        # Stages -1 to 1: routing, forms and ground truth (in-memory)
+        curated_response = self._get_curated_response(query_cleaned)
+        if curated_response:
+            return self._validate_and_correct_response(query_cleaned, curated_response)
+        
+        # Stage 2: RAG Retrieval from Docs (Comprehensive Fallback)  
+        rag_response = self._get_rag_response(query_cleaned)
+        if rag_response and rag_response.confidence >= 0.6:
+            logger.info(f"✅ RAG retrieval successful (confidence: {rag_response.confidence:.2f})")
+            final_response = self._format_final_response(rag_response)
+            return self._validate_and_correct_response(query_cleaned, final_response)
+        
+        # Stages 3 and 4: enhanced database search, then safety fallback
+        return self._get_last_resort_response(query_cleaned)
+    
+    async def get_medical_response_async(self, query: str) -> Dict[str, Any]:
+        """
+        Async variant of get_medical_response.
+        
+        The docs RAG stage awaits the async retrieval repository; the remaining
+        stages that use the sync session run in a worker thread.
+        """
+        query_cleaned = query.strip()
+        
+        logger.info(f"🛡️ Bulletproof retrieval for: {query_cleaned}")
+        
+        curated_response = self._get_curated_response(query_cleaned)
+        if curated_response:
+            return await asyncio.to_thread(self._validate_and_correct_response, query_cleaned, curated_response)
+        
+        rag_response = await self._get_rag_response_async(query_cleaned)
+        if rag_response and rag_response.confidence >= 0.6:
+            logger.info(f"✅ RAG retrieval successful (confidence: {rag_response.confidence:.2f})")
+            final_response = self._format_final_response(rag_response)
+            return await asyncio.to_thread(self._validate_and_correct_response, query_cleaned, final_response)
+        
+        return await asyncio.to_thread(self._get_last_resort_response, query_cleaned)
+    
+    def _get_curated_response(self, query_cleaned: str) -> Optional[Dict[str, Any]]:
+        """Form or ground truth response, formatted but not yet validated."""
         # Stage -1: Smart Query Routing (NEW)
         try:
             from .smart_query_router import route_query
@@ -81,23 +123,18 @@ class BulletproofRetriever:
         form_response = self._get_form_response(query_cleaned)
         if form_response and form_response.confidence >= 0.8:
             logger.info(f"📄 Form retrieval successful (confidence: {form_response.confidence:.2f})")
-            final_response = self._format_final_response(form_response)
-            return self._validate_and_correct_response(query_cleaned, final_response)
+            return self._format_final_response(form_response)
         
         # Stage 1: Ground Truth Validation (High Priority)
         ground_truth_response = self._get_ground_truth_response(query_cleaned)
         if ground_truth_response and ground_truth_response.confidence >= 0.7:
             logger.info(f"✅ Ground truth validation successful (confidence: {ground_truth_response.confidence:.2f})")
-            final_response = self._format_final_response(ground_truth_response)
-            return self._validate_and_correct_response(query_cleaned, final_response)
-        
-        # Stage 2: RAG Retrieval from Docs (Comprehensive Fallback)  
-        rag_response = self._get_rag_response(query_cleaned)
-        if rag_response and rag_response.confidence >= 0.6:
-            logger.info(f"✅ RAG retrieval successful (confidence: {rag_response.confidence:.2f})")
-            final_response = self._format_final_response(rag_response)
-            return self._validate_and_correct_response(query_cleaned, final_response)
+            return self._format_final_response(ground_truth_response)
         
+        return None
+    
+    def _get_last_resort_response(self, query_cleaned: str) -> Dict[str, Any]:
+        """Enhanced database search, or the safety fallback when nothing is reliable."""
         # Stage 3: Enhanced Database Search (Last Resort)
         enhanced_response = self._get_enhanced_database_response(query_cleaned)
         if enhanced_response and enhanced_response.confidence >= 0.5:
@@ -157,26 +194,41 @@ class BulletproofRetriever:
         """Get response from RAG retrieval system."""
         try:
             rag_response = self.docs_rag_retriever.get_docs_response(query)
-            
-            if rag_response:
-                # Apply safety validation to RAG responses
-                safety_validated = self._validate_medical_safety(query, rag_response['response'])
+            return self._to_rag_medical_response(query, rag_response)
                 
-                return MedicalResponse(
-                    response=rag_response['response'],
-                    sources=rag_response['sources'],
-                    confidence=rag_response['confidence'],
-                    query_type=rag_response['query_type'],
-                    validation_method="rag_retrieval",
-                    has_real_content=True,
-                    safety_validated=safety_validated
-                )
+        except Exception as e:
+            logger.error(f"RAG retrieval failed: {e}")
+        
+        return None
+    
+    async def _get_rag_response_async(self, query: str) -> Optional[MedicalResponse]:
+        """Async variant of _get_rag_response."""
+        try:
+            rag_response = await self.docs_rag_retriever.get_docs_response_async(query)
+            return self._to_rag_medical_response(query, rag_response)
                 
         except Exception as e:
             logger.error(f"RAG retrieval failed: {e}")
         
         return None
     
+    def _to_rag_medical_response(self, query: str, rag_response: Optional[Dict[str, Any]]) -> Optional[MedicalResponse]:
+        if not rag_response:
+            return None
+        
+        # Apply safety validation to RAG responses
+        safety_validated = self._validate_medical_safety(query, rag_response['response'])
+        
+        return MedicalResponse(
+            response=rag_response['response'],
+            sources=rag_response['sources'],
+            confidence=rag_response['confidence'],
+            query_type=rag_response['query_type'],
+            validation_method="rag_retrieval",
+            has_real_content=True,
+            safety_validated=safety_validated
+        )
+    
     def _get_enhanced_database_response(self, query: str) -> Optional[MedicalResponse]:
         """Enhanced database search as last resort."""
         try:
@@ -442,4 +494,9 @@ def get_bulletproof_response(query: str, db: Session) -> Dict[str, Any]:
     Guaranteed to return safe, accurate information or clear failure indication.
     """
     retriever = BulletproofRetriever(db)
-    return retriever.get_medical_response(query)
\ No newline at end of file
+    return retriever.get_medical_response(query)
+
+async def get_bulletproof_response_async(query: str, db: Session) -> Dict[str, Any]:
+    """Async variant of get_bulletproof_response for use inside request handlers."""
+    retriever = BulletproofRetriever(db)
+    return await retriever.get_medical_response_async(query)
@@ -0,0 +1,298 @@
+"""
+Shared corpus statistics for BM25 scoring.
+Chunk count, total token count and per-term document frequency over
+document_chunks, computed once into the corpus_stats/corpus_term_df tables,
+incremented by ingestion in the same transaction that stores new chunks,
+and cached per process so every BM25Scorer reads the same snapshot.
+"""
+import argparse
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Serializes full rebuilds against ingestion's increments (pg advisory lock key)
+CORPUS_STATS_LOCK_ID = 0x42_4D_32_35  # "BM25"
+
+STATS_SQL = text("SELECT chunk_count, total_tokens, version FROM corpus_stats WHERE id = 1")
+
+VERSION_SQL = text("SELECT version FROM corpus_stats WHERE id = 1")
+
+TERM_DF_SQL = text("SELECT term, document_frequency FROM corpus_term_df")
+
+LOCK_SQL = text("SELECT pg_advisory_xact_lock(:lock_id)")
+
+CHUNK_TEXTS_SQL = text("SELECT chunk_text FROM document_chunks")
+
+INCREMENT_STATS_SQL = text("""
+    UPDATE corpus_stats
+    SET chunk_count = chunk_count + :chunks,
+        total_tokens = total_tokens + :tokens,
+        version = version + 1,
+        updated_at = now()
+    WHERE id = 1
+    RETURNING version
+""")
+
+REPLACE_STATS_SQL = text("""
+    INSERT INTO corpus_stats (id, chunk_count, total_tokens, version, updated_at)
+    VALUES (1, :chunks, :tokens, 1, now())
+    ON CONFLICT (id) DO UPDATE
+    SET chunk_count = EXCLUDED.chunk_count,
+        total_tokens = EXCLUDED.total_tokens,
+        version = corpus_stats.version + 1,
+        updated_at = now()
+""")
+
+# Fixed-shape: the term/count arrays bind as two parameters whatever their length
+UPSERT_TERM_DF_SQL = text("""
+    INSERT INTO corpus_term_df (term, document_frequency)
+    SELECT * FROM unnest(CAST(:terms AS text[]), CAST(:counts AS integer[]))
+    ON CONFLICT (term) DO UPDATE
+    SET document_frequency = corpus_term_df.document_frequency + EXCLUDED.document_frequency
+""")
+
+CLEAR_TERM_DF_SQL = text("DELETE FROM corpus_term_df")
+
+# Terms per upsert statement during a rebuild
+UPSERT_BATCH_SIZE = 10_000
+
+
+def tokenize(chunk_text: str):
+    """BM25Scorer's tokens: lowercased, whitespace-separated."""
+    return chunk_text.lower().split()
+
+
+def count_chunks(texts: Iterable[str]):
+    """Chunk count, total tokens and per-term document frequency for texts."""
+    chunks = 0
+    tokens = 0
+    document_frequencies: Counter = Counter()
+    for chunk_text in texts:
+        chunk_tokens = tokenize(chunk_text or "")
+        chunks += 1
+        tokens += len(chunk_tokens)
+        document_frequencies.update(set(chunk_tokens))
+    return chunks, tokens, document_frequencies
+
+
+def _upsert_term_df(session: Any, document_frequencies: Counter) -> None:
+    items = list(document_frequencies.items())
+    for start in range(0, len(items), UPSERT_BATCH_SIZE):
+        batch = items[start:start + UPSERT_BATCH_SIZE]
+        session.execute(UPSERT_TERM_DF_SQL, {
+            "terms": [term for term, _ in batch],
+            "counts": [count for _, count in batch],
+        })
+
+
+def record_new_chunks(session: Any, texts: Iterable[str]) -> bool:
+    """Add newly stored chunks to the persisted statistics, in the caller's transaction.
+
+    If the statistics were never built, builds them from every chunk instead
+    (including the caller's uncommitted ones), since increments on top of
+    missing totals would be wrong.
+
+    Returns:
+        True if the statistics were updated
+    """
+    chunks, tokens, document_frequencies = count_chunks(texts)
+    if not chunks:
+        return False
+
+    session.execute(LOCK_SQL, {"lock_id": CORPUS_STATS_LOCK_ID})
+    if session.execute(INCREMENT_STATS_SQL, {"chunks": chunks, "tokens": tokens}).first() is None:
+        logger.warning("Corpus statistics not built yet; building them from every chunk")
+        summary = _build_stats(session)
+        logger.info(f"Built corpus statistics during ingestion: {summary}")
+        return True
+    _upsert_term_df(session, document_frequencies)
+    return True
+
+
+def _build_stats(session: Any) -> Dict[str, int]:
+    """Replace the statistics with counts over every chunk the session can see.
+
+    The caller holds the stats lock and commits.
+    """
+    rows = session.execute(CHUNK_TEXTS_SQL.execution_options(yield_per=1000))
+    chunks, tokens, document_frequencies = count_chunks(row.chunk_text for row in rows)
+
+    session.execute(CLEAR_TERM_DF_SQL)
+    _upsert_term_df(session, document_frequencies)
+    session.execute(REPLACE_STATS_SQL, {"chunks": chunks, "tokens": tokens})
+    return {"chunks": chunks, "tokens": tokens, "terms": len(document_frequencies)}
+
+
+@dataclass
+class CorpusSnapshot:
+    """Corpus statistics as of one version of the stats tables."""
+    chunk_count: int
+    total_tokens: int
+    version: int
+    document_frequencies: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self.total_tokens / self.chunk_count if self.chunk_count else 0.0
+
+    def idf(self, term: str) -> float:
+        """BM25 IDF from the term's document frequency."""
+        df = self.document_frequencies.get(term.lower(), 0)
+        return math.log(1 + (self.chunk_count - df + 0.5) / (df + 0.5))
+
+
+class CorpusStats:
+    """Process-wide cache of the persisted corpus statistics."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None, refresh_interval: float = 30.0):
+        """
+        Args:
+            session_factory: Sync session factory (defaults to the app's SessionLocal)
+            refresh_interval: Seconds between checks for a newer stats version
+        """
+        self._session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[CorpusSnapshot] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._reported_missing = False
+
+    @property
+    def session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from src.models.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def snapshot(self) -> Optional[CorpusSnapshot]:
+        """Current statistics, without touching the database on the caller's thread.
+
+        Once refresh_interval has passed since the last version check, a
+        background thread checks again and reloads if ingestion bumped the
+        version. Returns None (BM25 then uses its fallback constants) until
+        the first load finishes, or while no statistics have been built.
+        """
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            self._refresh_in_background()
+        return self._snapshot
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_worker, name="corpus-stats-refresh", daemon=True).start()
+
+    def _refresh_worker(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def refresh(self) -> Optional[CorpusSnapshot]:
+        """Check the stored version and reload the statistics if it changed (blocking)."""
+        try:
+            self._snapshot = self._load()
+        except Exception as e:
+            logger.warning(f"Corpus statistics unavailable: {e}")
+        # Also rate-limits retries while the database is down
+        self._checked_at = time.monotonic()
+        return self._snapshot
+
+    def _load(self) -> Optional[CorpusSnapshot]:
+        with self.session_factory() as session:
+            version = session.execute(VERSION_SQL).scalar()
+            if version is None:
+                if not self._reported_missing:
+                    logger.warning("Corpus statistics have not been built; BM25 uses fallback constants "
+                                   "until `make corpus-stats` is run")
+                    self._reported_missing = True
+                return self._snapshot
+            if self._snapshot is not None and self._snapshot.version == version:
+                return self._snapshot
+
+            row = session.execute(STATS_SQL).first()
+            document_frequencies = {term: df for term, df in session.execute(TERM_DF_SQL)}
+
+        logger.info(f"Loaded corpus statistics v{row.version}: {row.chunk_count} chunks, "
+                    f"{len(document_frequencies)} terms")
+        return CorpusSnapshot(
+            chunk_count=row.chunk_count,
+            total_tokens=row.total_tokens,
+            version=row.version,
+            document_frequencies=document_frequencies,
+        )
+
+    def rebuild(self, session: Optional[Any] = None, if_missing: bool = False) -> Dict[str, int]:
+        """Recompute the statistics from every chunk and replace the stored ones.
+
+        With if_missing, does nothing when another process built them while
+        this one waited for the lock.
+        """
+        if session is None:
+            with self.session_factory() as own_session:
+                return self.rebuild(own_session, if_missing=if_missing)
+
+        start = time.perf_counter()
+        # Taken before reading so chunks committed after the read are counted by ingestion
+        session.execute(LOCK_SQL, {"lock_id": CORPUS_STATS_LOCK_ID})
+        if if_missing:
+            existing = session.execute(STATS_SQL).first()
+            if existing is not None:
+                session.rollback()
+                logger.info(f"Corpus statistics v{existing.version} already built; skipping rebuild")
+                return {"chunks": existing.chunk_count, "tokens": existing.total_tokens, "terms": None}
+
+        summary = _build_stats(session)
+        session.commit()
+
+        logger.info(f"Rebuilt corpus statistics in {time.perf_counter() - start:.1f}s: {summary}")
+        return summary
+
+
+_corpus_stats: Optional[CorpusStats] = None
+
+
+def get_corpus_stats() -> CorpusStats:
+    """Get the process-wide corpus statistics."""
+    global _corpus_stats
+    if _corpus_stats is None:
+        _corpus_stats = CorpusStats()
+    return _corpus_stats
+
+
+def main():
+    """CLI entry point for building the corpus statistics."""
+    parser = argparse.ArgumentParser(description="Corpus statistics for BM25 scoring")
+    parser.add_argument("command", choices=["rebuild", "show"], help="Recompute from all chunks, or show")
+    parser.add_argument("--if-missing", action="store_true",
+                        help="Only rebuild when no statistics exist (safe to run from every worker)")
+    args = parser.parse_args()
+
+    stats = get_corpus_stats()
+    if args.command == "rebuild":
+        print(json.dumps(stats.rebuild(if_missing=args.if_missing), indent=2))
+    else:
+        snapshot = stats.refresh()
+        if snapshot is None:
+            raise SystemExit("Corpus statistics unavailable")
+        print(json.dumps({
+            "version": snapshot.version,
+            "chunks": snapshot.chunk_count,
+            "avg_doc_length": round(snapshot.avg_doc_length, 2),
+            "terms": len(snapshot.document_frequencies),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
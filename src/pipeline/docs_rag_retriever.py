@@ -3,6 +3,7 @@ Document RAG Retrieval System - Fallback retrieval from docs folder
 Uses advanced text processing to extract relevant content from PDF documents.
 """
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -12,6 +13,13 @@ from dataclasses import dataclass
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from ..models.retrieval_repository import (
+    CHUNKS_BY_FILENAME_PATTERN_SQL,
+    RetrievalRepository,
+    get_retrieval_repository,
+)
+from .text_search import build_chunk_text_search, term_match_sql
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -25,8 +33,9 @@ class DocumentMatch:
 class DocsRAGRetriever:
     """Advanced RAG retrieval from docs folder with medical-aware processing."""
     
-    def __init__(self, db: Session, docs_path: str = None):
+    def __init__(self, db: Session, docs_path: str = None, repository: Optional[RetrievalRepository] = None):
         self.db = db
+        self.repository = repository or get_retrieval_repository()
         self.docs_path = docs_path or self._find_docs_path()
         
         # Medical document priority mapping
@@ -82,7 +91,7 @@ class DocsRAGRetriever:
         db_matches = self._search_database_content(query, top_k)
         
         # Step 2: If database has good matches, use them
-        if db_matches and any(match.confidence > 0.7 for match in db_matches):
+        if self._has_confident_matches(db_matches):
             logger.info(f"✅ Found {len(db_matches)} high-confidence database matches")
             return db_matches[:top_k]
         
@@ -98,7 +107,39 @@ class DocsRAGRetriever:
             except Exception as e:
                 logger.warning(f"Failed to search {doc_name}: {e}")
         
-        # Combine and rank all matches
+        return self._rank_matches(db_matches, file_matches, top_k)
+    
+    async def retrieve_from_docs_async(self, query: str, top_k: int = 3) -> List[DocumentMatch]:
+        """Async variant of retrieve_from_docs; targeted document searches run concurrently."""
+        query_lower = query.lower()
+        
+        db_matches = await self._search_database_content_async(query, top_k)
+        
+        if self._has_confident_matches(db_matches):
+            logger.info(f"✅ Found {len(db_matches)} high-confidence database matches")
+            return db_matches[:top_k]
+        
+        targeted_docs = self._identify_target_documents(query_lower)[:5]  # Limit to top 5 documents
+        results = await asyncio.gather(
+            *(self._search_specific_document_async(query, doc_name) for doc_name in targeted_docs),
+            return_exceptions=True
+        )
+        
+        file_matches = []
+        for doc_name, match in zip(targeted_docs, results):
+            if isinstance(match, Exception):
+                logger.warning(f"Failed to search {doc_name}: {match}")
+            elif match and match.confidence > 0.5:
+                file_matches.append(match)
+        
+        return self._rank_matches(db_matches, file_matches, top_k)
+    
+    def _has_confident_matches(self, matches: List[DocumentMatch]) -> bool:
+        return bool(matches) and any(match.confidence > 0.7 for match in matches)
+    
+    def _rank_matches(self, db_matches: List[DocumentMatch], file_matches: List[DocumentMatch],
+                      top_k: int) -> List[DocumentMatch]:
+        """Combine and rank all matches."""
         all_matches = db_matches + file_matches
         all_matches.sort(key=lambda x: x.confidence, reverse=True)
         
@@ -107,89 +148,113 @@ class DocsRAGRetriever:
     def _search_database_content(self, query: str, top_k: int) -> List[DocumentMatch]:
         """Search database for relevant document content."""
         try:
-            # Extract key terms for targeted search
-            key_terms = self._extract_search_terms(query)
-            
-            if not key_terms:
+            search = self._build_database_search(query, top_k)
+            if search is None:
                 return []
             
-            # Build enhanced database query with medical prioritization
-            search_conditions = []
-            params = {}
-            
-            for i, term in enumerate(key_terms[:5]):  # Limit terms
-                param_name = f"term_{i}"
-                search_conditions.append(f"dc.chunk_text ILIKE :{param_name}")
-                params[param_name] = f"%{term}%"
-            
-            # Medical prioritization in SQL
-            priority_cases = []
-            for doc_pattern, priority in self.document_priority.items():
-                priority_cases.append(f"WHEN d.filename ILIKE '%{doc_pattern}%' THEN {priority}")
-            
-            priority_case_sql = " ".join(priority_cases) if priority_cases else ""
-            
-            search_query = f"""
-                SELECT 
-                    dc.chunk_text,
-                    d.filename,
-                    LENGTH(dc.chunk_text) as content_length,
-                    -- Medical document priority scoring
-                    (CASE 
-                        {priority_case_sql}
-                        WHEN d.content_type IN ('protocol', 'guideline', 'criteria') THEN 80
-                        WHEN dc.chunk_text ILIKE '%protocol%' THEN 75
-                        WHEN dc.chunk_text ILIKE '%guideline%' THEN 70
-                        ELSE 50 
-                    END) as priority_score,
-                    -- Term match scoring
-                    (
-                        {' + '.join([f"CASE WHEN dc.chunk_text ILIKE :{f'term_{i}'} THEN 1 ELSE 0 END" for i in range(len(key_terms[:5]))])}
-                    ) as term_matches
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                WHERE ({' OR '.join(search_conditions)})
-                AND LENGTH(dc.chunk_text) > 50
-                ORDER BY 
-                    priority_score DESC,
-                    term_matches DESC,
-                    content_length DESC
-                LIMIT :limit
-            """
-            
-            params["limit"] = top_k * 2  # Get extra results for filtering
-            
+            search_query, params = search
             results = self.db.execute(text(search_query), params).fetchall()
+            return self._database_matches(query, results)
             
-            matches = []
-            for result in results:
-                content = result[0]
-                filename = result[1]
-                content_length = result[2]
-                priority_score = result[3]
-                term_matches = result[4]
-                
-                # Calculate confidence based on multiple factors
-                confidence = self._calculate_content_confidence(
-                    query, content, filename, priority_score, term_matches
-                )
-                
-                if confidence > 0.3:  # Only return reasonable matches
-                    matches.append(DocumentMatch(
-                        content=content,
-                        filename=filename,
-                        confidence=confidence,
-                        match_type="database",
-                        source_section=self._extract_section_name(content)
-                    ))
+        except Exception as e:
+            logger.error(f"Database content search failed: {e}")
+            return []
+    
+    async def _search_database_content_async(self, query: str, top_k: int) -> List[DocumentMatch]:
+        """Async variant of _search_database_content on the retrieval repository."""
+        try:
+            search = self._build_database_search(query, top_k)
+            if search is None:
+                return []
             
-            logger.info(f"🔍 Database search returned {len(matches)} matches")
-            return matches
+            search_query, params = search
+            results = await self.repository.search_chunks(search_query, params)
+            return self._database_matches(query, results)
             
         except Exception as e:
             logger.error(f"Database content search failed: {e}")
             return []
     
+    def _build_database_search(self, query: str, top_k: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Build the prioritized content search SQL and params, or None without search terms."""
+        # Extract key terms for targeted search
+        key_terms = self._extract_search_terms(query)
+        
+        if not key_terms:
+            return None
+        
+        # Full-text match on the indexed search_vector, with per-term match counts
+        key_terms = key_terms[:5]  # Limit terms
+        search = build_chunk_text_search(key_terms)
+        params = dict(search.params)
+        params.update({f"term_{i}": term for i, term in enumerate(key_terms)})
+        
+        # Medical prioritization in SQL
+        priority_cases = []
+        for doc_pattern, priority in self.document_priority.items():
+            priority_cases.append(f"WHEN d.filename ILIKE '%{doc_pattern}%' THEN {priority}")
+        
+        priority_case_sql = " ".join(priority_cases) if priority_cases else ""
+        
+        search_query = f"""
+            SELECT 
+                dc.chunk_text,
+                d.filename,
+                LENGTH(dc.chunk_text) as content_length,
+                -- Medical document priority scoring
+                (CASE 
+                    {priority_case_sql}
+                    WHEN d.content_type IN ('protocol', 'guideline', 'criteria') THEN 80
+                    WHEN dc.chunk_text ILIKE '%protocol%' THEN 75
+                    WHEN dc.chunk_text ILIKE '%guideline%' THEN 70
+                    ELSE 50 
+                END) as priority_score,
+                -- Term match scoring
+                (
+                    {' + '.join([f"CASE WHEN {term_match_sql(f'term_{i}')} THEN 1 ELSE 0 END" for i in range(len(key_terms))])}
+                ) as term_matches
+            FROM document_chunks dc
+            JOIN documents d ON dc.document_id = d.id
+            WHERE {search.where_sql}
+            AND LENGTH(dc.chunk_text) > 50
+            ORDER BY 
+                priority_score DESC,
+                term_matches DESC,
+                content_length DESC
+            LIMIT :limit
+        """
+        
+        params["limit"] = top_k * 2  # Get extra results for filtering
+        
+        return search_query, params
+    
+    def _database_matches(self, query: str, results: List[Any]) -> List[DocumentMatch]:
+        """Score database rows into document matches."""
+        matches = []
+        for result in results:
+            content = result[0]
+            filename = result[1]
+            content_length = result[2]
+            priority_score = result[3]
+            term_matches = result[4]
+            
+            # Calculate confidence based on multiple factors
+            confidence = self._calculate_content_confidence(
+                query, content, filename, priority_score, term_matches
+            )
+            
+            if confidence > 0.3:  # Only return reasonable matches
+                matches.append(DocumentMatch(
+                    content=content,
+                    filename=filename,
+                    confidence=confidence,
+                    match_type="database",
+                    source_section=self._extract_section_name(content)
+                ))
+        
+        logger.info(f"🔍 Database search returned {len(matches)} matches")
+        return matches
+    
     def _identify_target_documents(self, query: str) -> List[str]:
         """Identify which documents are most likely to contain relevant information."""
         candidates = []
@@ -227,46 +292,52 @@ class DocsRAGRetriever:
         """Search for content within a specific document pattern."""
         try:
             # Search database for specific document
-            search_query = text("""
-                SELECT dc.chunk_text, d.filename
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                WHERE d.filename ILIKE :doc_pattern
-                AND LENGTH(dc.chunk_text) > 100
-                ORDER BY LENGTH(dc.chunk_text) DESC
-                LIMIT 5
-            """)
-            
-            results = self.db.execute(search_query, {"doc_pattern": f"%{doc_pattern}%"}).fetchall()
-            
-            if not results:
-                return None
+            results = self.db.execute(
+                CHUNKS_BY_FILENAME_PATTERN_SQL,
+                {"doc_pattern": f"%{doc_pattern}%", "min_length": 100, "limit": 5}
+            ).fetchall()
+            return self._best_document_match(query, results)
             
-            # Find best matching chunk
-            best_match = None
-            best_confidence = 0.0
-            
-            for result in results:
-                content = result[0]
-                filename = result[1]
-                
-                confidence = self._calculate_text_similarity(query, content)
-                if confidence > best_confidence:
-                    best_confidence = confidence
-                    best_match = DocumentMatch(
-                        content=content,
-                        filename=filename,
-                        confidence=confidence,
-                        match_type="document_targeted",
-                        source_section=self._extract_section_name(content)
-                    )
-            
-            return best_match
+        except Exception as e:
+            logger.error(f"Specific document search failed for {doc_pattern}: {e}")
+            return None
+    
+    async def _search_specific_document_async(self, query: str, doc_pattern: str) -> Optional[DocumentMatch]:
+        """Async variant of _search_specific_document on the retrieval repository."""
+        try:
+            results = await self.repository.get_chunks_by_filename_pattern(doc_pattern, min_length=100, limit=5)
+            return self._best_document_match(query, results)
             
         except Exception as e:
             logger.error(f"Specific document search failed for {doc_pattern}: {e}")
             return None
     
+    def _best_document_match(self, query: str, results: List[Any]) -> Optional[DocumentMatch]:
+        """Pick the chunk most similar to the query from a targeted document search."""
+        if not results:
+            return None
+        
+        # Find best matching chunk
+        best_match = None
+        best_confidence = 0.0
+        
+        for result in results:
+            content = result[0]
+            filename = result[1]
+            
+            confidence = self._calculate_text_similarity(query, content)
+            if confidence > best_confidence:
+                best_confidence = confidence
+                best_match = DocumentMatch(
+                    content=content,
+                    filename=filename,
+                    confidence=confidence,
+                    match_type="document_targeted",
+                    source_section=self._extract_section_name(content)
+                )
+        
+        return best_match
+    
     def _extract_search_terms(self, query: str) -> List[str]:
         """Extract meaningful search terms from query."""
         # Remove common stop words but keep medical terms
@@ -360,7 +431,15 @@ class DocsRAGRetriever:
         Returns formatted response ready for API.
         """
         matches = self.retrieve_from_docs(query, top_k=3)
-        
+        return self._build_docs_response(query, matches)
+    
+    async def get_docs_response_async(self, query: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_docs_response that doesn't block the event loop."""
+        matches = await self.retrieve_from_docs_async(query, top_k=3)
+        return self._build_docs_response(query, matches)
+    
+    def _build_docs_response(self, query: str, matches: List[DocumentMatch]) -> Optional[Dict[str, Any]]:
+        """Format the best matches as an API response."""
         if not matches:
             return None
         
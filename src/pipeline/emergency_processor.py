@@ -7,20 +7,29 @@ and provides direct medical responses with guaranteed quality.
 This fixes the fundamental disconnect between backend claims and frontend reality.
 """
 
+import copy
 import logging
 import time
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, ContextManager, Dict, List, Optional, Tuple
 
 from redis import Redis
 from sqlalchemy.orm import Session
 
+from ..cache.local_cache import get_local_cache
+from ..cache.response_cache import ResponseCache
+from ..cache.single_flight import get_single_flight
+from ..config.enhanced_settings import settings
+from ..models.database import get_db_session
 from ..models.query_types import QueryType
 from ..models.schemas import QueryResponse
+from ..observability.metrics import metrics
+from .knowledge_base import KnowledgeBase, get_knowledge_base
 from .simple_direct_retriever import SimpleDirectRetriever
-from .qa_index import QAIndex
 
 logger = logging.getLogger(__name__)
 
+STEMI_PAGER = "(917) 827-9725"
+
 
 class EmergencyQueryProcessor:
     """
@@ -34,14 +43,28 @@ class EmergencyQueryProcessor:
     - Direct database responses only
     """
 
-    def __init__(self, db: Session, redis: Redis, **kwargs):
+    def __init__(self, db: Session, redis: Redis,
+                 knowledge_base: Optional[KnowledgeBase] = None,
+                 session_factory: Callable[[], ContextManager[Session]] = get_db_session, **kwargs):
         """Initialize with minimal dependencies."""
         self.db = db
         self.redis = redis
-        self.direct_retriever = SimpleDirectRetriever(db)
-
-        # Load QA index for STEMI and other critical protocols
-        self.qa_index = QAIndex.load()
+        # Sessions for coalesced computations, which can outlive this request's session
+        self.session_factory = session_factory
+
+        # Pin one knowledge snapshot for the lifetime of this request
+        self.knowledge = (knowledge_base or get_knowledge_base()).snapshot
+        self.direct_retriever = SimpleDirectRetriever(
+            db, medical_expander=self.knowledge.abbreviation_expander)
+
+        # QA index for STEMI and other critical protocols
+        self.qa_index = self.knowledge.qa_index
+
+        # Exact-match response cache (worker L1 + shared Redis), scoped to this snapshot
+        self.response_cache = ResponseCache(
+            redis, self.knowledge.version,
+            abbreviation_expander=self.knowledge.abbreviation_expander,
+            local_cache=get_local_cache())
         logger.info(
             f"🚨 Emergency Query Processor initialized with {len(self.qa_index.entries)} QA entries - bypassing all complex systems")
 
@@ -51,6 +74,50 @@ class EmergencyQueryProcessor:
         context: Optional[str] = None,
         user_id: Optional[str] = None,
         timeout: int = 10  # Much shorter timeout
+    ) -> QueryResponse:
+        """
+        Process query, sharing one computation between identical queries in flight.
+
+        Concurrent requests whose canonical query, type and corpus version match
+        await the first request's response instead of rerunning retrieval.
+        """
+        start_time = time.time()
+
+        try:
+            query_type = self._emergency_classify(query)
+            key = self.response_cache.cache_key(query, query_type)
+        except Exception as e:
+            logger.error(f"Query coalescing unavailable: {e}")
+            return await self._process_query(query, context, user_id, timeout)
+
+        response, coalesced = await get_single_flight().do(
+            key,
+            lambda db: self._for_session(db)._process_query(query, context, user_id, timeout),
+            redis=self.redis if settings.cache_config.coalesce_across_workers else None,
+            lookup=lambda: self._get_cached_response(query, query_type),
+            session_factory=self.session_factory,
+        )
+        if coalesced is None:
+            return response
+
+        logger.info(f"🔗 Coalesced {query_type.value} query ({coalesced})")
+        metrics.track_coalesced_request(query_type.value, coalesced)
+        return response.model_copy(update={"processing_time": time.time() - start_time})
+
+    def _for_session(self, db: Session) -> "EmergencyQueryProcessor":
+        """This processor (same knowledge snapshot and caches) on another database session."""
+        processor = copy.copy(self)
+        processor.db = db
+        processor.direct_retriever = SimpleDirectRetriever(
+            db, medical_expander=self.knowledge.abbreviation_expander)
+        return processor
+
+    async def _process_query(
+        self,
+        query: str,
+        context: Optional[str] = None,
+        user_id: Optional[str] = None,
+        timeout: int = 10
     ) -> QueryResponse:
         """
         Process query with guaranteed medical response quality.
@@ -65,118 +132,82 @@ class EmergencyQueryProcessor:
             # Step 1: Ultra-simple classification (no LLM, no complex logic)
             query_type = self._emergency_classify(query)
 
-            # Step 1.5: PRIORITY QA FALLBACK for critical medical protocols
-            # Check for high-priority medical queries FIRST before database lookup
-            query_lower = query.lower()
-            priority_medical_queries = [
-                ('icp' in query_lower and (
-                    'guideline' in query_lower or 'protocol' in query_lower)),
-                ('asthma' in query_lower and (
-                    'guideline' in query_lower or 'protocol' in query_lower or 'pathway' in query_lower)),
-                ('sepsis' in query_lower and 'criteria' in query_lower),
-                ('stemi' in query_lower and 'protocol' in query_lower),
-                # BULLETPROOF FIX: Add DKA protocol detection (PRP-49)
-                ('dka' in query_lower and 'protocol' in query_lower),
-                ('diabetic ketoacidosis' in query_lower)
-            ]
-
-            if any(priority_medical_queries):
-                logger.warning(
-                    "🚨 PRIORITY MEDICAL QUERY DETECTED - Using enhanced retrieval")
-                logger.warning(f"🔧 Query: '{query}' | Lower: '{query_lower}'")
-                logger.warning(
-                    f"🔧 Priority checks: {priority_medical_queries}")
+            early_response = await self._early_response(query, query_type, start_time)
+            if early_response:
+                return early_response
+
+            return await self._direct_response(query, query_type, start_time)
+
+        except Exception as e:
+            logger.error(f"Emergency processor failed: {e}")
+            processing_time = time.time() - start_time
+
+            # Even failures get reasonable responses
+            return QueryResponse(
+                response="Emergency medical information retrieval temporarily unavailable. Please consult medical references directly.",
+                query_type="summary",
+                confidence=0.0,
+                sources=[],
+                warnings=["Emergency fallback active"],
+                processing_time=processing_time,
+            )
+
+    async def _early_response(self, query: str, query_type: QueryType,
+                              start_time: float) -> Optional[QueryResponse]:
+        """
+        Answer decided before any LLM call: the response cache, priority
+        protocols and the QA index. Shared by _process_query and stream_query.
+        """
+        # Step 1.2: Exact-match response cache
+        cached_response = await self._get_cached_response(query, query_type)
+        if cached_response:
+            logger.info("✅ Serving cached response")
+            return cached_response.model_copy(update={"processing_time": time.time() - start_time})
+
+        # Step 1.5: PRIORITY QA FALLBACK for critical medical protocols
+        # Check for high-priority medical queries FIRST before database lookup
+        query_lower = query.lower()
+        priority_medical_queries = [
+            ('icp' in query_lower and (
+                'guideline' in query_lower or 'protocol' in query_lower)),
+            ('asthma' in query_lower and (
+                'guideline' in query_lower or 'protocol' in query_lower or 'pathway' in query_lower)),
+            ('sepsis' in query_lower and 'criteria' in query_lower),
+            ('stemi' in query_lower and 'protocol' in query_lower),
+            # BULLETPROOF FIX: Add DKA protocol detection (PRP-49)
+            ('dka' in query_lower and 'protocol' in query_lower),
+            ('diabetic ketoacidosis' in query_lower)
+        ]
+
+        if any(priority_medical_queries):
+            logger.warning(
+                "🚨 PRIORITY MEDICAL QUERY DETECTED - Using enhanced retrieval")
+            logger.warning(f"🔧 Query: '{query}' | Lower: '{query_lower}'")
+            logger.warning(
+                f"🔧 Priority checks: {priority_medical_queries}")
                 
-                # BULLETPROOF FIX: Use SimpleDirectRetriever for DKA queries (PRP-49)
-                if 'dka' in query_lower or 'diabetic ketoacidosis' in query_lower:
-                    logger.info("🚨 DKA QUERY DETECTED - Using enhanced SimpleDirectRetriever with abbreviation expansion")
-                    try:
-                        response_data = self.direct_retriever.get_medical_response(query)
+            # BULLETPROOF FIX: Use SimpleDirectRetriever for DKA queries (PRP-49)
+            if 'dka' in query_lower or 'diabetic ketoacidosis' in query_lower:
+                logger.info("🚨 DKA QUERY DETECTED - Using enhanced SimpleDirectRetriever with abbreviation expansion")
+                try:
+                    response_data = await self.direct_retriever.get_medical_response_async(query)
                         
-                        return QueryResponse(
-                            response=response_data["response"],
-                            query_type=response_data.get("query_type", query_type.value),
-                            confidence=response_data["confidence"],
-                            sources=response_data.get("sources", []),
-                            processing_time=time.time() - start_time,
-                            warnings=None
-                        )
-                    except Exception as e:
-                        logger.error(f"Enhanced DKA retrieval failed: {e}")
-                        # Fall through to QA fallback
-                
-                # For other priority queries, use QA fallback
-                qa_response = self._qa_fallback(query, query_type)
-                if qa_response:
-                    logger.info(
-                        "✅ Using QA fallback for critical medical protocol")
-                    return QueryResponse(
-                        response=qa_response["response"],
-                        query_type=query_type.value,
-                        confidence=qa_response["confidence"],
-                        sources=qa_response["sources"],
-                        processing_time=time.time() - start_time
+                    dka_response = QueryResponse(
+                        response=response_data["response"],
+                        query_type=response_data.get("query_type", query_type.value),
+                        confidence=response_data["confidence"],
+                        sources=response_data.get("sources", []),
+                        processing_time=time.time() - start_time,
+                        warnings=None
                     )
-                else:
-                    # If QA fallback fails, provide comprehensive fallback
-                    if 'icp' in query_lower and ('guideline' in query_lower or 'protocol' in query_lower):
-                        logger.info(
-                            "🔧 QA fallback failed, providing comprehensive ICP guidelines")
-                        icp_response = "🧠 **ICP MANAGEMENT GUIDELINES:**\n\n"
-                        icp_response += "**🚨 Pre-EVD Placement:**\n"
-                        icp_response += "• Elevated ICP management discussion required\n"
-                        icp_response += "• Adequate sedation and pain control\n"
-                        icp_response += "• Consider mannitol administration\n"
-                        icp_response += "• Temporary hyperventilation if needed\n\n"
-                        icp_response += "**📍 EVD Placement:**\n"
-                        icp_response += "• Set drain at 20cmH2O above tragus of ear\n"
-                        icp_response += "• Always clamp during transport/turning\n"
-                        icp_response += "• Post-procedure CT always ordered\n\n"
-                        icp_response += "**🔄 Post-Procedure Huddle Required:**\n"
-                        icp_response += "• Ongoing BP goals\n"
-                        icp_response += "• EVD level and drainage plan\n"
-                        icp_response += "• Additional ICP treatment needs\n"
-                        icp_response += "• Specialized neuro-imaging requirements"
-
-                        return QueryResponse(
-                            response=icp_response,
-                            query_type=query_type.value,
-                            confidence=0.95,
-                            sources=[{"display_name": "ED EVD Placement Protocol.pdf",
-                                      "filename": "ED_EVD_Placement_Protocol_qa.json", "section": "Comprehensive guidelines"}],
-                            processing_time=time.time() - start_time
-                        )
-
-                    elif 'asthma' in query_lower and ('guideline' in query_lower or 'protocol' in query_lower or 'pathway' in query_lower):
-                        logger.info(
-                            "🔧 QA fallback failed, providing comprehensive asthma guidelines")
-                        asthma_response = "🫁 **ASTHMA PATHWAY GUIDELINES:**\n\n"
-                        asthma_response += "**🚨 Initial Assessment:**\n"
-                        asthma_response += "• Assess severity (mild, moderate, severe)\n"
-                        asthma_response += "• Peak flow measurement if able\n"
-                        asthma_response += "• Oxygen saturation monitoring\n\n"
-                        asthma_response += "**💨 First-Line Treatment:**\n"
-                        asthma_response += "• **Albuterol:** 2.5-5mg nebulized or MDI\n"
-                        asthma_response += "• **Ipratropium:** 0.5mg nebulized (if severe)\n"
-                        asthma_response += "• **Oxygen:** if SpO2 < 92%\n\n"
-                        asthma_response += "**💊 Corticosteroids:**\n"
-                        asthma_response += "• **Prednisolone:** 1-2mg/kg PO (pediatric)\n"
-                        asthma_response += "• **Prednisone:** 40-60mg PO (adult)\n\n"
-                        asthma_response += "**⚠️ Severe Exacerbation:**\n"
-                        asthma_response += "• Continuous nebulizers\n"
-                        asthma_response += "• IV magnesium sulfate\n"
-                        asthma_response += "• Consider epinephrine if anaphylaxis"
-
-                        return QueryResponse(
-                            response=asthma_response,
-                            query_type=query_type.value,
-                            confidence=0.95,
-                            sources=[{"display_name": "Pediatric Asthma Pathway.pdf",
-                                      "filename": "Pediatric_Asthma_Pathway_qa.json", "section": "Comprehensive guidelines"}],
-                            processing_time=time.time() - start_time
-                        )
-
-            # Step 1.6: Regular QA FALLBACK for other protocols
+                    if response_data.get("has_real_content"):
+                        await self._cache_response(query, query_type, dka_response)
+                    return dka_response
+                except Exception as e:
+                    logger.error(f"Enhanced DKA retrieval failed: {e}")
+                    # Fall through to QA fallback
+                
+            # For other priority queries, use QA fallback
             qa_response = self._qa_fallback(query, query_type)
             if qa_response:
                 logger.info(
@@ -188,37 +219,11 @@ class EmergencyQueryProcessor:
                     sources=qa_response["sources"],
                     processing_time=time.time() - start_time
                 )
-
-            # Step 2: Direct medical response with transaction safety
-            try:
-                response_data = self.direct_retriever.get_medical_response(
-                    query)
-            except Exception as db_error:
-                logger.error(f"Database retrieval failed: {db_error}")
-                # Force rollback any failed transactions
-                try:
-                    self.db.rollback()
-                except:
-                    pass
-                # Return a safe fallback response
-                response_data = {
-                    "response": "Database lookup failed: No relevant medical information found in database. Please consult medical references directly.",
-                    "sources": [],
-                    "confidence": 0.3,
-                    "query_type": query_type.value,
-                    "has_real_content": False
-                }
-
-            # Step 2.5: BULLETPROOF WRONG ANSWER DETECTION & OVERRIDE
-            # If we detect specific medical queries getting wrong answers, override immediately
-            query_lower = query.lower()
-            response_text = response_data.get("response", "").lower()
-
-            # ICP Guideline Override
-            if ('icp' in query_lower and 'guideline' in query_lower) or ('icp' in query_lower and 'protocol' in query_lower):
-                if 'consult' in response_text or 'trackboard' in response_text:
-                    logger.warning(
-                        "🚨 DETECTED WRONG ANSWER: ICP query returned consult info - OVERRIDING")
+            else:
+                # If QA fallback fails, provide comprehensive fallback
+                if 'icp' in query_lower and ('guideline' in query_lower or 'protocol' in query_lower):
+                    logger.info(
+                        "🔧 QA fallback failed, providing comprehensive ICP guidelines")
                     icp_response = "🧠 **ICP MANAGEMENT GUIDELINES:**\n\n"
                     icp_response += "**🚨 Pre-EVD Placement:**\n"
                     icp_response += "• Elevated ICP management discussion required\n"
@@ -244,11 +249,9 @@ class EmergencyQueryProcessor:
                         processing_time=time.time() - start_time
                     )
 
-            # Asthma Guideline Override
-            if ('asthma' in query_lower and 'guideline' in query_lower) or ('asthma' in query_lower and 'protocol' in query_lower):
-                if 'consult' in response_text or 'trackboard' in response_text or not ('asthma' in response_text or 'albuterol' in response_text):
-                    logger.warning(
-                        "🚨 DETECTED WRONG ANSWER: Asthma query returned irrelevant info - OVERRIDING")
+                elif 'asthma' in query_lower and ('guideline' in query_lower or 'protocol' in query_lower or 'pathway' in query_lower):
+                    logger.info(
+                        "🔧 QA fallback failed, providing comprehensive asthma guidelines")
                     asthma_response = "🫁 **ASTHMA PATHWAY GUIDELINES:**\n\n"
                     asthma_response += "**🚨 Initial Assessment:**\n"
                     asthma_response += "• Assess severity (mild, moderate, severe)\n"
@@ -275,41 +278,274 @@ class EmergencyQueryProcessor:
                         processing_time=time.time() - start_time
                     )
 
-            # Step 3: Enhance with emergency protocols if needed
-            enhanced_response = self._enhance_medical_response(
-                query, response_data)
-
-            # Step 4: Force high confidence for all medical content
-            if enhanced_response.get("has_real_content"):
-                confidence = 0.95  # PRP-43: Hardcode high confidence
-            else:
-                confidence = enhanced_response.get("confidence", 0.7)
-
-            processing_time = time.time() - start_time
-
+        # Step 1.6: Regular QA FALLBACK for other protocols
+        qa_response = self._qa_fallback(query, query_type)
+        if qa_response:
+            logger.info(
+                "✅ Using QA fallback for critical medical protocol")
             return QueryResponse(
-                response=enhanced_response.get("response", ""),
+                response=qa_response["response"],
                 query_type=query_type.value,
-                confidence=confidence,
-                sources=enhanced_response.get("sources", []),
-                warnings=None,  # PRP-43: No misleading validation warnings
-                processing_time=processing_time,
-                pdf_links=enhanced_response.get("pdf_links")
+                confidence=qa_response["confidence"],
+                sources=qa_response["sources"],
+                processing_time=time.time() - start_time
             )
 
+        return None
+
+    async def _direct_response(self, query: str, query_type: QueryType,
+                               start_time: float) -> QueryResponse:
+        """Retrieve, check and enhance the answer to a query that needs the LLM."""
+        # Step 2: Direct medical response with transaction safety
+        try:
+            response_data = await self.direct_retriever.get_medical_response_async(
+                query)
+        except Exception as db_error:
+            logger.error(f"Database retrieval failed: {db_error}")
+            # Force rollback any failed transactions
+            try:
+                self.db.rollback()
+            except:
+                pass
+            # Return a safe fallback response
+            response_data = {
+                "response": "Database lookup failed: No relevant medical information found in database. Please consult medical references directly.",
+                "sources": [],
+                "confidence": 0.3,
+                "query_type": query_type.value,
+                "has_real_content": False
+            }
+
+        # Step 2.5: Wrong answer detection & override
+        override_response = self._override_wrong_answer(query, query_type, response_data, start_time)
+        if override_response:
+            return override_response
+
+        # Step 3: Enhance with emergency protocols if needed
+        enhanced_response = self._enhance_medical_response(
+            query, response_data)
+
+        # Step 4: Force high confidence for all medical content
+        if enhanced_response.get("has_real_content"):
+            confidence = 0.95  # PRP-43: Hardcode high confidence
+        else:
+            confidence = enhanced_response.get("confidence", 0.7)
+
+        processing_time = time.time() - start_time
+
+        query_response = QueryResponse(
+            response=enhanced_response.get("response", ""),
+            query_type=query_type.value,
+            confidence=confidence,
+            sources=enhanced_response.get("sources", []),
+            warnings=None,  # PRP-43: No misleading validation warnings
+            processing_time=processing_time,
+            pdf_links=enhanced_response.get("pdf_links")
+        )
+
+        # Only real answers are cached; fallbacks should be retried
+        if enhanced_response.get("has_real_content"):
+            await self._cache_response(query, query_type, query_response)
+
+        return query_response
+
+    def _needs_answer_check(self, query: str) -> bool:
+        """Whether _override_wrong_answer may replace the answer to this query."""
+        query_lower = query.lower()
+        return ('icp' in query_lower or 'asthma' in query_lower) and (
+            'guideline' in query_lower or 'protocol' in query_lower)
+
+    def _override_wrong_answer(self, query: str, query_type: QueryType, response_data: Dict[str, Any],
+                               start_time: float) -> Optional[QueryResponse]:
+        """Known-good answer when a retrieved answer is detectably wrong, otherwise None."""
+        # Step 2.5: BULLETPROOF WRONG ANSWER DETECTION & OVERRIDE
+        # If we detect specific medical queries getting wrong answers, override immediately
+        query_lower = query.lower()
+        response_text = response_data.get("response", "").lower()
+
+        # ICP Guideline Override
+        if ('icp' in query_lower and 'guideline' in query_lower) or ('icp' in query_lower and 'protocol' in query_lower):
+            if 'consult' in response_text or 'trackboard' in response_text:
+                logger.warning(
+                    "🚨 DETECTED WRONG ANSWER: ICP query returned consult info - OVERRIDING")
+                icp_response = "🧠 **ICP MANAGEMENT GUIDELINES:**\n\n"
+                icp_response += "**🚨 Pre-EVD Placement:**\n"
+                icp_response += "• Elevated ICP management discussion required\n"
+                icp_response += "• Adequate sedation and pain control\n"
+                icp_response += "• Consider mannitol administration\n"
+                icp_response += "• Temporary hyperventilation if needed\n\n"
+                icp_response += "**📍 EVD Placement:**\n"
+                icp_response += "• Set drain at 20cmH2O above tragus of ear\n"
+                icp_response += "• Always clamp during transport/turning\n"
+                icp_response += "• Post-procedure CT always ordered\n\n"
+                icp_response += "**🔄 Post-Procedure Huddle Required:**\n"
+                icp_response += "• Ongoing BP goals\n"
+                icp_response += "• EVD level and drainage plan\n"
+                icp_response += "• Additional ICP treatment needs\n"
+                icp_response += "• Specialized neuro-imaging requirements"
+
+                return QueryResponse(
+                    response=icp_response,
+                    query_type=query_type.value,
+                    confidence=0.95,
+                    sources=[{"display_name": "ED EVD Placement Protocol.pdf",
+                              "filename": "ED_EVD_Placement_Protocol_qa.json", "section": "Comprehensive guidelines"}],
+                    processing_time=time.time() - start_time
+                )
+
+        # Asthma Guideline Override
+        if ('asthma' in query_lower and 'guideline' in query_lower) or ('asthma' in query_lower and 'protocol' in query_lower):
+            if 'consult' in response_text or 'trackboard' in response_text or not ('asthma' in response_text or 'albuterol' in response_text):
+                logger.warning(
+                    "🚨 DETECTED WRONG ANSWER: Asthma query returned irrelevant info - OVERRIDING")
+                asthma_response = "🫁 **ASTHMA PATHWAY GUIDELINES:**\n\n"
+                asthma_response += "**🚨 Initial Assessment:**\n"
+                asthma_response += "• Assess severity (mild, moderate, severe)\n"
+                asthma_response += "• Peak flow measurement if able\n"
+                asthma_response += "• Oxygen saturation monitoring\n\n"
+                asthma_response += "**💨 First-Line Treatment:**\n"
+                asthma_response += "• **Albuterol:** 2.5-5mg nebulized or MDI\n"
+                asthma_response += "• **Ipratropium:** 0.5mg nebulized (if severe)\n"
+                asthma_response += "• **Oxygen:** if SpO2 < 92%\n\n"
+                asthma_response += "**💊 Corticosteroids:**\n"
+                asthma_response += "• **Prednisolone:** 1-2mg/kg PO (pediatric)\n"
+                asthma_response += "• **Prednisone:** 40-60mg PO (adult)\n\n"
+                asthma_response += "**⚠️ Severe Exacerbation:**\n"
+                asthma_response += "• Continuous nebulizers\n"
+                asthma_response += "• IV magnesium sulfate\n"
+                asthma_response += "• Consider epinephrine if anaphylaxis"
+
+                return QueryResponse(
+                    response=asthma_response,
+                    query_type=query_type.value,
+                    confidence=0.95,
+                    sources=[{"display_name": "Pediatric Asthma Pathway.pdf",
+                              "filename": "Pediatric_Asthma_Pathway_qa.json", "section": "Comprehensive guidelines"}],
+                    processing_time=time.time() - start_time
+                )
+
+        return None
+
+    async def stream_query(self, query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Process query as (event, data) pairs for server-sent events.
+
+        "sources" is sent as soon as retrieval finishes, then the answer as
+        "token" events, then "done". Answers decided before the LLM runs
+        (cache, priority protocols, QA) and answers _override_wrong_answer
+        may replace arrive as a single token. If the LLM fails before its first
+        token a fallback answers instead, and its "sources" event replaces the
+        earlier one; if a finished LLM answer is not confident enough, a
+        "replace" event carries the fallback that supersedes the streamed text.
+        Only answers that pass those checks are cached.
+        """
+        start_time = time.time()
+        query_type = self._emergency_classify(query)
+
+        sources: List[Dict[str, Any]] = []
+        tokens: List[str] = []
+        try:
+            # Answers _override_wrong_answer may replace are checked whole
+            response = await self._early_response(query, query_type, start_time)
+            if not response and self._needs_answer_check(query):
+                response = await self._direct_response(query, query_type, start_time)
+            if response:
+                for event in self._answer_events(query_type, response.model_dump(), start_time):
+                    yield event
+                return
+
+            async for event, data in self.direct_retriever.stream_medical_response(query):
+                if event in ("response", "replace"):
+                    enhanced_response = self._enhance_medical_response(query, data)
+                    if enhanced_response.get("has_real_content"):
+                        enhanced_response["confidence"] = 0.95  # PRP-43: as in _process_query
+                    answer_events = self._answer_events(query_type, enhanced_response, start_time)
+                    if event == "replace":
+                        answer_events[1] = ("replace", answer_events[1][1])
+                    for answer_event in answer_events:
+                        yield answer_event
+                    if enhanced_response.get("has_real_content"):
+                        await self._cache_streamed_answer(query, query_type, enhanced_response)
+                    return
+
+                if event == "sources":
+                    sources = data["sources"]
+                    yield "sources", {"query_type": query_type.value, "sources": sources}
+                elif event == "token":
+                    tokens.append(data["text"])
+                    yield "token", data
+                elif event == "done":
+                    answer = "".join(tokens)
+                    # PRP-43: guarantee STEMI contact information
+                    if "stemi" in query.lower() and STEMI_PAGER not in answer:
+                        contact_section = f"\n\n📞 **CRITICAL EMERGENCY CONTACTS:**\n• STEMI Pager: **{STEMI_PAGER}** ⚡\n"
+                        answer += contact_section
+                        yield "token", {"text": contact_section}
+
+                    yield "done", {
+                        "confidence": data["confidence"],
+                        "processing_time": time.time() - start_time,
+                    }
+                    # stream_medical_response only sends "done" for accepted answers
+                    await self._cache_streamed_answer(query, query_type, {
+                        "response": answer, "sources": sources, "confidence": data["confidence"]})
+                    return
+
         except Exception as e:
-            logger.error(f"Emergency processor failed: {e}")
-            processing_time = time.time() - start_time
+            logger.error(f"Emergency streaming failed: {e}")
+            self._rollback()
+            if tokens:
+                yield "error", {"message": "Answer generation interrupted"}
+                yield "done", {"confidence": 0.0, "processing_time": time.time() - start_time}
+                return
+
+            unavailable = {
+                "response": "Emergency medical information retrieval temporarily unavailable. Please consult medical references directly.",
+                "sources": [],
+                "confidence": 0.0,
+            }
+            for event in self._answer_events(query_type, unavailable, start_time):
+                yield event
 
-            # Even failures get reasonable responses
-            return QueryResponse(
-                response="Emergency medical information retrieval temporarily unavailable. Please consult medical references directly.",
-                query_type="summary",
-                confidence=0.0,
-                sources=[],
-                warnings=["Emergency fallback active"],
-                processing_time=processing_time,
-            )
+    def _rollback(self) -> None:
+        """Roll back a failed transaction so the session stays usable."""
+        try:
+            self.db.rollback()
+        except Exception:
+            pass
+
+    def _answer_events(self, query_type: QueryType, response: Dict[str, Any],
+                       start_time: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """Stream events for an answer that is already complete."""
+        return [
+            ("sources", {"query_type": query_type.value, "sources": response.get("sources", [])}),
+            ("token", {"text": response.get("response", "")}),
+            ("done", {"confidence": response.get("confidence", 0.7), "processing_time": time.time() - start_time}),
+        ]
+
+    async def _cache_streamed_answer(self, query: str, query_type: QueryType, response: Dict[str, Any]) -> None:
+        """Cache a streamed answer so /query and later streams are served from it."""
+        await self._cache_response(query, query_type, QueryResponse(
+            response=response["response"],
+            query_type=query_type.value,
+            confidence=response["confidence"],
+            sources=response.get("sources", []),
+            processing_time=0.0,
+            pdf_links=response.get("pdf_links"),
+        ))
+
+    async def _get_cached_response(self, query: str, query_type: QueryType) -> Optional[QueryResponse]:
+        """Cached response for this exact query, if any (processing_time left at 0)."""
+        cached = await self.response_cache.get(query, query_type)
+        if not cached:
+            return None
+        return QueryResponse(**cached, processing_time=0.0)
+
+    async def _cache_response(self, query: str, query_type: QueryType, response: QueryResponse) -> None:
+        """Store a response in the exact-match cache (without per-request timing)."""
+        await self.response_cache.set(
+            query, query_type,
+            response.model_dump(exclude={"processing_time"}, exclude_none=True))
 
     def _emergency_classify(self, query: str) -> QueryType:
         """Ultra-fast rule-based classification with zero complexity."""
@@ -659,28 +895,23 @@ class EmergencyQueryProcessor:
             logger.info(
                 f"🔧 Searching with condition-specific query: '{condition_enhanced_query}'")
 
-            for qa_type in possible_types:
-                match = self.qa_index.find_best(
-                    condition_enhanced_query, expected_type=qa_type)
-                if match and (not best_match or match[1] > best_match[1]):
-                    best_match = match
-                    logger.info(
-                        f"🔧 Found condition-specific match with score: {match[1]}")
+            matches = self.qa_index.find_top_k(
+                condition_enhanced_query, types=possible_types, k=1)
+            if matches:
+                best_match = matches[0]
+                logger.info(
+                    f"🔧 Found condition-specific match with score: {best_match[1]}")
 
         # Try enhanced query with type restrictions
         if not best_match:
-            for qa_type in possible_types:
-                match = self.qa_index.find_best(
-                    enhanced_query, expected_type=qa_type)
-                if match and (not best_match or match[1] > best_match[1]):
-                    best_match = match
+            matches = self.qa_index.find_top_k(
+                enhanced_query, types=possible_types, k=1)
+            best_match = matches[0] if matches else None
 
         # Try original query if enhanced didn't work
         if not best_match:
-            for qa_type in possible_types:
-                match = self.qa_index.find_best(query, expected_type=qa_type)
-                if match and (not best_match or match[1] > best_match[1]):
-                    best_match = match
+            matches = self.qa_index.find_top_k(query, types=possible_types, k=1)
+            best_match = matches[0] if matches else None
 
         # If no type-specific match, try without type restriction
         if not best_match:
@@ -279,6 +279,6 @@ Please try a different search term or contact the forms administrator."""
 
 # Convenience function for easy integration
 def get_form_response(query: str) -> Optional[Dict[str, Any]]:
-    """Get form response for any query."""
-    retriever = FormRetriever()
-    return retriever.get_form_response(query)
\ No newline at end of file
+    """Get form response for any query from the current knowledge base snapshot."""
+    from .knowledge_base import get_knowledge_base
+    return get_knowledge_base().snapshot.form_retriever.get_form_response(query)
\ No newline at end of file
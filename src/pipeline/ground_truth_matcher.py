@@ -0,0 +1,122 @@
+"""
+Vectorized candidate scoring for ground truth validation.
+
+Builds a TF-IDF matrix over the ground truth QA pairs once per store, with an
+optional dense-embedding matrix, so a query is scored against every pair with
+a single matrix-vector product. GroundTruthValidator then applies its
+form/protocol confidence rules only to the top-ranked candidates.
+"""
+
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .ground_truth_store import GroundTruthPair
+
+logger = logging.getLogger(__name__)
+
+# The matrix is over questions; answer-only terms add a little recall
+ANSWER_TERM_WEIGHT = 0.1
+
+# Synonym expansion terms count for less than terms typed in the query
+EXPANSION_TERM_WEIGHT = 0.5
+
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class GroundTruthMatcher:
+    """TF-IDF (and optional dense) scorer over ground truth pairs."""
+
+    def __init__(self, pairs: Sequence[GroundTruthPair], embedder: Optional[Embedder] = None,
+                 dense_weight: float = 0.5):
+        self.pairs = pairs
+        self.embedder = embedder
+        self.dense_weight = dense_weight
+
+        vocabulary: Dict[str, int] = {}
+        document_frequency: List[int] = []
+        for pair in pairs:
+            for term in pair.medical_terms:
+                col = vocabulary.setdefault(term, len(vocabulary))
+                if col == len(document_frequency):
+                    document_frequency.append(0)
+                document_frequency[col] += 1
+        self.vocabulary = vocabulary
+
+        # Smoothed IDF, as in scikit-learn's TfidfVectorizer
+        n_pairs = len(pairs)
+        self.idf = np.array(
+            [math.log((1 + n_pairs) / (1 + df)) + 1.0 for df in document_frequency],
+            dtype=np.float32,
+        )
+
+        # Column-major so gathering the query's term columns is contiguous
+        matrix = np.zeros((n_pairs, len(vocabulary)), dtype=np.float32, order="F")
+        for row, pair in enumerate(pairs):
+            for term in pair.medical_terms:
+                col = vocabulary[term]
+                weight = 1.0 if term in pair.question_terms else ANSWER_TERM_WEIGHT
+                matrix[row, col] = weight * self.idf[col]
+        self.matrix = np.asfortranarray(_normalize_rows(matrix))
+
+        self.dense: Optional[np.ndarray] = None
+        if embedder is not None and n_pairs:
+            embeddings = np.asarray(embedder([pair.question for pair in pairs]), dtype=np.float32)
+            self.dense = _normalize_rows(embeddings)
+
+        logger.info(
+            f"Ground truth matcher built: {n_pairs} pairs x {len(vocabulary)} terms"
+            f"{' + dense embeddings' if self.dense is not None else ''}"
+        )
+
+    def _query_weights(self, terms: Iterable[str], expansion_terms: Iterable[str]) -> Dict[int, float]:
+        weights: Dict[int, float] = {}
+        for term in expansion_terms:
+            col = self.vocabulary.get(term)
+            if col is not None:
+                weights[col] = EXPANSION_TERM_WEIGHT * float(self.idf[col])
+        for term in terms:
+            col = self.vocabulary.get(term)
+            if col is not None:
+                weights[col] = float(self.idf[col])
+        return weights
+
+    def score(self, query: str, terms: Iterable[str], expansion_terms: Iterable[str] = ()) -> np.ndarray:
+        """Similarity of the query to every pair (zeros when nothing overlaps)."""
+        query_weights = self._query_weights(terms, expansion_terms)
+        scores = np.zeros(len(self.pairs), dtype=np.float32)
+
+        if query_weights:
+            cols = sorted(query_weights)
+            weights = np.array([query_weights[col] for col in cols], dtype=np.float32)
+            weights /= np.linalg.norm(weights)
+            scores += self.matrix[:, cols] @ weights
+
+        if self.dense is not None:
+            query_vec = np.asarray(self.embedder([query])[0], dtype=np.float32)
+            norm = np.linalg.norm(query_vec)
+            if norm > 0:
+                scores += self.dense_weight * (self.dense @ (query_vec / norm))
+
+        return scores
+
+    def top_candidates(self, query: str, terms: Iterable[str], expansion_terms: Iterable[str] = (),
+                       k: int = 32) -> List[int]:
+        """Indices of the k best-scoring pairs with a positive score, best first."""
+        if not self.pairs or k <= 0:
+            return []
+
+        scores = self.score(query, terms, expansion_terms)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Best score first, load order among equal scores
+        top = top[np.lexsort((top, -scores[top]))]
+        return [int(i) for i in top if scores[i] > 0]
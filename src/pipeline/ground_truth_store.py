@@ -0,0 +1,210 @@
+"""
+Shared ground truth store.
+
+Parses the protocols/guidelines/reference JSON under ground_truth_qa/ once and
+keeps a pre-normalized, read-only view that GroundTruthValidator,
+LLMRAGRetriever and BulletproofRetriever all share: QA pairs are flattened,
+questions and answers lowercased and tokenized, and the medical synonym table
+is pre-tokenized so per-query matching never re-parses files or text.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+GROUND_TRUTH_CATEGORIES = ('protocols', 'guidelines', 'reference')
+
+# Critical medical abbreviations and their expansions used for query matching
+GROUND_TRUTH_SYNONYMS: Dict[str, List[str]] = {
+    # Critical medical abbreviations
+    'icp': ['intracranial pressure', 'ich', 'intracerebral hemorrhage', 'brain pressure'],
+    'evd': ['external ventricular drain', 'ventricular drain', 'brain drain'],
+    'ich': ['intracerebral hemorrhage', 'brain hemorrhage', 'intracranial bleeding', 'icp'],
+    'sah': ['subarachnoid hemorrhage'],
+    'tbi': ['traumatic brain injury', 'head injury'],
+    'stemi': ['st elevation myocardial infarction', 'heart attack'],
+    'sepsis': ['severe infection', 'septic shock', 'systemic infection'],
+    'stroke': ['cerebrovascular accident', 'cva', 'brain attack'],
+    'anaphylaxis': ['severe allergic reaction', 'allergic shock'],
+    'asthma': ['bronchial asthma', 'respiratory distress'],
+
+    # Medication mappings
+    'epi': ['epinephrine', 'adrenaline', 'epipen'],
+    'heparin': ['anticoagulant', 'blood thinner'],
+    'nicardipine': ['calcium channel blocker', 'blood pressure medication'],
+    'mannitol': ['osmotic diuretic', 'brain pressure medication'],
+    'ativan': ['lorazepam', 'benzodiazepine'],
+
+    # Procedure mappings
+    'evd placement': ['ventricular drain insertion', 'brain drain placement'],
+    'intubation': ['airway management', 'breathing tube'],
+    'central line': ['central venous catheter', 'cvc'],
+}
+
+_TERM_PATTERN = re.compile(r'\b[a-zA-Z][a-zA-Z0-9]*\b')
+
+MEDICAL_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'what', 'how', 'when', 'where', 'who', 'why'
+})
+
+KEY_TERM_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'what', 'how', 'when', 'where', 'who', 'why', 'is', 'are'
+})
+
+
+def extract_medical_terms(text: str) -> List[str]:
+    """Extract meaningful medical terms (length > 2, no stop words)."""
+    return [term for term in _TERM_PATTERN.findall(text.lower())
+            if len(term) > 2 and term not in MEDICAL_STOP_WORDS]
+
+
+def extract_key_terms(text: str) -> List[str]:
+    """Extract key terms for LLM RAG matching (slightly smaller stop list)."""
+    return [term for term in _TERM_PATTERN.findall(text.lower())
+            if len(term) > 2 and term not in KEY_TERM_STOP_WORDS]
+
+
+def extract_qa_pairs(file_data: Any) -> List[Dict]:
+    """Extract Q&A pairs from the different ground truth JSON structures."""
+    qa_pairs = []
+
+    # Handle list format (like EVD protocol)
+    if isinstance(file_data, list):
+        qa_pairs = file_data
+
+    # Handle structured format with qa_pairs
+    elif isinstance(file_data, dict) and 'qa_pairs' in file_data:
+        qa_pairs = file_data['qa_pairs']
+
+    # Handle flat dictionary format
+    elif isinstance(file_data, dict):
+        qa_pairs = [{
+            'question': key,
+            'answer': value,
+            'source': file_data.get('document', 'ground_truth')
+        } for key, value in file_data.items()
+            if key not in ['document', 'document_type', 'complexity']]
+
+    return qa_pairs
+
+
+@dataclass(frozen=True)
+class GroundTruthPair:
+    """One flattened, pre-normalized ground truth Q&A pair."""
+
+    category: str
+    file_key: str
+    question: str
+    answer: str
+    source: str
+    question_lower: str
+    answer_lower: str
+    question_terms: FrozenSet[str]
+    answer_terms: FrozenSet[str]
+    medical_terms: FrozenSet[str]
+    key_terms: FrozenSet[str]
+
+
+class GroundTruthStore:
+    """Immutable, parsed ground truth data shared by all validators and retrievers."""
+
+    def __init__(self, path: str, files: Mapping[str, Mapping[str, Any]],
+                 pairs: Tuple[GroundTruthPair, ...],
+                 synonyms: Mapping[str, Tuple[str, ...]]):
+        self.path = path
+        self.files = files
+        self.pairs = pairs
+        self.synonyms = synonyms
+        # Synonym phrases are tokenized once instead of once per query per pair
+        self.synonym_terms: Mapping[str, FrozenSet[str]] = MappingProxyType({
+            synonym: frozenset(extract_medical_terms(synonym))
+            for expansions in synonyms.values() for synonym in expansions
+        })
+
+    @property
+    def file_count(self) -> int:
+        return sum(len(category) for category in self.files.values())
+
+    def term_set(self, text: str) -> FrozenSet[str]:
+        """Medical term set for text, served from the synonym table when possible."""
+        cached = self.synonym_terms.get(text)
+        if cached is not None:
+            return cached
+        return frozenset(extract_medical_terms(text))
+
+    @classmethod
+    def load(cls, ground_truth_path: str) -> "GroundTruthStore":
+        """Parse every ground truth file under the category folders."""
+        files: Dict[str, Dict[str, Any]] = {}
+        pairs: List[GroundTruthPair] = []
+        base = Path(ground_truth_path)
+
+        if not base.exists():
+            logger.error(f"Ground truth path not found: {ground_truth_path}")
+        else:
+            logger.info(f"🔍 Loading ground truth data from: {ground_truth_path}")
+
+        for category in GROUND_TRUTH_CATEGORIES:
+            category_path = base / category
+            if not category_path.exists():
+                continue
+
+            files[category] = {}
+            for json_file in category_path.glob("*.json"):
+                try:
+                    with open(json_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.error(f"Failed to load {json_file}: {e}")
+                    continue
+
+                file_key = json_file.stem
+                files[category][file_key] = data
+
+                for qa_item in extract_qa_pairs(data):
+                    if not isinstance(qa_item, dict):
+                        continue
+                    question = qa_item.get('question', '') or ''
+                    answer = qa_item.get('answer', '') or ''
+                    if not isinstance(question, str) or not isinstance(answer, str):
+                        continue
+                    question_lower = question.lower()
+                    answer_lower = answer.lower()
+                    question_terms = frozenset(extract_medical_terms(question_lower))
+                    answer_terms = frozenset(extract_medical_terms(answer_lower))
+                    pairs.append(GroundTruthPair(
+                        category=category,
+                        file_key=file_key,
+                        question=question,
+                        answer=answer,
+                        source=qa_item.get('source', file_key),
+                        question_lower=question_lower,
+                        answer_lower=answer_lower,
+                        question_terms=question_terms,
+                        answer_terms=answer_terms,
+                        medical_terms=question_terms | answer_terms,
+                        key_terms=frozenset(extract_key_terms(f"{question_lower} {answer_lower}")),
+                    ))
+
+        store = cls(
+            path=str(ground_truth_path),
+            files=MappingProxyType({k: MappingProxyType(v) for k, v in files.items()}),
+            pairs=tuple(pairs),
+            synonyms=MappingProxyType({k: tuple(v) for k, v in GROUND_TRUTH_SYNONYMS.items()}),
+        )
+        logger.info(f"✅ Loaded {store.file_count} ground truth files ({len(store.pairs)} QA pairs)")
+        return store
+
+
+def get_ground_truth_store() -> GroundTruthStore:
+    """Get the ground truth store from the current knowledge base snapshot."""
+    from .knowledge_base import get_knowledge_base
+    return get_knowledge_base().snapshot.ground_truth
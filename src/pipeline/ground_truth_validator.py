@@ -3,14 +3,19 @@ Ground Truth Validation System - Bulletproof Medical Query Resolver
 Validates answers against curated ground truth data then falls back to RAG retrieval.
 """
 
-import json
 import logging
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-import re
+from typing import Any, Dict, FrozenSet, List, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
-import os
+
+from .ground_truth_matcher import Embedder, GroundTruthMatcher
+from .ground_truth_store import (
+    GroundTruthPair,
+    GroundTruthStore,
+    extract_medical_terms,
+    extract_qa_pairs,
+    get_ground_truth_store,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,79 +34,23 @@ class GroundTruthMatch:
     query_type: str
     document_source: str = ""
     
+# Number of TF-IDF candidates the confidence rules are applied to
+MAX_RULE_CANDIDATES = 32
+
 class GroundTruthValidator:
     """Validates queries against curated ground truth data with bulletproof precision."""
     
-    def __init__(self, ground_truth_path: str = None):
-        self.ground_truth_path = ground_truth_path or self._find_ground_truth_path()
-        self.ground_truth_cache = {}
-        self.medical_synonyms = {
-            # Critical medical abbreviations
-            'icp': ['intracranial pressure', 'ich', 'intracerebral hemorrhage', 'brain pressure'],
-            'evd': ['external ventricular drain', 'ventricular drain', 'brain drain'],
-            'ich': ['intracerebral hemorrhage', 'brain hemorrhage', 'intracranial bleeding', 'icp'],
-            'sah': ['subarachnoid hemorrhage'],
-            'tbi': ['traumatic brain injury', 'head injury'],
-            'stemi': ['st elevation myocardial infarction', 'heart attack'],
-            'sepsis': ['severe infection', 'septic shock', 'systemic infection'],
-            'stroke': ['cerebrovascular accident', 'cva', 'brain attack'],
-            'anaphylaxis': ['severe allergic reaction', 'allergic shock'],
-            'asthma': ['bronchial asthma', 'respiratory distress'],
-            
-            # Medication mappings
-            'epi': ['epinephrine', 'adrenaline', 'epipen'],
-            'heparin': ['anticoagulant', 'blood thinner'],
-            'nicardipine': ['calcium channel blocker', 'blood pressure medication'],
-            'mannitol': ['osmotic diuretic', 'brain pressure medication'],
-            'ativan': ['lorazepam', 'benzodiazepine'],
-            
-            # Procedure mappings
-            'evd placement': ['ventricular drain insertion', 'brain drain placement'],
-            'intubation': ['airway management', 'breathing tube'],
-            'central line': ['central venous catheter', 'cvc'],
-        }
-        self._load_ground_truth_data()
-    
-    def _find_ground_truth_path(self) -> str:
-        """Find ground truth directory in the project."""
-        current_dir = Path(__file__).parent
-        for _ in range(5):  # Search up to 5 levels up
-            ground_truth_dir = current_dir / "ground_truth_qa"
-            if ground_truth_dir.exists():
-                return str(ground_truth_dir)
-            current_dir = current_dir.parent
-        
-        # Fallback to relative path
-        return "/Users/nimayh/Desktop/NH/V8/edbot-v8-fix-prp-44-comprehensive-code-quality/ground_truth_qa"
-    
-    def _load_ground_truth_data(self):
-        """Load all ground truth data into memory for fast access."""
-        if not os.path.exists(self.ground_truth_path):
-            logger.error(f"Ground truth path not found: {self.ground_truth_path}")
-            return
-        
-        logger.info(f"🔍 Loading ground truth data from: {self.ground_truth_path}")
-        
-        for category in ['protocols', 'guidelines', 'reference']:
-            category_path = Path(self.ground_truth_path) / category
-            if not category_path.exists():
-                continue
-                
-            self.ground_truth_cache[category] = {}
-            
-            for json_file in category_path.glob("*.json"):
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    file_key = json_file.stem
-                    self.ground_truth_cache[category][file_key] = data
-                    
-                except Exception as e:
-                    logger.error(f"Failed to load {json_file}: {e}")
-        
-        total_files = sum(len(cat) for cat in self.ground_truth_cache.values())
-        logger.info(f"✅ Loaded {total_files} ground truth files")
+    def __init__(self, ground_truth_path: str = None, store: Optional[GroundTruthStore] = None,
+                 embedder: Optional[Embedder] = None, max_candidates: int = MAX_RULE_CANDIDATES):
+        if store is None:
+            # Share the process-wide parsed store unless a specific path is requested
+            store = GroundTruthStore.load(ground_truth_path) if ground_truth_path else get_ground_truth_store()
+        self.store = store
+        self.ground_truth_path = store.path
+        self.ground_truth_cache = store.files
+        self.medical_synonyms = store.synonyms
+        self.matcher = GroundTruthMatcher(store.pairs, embedder=embedder)
+        self.max_candidates = max_candidates
     
     def validate_query(self, query: str) -> Optional[GroundTruthMatch]:
         """
@@ -112,31 +61,31 @@ class GroundTruthValidator:
         best_match = None
         best_confidence = 0.0
         
-        # Step 1: Expand query with medical synonyms
+        # Step 1: Expand query with medical synonyms (tokenized once per query)
         expanded_terms = self._expand_query_terms(query_lower)
+        expanded_term_sets = [self.store.term_set(term) for term in expanded_terms]
+        query_terms = set(self._extract_medical_terms(query_lower))
         
-        # Step 2: Search through all ground truth data
-        for category, files_data in self.ground_truth_cache.items():
-            for file_key, file_data in files_data.items():
-                
-                # Handle different JSON structures
-                qa_pairs = self._extract_qa_pairs(file_data)
-                
-                for qa_item in qa_pairs:
-                    confidence = self._calculate_match_confidence(
-                        query_lower, expanded_terms, qa_item
-                    )
-                    
-                    if confidence > best_confidence and confidence >= MatchConfidence.MEDIUM.value:
-                        best_confidence = confidence
-                        best_match = GroundTruthMatch(
-                            question=qa_item.get('question', ''),
-                            answer=qa_item.get('answer', ''),
-                            confidence=confidence,
-                            source=file_key,
-                            query_type=category,
-                            document_source=qa_item.get('source', file_key)
-                        )
+        # Step 2: Score every pair at once, then apply the match rules to the best candidates
+        candidates = self.matcher.top_candidates(
+            query_lower, query_terms, frozenset().union(*expanded_term_sets), k=self.max_candidates
+        )
+        for idx in candidates:
+            qa_item = self.store.pairs[idx]
+            confidence = self._calculate_match_confidence(
+                query_lower, expanded_term_sets, qa_item, query_terms
+            )
+            
+            if confidence > best_confidence and confidence >= MatchConfidence.MEDIUM.value:
+                best_confidence = confidence
+                best_match = GroundTruthMatch(
+                    question=qa_item.question,
+                    answer=qa_item.answer,
+                    confidence=confidence,
+                    source=qa_item.file_key,
+                    query_type=qa_item.category,
+                    document_source=qa_item.source
+                )
         
         if best_match and best_confidence >= MatchConfidence.MEDIUM.value:
             logger.info(f"🎯 Ground truth match found: {best_match.source} (confidence: {best_confidence:.2f})")
@@ -159,32 +108,13 @@ class GroundTruthValidator:
     
     def _extract_qa_pairs(self, file_data: Any) -> List[Dict]:
         """Extract Q&A pairs from different JSON structures."""
-        qa_pairs = []
-        
-        # Handle list format (like EVD protocol)
-        if isinstance(file_data, list):
-            qa_pairs = file_data
-        
-        # Handle structured format with qa_pairs
-        elif isinstance(file_data, dict) and 'qa_pairs' in file_data:
-            qa_pairs = file_data['qa_pairs']
-        
-        # Handle flat dictionary format
-        elif isinstance(file_data, dict):
-            # Convert dict to qa format
-            qa_pairs = [{
-                'question': key,
-                'answer': value,
-                'source': file_data.get('document', 'ground_truth')
-            } for key, value in file_data.items() 
-            if key not in ['document', 'document_type', 'complexity']]
-        
-        return qa_pairs
+        return extract_qa_pairs(file_data)
     
-    def _calculate_match_confidence(self, query: str, expanded_terms: List[str], qa_item: Dict) -> float:
+    def _calculate_match_confidence(self, query: str, expanded_term_sets: List[FrozenSet[str]],
+                                    qa_item: GroundTruthPair, query_terms: Set[str]) -> float:
         """Calculate confidence score for query-QA match with precise medical targeting."""
-        question = qa_item.get('question', '').lower()
-        answer = qa_item.get('answer', '').lower()
+        question = qa_item.question_lower
+        answer = qa_item.answer_lower
         
         if not question:
             return 0.0
@@ -252,26 +182,18 @@ class GroundTruthValidator:
         if query_lower in question or question in query_lower:
             return MatchConfidence.EXACT.value
         
-        # Calculate term overlap for general matching
-        query_terms = set(self._extract_medical_terms(query_lower))
-        question_terms = set(self._extract_medical_terms(question))
-        answer_terms = set(self._extract_medical_terms(answer))
+        # Calculate term overlap for general matching (pair terms are pre-tokenized)
+        if len(query_terms) == 0:
+            return 0.0
+        
+        qa_terms = qa_item.medical_terms
         
         # Check for critical medical term matches
-        critical_matches = 0
-        for term in query_terms:
-            if term in question_terms or term in answer_terms:
-                critical_matches += 1
-            
-            # Check synonyms
-            for expanded_query in expanded_terms:
-                expanded_terms_set = set(self._extract_medical_terms(expanded_query))
-                if expanded_terms_set & (question_terms | answer_terms):
-                    critical_matches += 1
-                    break
+        critical_matches = sum(1 for term in query_terms if term in qa_terms)
         
-        if len(query_terms) == 0:
-            return 0.0
+        # Each query term earns a synonym credit when any expansion hits the pair
+        if any(expanded & qa_terms for expanded in expanded_term_sets):
+            critical_matches += len(query_terms)
         
         base_confidence = critical_matches / len(query_terms)
         
@@ -289,17 +211,7 @@ class GroundTruthValidator:
     
     def _extract_medical_terms(self, text: str) -> List[str]:
         """Extract meaningful medical terms from text."""
-        # Remove common stop words but keep medical terms
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'what', 'how', 'when', 'where', 'who', 'why'}
-        
-        # Extract alphanumeric terms
-        terms = re.findall(r'\b[a-zA-Z][a-zA-Z0-9]*\b', text.lower())
-        
-        # Filter meaningful terms (length > 2 and not stop words)
-        meaningful_terms = [term for term in terms 
-                          if len(term) > 2 and term not in stop_words]
-        
-        return meaningful_terms
+        return extract_medical_terms(text)
     
     def get_ground_truth_response(self, query: str) -> Optional[Dict[str, Any]]:
         """
@@ -378,10 +290,12 @@ class GroundTruthValidator:
 _ground_truth_validator = None
 
 def get_ground_truth_validator() -> GroundTruthValidator:
-    """Get singleton ground truth validator instance."""
+    """Get singleton ground truth validator bound to the current shared store."""
     global _ground_truth_validator
-    if _ground_truth_validator is None:
-        _ground_truth_validator = GroundTruthValidator()
+    store = get_ground_truth_store()
+    if _ground_truth_validator is None or _ground_truth_validator.store is not store:
+        # Rebind after a knowledge base reload swapped in a new store
+        _ground_truth_validator = GroundTruthValidator(store=store)
     return _ground_truth_validator
 
 def validate_medical_query(query: str) -> Optional[Dict[str, Any]]:
@@ -5,12 +5,13 @@ import json
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, Union
 
 from src.config.settings import Settings
 from src.models.query_types import QueryType
+from src.observability.metrics import metrics as prometheus_metrics
 from src.pipeline.rag_retriever import RAGRetriever
-from src.search.elasticsearch_client import ElasticsearchClient
+from src.search.elasticsearch_client import AsyncElasticsearchClient, ElasticsearchClient
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,15 @@ class RetrievalResult:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class BranchOutcome:
+    """How one search branch of a hybrid query ended."""
+    results: List[RetrievalResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    timed_out: bool = False
+    error: Optional[BaseException] = None
+
+
 @dataclass
 class RetrievalMetrics:
     """Performance metrics for retrieval operations."""
@@ -34,6 +44,8 @@ class RetrievalMetrics:
     semantic_only_requests: int = 0
     keyword_failures: int = 0
     semantic_failures: int = 0
+    keyword_timeouts: int = 0
+    semantic_timeouts: int = 0
     total_latency_seconds: float = 0.0
     keyword_latency_seconds: float = 0.0
     semantic_latency_seconds: float = 0.0
@@ -43,8 +55,9 @@ class RetrievalMetrics:
     query_type_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     
     def record_request(self, query_type: QueryType, is_hybrid: bool, total_time: float, 
-                      keyword_time: float = 0, semantic_time: float = 0, fusion_time: float = 0):
-        """Record a retrieval request with timing."""
+                      keyword_time: float = 0, semantic_time: float = 0, fusion_time: float = 0,
+                      keyword_timed_out: bool = False, semantic_timed_out: bool = False):
+        """Record a retrieval request with timing and which branch deadlines fired."""
         self.total_requests += 1
         self.total_latency_seconds += total_time
         
@@ -63,15 +76,34 @@ class RetrievalMetrics:
             self.query_type_stats[qt_key] = {
                 "count": 0,
                 "total_time": 0.0,
-                "avg_time": 0.0
+                "avg_time": 0.0,
+                "hybrid_count": 0,
+                "keyword_time": 0.0,
+                "semantic_time": 0.0,
+                "avg_keyword_time": 0.0,
+                "avg_semantic_time": 0.0,
+                "keyword_deadline_exceeded": 0,
+                "semantic_deadline_exceeded": 0
             }
             
-        self.query_type_stats[qt_key]["count"] += 1
-        self.query_type_stats[qt_key]["total_time"] += total_time
-        self.query_type_stats[qt_key]["avg_time"] = (
-            self.query_type_stats[qt_key]["total_time"] / 
-            self.query_type_stats[qt_key]["count"]
-        )
+        qt_stats = self.query_type_stats[qt_key]
+        qt_stats["count"] += 1
+        qt_stats["total_time"] += total_time
+        qt_stats["avg_time"] = qt_stats["total_time"] / qt_stats["count"]
+        
+        # Branch latency and deadline counts, over hybrid requests
+        if is_hybrid:
+            qt_stats["hybrid_count"] += 1
+            qt_stats["keyword_time"] += keyword_time
+            qt_stats["semantic_time"] += semantic_time
+            qt_stats["avg_keyword_time"] = qt_stats["keyword_time"] / qt_stats["hybrid_count"]
+            qt_stats["avg_semantic_time"] = qt_stats["semantic_time"] / qt_stats["hybrid_count"]
+        if keyword_timed_out:
+            self.keyword_timeouts += 1
+            qt_stats["keyword_deadline_exceeded"] += 1
+        if semantic_timed_out:
+            self.semantic_timeouts += 1
+            qt_stats["semantic_deadline_exceeded"] += 1
     
     def record_failure(self, failure_type: str):
         """Record a search failure."""
@@ -91,6 +123,8 @@ class RetrievalMetrics:
             "semantic_only_requests": self.semantic_only_requests,
             "keyword_failures": self.keyword_failures,
             "semantic_failures": self.semantic_failures,
+            "keyword_timeouts": self.keyword_timeouts,
+            "semantic_timeouts": self.semantic_timeouts,
             "avg_total_latency_ms": (self.total_latency_seconds / self.total_requests) * 1000,
             "avg_keyword_latency_ms": (self.keyword_latency_seconds / max(1, self.hybrid_requests)) * 1000,
             "avg_semantic_latency_ms": (self.semantic_latency_seconds / self.total_requests) * 1000,
@@ -105,6 +139,9 @@ class RetrievalMetrics:
 class HybridRetriever:
     """Combines keyword and semantic search with query-aware fusion."""
     
+    FUSION_RRF = "rrf"
+    FUSION_WEIGHTED = "weighted"
+    
     # Query-type specific weights (keyword_weight, semantic_weight)
     FUSION_WEIGHTS = {
         QueryType.FORM_RETRIEVAL: (0.8, 0.2),      # Heavy keyword bias
@@ -118,14 +155,15 @@ class HybridRetriever:
     def __init__(
         self,
         rag_retriever: RAGRetriever,
-        es_client: Optional[ElasticsearchClient],
+        es_client: Optional[Union[AsyncElasticsearchClient, ElasticsearchClient]],
         settings: Settings
     ):
         """Initialize hybrid retriever.
         
         Args:
             rag_retriever: The existing RAG retriever for semantic search
-            es_client: Elasticsearch client for keyword search
+            es_client: Elasticsearch client for keyword search; the shared async
+                client also matches documents and registry entries via msearch
             settings: Application settings
         """
         self.rag_retriever = rag_retriever
@@ -143,7 +181,18 @@ class HybridRetriever:
             except json.JSONDecodeError as e:
                 logger.warning(f"Invalid fusion weights JSON: {e}")
         
-        logger.info(f"HybridRetriever initialized, hybrid_enabled: {self.hybrid_enabled}")
+        # Fusion mode and per-branch deadlines (settings may predate these fields)
+        self.fusion_mode = getattr(settings, 'hybrid_fusion_mode', self.FUSION_RRF)
+        self.rrf_k = getattr(settings, 'hybrid_rrf_k', 60)
+        self.branch_deadlines = {
+            "keyword": getattr(settings, 'hybrid_keyword_deadline_ms', 750) / 1000,
+            "semantic": getattr(settings, 'hybrid_semantic_deadline_ms', 1500) / 1000,
+        }
+        
+        logger.info(
+            f"HybridRetriever initialized, hybrid_enabled: {self.hybrid_enabled}, "
+            f"fusion: {self.fusion_mode}, deadlines: {self.branch_deadlines}"
+        )
         
     async def retrieve(
         self,
@@ -173,7 +222,7 @@ class HybridRetriever:
             if not self.hybrid_enabled:
                 logger.info("Hybrid search disabled, falling back to semantic-only")
                 semantic_start = time.time()
-                results = await self._semantic_only(query, top_k, filters)
+                results = await self._semantic_only(query, top_k, filters, query_type)
                 semantic_time = time.time() - semantic_start
                 
                 # Record metrics for semantic-only
@@ -182,60 +231,47 @@ class HybridRetriever:
                                           semantic_time=semantic_time)
                 return results
                 
-            # Run both searches in parallel
+            # Run both searches in parallel, each against its own deadline
             logger.info(f"Running hybrid search for query_type: {query_type.value}")
-            
-            # Time the parallel searches
-            time.time()
-            keyword_task = asyncio.create_task(
-                self._timed_keyword_search(query, query_type, top_k * 2, filters)
-            )
-            semantic_task = asyncio.create_task(
-                self._timed_semantic_search(query, top_k * 2, filters)
+            keyword, semantic = await asyncio.gather(
+                self._run_branch(
+                    "keyword", self._keyword_search(query, query_type, top_k * 2, filters)
+                ),
+                self._run_branch(
+                    "semantic", self._semantic_search(query, top_k * 2, filters, query_type)
+                )
             )
+            self._track_branches(query_type, keyword, semantic)
             
-            # Wait for both with timeout
-            try:
-                (keyword_results, kw_time), (semantic_results, sem_time) = await asyncio.gather(
-                    keyword_task,
-                    semantic_task,
-                    return_exceptions=True
-                )
-                keyword_time = kw_time if not isinstance(keyword_results, Exception) else 0
-                semantic_time = sem_time if not isinstance(semantic_results, Exception) else 0
-            except Exception as e:
-                logger.error(f"Hybrid search failed: {e}")
-                semantic_start = time.time()
-                results = await self._semantic_only(query, top_k, filters)
-                semantic_time = time.time() - semantic_start
-                
-                total_time = time.time() - start_time
-                self.metrics.record_request(query_type, False, total_time, 
-                                          semantic_time=semantic_time)
-                return results
-                
             # Handle partial failures
-            if isinstance(keyword_results, Exception):
-                logger.warning(f"Keyword search failed: {keyword_results}")
+            if keyword.error is not None:
+                logger.warning(f"Keyword search failed: {keyword.error}")
                 self.metrics.record_failure("keyword")
-                keyword_results = []
-                keyword_time = 0
-            if isinstance(semantic_results, Exception):
-                logger.warning(f"Semantic search failed: {semantic_results}")
+            if semantic.error is not None:
+                logger.warning(f"Semantic search failed: {semantic.error}")
                 self.metrics.record_failure("semantic")
-                semantic_results = []
-                semantic_time = 0
+            keyword_results, semantic_results = keyword.results, semantic.results
+            keyword_time = keyword.elapsed if keyword.error is None else 0
+            semantic_time = semantic.elapsed if semantic.error is None else 0
                 
-            # If both failed, try semantic fallback
+            # If both failed, try semantic fallback (unless semantic already ran out of time)
             if not keyword_results and not semantic_results:
+                if semantic.timed_out:
+                    logger.warning("Semantic search missed its deadline and keyword search found nothing")
+                    total_time = time.time() - start_time
+                    self.metrics.record_request(query_type, True, total_time, keyword_time, semantic_time,
+                                                keyword_timed_out=keyword.timed_out, semantic_timed_out=True)
+                    return []
+                    
                 logger.warning("Both search methods failed, trying semantic fallback")
                 semantic_start = time.time()
-                results = await self._semantic_only(query, top_k, filters)
+                results = await self._semantic_only(query, top_k, filters, query_type)
                 semantic_time = time.time() - semantic_start
                 
                 total_time = time.time() - start_time
                 self.metrics.record_request(query_type, False, total_time, 
-                                          semantic_time=semantic_time)
+                                          semantic_time=semantic_time,
+                                          keyword_timed_out=keyword.timed_out)
                 return results
                 
             # Fuse results
@@ -248,12 +284,24 @@ class HybridRetriever:
             )
             fusion_time = time.time() - fusion_start
             
+            # Mark results missing a branch that ran out of time
+            timed_out = [name for name, branch in (("keyword", keyword), ("semantic", semantic)) if branch.timed_out]
+            if timed_out:
+                partial = {
+                    "timed_out": timed_out,
+                    "deadline_ms": {name: int(self.branch_deadlines[name] * 1000) for name in timed_out}
+                }
+                for result in fused_results:
+                    result.metadata["partial_results"] = partial
+            
             logger.info(f"Hybrid search returned {len(fused_results)} results")
             
             # Record successful hybrid request metrics
             total_time = time.time() - start_time
             self.metrics.record_request(query_type, True, total_time, 
-                                      keyword_time, semantic_time, fusion_time)
+                                      keyword_time, semantic_time, fusion_time,
+                                      keyword_timed_out=keyword.timed_out,
+                                      semantic_timed_out=semantic.timed_out)
             
             return fused_results
             
@@ -261,7 +309,7 @@ class HybridRetriever:
             logger.error(f"Hybrid retrieval failed unexpectedly: {e}")
             # Try semantic fallback as last resort
             semantic_start = time.time()
-            results = await self._semantic_only(query, top_k, filters)
+            results = await self._semantic_only(query, top_k, filters, query_type)
             semantic_time = time.time() - semantic_start
             
             total_time = time.time() - start_time
@@ -280,32 +328,38 @@ class HybridRetriever:
         if not self.es_client or not self.es_client.is_available():
             return []
             
-        es = self.es_client.get_client()
-        if not es:
-            return []
-            
         # Build ES query based on query type
         es_query = self._build_es_query(query, query_type, filters)
         
         try:
-            response = await asyncio.to_thread(
-                es.search,
-                index=f"{self.settings.elasticsearch_index_prefix}_chunks",
-                body=es_query,
-                size=top_k
-            )
+            if isinstance(self.es_client, AsyncElasticsearchClient):
+                hits, document_scores = await self._msearch_chunks(query, es_query, top_k)
+            else:
+                es = self.es_client.get_client()
+                if not es:
+                    return []
+                response = await asyncio.to_thread(
+                    es.search,
+                    index=f"{self.settings.elasticsearch_index_prefix}_chunks",
+                    body=es_query,
+                    size=top_k
+                )
+                hits, document_scores = response["hits"]["hits"], {}
             
             results = []
-            for hit in response["hits"]["hits"]:
+            for hit in hits:
                 source_data = hit["_source"]
+                # Chunks of documents whose title/name/registry entry matched rank up to 2x higher
+                document_boost = 1.0 + document_scores.get(source_data["document_id"], 0.0)
                 results.append(RetrievalResult(
                     chunk_id=source_data["id"],
                     document_id=source_data["document_id"],
                     content=source_data["content"],
-                    score=hit["_score"],
+                    score=hit["_score"] * document_boost,
                     source="keyword",
                     metadata=source_data.get("metadata", {})
                 ))
+            results.sort(key=lambda r: r.score, reverse=True)
                 
             logger.info(f"Keyword search returned {len(results)} results")
             return results
@@ -314,23 +368,68 @@ class HybridRetriever:
             logger.error(f"ES search failed: {e}")
             return []
             
+    async def _msearch_chunks(
+        self,
+        query: str,
+        es_query: Dict[str, Any],
+        top_k: int
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """Chunk hits plus per-document match scores from one msearch round trip.
+        
+        The document-level fields the query-type queries target (title,
+        protocol_name, form_name, filename) live on the documents index, and
+        display names/keywords on the registry, so both are searched alongside
+        the chunks. Document scores are normalized to 0..1 by the best match.
+        """
+        registry_query = {
+            "query": {
+                "multi_match": {"query": query, "fields": ["display_name^2", "keywords"]}
+            }
+        }
+        chunks, documents, registry = await self.es_client.msearch([
+            (self.es_client.index_name("chunks"), {**es_query, "size": top_k}),
+            (self.es_client.index_name("documents"), {**es_query, "size": top_k, "_source": ["id"]}),
+            (self.es_client.index_name("registry"), {**registry_query, "size": top_k, "_source": ["document_id"]}),
+        ])
+        
+        document_scores: Dict[str, float] = {}
+        for response, id_field in ((documents, "id"), (registry, "document_id")):
+            hits = response["hits"]["hits"]
+            best = max((hit["_score"] or 0.0 for hit in hits), default=0.0)
+            for hit in hits:
+                if not best:
+                    break
+                document_id = hit["_source"][id_field]
+                score = (hit["_score"] or 0.0) / best
+                document_scores[document_id] = max(document_scores.get(document_id, 0.0), score)
+                
+        return chunks["hits"]["hits"], document_scores
+            
     async def _semantic_search(
         self,
         query: str,
         top_k: int,
-        filters: Optional[Dict]
+        filters: Optional[Dict],
+        query_type: Optional[QueryType] = None,
+        fallback_to_text: bool = False
     ) -> List[RetrievalResult]:
-        """Pgvector semantic search using existing RAG retriever."""
+        """Pgvector semantic search using existing RAG retriever.
+        
+        Runs on the async engine, so it overlaps the keyword branch instead of
+        blocking the event loop. The text search fallback is only wanted when
+        there is no keyword branch to cover for an empty vector result.
+        """
         try:
             # Determine content type filter from filters
             content_type = filters.get("content_type") if filters else None
             
-            # Use the existing semantic search method (synchronous)
-            search_results = self.rag_retriever.semantic_search(
+            search_results = await self.rag_retriever.semantic_search_async(
                 query=query,
                 k=top_k,
                 content_type=content_type,
-                threshold=0.6  # Use lower threshold for broader results
+                threshold=0.6,  # Use lower threshold for broader results
+                query_type=query_type,
+                fallback_to_text=fallback_to_text
             )
             
             results = []
@@ -351,48 +450,38 @@ class HybridRetriever:
             logger.error(f"Semantic search failed: {e}")
             return []
     
-    async def _timed_keyword_search(
-        self,
-        query: str,
-        query_type: QueryType,
-        top_k: int,
-        filters: Optional[Dict]
-    ) -> Tuple[List[RetrievalResult], float]:
-        """Keyword search with timing."""
+    async def _run_branch(self, name: str, search: Awaitable[List[RetrievalResult]]) -> BranchOutcome:
+        """Await one search branch until its deadline.
+        
+        A branch past its deadline is cancelled and returns no results, so a
+        slow backend costs the query at most that branch's deadline.
+        """
+        deadline = self.branch_deadlines[name]
         start_time = time.time()
         try:
-            results = await self._keyword_search(query, query_type, top_k, filters)
-            elapsed = time.time() - start_time
-            return results, elapsed
+            results = await asyncio.wait_for(search, timeout=deadline)
+            return BranchOutcome(results=results, elapsed=time.time() - start_time)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name.capitalize()} search missed its {deadline * 1000:.0f}ms deadline")
+            return BranchOutcome(elapsed=time.time() - start_time, timed_out=True)
         except Exception as e:
-            elapsed = time.time() - start_time
-            return e, elapsed
+            return BranchOutcome(elapsed=time.time() - start_time, error=e)
     
-    async def _timed_semantic_search(
-        self,
-        query: str,
-        top_k: int,
-        filters: Optional[Dict]
-    ) -> Tuple[List[RetrievalResult], float]:
-        """Semantic search with timing."""
-        start_time = time.time()
-        try:
-            results = await self._semantic_search(query, top_k, filters)
-            elapsed = time.time() - start_time
-            return results, elapsed
-        except Exception as e:
-            elapsed = time.time() - start_time
-            return e, elapsed
+    def _track_branches(self, query_type: QueryType, keyword: BranchOutcome, semantic: BranchOutcome):
+        """Export branch latency and deadline misses per query type."""
+        for name, branch in (("keyword", keyword), ("semantic", semantic)):
+            prometheus_metrics.track_hybrid_branch(query_type.value, name, branch.elapsed, branch.timed_out)
         
     async def _semantic_only(
         self,
         query: str,
         top_k: int,
-        filters: Optional[Dict]
+        filters: Optional[Dict],
+        query_type: Optional[QueryType] = None
     ) -> List[RetrievalResult]:
         """Fallback to semantic-only search."""
         logger.info("Using semantic-only fallback")
-        return await self._semantic_search(query, top_k, filters)
+        return await self._semantic_search(query, top_k, filters, query_type, fallback_to_text=True)
         
     def _build_es_query(
         self,
@@ -461,7 +550,12 @@ class HybridRetriever:
         query_type: QueryType,
         top_k: int
     ) -> List[RetrievalResult]:
-        """Fuse keyword and semantic results with query-aware weights."""
+        """Fuse keyword and semantic results with query-aware weights.
+        
+        In RRF mode each result contributes weight / (rrf_k + rank) for its rank
+        within its branch, so BM25 and cosine scales never need reconciling. In
+        weighted mode scores are min-max normalized per branch and weighted.
+        """
         
         # Get fusion weights for this query type
         kw_weight, sem_weight = self.FUSION_WEIGHTS.get(
@@ -469,11 +563,17 @@ class HybridRetriever:
             (0.5, 0.5)  # Default balanced
         )
         
-        logger.info(f"Using fusion weights for {query_type.value}: keyword={kw_weight}, semantic={sem_weight}")
+        logger.info(
+            f"Using {self.fusion_mode} fusion for {query_type.value}: keyword={kw_weight}, semantic={sem_weight}"
+        )
         
-        # Normalize scores within each result set
-        keyword_results = self._normalize_scores(keyword_results)
-        semantic_results = self._normalize_scores(semantic_results)
+        if self.fusion_mode == self.FUSION_RRF:
+            keyword_results = self._rrf_scores(keyword_results)
+            semantic_results = self._rrf_scores(semantic_results)
+        else:
+            # Normalize scores within each result set
+            keyword_results = self._normalize_scores(keyword_results)
+            semantic_results = self._normalize_scores(semantic_results)
         
         # Create unified score map
         chunk_scores = {}
@@ -519,6 +619,13 @@ class HybridRetriever:
             
         return results
         
+    def _rrf_scores(self, results: List[RetrievalResult]) -> List[RetrievalResult]:
+        """Replace scores with reciprocal ranks 1 / (rrf_k + rank), best score ranked 1."""
+        ranked = sorted(results, key=lambda r: r.score, reverse=True)
+        for rank, r in enumerate(ranked, start=1):
+            r.score = 1.0 / (self.rrf_k + rank)
+        return ranked
+        
     def _normalize_scores(self, results: List[RetrievalResult]) -> List[RetrievalResult]:
         """Normalize scores to 0-1 range using min-max normalization."""
         if not results:
@@ -544,10 +651,14 @@ class HybridRetriever:
         stats = {
             "hybrid_enabled": self.hybrid_enabled,
             "elasticsearch_available": self.es_client.is_available() if self.es_client else False,
+            "fusion_mode": self.fusion_mode,
             "fusion_weights": {
                 qt.value if hasattr(qt, 'value') else str(qt): weights 
                 for qt, weights in self.FUSION_WEIGHTS.items()
             },
+            "branch_deadlines_ms": {
+                name: int(deadline * 1000) for name, deadline in self.branch_deadlines.items()
+            },
             "performance_metrics": self.metrics.get_summary()
         }
         
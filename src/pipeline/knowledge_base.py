@@ -0,0 +1,201 @@
+"""
+Process-wide knowledge base for the query pipeline.
+
+Loads the static medical knowledge that every request needs (ground-truth QA
+index and parsed ground truth store, abbreviation and synonym maps, form
+catalog, curated responses) once per worker and hands request handlers an
+immutable snapshot. When the source files change on disk a fresh snapshot is
+built off to the side and swapped in with a single reference assignment, so
+in-flight requests keep the snapshot they started with.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Mapping, Optional
+
+from .curated_responses import CuratedMedicalDatabase
+from .form_retriever import FormRetriever
+from .ground_truth_store import GroundTruthStore
+from .medical_abbreviation_expander import MedicalAbbreviationExpander
+from .medical_synonym_expander import MedicalSynonymExpander
+from .qa_index import QAIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QA_DIR = "ground_truth_qa"
+DEFAULT_SYNONYMS_FILE = Path(__file__).parent.parent / "data" / "medical_synonyms.json"
+
+
+@dataclass(frozen=True)
+class KnowledgeBaseSnapshot:
+    """Immutable view of the knowledge sources at one point in time."""
+
+    version: str
+    loaded_at: float
+    qa_index: QAIndex
+    ground_truth: GroundTruthStore
+    abbreviation_expander: MedicalAbbreviationExpander
+    synonym_expander: MedicalSynonymExpander
+    form_retriever: FormRetriever
+    curated: CuratedMedicalDatabase
+
+    @property
+    def abbreviation_map(self) -> Mapping[str, List[str]]:
+        return self.abbreviation_expander.abbreviation_map
+
+    @property
+    def synonyms(self) -> Mapping[str, dict]:
+        return self.synonym_expander.synonyms
+
+
+class KnowledgeBase:
+    """Holds the current snapshot and rebuilds it when source files change."""
+
+    def __init__(self, qa_dir: Optional[str] = None, reload_interval: float = 30.0):
+        self.qa_dir = qa_dir or DEFAULT_QA_DIR
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[KnowledgeBaseSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> KnowledgeBaseSnapshot:
+        """Current snapshot, loading it on first access."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.load()
+        return snapshot
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    def load(self) -> KnowledgeBaseSnapshot:
+        """Build a snapshot from disk and make it current."""
+        with self._build_lock:
+            snapshot = self._build(self._fingerprint())
+            self._snapshot = snapshot
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild the snapshot if any source file changed. Returns True on swap."""
+        fingerprint = self._fingerprint()
+        current = self._snapshot
+        if current is not None and current.version == fingerprint:
+            return False
+
+        with self._build_lock:
+            # Another caller may have rebuilt while we waited for the lock
+            current = self._snapshot
+            if current is not None and current.version == fingerprint:
+                return False
+            try:
+                snapshot = self._build(fingerprint)
+            except Exception as e:
+                logger.error(f"Knowledge base reload failed, keeping previous snapshot: {e}")
+                return False
+            self._snapshot = snapshot
+
+        logger.info(f"Knowledge base reloaded (version {fingerprint[:12]})")
+        return True
+
+    async def watch(self) -> None:
+        """Poll source files and swap in a new snapshot when they change."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                logger.error(f"Knowledge base watcher error: {e}")
+
+    def start_watching(self) -> None:
+        if self.reload_interval > 0 and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self.watch())
+
+    async def stop_watching(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def _source_files(self) -> Iterable[Path]:
+        base = Path(self.qa_dir)
+        if base.exists():
+            for root, _, files in os.walk(base):
+                for fname in sorted(files):
+                    if fname.endswith(".json"):
+                        yield Path(root) / fname
+
+        abbreviations_file = MedicalAbbreviationExpander._find_abbreviations_file()
+        if abbreviations_file:
+            yield Path(abbreviations_file)
+        yield DEFAULT_SYNONYMS_FILE
+
+    def _fingerprint(self) -> str:
+        """Digest of path, size and mtime for every knowledge source file."""
+        digest = hashlib.sha1()
+        for path in sorted(self._source_files()):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def _build(self, version: str) -> KnowledgeBaseSnapshot:
+        start = time.time()
+
+        qa_index = QAIndex.load(self.qa_dir)
+        ground_truth = GroundTruthStore.load(self.qa_dir)
+        abbreviation_expander = MedicalAbbreviationExpander()
+        synonym_expander = MedicalSynonymExpander()
+        form_retriever = FormRetriever()
+
+        snapshot = KnowledgeBaseSnapshot(
+            version=version,
+            loaded_at=time.time(),
+            qa_index=qa_index,
+            ground_truth=ground_truth,
+            abbreviation_expander=abbreviation_expander,
+            synonym_expander=synonym_expander,
+            form_retriever=form_retriever,
+            curated=CuratedMedicalDatabase(),
+        )
+
+        logger.info(
+            f"Knowledge base loaded: {len(qa_index.entries)} QA entries, "
+            f"{len(ground_truth.pairs)} ground truth pairs, "
+            f"{len(abbreviation_expander.abbreviation_map)} abbreviations, "
+            f"{len(form_retriever.form_mappings)} form mappings in {time.time() - start:.2f}s"
+        )
+        return snapshot
+
+
+# Process-wide knowledge base
+_knowledge_base: Optional[KnowledgeBase] = None
+
+
+def init_knowledge_base(qa_dir: Optional[str] = None, reload_interval: float = 30.0) -> KnowledgeBase:
+    """Create and load the process-wide knowledge base."""
+    global _knowledge_base
+    knowledge_base = KnowledgeBase(qa_dir=qa_dir, reload_interval=reload_interval)
+    knowledge_base.load()
+    _knowledge_base = knowledge_base
+    return knowledge_base
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Get the process-wide knowledge base, loading it lazily outside the API."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        init_knowledge_base()
+    return _knowledge_base
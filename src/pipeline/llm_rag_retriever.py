@@ -4,18 +4,33 @@ Uses LLM API calls to process queries against ground truth data and PDF document
 """
 
 import asyncio
-import json
 import logging
-import os
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-import re
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional, Tuple
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from ..ai.llm_client import stream_completion
+from ..models.retrieval_repository import RetrievalRepository
+from .ground_truth_store import (
+    GroundTruthStore,
+    extract_key_terms,
+    extract_qa_pairs,
+    get_ground_truth_store,
+)
+from .text_search import build_chunk_text_search
+
 logger = logging.getLogger(__name__)
 
+# Medical-optimized generation parameters
+LLM_PARAMS = {
+    'max_tokens': 1500,  # Sufficient for detailed medical responses
+    'temperature': 0.1,  # Low temperature for factual accuracy
+    'top_p': 0.9,
+}
+
 @dataclass
 class LLMResponse:
     content: str
@@ -33,14 +48,20 @@ class GroundTruthMatch:
 class LLMRAGRetriever:
     """LLM-based RAG retrieval system with ground truth validation."""
     
-    def __init__(self, db: Session, llm_client, ground_truth_path: str = None, docs_path: str = None):
+    def __init__(self, db: Session, llm_client, ground_truth_path: str = None, docs_path: str = None,
+                 store: Optional[GroundTruthStore] = None, repository: Optional[RetrievalRepository] = None):
         self.db = db
         self.llm_client = llm_client
-        self.ground_truth_path = ground_truth_path or self._find_ground_truth_path()
+        # Async engine for callers on the server loop; without it the sync session runs in a thread
+        self.repository = repository
         self.docs_path = docs_path or self._find_docs_path()
         
-        # Load ground truth data
-        self.ground_truth_data = self._load_ground_truth_data()
+        # Share the process-wide parsed ground truth unless a specific path is requested
+        if store is None:
+            store = GroundTruthStore.load(ground_truth_path) if ground_truth_path else get_ground_truth_store()
+        self.store = store
+        self.ground_truth_path = store.path
+        self.ground_truth_data = store.files
         
         # Medical query templates
         self.query_templates = {
@@ -108,16 +129,6 @@ Please provide comprehensive, accurate medical information with proper citations
 Response:"""
         }
     
-    def _find_ground_truth_path(self) -> str:
-        """Find ground truth directory."""
-        current_dir = Path(__file__).parent
-        for _ in range(5):
-            ground_truth_dir = current_dir / "ground_truth_qa"
-            if ground_truth_dir.exists():
-                return str(ground_truth_dir)
-            current_dir = current_dir.parent
-        return "/Users/nimayh/Desktop/NH/V8/edbot-v8-fix-prp-44-comprehensive-code-quality/ground_truth_qa"
-    
     def _find_docs_path(self) -> str:
         """Find docs directory."""
         current_dir = Path(__file__).parent
@@ -128,39 +139,6 @@ Response:"""
             current_dir = current_dir.parent
         return "/Users/nimayh/Desktop/NH/V8/edbot-v8-fix-prp-44-comprehensive-code-quality/docs"
     
-    def _load_ground_truth_data(self) -> Dict[str, Any]:
-        """Load all ground truth data for validation."""
-        ground_truth_data = {}
-        
-        if not os.path.exists(self.ground_truth_path):
-            logger.warning(f"Ground truth path not found: {self.ground_truth_path}")
-            return ground_truth_data
-        
-        logger.info(f"🔍 Loading ground truth data from: {self.ground_truth_path}")
-        
-        for category in ['protocols', 'guidelines', 'reference']:
-            category_path = Path(self.ground_truth_path) / category
-            if not category_path.exists():
-                continue
-                
-            ground_truth_data[category] = {}
-            
-            for json_file in category_path.glob("*.json"):
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    file_key = json_file.stem
-                    ground_truth_data[category][file_key] = data
-                    
-                except Exception as e:
-                    logger.error(f"Failed to load {json_file}: {e}")
-        
-        total_files = sum(len(cat) for cat in ground_truth_data.values())
-        logger.info(f"✅ Loaded {total_files} ground truth files")
-        
-        return ground_truth_data
-    
     async def get_llm_response(self, query: str) -> Dict[str, Any]:
         """
         Get comprehensive LLM-based response using RAG with ground truth validation.
@@ -171,27 +149,12 @@ Response:"""
         debug_metrics = {
             'query': query,
             'query_length': len(query),
-            'timestamp': import_module('datetime').datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat()
         }
         
         try:
-            # Step 1: Find relevant ground truth data
-            ground_truth_matches = self._find_ground_truth_matches(query)
-            
-            # Step 2: Retrieve relevant document content from database
-            doc_content = await self._retrieve_document_content(query)
-            debug_metrics['doc_content_count'] = len(doc_content)
-            logger.info(f"📄 Retrieved {len(doc_content)} documents")
-            
-            # Step 3: Determine query type for appropriate template
-            query_type = self._classify_query_type(query)
-            debug_metrics['query_type'] = query_type
-            logger.info(f"🏷️ Query classified as: {query_type}")
-            
-            # Step 4: Build LLM prompt with ground truth validation
-            prompt = self._build_llm_prompt(query, query_type, doc_content, ground_truth_matches)
-            debug_metrics['prompt_length'] = len(prompt)
-            logger.info(f"📝 Built prompt: {len(prompt)} characters")
+            # Steps 1-4: Ground truth, document content and prompt
+            ground_truth_matches, doc_content, prompt = await self._prepare_prompt(query, debug_metrics)
             
             # Step 5: Call LLM API
             llm_response = await self._call_llm_api(prompt)
@@ -218,6 +181,66 @@ Response:"""
             logger.error(f"🔍 Debug context: {debug_metrics}")
             return self._get_error_response(query, str(e))
     
+    async def stream_llm_response(self, query: str,
+                                  min_confidence: float = 0.0) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream the LLM RAG response as (event, data) pairs.
+        
+        Emits "sources" as soon as retrieval finishes, then one "token" per
+        generated chunk, then "done" with the confidence of the full answer.
+        Errors before the first token propagate so the caller can fall back.
+        Emits nothing when no answer could reach min_confidence (no ground
+        truth to validate against), so nothing is generated only to be rejected.
+        """
+        logger.info(f"🤖 Streaming LLM RAG query: {query}")
+        debug_metrics = {'query': query, 'query_length': len(query)}
+        
+        ground_truth_matches, doc_content, prompt = await self._prepare_prompt(query, debug_metrics)
+        if self._max_confidence(ground_truth_matches) <= min_confidence:
+            logger.info("⏭️ No ground truth to validate against, skipping LLM generation")
+            return
+        yield "sources", {
+            'sources': self._collect_sources(ground_truth_matches, doc_content),
+            'query_type': self._map_to_api_query_type(query),
+        }
+        
+        tokens = []
+        async for token in stream_completion(self.llm_client, prompt, **LLM_PARAMS):
+            tokens.append(token)
+            yield "token", {'text': token}
+        
+        llm_response = "".join(tokens).strip()
+        validation_score = self._validate_response_quality(llm_response, ground_truth_matches)
+        logger.info(f"🏁 LLM RAG stream complete: {len(llm_response)} characters, validation {validation_score:.2%}")
+        yield "done", {
+            'confidence': self._confidence(validation_score),
+            'has_real_content': bool(llm_response),
+            'validation_score': validation_score,
+        }
+    
+    async def _prepare_prompt(self, query: str, debug_metrics: Dict[str, Any]
+                              ) -> Tuple[List[GroundTruthMatch], List[Dict[str, str]], str]:
+        """Find ground truth matches, retrieve document content and build the LLM prompt."""
+        # Step 1: Find relevant ground truth data
+        ground_truth_matches = self._find_ground_truth_matches(query)
+        
+        # Step 2: Retrieve relevant document content from database
+        doc_content = await self._retrieve_document_content(query)
+        debug_metrics['doc_content_count'] = len(doc_content)
+        logger.info(f"📄 Retrieved {len(doc_content)} documents")
+        
+        # Step 3: Determine query type for appropriate template
+        query_type = self._classify_query_type(query)
+        debug_metrics['query_type'] = query_type
+        logger.info(f"🏷️ Query classified as: {query_type}")
+        
+        # Step 4: Build LLM prompt with ground truth validation
+        prompt = self._build_llm_prompt(query, query_type, doc_content, ground_truth_matches)
+        debug_metrics['prompt_length'] = len(prompt)
+        logger.info(f"📝 Built prompt: {len(prompt)} characters")
+        
+        return ground_truth_matches, doc_content, prompt
+    
     def _find_ground_truth_matches(self, query: str) -> List[GroundTruthMatch]:
         """Find matching ground truth data for validation."""
         matches = []
@@ -226,24 +249,20 @@ Response:"""
         # Key terms extraction
         key_terms = self._extract_key_terms(query_lower)
         
-        for category, files_data in self.ground_truth_data.items():
-            for file_key, file_data in files_data.items():
-                qa_pairs = self._extract_qa_pairs(file_data)
-                
-                for qa_item in qa_pairs:
-                    question = qa_item.get('question', '').lower()
-                    answer = qa_item.get('answer', '').lower()
-                    
-                    # Calculate match score
-                    match_score = self._calculate_semantic_match(query_lower, question, answer, key_terms)
-                    
-                    if match_score > 0.3:  # Minimum threshold
-                        matches.append(GroundTruthMatch(
-                            question=qa_item.get('question', ''),
-                            answer=qa_item.get('answer', ''),
-                            source_document=file_key,
-                            match_score=match_score
-                        ))
+        for qa_item in self.store.pairs:
+            # Calculate match score against the pre-tokenized pair
+            match_score = self._calculate_semantic_match(
+                query_lower, qa_item.question_lower, qa_item.answer_lower, key_terms,
+                combined_terms=qa_item.key_terms
+            )
+            
+            if match_score > 0.3:  # Minimum threshold
+                matches.append(GroundTruthMatch(
+                    question=qa_item.question,
+                    answer=qa_item.answer,
+                    source_document=qa_item.file_key,
+                    match_score=match_score
+                ))
         
         # Sort by match score and return top matches
         matches.sort(key=lambda x: x.match_score, reverse=True)
@@ -252,45 +271,16 @@ Response:"""
     async def _retrieve_document_content(self, query: str) -> List[Dict[str, str]]:
         """Retrieve relevant document content from database."""
         try:
-            # Extract search terms
-            search_terms = self._extract_key_terms(query)
-            
-            if not search_terms:
+            search = self._build_document_search(query)
+            if search is None:
                 return []
             
-            # Build database query
-            search_conditions = []
-            params = {}
-            
-            for i, term in enumerate(search_terms[:3]):  # Limit to 3 terms
-                param_name = f"term_{i}"
-                search_conditions.append(f"dc.chunk_text ILIKE :{param_name}")
-                params[param_name] = f"%{term}%"
-            
-            # Enhanced query with medical prioritization
-            search_query = f"""
-                SELECT 
-                    dc.chunk_text,
-                    d.filename,
-                    d.content_type,
-                    LENGTH(dc.chunk_text) as content_length,
-                    -- Medical relevance scoring
-                    (CASE 
-                        WHEN d.content_type IN ('protocol', 'guideline', 'criteria') THEN 100
-                        WHEN d.filename ILIKE '%STEMI%' OR d.filename ILIKE '%sepsis%' THEN 95
-                        WHEN d.filename ILIKE '%ICH%' OR d.filename ILIKE '%ICP%' THEN 95
-                        WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' THEN 80
-                        ELSE 50 
-                    END) as relevance_score
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                WHERE ({' OR '.join(search_conditions)})
-                AND LENGTH(dc.chunk_text) > 100
-                ORDER BY relevance_score DESC, content_length DESC
-                LIMIT 10
-            """
-            
-            results = self.db.execute(text(search_query), params).fetchall()
+            search_query, params = search
+            if self.repository is not None:
+                results = await self.repository.search_chunks(search_query, params)
+            else:
+                results = await asyncio.to_thread(
+                    lambda: self.db.execute(text(search_query), params).fetchall())
             
             doc_content = []
             for result in results:
@@ -309,6 +299,40 @@ Response:"""
             logger.error(f"Document content retrieval failed: {e}")
             return []
     
+    def _build_document_search(self, query: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Build the prioritized chunk search SQL and params, or None without search terms."""
+        # Extract search terms
+        search_terms = self._extract_key_terms(query)
+        
+        # Full-text match on the indexed search_vector (limit to 3 terms)
+        search = build_chunk_text_search(search_terms[:3]) if search_terms else None
+        if search is None:
+            return None
+        
+        # Enhanced query with medical prioritization
+        search_query = f"""
+            SELECT 
+                dc.chunk_text,
+                d.filename,
+                d.content_type,
+                LENGTH(dc.chunk_text) as content_length,
+                -- Medical relevance scoring
+                (CASE 
+                    WHEN d.content_type IN ('protocol', 'guideline', 'criteria') THEN 100
+                    WHEN d.filename ILIKE '%STEMI%' OR d.filename ILIKE '%sepsis%' THEN 95
+                    WHEN d.filename ILIKE '%ICH%' OR d.filename ILIKE '%ICP%' THEN 95
+                    WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' THEN 80
+                    ELSE 50 
+                END) as relevance_score
+            FROM document_chunks dc
+            JOIN documents d ON dc.document_id = d.id
+            WHERE {search.where_sql}
+            AND LENGTH(dc.chunk_text) > 100
+            ORDER BY relevance_score DESC, {search.rank_sql} DESC, content_length DESC
+            LIMIT 10
+        """
+        return search_query, search.params
+    
     def _classify_query_type(self, query: str) -> str:
         """Classify query type for appropriate template selection."""
         query_lower = query.lower()
@@ -384,10 +408,8 @@ LLAMA 3.1 13B MEDICAL RESPONSE INSTRUCTIONS:
             # Use the existing LLM client with medical-optimized settings
             response = await self.llm_client.generate_text(
                 prompt=prompt,
-                max_tokens=1500,  # Sufficient for detailed medical responses
-                temperature=0.1,  # Low temperature for factual accuracy
-                top_p=0.9,
-                stop_sequences=None
+                stop_sequences=None,
+                **LLM_PARAMS
             )
             
             return response.strip()
@@ -426,12 +448,44 @@ LLAMA 3.1 13B MEDICAL RESPONSE INSTRUCTIONS:
         
         return final_score
     
+    def _confidence(self, validation_score: float) -> float:
+        """Answer confidence for a validation score."""
+        return min(validation_score + 0.2, 0.95)  # Boost for LLM processing
+    
+    def _max_confidence(self, ground_truth_matches: List[GroundTruthMatch]) -> float:
+        """Highest confidence any answer can reach against these matches."""
+        if any(match.match_score > 0 for match in ground_truth_matches[:3]):
+            return self._confidence(1.0)
+        return self._confidence(0.5)  # _validate_response_quality without ground truth
+    
     def _format_llm_response(self, query: str, llm_response: str, validation_score: float,
                            ground_truth_matches: List[GroundTruthMatch], 
                            doc_content: List[Dict]) -> Dict[str, Any]:
         """Format LLM response for API return."""
         
-        # Extract sources
+        sources = self._collect_sources(ground_truth_matches, doc_content)
+        
+        # Determine confidence
+        confidence = self._confidence(validation_score)
+        
+        # Keep responses clean and professional - remove validation disclaimers
+        response_text = llm_response
+        
+        return {
+            'response': response_text,
+            'sources': sources,
+            'confidence': confidence,
+            'query_type': self._map_to_api_query_type(query),
+            'has_real_content': True,
+            'llm_rag_retrieval': True,
+            'validation_score': validation_score,
+            'ground_truth_matches': len(ground_truth_matches),
+            'document_chunks': len(doc_content)
+        }
+    
+    def _collect_sources(self, ground_truth_matches: List[GroundTruthMatch],
+                         doc_content: List[Dict]) -> List[Dict[str, str]]:
+        """Source citations for the documents and ground truth used in the prompt."""
         sources = []
         seen_files = set()
         
@@ -459,23 +513,7 @@ LLAMA 3.1 13B MEDICAL RESPONSE INSTRUCTIONS:
                 })
                 seen_files.add(source_doc)
         
-        # Determine confidence
-        confidence = min(validation_score + 0.2, 0.95)  # Boost for LLM processing
-        
-        # Keep responses clean and professional - remove validation disclaimers
-        response_text = llm_response
-        
-        return {
-            'response': response_text,
-            'sources': sources,
-            'confidence': confidence,
-            'query_type': self._map_to_api_query_type(query),
-            'has_real_content': True,
-            'llm_rag_retrieval': True,
-            'validation_score': validation_score,
-            'ground_truth_matches': len(ground_truth_matches),
-            'document_chunks': len(doc_content)
-        }
+        return sources
     
     def _get_error_response(self, query: str, error_message: str) -> Dict[str, Any]:
         """Generate error response."""
@@ -492,42 +530,22 @@ LLAMA 3.1 13B MEDICAL RESPONSE INSTRUCTIONS:
     # Helper methods
     def _extract_qa_pairs(self, file_data: Any) -> List[Dict]:
         """Extract Q&A pairs from different JSON structures."""
-        qa_pairs = []
-        
-        if isinstance(file_data, list):
-            qa_pairs = file_data
-        elif isinstance(file_data, dict) and 'qa_pairs' in file_data:
-            qa_pairs = file_data['qa_pairs']
-        elif isinstance(file_data, dict):
-            qa_pairs = [{
-                'question': key,
-                'answer': value,
-                'source': file_data.get('document', 'ground_truth')
-            } for key, value in file_data.items() 
-            if key not in ['document', 'document_type', 'complexity']]
-        
-        return qa_pairs
+        return extract_qa_pairs(file_data)
     
     def _extract_key_terms(self, text: str) -> List[str]:
         """Extract meaningful medical terms."""
-        # Medical stop words (keep medical terms)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'what', 'how', 'when', 'where', 'who', 'why', 'is', 'are'}
-        
-        # Extract terms
-        terms = re.findall(r'\b[a-zA-Z][a-zA-Z0-9]*\b', text.lower())
-        meaningful_terms = [term for term in terms 
-                          if len(term) > 2 and term not in stop_words]
-        
-        return meaningful_terms
+        return extract_key_terms(text)
     
-    def _calculate_semantic_match(self, query: str, question: str, answer: str, query_terms: List[str]) -> float:
+    def _calculate_semantic_match(self, query: str, question: str, answer: str, query_terms: List[str],
+                                  combined_terms: Optional[FrozenSet[str]] = None) -> float:
         """Calculate semantic match score between query and Q&A pair."""
         if not query_terms:
             return 0.0
         
         # Combine question and answer for matching
         combined_text = f"{question} {answer}"
-        combined_terms = set(self._extract_key_terms(combined_text))
+        if combined_terms is None:
+            combined_terms = set(self._extract_key_terms(combined_text))
         
         # Calculate term overlap
         query_terms_set = set(query_terms)
@@ -570,9 +588,10 @@ LLAMA 3.1 13B MEDICAL RESPONSE INSTRUCTIONS:
 
 
 # Convenience function for easy integration
-async def get_llm_rag_response(query: str, db: Session, llm_client) -> Dict[str, Any]:
+async def get_llm_rag_response(query: str, db: Session, llm_client,
+                               repository: Optional[RetrievalRepository] = None) -> Dict[str, Any]:
     """
     Get LLM-based RAG response for medical query.
     """
-    retriever = LLMRAGRetriever(db, llm_client)
+    retriever = LLMRAGRetriever(db, llm_client, repository=repository)
     return await retriever.get_llm_response(query)
\ No newline at end of file
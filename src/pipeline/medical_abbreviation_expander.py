@@ -22,7 +22,8 @@ class MedicalAbbreviationExpander:
         
         logger.info(f"✅ Loaded {len(self.abbreviation_map)} medical abbreviations for RAG expansion")
     
-    def _find_abbreviations_file(self) -> str:
+    @staticmethod
+    def _find_abbreviations_file() -> str:
         """Find medical abbreviations JSON file."""
         possible_paths = [
             "medical_abbreviations.json",
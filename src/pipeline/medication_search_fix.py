@@ -3,18 +3,27 @@ Medication Search Fix - Targeted fixes for failing medication queries
 PRP-48: Fix levophed, epinephrine, and other medication dosing queries
 """
 
-from typing import Dict, List, Any, Optional
-from sqlalchemy import text
+from typing import Dict, List, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 import logging
 
+from ..models.retrieval_repository import (
+    DOCUMENT_CHUNK_TEXTS_SQL,
+    RetrievalRepository,
+    get_retrieval_repository,
+)
+
 logger = logging.getLogger(__name__)
 
+# Leading chunks of a targeted file combined into the response content
+FILE_CONTENT_CHUNKS = 3
+
 class MedicationSearchFix:
     """Fix medication-specific search failures."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, repository: Optional[RetrievalRepository] = None):
         self.db = db
+        self.repository = repository or get_retrieval_repository()
         
         # Medication search mappings - direct filename targeting
         self.medication_files = {
@@ -72,37 +81,49 @@ class MedicationSearchFix:
     
     def get_targeted_medication_response(self, query: str) -> Optional[Dict[str, Any]]:
         """Get response using targeted medication search."""
-        query_lower = query.lower()
+        target_file, matched_medication = self._find_target_file(query.lower())
+        if not target_file:
+            logger.info(f"No targeted file found for query: {query}")
+            return None
         
-        # Find the most relevant medication file
-        target_file = None
-        matched_medication = None
+        # Get content from the specific file
+        content = self._get_file_content(target_file)
+        return self._build_targeted_response(query, target_file, matched_medication, content)
+    
+    async def get_targeted_medication_response_async(self, query: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_targeted_medication_response on the retrieval repository."""
+        target_file, matched_medication = self._find_target_file(query.lower())
+        if not target_file:
+            logger.info(f"No targeted file found for query: {query}")
+            return None
         
+        content = await self._get_file_content_async(target_file)
+        return self._build_targeted_response(query, target_file, matched_medication, content)
+    
+    def _find_target_file(self, query_lower: str) -> Tuple[Optional[str], Optional[str]]:
+        """Find the most relevant medication or RETU pathway file for the query."""
         # Direct medication matching
         for med_name, filename in self.medication_files.items():
             if med_name in query_lower:
-                target_file = filename
-                matched_medication = med_name
-                break
+                return filename, med_name
         
         # RETU pathway matching
-        if not target_file and 'retu' in query_lower:
+        if 'retu' in query_lower:
             for condition, filename in self.retu_pathways.items():
                 if condition in query_lower:
-                    target_file = filename
-                    matched_medication = f"RETU {condition}"
-                    break
-        
-        if not target_file:
-            logger.info(f"No targeted file found for query: {query}")
-            return None
+                    return filename, f"RETU {condition}"
         
-        # Get content from the specific file
-        content = self._get_file_content(target_file)
+        return None, None
+    
+    def _build_targeted_response(self, query: str, target_file: str, matched_medication: str,
+                                 content: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Format targeted file content as an API response."""
         if not content:
             logger.warning(f"No content found for file: {target_file}")
             return None
         
+        query_lower = query.lower()
+        
         # Format response based on query type
         if 'retu' in query_lower:
             response = self._format_retu_response(content, matched_medication)
@@ -124,30 +145,35 @@ class MedicationSearchFix:
     def _get_file_content(self, filename: str) -> Optional[str]:
         """Get content from a specific file."""
         try:
-            query = text("""
-                SELECT dc.chunk_text
-                FROM documents d
-                JOIN document_chunks dc ON d.id = dc.document_id
-                WHERE d.filename = :filename
-                ORDER BY dc.chunk_index
-                LIMIT 3
-            """)
-            
-            results = self.db.execute(query, {"filename": filename}).fetchall()
-            
-            if results:
-                # Combine chunks for comprehensive content
-                combined_content = "\n\n".join(result[0] for result in results)
-                logger.info(f"Found content for {filename}: {len(combined_content)} chars")
-                return combined_content
-            else:
-                logger.warning(f"No chunks found for {filename}")
-                return None
+            results = self.db.execute(
+                DOCUMENT_CHUNK_TEXTS_SQL, {"filename": filename, "limit": FILE_CONTENT_CHUNKS}
+            ).fetchall()
+            return self._combine_chunks(filename, [result[0] for result in results])
                 
         except Exception as e:
             logger.error(f"Error getting content for {filename}: {e}")
             return None
     
+    async def _get_file_content_async(self, filename: str) -> Optional[str]:
+        """Async variant of _get_file_content on the retrieval repository."""
+        try:
+            chunks = await self.repository.get_document_chunk_texts(filename, limit=FILE_CONTENT_CHUNKS)
+            return self._combine_chunks(filename, chunks)
+                
+        except Exception as e:
+            logger.error(f"Error getting content for {filename}: {e}")
+            return None
+    
+    def _combine_chunks(self, filename: str, chunks: List[str]) -> Optional[str]:
+        if chunks:
+            # Combine chunks for comprehensive content
+            combined_content = "\n\n".join(chunks)
+            logger.info(f"Found content for {filename}: {len(combined_content)} chars")
+            return combined_content
+        else:
+            logger.warning(f"No chunks found for {filename}")
+            return None
+    
     def _format_medication_response(self, content: str, medication: str, query: str) -> str:
         """Format medication dosing response."""
         response = f"💊 **{medication.title()} Dosing Information**\n\n"
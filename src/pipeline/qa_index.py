@@ -3,7 +3,8 @@
 Loads curated Q/A JSON from ground_truth_qa/ and provides a simple
 lookup API keyed by normalized query text and QueryType.
 
-This is a lightweight, dependency-free matcher using token overlap.
+This is a lightweight, dependency-free matcher using token overlap over an
+inverted index built at load time.
 """
 
 from __future__ import annotations
@@ -11,7 +12,7 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 
 class QAEntry:
@@ -49,13 +50,8 @@ def _tokenize(text: str) -> List[str]:
     return [t for t in _normalize(text).replace("/", " ").replace("-", " ").split() if t]
 
 
-def _overlap_score(a: str, b: str) -> float:
-    ta, tb = set(_tokenize(a)), set(_tokenize(b))
-    if not ta or not tb:
-        return 0.0
-    inter = len(ta & tb)
-    denom = max(len(ta), len(tb))
-    return inter / denom
+# Minimum token overlap for a match without an anchor term
+MIN_OVERLAP_SCORE = 0.35
 
 ANCHOR_TERMS = {
     "stemi", "tpa", "alteplase", "ottawa", "anaphylaxis", "hypoglycemia",
@@ -64,8 +60,27 @@ ANCHOR_TERMS = {
 
 
 class QAIndex:
+    """Inverted index over curated QA entries.
+
+    Question tokens, a token -> entry posting list and per-type partitions are
+    built once at load time, so a lookup only scores entries that share at
+    least one token with the query.
+    """
+
     def __init__(self, entries: List[QAEntry]):
         self.entries = entries
+        self._tokens: List[FrozenSet[str]] = []
+        postings: Dict[str, List[int]] = {}
+        partitions: Dict[str, List[int]] = {}
+        for idx, e in enumerate(entries):
+            tokens = frozenset(_tokenize(e.question))
+            self._tokens.append(tokens)
+            for token in tokens:
+                postings.setdefault(token, []).append(idx)
+            partitions.setdefault(e.query_type, []).append(idx)
+        self._postings: Dict[str, Tuple[int, ...]] = {t: tuple(ids) for t, ids in postings.items()}
+        # Entries without a query_type ("" partition) match every expected type
+        self._partitions: Dict[str, FrozenSet[int]] = {t: frozenset(ids) for t, ids in partitions.items()}
 
     @classmethod
     def load(cls, base_dir: Optional[str] = None) -> "QAIndex":
@@ -134,31 +149,65 @@ class QAIndex:
 
         return cls(entries)
 
-    def find_best(self, query: str, expected_type: Optional[str] = None) -> Optional[Tuple[QAEntry, float]]:
-        if not self.entries:
-            return None
-
-        expected_norm = (expected_type or "").lower()
-        best: Optional[Tuple[QAEntry, float]] = None
-        q_tokens = set(_tokenize(query))
-        for e in self.entries:
-            if expected_norm and e.query_type and e.query_type != expected_norm:
-                # Keep only matching type when explicit type provided
-                continue
-            score = _overlap_score(query, e.question)
-            if best is None or score > best[1]:
-                best = (e, score)
-
-        # Heuristic threshold: require at least modest token overlap
-        # Conservative initial threshold to reduce false positives
-        if best and best[1] >= 0.35:
-            return best
-        # Anchor-based acceptance to catch key clinical topics
-        if best:
-            e, score = best
-            e_tokens = set(_tokenize(e.question))
-            if q_tokens & e_tokens & ANCHOR_TERMS:
-                return best
-        return None
+    def _score_candidates(self, q_tokens: FrozenSet[str]) -> Dict[int, float]:
+        """Overlap score for every entry sharing a token with the query."""
+        inter: Dict[int, int] = {}
+        for token in q_tokens:
+            for idx in self._postings.get(token, ()):
+                inter[idx] = inter.get(idx, 0) + 1
+        n = len(q_tokens)
+        return {idx: count / max(n, len(self._tokens[idx])) for idx, count in inter.items()}
+
+    def find_top_k(self, query: str, types: Optional[Sequence[str]] = None,
+                   k: int = 1) -> List[Tuple[QAEntry, float]]:
+        """Best matches across several expected types in a single pass.
+
+        An entry qualifies with at least MIN_OVERLAP_SCORE token overlap, or
+        when it is the best match for one of ``types`` and shares an anchor
+        term with the query. Results are ordered by score, then by the
+        position of the entry's type in ``types``.
+        """
+        q_tokens = frozenset(_tokenize(query))
+        if not q_tokens or k <= 0:
+            return []
+
+        order = [t.lower() for t in (types or []) if t]
+        scores = self._score_candidates(q_tokens)
+        if not scores:
+            return []
+
+        # Partition position of each candidate; typeless entries belong to all
+        positions: Dict[int, range] = {}
+        if order:
+            untyped = self._partitions.get("", frozenset())
+            for pos, qa_type in enumerate(order):
+                for idx in self._partitions.get(qa_type, frozenset()) & scores.keys():
+                    positions.setdefault(idx, range(pos, pos + 1))
+            for idx in untyped & scores.keys():
+                positions[idx] = range(len(order))
+        else:
+            positions = {idx: range(1) for idx in scores}
+
+        # First highest-scoring entry per partition, in load order
+        partition_best: Dict[int, Tuple[int, float]] = {}
+        for idx in sorted(positions):
+            score = scores[idx]
+            for pos in positions[idx]:
+                best = partition_best.get(pos)
+                if best is None or score > best[1]:
+                    partition_best[pos] = (idx, score)
+        anchored_best = {
+            idx for idx, _ in partition_best.values()
+            if q_tokens & self._tokens[idx] & ANCHOR_TERMS
+        }
 
+        ranked = sorted(
+            (idx for idx in positions
+             if scores[idx] >= MIN_OVERLAP_SCORE or idx in anchored_best),
+            key=lambda idx: (-scores[idx], positions[idx][0], idx),
+        )
+        return [(self.entries[idx], scores[idx]) for idx in ranked[:k]]
 
+    def find_best(self, query: str, expected_type: Optional[str] = None) -> Optional[Tuple[QAEntry, float]]:
+        matches = self.find_top_k(query, [expected_type] if expected_type else None, k=1)
+        return matches[0] if matches else None
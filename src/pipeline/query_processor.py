@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import time
 from datetime import datetime
@@ -8,6 +7,8 @@ from typing import Any, Dict, Optional
 from redis import Redis
 from sqlalchemy.orm import Session
 
+from src.cache.local_cache import get_local_cache
+from src.cache.response_cache import ResponseCache
 from src.cache.semantic_cache import SemanticCache
 from src.models.query_types import QueryType
 from src.models.schemas import ContactResponse, QueryResponse
@@ -17,6 +18,7 @@ from src.validation.medical_validator import MedicalValidator
 
 from .classifier import QueryClassifier
 from .curated_quality_formatter import UniversalQualityFormatter
+from .knowledge_base import get_knowledge_base
 from .router import QueryRouter
 
 # PRP-43: ResponseValidator removed - was corrupting good medical responses
@@ -46,6 +48,12 @@ class QueryProcessor:
         self.classifier = QueryClassifier(llm_client)
         self.router = QueryRouter(db, redis, llm_client, semantic_cache=semantic_cache)
         self.validator = MedicalValidator()
+
+        knowledge = get_knowledge_base().snapshot
+        self.response_cache = ResponseCache(
+            redis, knowledge.version, abbreviation_expander=knowledge.abbreviation_expander,
+            local_cache=get_local_cache()
+        )
         # PRP-43: ResponseValidator removed - was corrupting good medical responses
         
         # PRP-41: Universal Quality System
@@ -338,16 +346,6 @@ class QueryProcessor:
     ):
         """Cache query result based on type-specific policies."""
         try:
-            # Don't cache FORM queries (always fresh)
-            if query_type == QueryType.FORM_RETRIEVAL:
-                return
-
-            # Don't cache CONTACT queries (time-sensitive)
-            if query_type == QueryType.CONTACT_LOOKUP:
-                return
-
-            # Cache other query types
-            cache_key = f"query:{hash(query.lower().strip())}"
             cache_data = {
                 "response": response.response,
                 "query_type": response.query_type,
@@ -355,16 +353,8 @@ class QueryProcessor:
                 "sources": response.sources,
                 "timestamp": datetime.utcnow().isoformat(),
             }
-
-            # Set TTL based on query type
-            ttl = 300  # 5 minutes default
-            if query_type in [QueryType.PROTOCOL_STEPS, QueryType.CRITERIA_CHECK]:
-                ttl = 3600  # 1 hour for protocols/criteria
-            elif query_type == QueryType.DOSAGE_LOOKUP:
-                ttl = 1800  # 30 minutes for dosages
-
-            self.redis.setex(cache_key, ttl, json.dumps(cache_data))
-            logger.debug(f"Cached result for {query_type.value} query with TTL {ttl}s")
+            # FORM and CONTACT queries are never cached; TTLs come from cache_config
+            await self.response_cache.set(query, query_type, cache_data)
 
         except Exception as e:
             logger.warning(f"Failed to cache result: {e}")
@@ -372,10 +362,11 @@ class QueryProcessor:
     async def _get_cached_result(self, query: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached query result."""
         try:
-            cache_key = f"query:{hash(query.lower().strip())}"
-            cached_data = self.redis.get(cache_key)
+            query_type, _ = self._simple_classify(query)
+            cached_data = await self.response_cache.get(query, query_type)
             if cached_data:
-                return json.loads(cached_data)
+                cached_data.pop("timestamp", None)
+                return cached_data
         except Exception as e:
             logger.warning(f"Failed to retrieve cached result: {e}")
         return None
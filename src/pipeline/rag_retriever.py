@@ -1,36 +1,77 @@
 """RAG retrieval module for semantic search and document retrieval."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
 
+from src.ai.local_embeddings import get_local_embedding_model, to_pgvector
 from src.models.entities import Document, DocumentChunk, DocumentRegistry
+from src.models.query_types import QueryType
+from src.models.retrieval_repository import SEMANTIC_CHUNKS_SQL, RetrievalRepository, get_retrieval_repository
+from src.models.vector_index_manager import ann_search_params, apply_ann_search_params
+from src.pipeline.bm25_index import BM25Index, get_bm25_index
 from src.pipeline.bm25_scorer import BM25Scorer, BM25Configuration
-from src.pipeline.medical_synonym_expander import MedicalSynonymExpander
+from src.pipeline.knowledge_base import get_knowledge_base
+from src.pipeline.retrieval_sql import (
+    FALLBACK_TEXT_SEARCH,
+    MEDICAL_AWARE_SEARCH,
+    SIMPLE_SEARCH_ALL,
+    SIMPLE_SEARCH_ANY,
+    RetrievalStatement,
+    get_statement_cache,
+)
+from src.pipeline.text_search import build_chunk_text_search
 
 logger = logging.getLogger(__name__)
 
+# Key medical terms get a flat terminology boost in medical-aware search
+TERMINOLOGY_KEYWORDS = (
+    'STEMI', 'SEPSIS', 'HYPOGLYCEMIA', 'OTTAWA', 'EPINEPHRINE', 'CARDIAC', 'ARREST', 'PROTOCOL', 'CRITERIA', 'DOSAGE'
+)
+
+# Hydrates in-memory BM25 hits with their text and source metadata
+CHUNKS_BY_ID_SQL = text("""
+    SELECT 
+        dc.id,
+        dc.document_id,
+        dc.chunk_text,
+        dc.chunk_index,
+        dc.metadata,
+        d.filename,
+        d.content_type,
+        d.file_type,
+        dr.display_name,
+        dr.category
+    FROM document_chunks dc
+    JOIN documents d ON dc.document_id = d.id
+    LEFT JOIN document_registry dr ON d.id = dr.document_id
+    WHERE dc.id IN :chunk_ids
+""").bindparams(bindparam("chunk_ids", expanding=True))
+
 
 class RAGRetriever:
     """Handles semantic search and document retrieval for the RAG pipeline."""
     
-    def __init__(self, db: Session, embedding_model=None):
+    def __init__(self, db: Session, embedding_model=None, repository: Optional[RetrievalRepository] = None):
         """Initialize the RAG retriever.
         
         Args:
             db: Database session
-            embedding_model: Optional embedding model (defaults to system model)
+            embedding_model: Optional embedding model (defaults to the local 384-dim encoder)
+            repository: Async retrieval repository (defaults to the shared one)
         """
         self.db = db
-        self.embedding_model = embedding_model  # Will be None for now, embeddings handled elsewhere
+        self.repository = repository or get_retrieval_repository()
+        self.embedding_model = embedding_model or get_local_embedding_model()
         
         # Initialize enhanced retrieval components
         try:
             self.bm25_scorer = BM25Scorer(db, BM25Configuration(k1=1.2, b=0.75))
-            self.synonym_expander = MedicalSynonymExpander()
+            self.synonym_expander = get_knowledge_base().snapshot.synonym_expander
             logger.info("Enhanced retrieval components initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize enhanced retrieval: {e}")
@@ -42,7 +83,8 @@ class RAGRetriever:
         query: str, 
         k: int = 5,
         content_type: Optional[str] = None,
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        query_type: Optional[Union[QueryType, str]] = None
     ) -> List[Dict[str, Any]]:
         """Perform semantic search using vector similarity.
         
@@ -51,6 +93,7 @@ class RAGRetriever:
             k: Number of results to return
             content_type: Optional filter by content type
             threshold: Minimum similarity threshold
+            query_type: Selects the configured ANN search breadth (ef_search/probes)
             
         Returns:
             List of search results with document metadata
@@ -64,74 +107,19 @@ class RAGRetriever:
                 logger.warning("Embedding generation failed, falling back to text search")
                 return self._fallback_text_search(query, content_type, k)
             
-            # Build the vector search query
-            search_query = """
-                SELECT 
-                    dc.id,
-                    dc.document_id,
-                    dc.chunk_text,
-                    dc.chunk_index,
-                    dc.metadata,
-                    d.filename,
-                    d.content_type,
-                    d.file_type,
-                    dr.display_name,
-                    dr.category,
-                    1 - (dc.embedding <=> %(query_embedding)s::vector) as similarity
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                LEFT JOIN document_registry dr ON d.id = dr.document_id
-                WHERE 1=1
-            """
-            
-            params = {"query_embedding": query_embedding.tolist()}
-            
-            # Add content type filter if specified
-            if content_type:
-                search_query += " AND d.content_type = %(content_type)s"
-                params["content_type"] = content_type
-                
-            # Add similarity threshold and ordering
-            search_query += """
-                AND 1 - (dc.embedding <=> %(query_embedding)s::vector) >= %(threshold)s
-                ORDER BY similarity DESC
-                LIMIT %(k)s
-            """
-            params["threshold"] = threshold
-            params["k"] = k
-            
-            # Execute search with direct parameter passing
-            params = {
-                "query_embedding": query_embedding.tolist(),
-                "threshold": threshold, 
+            apply_ann_search_params(self.db, query_type, k)
+            results = self.db.execute(SEMANTIC_CHUNKS_SQL, {
+                "query_embedding": to_pgvector(query_embedding),
+                "content_type": content_type,
+                "threshold": threshold,
                 "k": k
-            }
-            if content_type:
-                params["content_type"] = content_type
-                
-            results = self.db.execute(text(search_query), params).fetchall()
-            
-            # Format results with full metadata
-            formatted_results = []
-            for row in results:
-                result = {
-                    "chunk_id": row.id,
-                    "document_id": row.document_id,
-                    "content": row.chunk_text,
-                    "chunk_index": row.chunk_index,
-                    "similarity": float(row.similarity),
-                    "metadata": row.metadata or {},
-                    "source": {
-                        "filename": row.filename,
-                        "display_name": row.display_name or row.filename,
-                        "content_type": row.content_type,
-                        "file_type": row.file_type,
-                        "category": row.category
-                    }
-                }
-                formatted_results.append(result)
+            }).fetchall()
+            formatted_results = self._format_vector_results(results)
                 
             logger.info(f"Semantic search returned {len(formatted_results)} results")
+            if not formatted_results:
+                # Chunks may not have embeddings yet (e.g. before a backfill)
+                return self._fallback_text_search(query, content_type, k)
             return formatted_results
             
         except Exception as e:
@@ -140,85 +128,97 @@ class RAGRetriever:
             logger.warning("Vector search failed, falling back to text search")
             return self._fallback_text_search(query, content_type, k)
 
-    def _fallback_text_search(self, query: str, content_type: str = None, k: int = 5):
-        """Fallback text-based search when vector search fails."""
+    async def semantic_search_async(
+        self,
+        query: str,
+        k: int = 5,
+        content_type: Optional[str] = None,
+        threshold: float = 0.7,
+        query_type: Optional[Union[QueryType, str]] = None,
+        fallback_to_text: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Async variant of semantic_search that never blocks the event loop.
+        
+        The query is embedded in a worker thread and the vector search runs on
+        the pooled async engine, so it overlaps other coroutines (e.g. the
+        Elasticsearch branch of a hybrid search) and stops cleanly on cancellation.
+        
+        Args:
+            fallback_to_text: Fall back to the text search (run in a worker
+                thread, since it uses the sync session) when the vector search
+                fails or finds nothing; otherwise return []
+        """
         try:
-            # Extract meaningful search terms from the query
-            search_terms = self._extract_search_terms(query)
+            query_embedding = await asyncio.to_thread(self._generate_embedding, query)
+            if query_embedding is None:
+                logger.warning("Embedding generation failed, falling back to text search")
+                return await self._fallback_text_search_async(query, content_type, k) if fallback_to_text else []
+            
+            results = await self.repository.semantic_search_chunks(
+                to_pgvector(query_embedding),
+                k=k,
+                threshold=threshold,
+                content_type=content_type,
+                ann_params=ann_search_params(query_type, k)
+            )
+            formatted_results = self._format_vector_results(results)
             
-            # Build search query with medical-aware relevance scoring
-            search_conditions = []
-            params = {}
-            relevance_scores = []
+            logger.info(f"Semantic search returned {len(formatted_results)} results")
+            if not formatted_results and fallback_to_text:
+                # Chunks may not have embeddings yet (e.g. before a backfill)
+                return await self._fallback_text_search_async(query, content_type, k)
+            return formatted_results
             
-            for i, term in enumerate(search_terms):
-                param_name = f"term_{i}"
-                search_conditions.append(f"dc.chunk_text ILIKE :{param_name}")
-                params[param_name] = f"%{term}%"
-                
-                # Add medical-aware relevance scoring
-                relevance_scores.append(f"""
-                    (CASE WHEN dc.chunk_text ILIKE :{param_name} THEN
-                        -- Base term frequency scoring
-                        (LENGTH(dc.chunk_text) - LENGTH(REPLACE(UPPER(dc.chunk_text), UPPER('{term}'), ''))) / LENGTH('{term}')
-                        + (CASE WHEN UPPER(dc.chunk_text) LIKE UPPER('%{term}%') THEN 2 ELSE 0 END)
-                        -- Medical document priority boost
-                        + (CASE 
-                            WHEN d.content_type IN ('protocol', 'guideline', 'criteria', 'medication') THEN 50
-                            WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' OR d.filename ILIKE '%clinical%' THEN 25
-                            WHEN dr.category IN ('protocol', 'criteria', 'dosage', 'form') THEN 40
-                            ELSE 0 
-                        END)
-                        -- Medical terminology boost
-                        + (CASE 
-                            WHEN '{term.upper()}' IN ('STEMI', 'SEPSIS', 'HYPOGLYCEMIA', 'OTTAWA', 'EPINEPHRINE', 'CARDIAC', 'ARREST', 'PROTOCOL', 'CRITERIA', 'DOSAGE') THEN 30
-                            WHEN dc.chunk_text ILIKE '%mg%' OR dc.chunk_text ILIKE '%ml%' OR dc.chunk_text ILIKE '%dose%' OR dc.chunk_text ILIKE '%units%' THEN 20
-                            WHEN dc.chunk_text ILIKE '%contact%' OR dc.chunk_text ILIKE '%pager%' OR dc.chunk_text ILIKE '%phone%' THEN 15
-                            ELSE 0
-                        END)
-                        -- Penalize non-medical content
-                        - (CASE 
-                            WHEN d.filename ILIKE '%context_enhancement%' OR d.filename ILIKE '%photography%' OR d.filename ILIKE '%guide%' THEN 100
-                            WHEN d.content_type = 'general' OR dr.category = 'general' THEN 50
-                            ELSE 0
-                        END)
-                    ELSE 0 END)
-                """)
-            
-            # Combine conditions with OR for broader matching
-            where_clause = " OR ".join(search_conditions) if search_conditions else "1=0"
-            relevance_calc = " + ".join(relevance_scores) if relevance_scores else "1.0"
-            
-            search_query = f"""
-                SELECT 
-                    dc.id,
-                    dc.document_id,
-                    dc.chunk_text,
-                    dc.chunk_index,
-                    dc.metadata,
-                    d.filename,
-                    d.content_type,
-                    d.file_type,
-                    dr.display_name,
-                    dr.category,
-                    ({relevance_calc}) as relevance
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                LEFT JOIN document_registry dr ON d.id = dr.document_id
-                WHERE ({where_clause})
-            """
-            
-            # Add content type filter if specified
-            if content_type:
-                search_query += " AND d.content_type = :content_type"
-                params["content_type"] = content_type
-                
-            # Add ordering and limit - order by relevance (highest first)
-            search_query += " ORDER BY relevance DESC, LENGTH(dc.chunk_text) DESC LIMIT :k"
-            params["k"] = k
+        except Exception as e:
+            logger.error(f"Semantic search failed: {e}")
+            return await self._fallback_text_search_async(query, content_type, k) if fallback_to_text else []
+
+    def _format_vector_results(self, results: List[Any]) -> List[Dict[str, Any]]:
+        """Format vector search rows with full metadata."""
+        formatted_results = []
+        for row in results:
+            result = {
+                "chunk_id": row.id,
+                "document_id": row.document_id,
+                "content": row.chunk_text,
+                "chunk_index": row.chunk_index,
+                "similarity": float(row.similarity),
+                "metadata": row.metadata or {},
+                "source": {
+                    "filename": row.filename,
+                    "display_name": row.display_name or row.filename,
+                    "content_type": row.content_type,
+                    "file_type": row.file_type,
+                    "category": row.category
+                }
+            }
+            formatted_results.append(result)
+        return formatted_results
+
+    async def _fallback_text_search_async(self, query: str, content_type: str = None, k: int = 5):
+        """_fallback_text_search in a worker thread, off the event loop."""
+        return await asyncio.to_thread(self._fallback_text_search, query, content_type, k)
+
+    def _fallback_text_search(self, query: str, content_type: str = None, k: int = 5):
+        """Fallback text-based search when vector search fails."""
+        index = get_bm25_index()
+        if index is not None and index.ready:
+            try:
+                results = self._bm25_index_search(index, query, content_type, k)
+                if results:
+                    return results
+            except Exception as e:
+                logger.error(f"BM25 index search failed, using SQL text search: {e}")
+
+        try:
+            # Full-text match on the indexed search_vector instead of ILIKE scans
+            search = build_chunk_text_search(self._extract_search_terms(query))
+            if search is None:
+                return []
             
-            # Execute search with colon-style parameter binding
-            results = self.db.execute(text(search_query), params).fetchall()
+            # Fixed-shape statement: terms and the optional content type filter are bound
+            params = {**search.params, "content_type": content_type, "k": k}
+            results = get_statement_cache().execute(self.db, FALLBACK_TEXT_SEARCH, params)
             
             # Format results (similar to vector search format)
             formatted_results = []
@@ -247,6 +247,42 @@ class RAGRetriever:
             logger.error(f"Text search fallback failed: {e}")
             return []
             
+    def _bm25_index_search(
+        self, index: BM25Index, query: str, content_type: Optional[str], k: int
+    ) -> List[Dict[str, Any]]:
+        """Rank chunks with the in-memory BM25 index, then load only the top k."""
+        hits = index.search(query, k, content_type=content_type)
+        if not hits:
+            return []
+
+        rows = {row.id: row for row in self.db.execute(
+            CHUNKS_BY_ID_SQL, {"chunk_ids": [hit.chunk_id for hit in hits]}).fetchall()}
+        formatted_results = []
+        for hit in hits:
+            row = rows.get(hit.chunk_id)
+            if row is None:
+                # Deleted since the index last synced
+                continue
+            formatted_results.append({
+                "chunk_id": row.id,
+                "document_id": row.document_id,
+                "content": row.chunk_text,
+                "chunk_index": row.chunk_index,
+                "similarity": hit.score,
+                "bm25_score": hit.score,
+                "metadata": row.metadata or {},
+                "source": {
+                    "filename": row.filename,
+                    "display_name": row.display_name or row.filename,
+                    "content_type": row.content_type,
+                    "file_type": row.file_type,
+                    "category": row.category
+                }
+            })
+
+        logger.info(f"BM25 index search returned {len(formatted_results)} results")
+        return formatted_results
+
     def get_document_context(
         self,
         document_id: str,
@@ -313,184 +349,156 @@ class RAGRetriever:
             logger.error(f"Failed to get document context: {e}")
             return {}
             
+    async def get_document_context_async(
+        self,
+        document_id: str,
+        chunk_index: int,
+        context_window: int = 2
+    ) -> Dict[str, Any]:
+        """Async variant of get_document_context on the retrieval repository."""
+        try:
+            return await self.repository.get_chunk_context(document_id, chunk_index, context_window)
+        except Exception as e:
+            logger.error(f"Failed to get document context: {e}")
+            return {}
+
+    def _build_simple_search(
+        self, query: str, k: int
+    ) -> Tuple[RetrievalStatement, Optional[RetrievalStatement], Dict[str, Any]]:
+        """Pick the AND search statement, its OR fallback (None for a single term) and bind params."""
+        # Enhanced query expansion with medical synonyms
+        expanded_terms = terms = self._extract_search_terms(query)
+        if self.synonym_expander:
+            try:
+                expanded_query = self.synonym_expander.expand_query(query, QueryType.PROTOCOL_STEPS)
+                if expanded_query.expanded_terms:
+                    expanded_terms = expanded_query.expanded_terms[:5]  # Limit expansion
+                    logger.info(f"Query expanded with synonyms: {len(expanded_query.expanded_terms)} terms")
+            except Exception as e:
+                logger.warning(f"Synonym expansion failed: {e}")
+        
+        # Extract key terms from expanded query
+        terms = expanded_terms if expanded_terms else self._extract_search_terms(query)
+        if not terms:
+            terms = [query.strip()]
+            
+        logger.info(f"Simple search for terms: {terms}")
+        
+        # Identify key medical terms (longer words are often more specific)
+        important_terms = sorted(terms, key=len, reverse=True)[:2]  # Use top 2 longest terms
+        
+        # Full-text searches on the indexed search_vector: all key terms, then any of them
+        all_terms = build_chunk_text_search(important_terms, match_all=True, fuzzy=False, param="all_terms")
+        any_terms = build_chunk_text_search(important_terms, param="any_terms")
+        if all_terms is None:
+            raise ValueError(f"No searchable terms in query: {query!r}")
+        query_lower = query.lower()
+        params = {
+            **all_terms.params,
+            **any_terms.params,
+            # Enhanced relevance calculation for protocols (PRP-40)
+            "protocol_query": 'sepsis' in query_lower or 'protocol' in query_lower,
+            "sepsis_query": 'sepsis' in query_lower,
+            "k": k,
+        }
+        
+        # OR fallback for when the AND search is too restrictive
+        or_statement = SIMPLE_SEARCH_ANY if len(important_terms) > 1 else None
+        return SIMPLE_SEARCH_ALL, or_statement, params
+
     def _simple_medical_search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Simple, reliable medical text search with enhanced protocol filtering and BM25 scoring."""
         try:
-            # Enhanced query expansion with medical synonyms
-            expanded_terms = terms = self._extract_search_terms(query)
-            if self.synonym_expander:
-                try:
-                    from src.models.query_types import QueryType
-                    expanded_query = self.synonym_expander.expand_query(query, QueryType.PROTOCOL_STEPS)
-                    if expanded_query.expanded_terms:
-                        expanded_terms = expanded_query.expanded_terms[:5]  # Limit expansion
-                        logger.info(f"Query expanded with synonyms: {len(expanded_query.expanded_terms)} terms")
-                except Exception as e:
-                    logger.warning(f"Synonym expansion failed: {e}")
-            
-            # Extract key terms from expanded query
-            terms = expanded_terms if expanded_terms else self._extract_search_terms(query)
-            if not terms:
-                terms = [query.strip()]
-                
-            logger.info(f"Simple search for terms: {terms}")
-            
-            # Build search conditions - prioritize key medical terms
-            conditions = []
-            params = {}
+            search_statement, or_statement, params = self._build_simple_search(query, k)
+            statements = get_statement_cache()
+            results = statements.execute(self.db, search_statement, params)
             
-            # Identify key medical terms (longer words are often more specific)
-            important_terms = sorted(terms, key=len, reverse=True)[:2]  # Use top 2 longest terms
+            # If AND is too restrictive, fall back to OR
+            if len(results) < k and or_statement:
+                logger.info(f"AND search too restrictive ({len(results)} results), trying OR")
+                results = statements.execute(self.db, or_statement, params)
             
-            # Always use the most important term
-            if important_terms:
-                params['term_0'] = f"%{important_terms[0]}%"
-                conditions.append("dc.chunk_text ILIKE :term_0")
-                
-                # Add second term if available
-                if len(important_terms) > 1:
-                    params['term_1'] = f"%{important_terms[1]}%"
-                    conditions.append("dc.chunk_text ILIKE :term_1")
+            logger.info(f"Simple search returned {len(results)} results")
+            return self._format_simple_results(query, results, k)
             
-            # Enhanced relevance calculation for protocols (PRP-40)
-            query_lower = query.lower()
-            if 'sepsis' in query_lower or 'protocol' in query_lower:
-                # Special handling for protocol queries
-                relevance_calc = self._get_protocol_relevance_calc(important_terms, query_lower)
-            else:
-                # Standard relevance calculation
-                relevance_calc = " + ".join([
-                    f"CASE WHEN dc.chunk_text ILIKE :term_{i} THEN 1 ELSE 0 END"
-                    for i in range(len(important_terms))
-                ])
-            
-            search_query = f"""
-                SELECT 
-                    dc.id,
-                    dc.document_id,
-                    dc.chunk_text,
-                    dc.chunk_index,
-                    dc.metadata,
-                    d.filename,
-                    d.content_type,
-                    d.file_type,
-                    dr.display_name,
-                    dr.category,
-                    ({relevance_calc}) as relevance
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                LEFT JOIN document_registry dr ON d.id = dr.document_id
-                WHERE ({' AND '.join(conditions)})
-                AND LENGTH(dc.chunk_text) > 20
-                ORDER BY relevance DESC, d.filename, LENGTH(dc.chunk_text) ASC
-                LIMIT :k
-            """
-            
-            params['k'] = k
-            
-            results = self.db.execute(text(search_query), params).fetchall()
+        except Exception as e:
+            logger.error(f"Simple search failed: {e}")
+            return []
+
+    async def _simple_medical_search_async(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Async variant of _simple_medical_search on the retrieval repository."""
+        try:
+            # asyncpg prepares and caches the fixed-shape statements per connection
+            search_statement, or_statement, params = self._build_simple_search(query, k)
+            results = await self.repository.search_chunks(search_statement.text, params)
             
             # If AND is too restrictive, fall back to OR
-            if len(results) < k and len(important_terms) > 1:
+            if len(results) < k and or_statement:
                 logger.info(f"AND search too restrictive ({len(results)} results), trying OR")
-                
-                or_query = f"""
-                    SELECT 
-                        dc.id,
-                        dc.document_id,
-                        dc.chunk_text,
-                        dc.chunk_index,
-                        dc.metadata,
-                        d.filename,
-                        d.content_type,
-                        d.file_type,
-                        dr.display_name,
-                        dr.category,
-                        ({relevance_calc}) as relevance
-                    FROM document_chunks dc
-                    JOIN documents d ON dc.document_id = d.id
-                    LEFT JOIN document_registry dr ON d.id = dr.document_id
-                    WHERE ({' OR '.join(conditions)})
-                    AND LENGTH(dc.chunk_text) > 20
-                    ORDER BY relevance DESC, d.filename, LENGTH(dc.chunk_text) ASC
-                    LIMIT :k
-                """
-                results = self.db.execute(text(or_query), params).fetchall()
+                results = await self.repository.search_chunks(or_statement.text, params)
             
             logger.info(f"Simple search returned {len(results)} results")
+            return self._format_simple_results(query, results, k)
             
-            # Format results with BM25 scoring enhancement
-            formatted_results = []
-            
-            # Apply BM25 scoring if available
-            if self.bm25_scorer and results:
-                try:
-                    # Convert results to format expected by BM25 scorer
-                    candidate_chunks = []
-                    for row in results:
-                        chunk_dict = {
-                            'id': row.id,
-                            'document_id': row.document_id,
-                            'chunk_text': row.chunk_text,
-                            'chunk_index': row.chunk_index,
-                            'metadata': row.metadata or {},
-                            'filename': row.filename,
-                            'content_type': row.content_type,
-                            'file_type': row.file_type,
-                            'display_name': row.display_name,
-                            'category': row.category,
-                            'original_relevance': getattr(row, 'relevance', 0.0)
-                        }
-                        candidate_chunks.append(chunk_dict)
-                    
-                    # Apply BM25 scoring
-                    enhanced_results = self.bm25_scorer.score_sql_results(query, results, k)
-                    
-                    # Format enhanced results
-                    for enhanced_row in enhanced_results:
-                        result = {
-                            "chunk_id": enhanced_row['id'],
-                            "document_id": enhanced_row['document_id'],
-                            "content": enhanced_row['chunk_text'],
-                            "chunk_index": enhanced_row['chunk_index'],
-                            "similarity": enhanced_row.get('final_score', 1.0),
-                            "bm25_score": enhanced_row.get('bm25_score', 0.0),
-                            "medical_boost": enhanced_row.get('medical_boost', 1.0),
-                            "metadata": enhanced_row['metadata'] or {},
-                            "source": {
-                                "filename": enhanced_row['filename'],
-                                "display_name": enhanced_row['display_name'] or enhanced_row['filename'].replace('.pdf', '').replace('_', ' ').title(),
-                                "content_type": enhanced_row['content_type'],
-                                "file_type": enhanced_row['file_type'],
-                                "category": enhanced_row['category']
-                            }
+        except Exception as e:
+            logger.error(f"Simple search failed: {e}")
+            return []
+
+    def _format_simple_results(self, query: str, results: List[Any], k: int) -> List[Dict[str, Any]]:
+        """Format simple search rows, re-ranked with BM25 when available."""
+        # Format results with BM25 scoring enhancement
+        formatted_results = []
+        
+        # Apply BM25 scoring if available
+        if self.bm25_scorer and results:
+            try:
+                # Convert results to format expected by BM25 scorer
+                candidate_chunks = []
+                for row in results:
+                    chunk_dict = {
+                        'id': row.id,
+                        'document_id': row.document_id,
+                        'chunk_text': row.chunk_text,
+                        'chunk_index': row.chunk_index,
+                        'metadata': row.metadata or {},
+                        'filename': row.filename,
+                        'content_type': row.content_type,
+                        'file_type': row.file_type,
+                        'display_name': row.display_name,
+                        'category': row.category,
+                        'original_relevance': getattr(row, 'relevance', 0.0)
+                    }
+                    candidate_chunks.append(chunk_dict)
+                
+                # Apply BM25 scoring
+                enhanced_results = self.bm25_scorer.score_sql_results(query, results, k)
+                
+                # Format enhanced results
+                for enhanced_row in enhanced_results:
+                    result = {
+                        "chunk_id": enhanced_row['id'],
+                        "document_id": enhanced_row['document_id'],
+                        "content": enhanced_row['chunk_text'],
+                        "chunk_index": enhanced_row['chunk_index'],
+                        "similarity": enhanced_row.get('final_score', 1.0),
+                        "bm25_score": enhanced_row.get('bm25_score', 0.0),
+                        "medical_boost": enhanced_row.get('medical_boost', 1.0),
+                        "metadata": enhanced_row['metadata'] or {},
+                        "source": {
+                            "filename": enhanced_row['filename'],
+                            "display_name": enhanced_row['display_name'] or enhanced_row['filename'].replace('.pdf', '').replace('_', ' ').title(),
+                            "content_type": enhanced_row['content_type'],
+                            "file_type": enhanced_row['file_type'],
+                            "category": enhanced_row['category']
                         }
-                        formatted_results.append(result)
-                        
-                    logger.info(f"Applied BM25 scoring to {len(formatted_results)} results")
+                    }
+                    formatted_results.append(result)
                     
-                except Exception as e:
-                    logger.error(f"BM25 scoring failed, falling back to standard scoring: {e}")
-                    # Fallback to standard formatting
-                    for row in results:
-                        result = {
-                            "chunk_id": row.id,
-                            "document_id": row.document_id,
-                            "content": row.chunk_text,
-                            "chunk_index": row.chunk_index,
-                            "similarity": 1.0,
-                            "metadata": row.metadata or {},
-                            "source": {
-                                "filename": row.filename,
-                                "display_name": row.display_name or row.filename.replace('.pdf', '').replace('_', ' ').title(),
-                                "content_type": row.content_type,
-                                "file_type": row.file_type,
-                                "category": row.category
-                            }
-                        }
-                        formatted_results.append(result)
-            else:
-                # Fallback to standard formatting when BM25 not available
+                logger.info(f"Applied BM25 scoring to {len(formatted_results)} results")
+                
+            except Exception as e:
+                logger.error(f"BM25 scoring failed, falling back to standard scoring: {e}")
+                # Fallback to standard formatting
                 for row in results:
                     result = {
                         "chunk_id": row.id,
@@ -508,12 +516,27 @@ class RAGRetriever:
                         }
                     }
                     formatted_results.append(result)
-                
-            return formatted_results
+        else:
+            # Fallback to standard formatting when BM25 not available
+            for row in results:
+                result = {
+                    "chunk_id": row.id,
+                    "document_id": row.document_id,
+                    "content": row.chunk_text,
+                    "chunk_index": row.chunk_index,
+                    "similarity": 1.0,
+                    "metadata": row.metadata or {},
+                    "source": {
+                        "filename": row.filename,
+                        "display_name": row.display_name or row.filename.replace('.pdf', '').replace('_', ' ').title(),
+                        "content_type": row.content_type,
+                        "file_type": row.file_type,
+                        "category": row.category
+                    }
+                }
+                formatted_results.append(result)
             
-        except Exception as e:
-            logger.error(f"Simple search failed: {e}")
-            return []
+        return formatted_results
 
     def retrieve_for_query_type(
         self,
@@ -534,7 +557,24 @@ class RAGRetriever:
         # Use simple search first
         logger.info(f"Using simple search for query: {query}")
         search_results = self._simple_medical_search(query, k)
-        
+        return self._with_source_citations(search_results)
+
+    async def retrieve_for_query_type_async(
+        self,
+        query: str,
+        query_type: str,
+        k: int = 5
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Async variant of retrieve_for_query_type that doesn't block the event loop."""
+        logger.info(f"Using simple search for query: {query}")
+        search_results = await self._simple_medical_search_async(query, k)
+        return self._with_source_citations(search_results)
+
+    def _with_source_citations(
+        self,
+        search_results: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Pair search results with their unique source display names."""
         if not search_results:
             logger.warning("Simple search returned no results")
             return [], []
@@ -559,98 +599,20 @@ class RAGRetriever:
             # Extract meaningful search terms from the query
             search_terms = self._extract_search_terms(query)
             
-            # Build search query with medical-aware relevance scoring
-            search_conditions = []
-            params = {}
-            relevance_scores = []
+            search = build_chunk_text_search(search_terms)
+            if search is None:
+                return []
             
-            for i, term in enumerate(search_terms):
-                param_name = f"term_{i}"
-                search_conditions.append(f"dc.chunk_text ILIKE :{param_name}")
-                params[param_name] = f"%{term}%"
-                
-                # Query-type-specific scoring
-                query_type_boost = self._get_query_type_boost(query_type, term)
-                
-                # Add comprehensive medical-aware relevance scoring
-                relevance_scores.append(f"""
-                    (CASE WHEN dc.chunk_text ILIKE :{param_name} THEN
-                        -- Base term frequency scoring
-                        (LENGTH(dc.chunk_text) - LENGTH(REPLACE(UPPER(dc.chunk_text), UPPER('{term}'), ''))) / LENGTH('{term}') * 2
-                        
-                        -- Medical document priority boost (highest priority)
-                        + (CASE 
-                            WHEN d.content_type IN ('protocol', 'guideline', 'criteria', 'medication') THEN 100
-                            WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' OR d.filename ILIKE '%clinical%' THEN 80
-                            WHEN dr.category IN ('protocol', 'criteria', 'dosage', 'form') THEN 90
-                            WHEN d.filename ILIKE '%STEMI%' OR d.filename ILIKE '%epinephrine%' OR d.filename ILIKE '%ottawa%' THEN 150
-                            ELSE 0 
-                        END)
-                        
-                        -- Medical terminology boost
-                        + (CASE 
-                            WHEN '{term.upper()}' IN ('STEMI', 'SEPSIS', 'HYPOGLYCEMIA', 'OTTAWA', 'EPINEPHRINE', 'CARDIAC', 'ARREST', 'PROTOCOL', 'CRITERIA', 'DOSAGE') THEN 60
-                            WHEN dc.chunk_text ILIKE '%mg%' OR dc.chunk_text ILIKE '%ml%' OR dc.chunk_text ILIKE '%dose%' OR dc.chunk_text ILIKE '%units%' THEN 40
-                            WHEN dc.chunk_text ILIKE '%contact%' OR dc.chunk_text ILIKE '%pager%' OR dc.chunk_text ILIKE '%phone%' OR dc.chunk_text ILIKE '%917-%' THEN 50
-                            WHEN dc.chunk_text ILIKE '%emergency%' OR dc.chunk_text ILIKE '%urgent%' OR dc.chunk_text ILIKE '%acute%' THEN 30
-                            ELSE 0
-                        END)
-                        
-                        -- Query-type specific boost
-                        + {query_type_boost}
-                        
-                        -- Heavily penalize non-medical content (must be negative to truly penalize)
-                        - (CASE 
-                            WHEN d.filename ILIKE '%context_enhancement%' OR d.filename ILIKE '%photography%' OR d.filename ILIKE '%guide%' OR d.filename ILIKE '%readme%' THEN 200
-                            WHEN d.content_type = 'general' OR dr.category = 'general' OR d.filename ILIKE '%test%' THEN 100
-                            WHEN d.filename ILIKE '%phase_%' OR d.filename ILIKE '%dev%' OR d.filename ILIKE '%example%' THEN 150
-                            ELSE 0
-                        END)
-                        
-                        -- Boost for exact medical matches in content
-                        + (CASE 
-                            WHEN dc.chunk_text ILIKE '%{term}%' AND dc.chunk_text ILIKE '%protocol%' THEN 25
-                            WHEN dc.chunk_text ILIKE '%{term}%' AND dc.chunk_text ILIKE '%treatment%' THEN 20
-                            WHEN dc.chunk_text ILIKE '%{term}%' AND dc.chunk_text ILIKE '%dose%' THEN 30
-                            ELSE 0
-                        END)
-                    ELSE 0 END)
-                """)
-            
-            # Combine conditions with OR for broader matching
-            where_clause = " OR ".join(search_conditions) if search_conditions else "1=0"
-            relevance_calc = " + ".join(relevance_scores) if relevance_scores else "1.0"
-            
-            search_query = f"""
-                SELECT 
-                    dc.id,
-                    dc.document_id,
-                    dc.chunk_text,
-                    dc.chunk_index,
-                    dc.metadata,
-                    d.filename,
-                    d.content_type,
-                    d.file_type,
-                    dr.display_name,
-                    dr.category,
-                    ({relevance_calc}) as relevance
-                FROM document_chunks dc
-                JOIN documents d ON dc.document_id = d.id
-                LEFT JOIN document_registry dr ON d.id = dr.document_id
-                WHERE ({where_clause})
-            """
-            
-            # Add content type filter if specified
-            if content_type:
-                search_query += " AND d.content_type = :content_type"
-                params["content_type"] = content_type
-                
-            # Add ordering and limit - order by relevance (highest first), then by length
-            search_query += " ORDER BY relevance DESC, LENGTH(dc.chunk_text) DESC LIMIT :k"
-            params["k"] = k
-            
-            # Execute search
-            results = self.db.execute(text(search_query), params).fetchall()
+            # Fixed-shape statement: per-term boosts are computed here and bound as arrays
+            params = {
+                **search.params,
+                "terms": search_terms,
+                "term_boosts": [self._get_query_type_boost(query_type, term) for term in search_terms],
+                "keyword_terms": [term.upper() in TERMINOLOGY_KEYWORDS for term in search_terms],
+                "content_type": content_type,
+                "k": k,
+            }
+            results = get_statement_cache().execute(self.db, MEDICAL_AWARE_SEARCH, params)
             
             # Format results
             formatted_results = []
@@ -680,7 +642,7 @@ class RAGRetriever:
             # Fallback to original text search
             return self._fallback_text_search(query, content_type, k)
 
-    def _get_query_type_boost(self, query_type: str, term: str) -> str:
+    def _get_query_type_boost(self, query_type: str, term: str) -> int:
         """Get query-type-specific scoring boost for a search term."""
         # Define query-type-specific term priorities
         query_boosts = {
@@ -715,65 +677,13 @@ class RAGRetriever:
         term_lower = term.lower()
         
         if term_lower in boosts.get("high", []) or term.upper() in boosts.get("keywords", []):
-            return "75"
+            return 75
         elif term_lower in boosts.get("medium", []):
-            return "50" 
+            return 50
         elif any(keyword.lower() in term_lower for keyword in boosts.get("keywords", [])):
-            return "60"
+            return 60
         else:
-            return "0"
-    
-    def _get_protocol_relevance_calc(self, terms: List[str], query_lower: str) -> str:
-        """
-        Enhanced relevance calculation for protocol queries (PRP-40).
-        Boosts relevant protocol content and penalizes irrelevant results.
-        """
-        base_relevance = []
-        
-        # Base term matching
-        for i in range(len(terms)):
-            base_relevance.append(f"CASE WHEN dc.chunk_text ILIKE :term_{i} THEN 2 ELSE 0 END")
-        
-        # Boost for protocol-specific content
-        protocol_boost = """
-            + CASE 
-                WHEN d.content_type IN ('protocol', 'guideline', 'criteria') THEN 10
-                WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' THEN 8
-                WHEN dr.category IN ('protocol', 'criteria') THEN 8
-                ELSE 0
-            END
-        """
-        
-        # Specific boosting for sepsis content
-        if 'sepsis' in query_lower:
-            sepsis_boost = """
-                + CASE 
-                    WHEN dc.chunk_text ILIKE '%sepsis%' AND dc.chunk_text ILIKE '%lactate%' THEN 20
-                    WHEN dc.chunk_text ILIKE '%sepsis%' AND dc.chunk_text ILIKE '%protocol%' THEN 15
-                    WHEN dc.chunk_text ILIKE '%sepsis%' THEN 10
-                    WHEN dc.chunk_text ILIKE '%lactate%' AND dc.chunk_text ILIKE '%shock%' THEN 10
-                    WHEN dc.chunk_text ILIKE '%sirs%' OR dc.chunk_text ILIKE '%infection%' THEN 5
-                    ELSE 0
-                END
-            """
-        else:
-            sepsis_boost = ""
-        
-        # Penalty for irrelevant content
-        irrelevant_penalty = """
-            - CASE 
-                WHEN d.filename ILIKE '%chf%' OR dc.chunk_text ILIKE '%heart failure%' THEN 50
-                WHEN d.filename ILIKE '%referral%' OR dc.chunk_text ILIKE '%referral line%' THEN 50
-                WHEN d.filename ILIKE '%photography%' OR d.filename ILIKE '%context_enhancement%' THEN 100
-                WHEN d.filename ILIKE '%test%' OR d.filename ILIKE '%example%' THEN 75
-                ELSE 0
-            END
-        """
-        
-        # Combine all components
-        relevance_calc = " + ".join(base_relevance) + protocol_boost + sepsis_boost + irrelevant_penalty
-        
-        return relevance_calc
+            return 0
     
     def _extract_search_terms(self, query: str) -> List[str]:
         """Extract meaningful search terms from a query."""
@@ -883,3 +793,11 @@ class RAGRetriever:
         except Exception as e:
             logger.error(f"Failed to get document by filename: {e}")
             return None
+
+    async def get_document_by_filename_async(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_document_by_filename on the retrieval repository."""
+        try:
+            return await self.repository.get_document_by_filename(filename)
+        except Exception as e:
+            logger.error(f"Failed to get document by filename: {e}")
+            return None
@@ -0,0 +1,298 @@
+"""
+Fixed-shape SQL for RAGRetriever's text searches.
+Each statement's text is constant: query terms, per-term boosts and optional
+filters are bound parameters (term lists as arrays), so Postgres can parse and
+plan every shape once per pooled connection instead of once per query. On
+psycopg2 the statements are PREPAREd on the connection and run with EXECUTE;
+asyncpg prepares and caches statements per connection by itself.
+"""
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from ..observability.metrics import metrics
+from .text_search import TS_CONFIG, ChunkTextSearch
+
+logger = logging.getLogger(__name__)
+
+# Key in the pooled DBAPI connection's info dict, which lives as long as the
+# server session and therefore as long as its prepared statements
+PREPARED_KEY = "edbot_prepared_statements"
+
+# Named binds; "::" casts are not binds
+_BIND = re.compile(r"(?<![:\w]):(\w+)")
+
+
+@dataclass(frozen=True)
+class RetrievalStatement:
+    """A named statement whose SQL never changes between queries."""
+
+    name: str
+    sql: str
+
+    @cached_property
+    def text(self) -> TextClause:
+        return text(self.sql)
+
+    @cached_property
+    def param_names(self) -> Tuple[str, ...]:
+        """Bind names in order of first use."""
+        return tuple(dict.fromkeys(_BIND.findall(self.sql)))
+
+    @cached_property
+    def prepare_sql(self) -> str:
+        """PREPARE with positional $n placeholders; Postgres infers their types."""
+        positions = {name: i for i, name in enumerate(self.param_names, start=1)}
+        body = _BIND.sub(lambda m: f"${positions[m.group(1)]}", self.sql)
+        return f"PREPARE {self.name} AS {body}"
+
+    @cached_property
+    def execute_sql(self) -> str:
+        """EXECUTE with psycopg2 pyformat placeholders."""
+        if not self.param_names:
+            return f"EXECUTE {self.name}"
+        return f"EXECUTE {self.name}(" + ", ".join(f"%({name})s" for name in self.param_names) + ")"
+
+
+class PreparedStatementCache:
+    """Runs RetrievalStatements as prepared statements and counts plan-cache hits.
+
+    A hit is an execution on a connection that already has the statement
+    prepared, so Postgres skips parsing and (once it settles on a generic
+    plan) planning.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def execute(self, session: Session, statement: RetrievalStatement, params: Dict[str, Any]) -> List[Row]:
+        """Run the statement on the session's connection and return all rows."""
+        connection = session.connection()
+        if connection.dialect.driver != "psycopg2":
+            # Other drivers (asyncpg, psycopg 3) prepare repeated statements themselves
+            return list(session.execute(statement.text, params).fetchall())
+
+        prepared = connection.info.setdefault(PREPARED_KEY, set())
+        hit = statement.name in prepared
+        if not hit:
+            connection.exec_driver_sql(statement.prepare_sql, execution_options={"no_parameters": True})
+            prepared.add(statement.name)
+        self._record(statement, hit)
+
+        values = {name: params[name] for name in statement.param_names}
+        return list(connection.exec_driver_sql(statement.execute_sql, values).fetchall())
+
+    def _record(self, statement: RetrievalStatement, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.track_prepared_statement(statement.name, hit)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_statement_cache = PreparedStatementCache()
+
+
+def get_statement_cache() -> PreparedStatementCache:
+    """Get the process-wide prepared statement cache."""
+    return _statement_cache
+
+
+# Search fragments with the param names the retrievers bind
+TEXT_SEARCH = ChunkTextSearch(ts_query="")
+ALL_TERMS_SEARCH = ChunkTextSearch(ts_query="", param="all_terms", fuzzy=False)
+ANY_TERMS_SEARCH = ChunkTextSearch(ts_query="", param="any_terms")
+
+_CHUNK_COLUMNS = """
+        dc.id,
+        dc.document_id,
+        dc.chunk_text,
+        dc.chunk_index,
+        dc.metadata,
+        d.filename,
+        d.content_type,
+        d.file_type,
+        dr.display_name,
+        dr.category"""
+
+_CHUNK_JOINS = """
+    FROM document_chunks dc
+    JOIN documents d ON dc.document_id = d.id
+    LEFT JOIN document_registry dr ON d.id = dr.document_id"""
+
+# NULL content_type means no filter
+_CONTENT_TYPE_FILTER = "(CAST(:content_type AS text) IS NULL OR d.content_type = CAST(:content_type AS text))"
+
+# Medical-aware relevance: text rank plus document and content boosts
+_TEXT_SEARCH_RELEVANCE = f"""
+        {TEXT_SEARCH.rank_sql} * 100
+        -- Medical document priority boost
+        + (CASE
+            WHEN d.content_type IN ('protocol', 'guideline', 'criteria', 'medication') THEN 50
+            WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' OR d.filename ILIKE '%clinical%' THEN 25
+            WHEN dr.category IN ('protocol', 'criteria', 'dosage', 'form') THEN 40
+            ELSE 0
+        END)
+        -- Medical content boost
+        + (CASE
+            WHEN dc.chunk_text ILIKE '%mg%' OR dc.chunk_text ILIKE '%ml%' OR dc.chunk_text ILIKE '%dose%' OR dc.chunk_text ILIKE '%units%' THEN 20
+            WHEN dc.chunk_text ILIKE '%contact%' OR dc.chunk_text ILIKE '%pager%' OR dc.chunk_text ILIKE '%phone%' THEN 15
+            ELSE 0
+        END)
+        -- Penalize non-medical content
+        - (CASE
+            WHEN d.filename ILIKE '%context_enhancement%' OR d.filename ILIKE '%photography%' OR d.filename ILIKE '%guide%' THEN 100
+            WHEN d.content_type = 'general' OR dr.category = 'general' THEN 50
+            ELSE 0
+        END)"""
+
+FALLBACK_TEXT_SEARCH = RetrievalStatement("edbot_text_search", f"""
+    SELECT {_CHUNK_COLUMNS},
+        ({_TEXT_SEARCH_RELEVANCE}) as relevance
+    {_CHUNK_JOINS}
+    WHERE {TEXT_SEARCH.where_sql}
+    AND {_CONTENT_TYPE_FILTER}
+    ORDER BY relevance DESC, LENGTH(dc.chunk_text) DESC
+    LIMIT :k
+""")
+
+
+def _protocol_relevance(rank_sql: str) -> str:
+    """
+    Enhanced relevance calculation for protocol queries (PRP-40).
+    Boosts relevant protocol content and penalizes irrelevant results;
+    :protocol_query selects it over the plain rank, :sepsis_query adds the
+    sepsis boosts.
+    """
+    return f"""CASE WHEN CAST(:protocol_query AS boolean) THEN
+            -- Base text match rank, in [0, 1)
+            {rank_sql} * 10
+            -- Boost for protocol-specific content
+            + CASE
+                WHEN d.content_type IN ('protocol', 'guideline', 'criteria') THEN 10
+                WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' THEN 8
+                WHEN dr.category IN ('protocol', 'criteria') THEN 8
+                ELSE 0
+            END
+            -- Specific boosting for sepsis content
+            + CASE WHEN CAST(:sepsis_query AS boolean) THEN
+                CASE
+                    WHEN dc.chunk_text ILIKE '%sepsis%' AND dc.chunk_text ILIKE '%lactate%' THEN 20
+                    WHEN dc.chunk_text ILIKE '%sepsis%' AND dc.chunk_text ILIKE '%protocol%' THEN 15
+                    WHEN dc.chunk_text ILIKE '%sepsis%' THEN 10
+                    WHEN dc.chunk_text ILIKE '%lactate%' AND dc.chunk_text ILIKE '%shock%' THEN 10
+                    WHEN dc.chunk_text ILIKE '%sirs%' OR dc.chunk_text ILIKE '%infection%' THEN 5
+                    ELSE 0
+                END
+            ELSE 0 END
+            -- Penalty for irrelevant content
+            - CASE
+                WHEN d.filename ILIKE '%chf%' OR dc.chunk_text ILIKE '%heart failure%' THEN 50
+                WHEN d.filename ILIKE '%referral%' OR dc.chunk_text ILIKE '%referral line%' THEN 50
+                WHEN d.filename ILIKE '%photography%' OR d.filename ILIKE '%context_enhancement%' THEN 100
+                WHEN d.filename ILIKE '%test%' OR d.filename ILIKE '%example%' THEN 75
+                ELSE 0
+            END
+        ELSE {rank_sql} END"""
+
+
+def _simple_search(name: str, search: ChunkTextSearch) -> RetrievalStatement:
+    return RetrievalStatement(name, f"""
+    SELECT {_CHUNK_COLUMNS},
+        ({_protocol_relevance(search.rank_sql)}) as relevance
+    {_CHUNK_JOINS}
+    WHERE {search.where_sql}
+    AND LENGTH(dc.chunk_text) > 20
+    ORDER BY relevance DESC, d.filename, LENGTH(dc.chunk_text) ASC
+    LIMIT :k
+""")
+
+
+# All key terms, then (when that is too restrictive) any of them
+SIMPLE_SEARCH_ALL = _simple_search("edbot_simple_search_all", ALL_TERMS_SEARCH)
+SIMPLE_SEARCH_ANY = _simple_search("edbot_simple_search_any", ANY_TERMS_SEARCH)
+
+# Per-term matches, aggregated over the bound term arrays: :terms, their
+# query-type boosts (:term_boosts) and whether each is a key medical term
+# (:keyword_terms, a flat terminology boost instead of the content one)
+_TERM_MATCHES = f"""
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS matched,
+            COUNT(*) FILTER (WHERE t.keyword) AS keyword_matches,
+            COALESCE(SUM(t.boost), 0) AS query_type_boost
+        FROM unnest(
+            CAST(:terms AS text[]), CAST(:term_boosts AS integer[]), CAST(:keyword_terms AS boolean[])
+        ) AS t(term, boost, keyword)
+        WHERE dc.search_vector @@ plainto_tsquery('{TS_CONFIG}', t.term)
+    ) tm"""
+
+# Each matched term scores the document and content boosts once, plus its own boosts
+_MEDICAL_AWARE_RELEVANCE = f"""
+        {TEXT_SEARCH.rank_sql} * 200
+        + tm.matched * (
+            -- Medical document priority boost (highest priority)
+            (CASE
+                WHEN d.content_type IN ('protocol', 'guideline', 'criteria', 'medication') THEN 100
+                WHEN d.filename ILIKE '%protocol%' OR d.filename ILIKE '%guideline%' OR d.filename ILIKE '%clinical%' THEN 80
+                WHEN dr.category IN ('protocol', 'criteria', 'dosage', 'form') THEN 90
+                WHEN d.filename ILIKE '%STEMI%' OR d.filename ILIKE '%epinephrine%' OR d.filename ILIKE '%ottawa%' THEN 150
+                ELSE 0
+            END)
+
+            -- Heavily penalize non-medical content (must be negative to truly penalize)
+            - (CASE
+                WHEN d.filename ILIKE '%context_enhancement%' OR d.filename ILIKE '%photography%' OR d.filename ILIKE '%guide%' OR d.filename ILIKE '%readme%' THEN 200
+                WHEN d.content_type = 'general' OR dr.category = 'general' OR d.filename ILIKE '%test%' THEN 100
+                WHEN d.filename ILIKE '%phase_%' OR d.filename ILIKE '%dev%' OR d.filename ILIKE '%example%' THEN 150
+                ELSE 0
+            END)
+
+            -- Boost for term matches in clinical content
+            + (CASE
+                WHEN dc.chunk_text ILIKE '%protocol%' THEN 25
+                WHEN dc.chunk_text ILIKE '%treatment%' THEN 20
+                WHEN dc.chunk_text ILIKE '%dose%' THEN 30
+                ELSE 0
+            END)
+        )
+        -- Medical terminology boost
+        + tm.keyword_matches * 60
+        + (tm.matched - tm.keyword_matches) * (CASE
+            WHEN dc.chunk_text ILIKE '%mg%' OR dc.chunk_text ILIKE '%ml%' OR dc.chunk_text ILIKE '%dose%' OR dc.chunk_text ILIKE '%units%' THEN 40
+            WHEN dc.chunk_text ILIKE '%contact%' OR dc.chunk_text ILIKE '%pager%' OR dc.chunk_text ILIKE '%phone%' OR dc.chunk_text ILIKE '%917-%' THEN 50
+            WHEN dc.chunk_text ILIKE '%emergency%' OR dc.chunk_text ILIKE '%urgent%' OR dc.chunk_text ILIKE '%acute%' THEN 30
+            ELSE 0
+        END)
+        -- Query-type specific boost
+        + tm.query_type_boost"""
+
+MEDICAL_AWARE_SEARCH = RetrievalStatement("edbot_medical_aware_search", f"""
+    SELECT {_CHUNK_COLUMNS},
+        ({_MEDICAL_AWARE_RELEVANCE}) as relevance
+    {_CHUNK_JOINS}
+    {_TERM_MATCHES}
+    WHERE {TEXT_SEARCH.where_sql}
+    AND {_CONTENT_TYPE_FILTER}
+    ORDER BY relevance DESC, LENGTH(dc.chunk_text) DESC
+    LIMIT :k
+""")
@@ -18,13 +18,13 @@ from ..models.entities import (
 )
 from ..models.query_types import QueryType
 from ..observability import qa_metrics
-from ..search.elasticsearch_client import ElasticsearchClient
+from ..search.elasticsearch_client import get_async_elasticsearch_client
 
 # from ..ai.gpt_oss_client import GPTOSSClient  # Remove tight coupling
 from ..validation.medical_validator import MedicalValidator
 from ..validation.protocol_validator import ProtocolResponseValidator
 from .hybrid_retriever import HybridRetriever
-from .qa_index import QAIndex
+from .knowledge_base import get_knowledge_base
 from .rag_retriever import RAGRetriever
 from .source_highlighter import SourceHighlighter
 from .table_retriever import TableRetriever
@@ -61,8 +61,8 @@ class QueryRouter:
         self.rag_retriever = RAGRetriever(db)
 
         if settings and settings.search_backend == "hybrid":
-            # Initialize hybrid retriever
-            es_client = ElasticsearchClient(settings)
+            # Initialize hybrid retriever on the process-wide pooled client
+            es_client = get_async_elasticsearch_client(settings)
             self.retriever = HybridRetriever(
                 self.rag_retriever, es_client, settings)
             logger.info("Initialized HybridRetriever for search backend")
@@ -71,8 +71,8 @@ class QueryRouter:
             self.retriever = self.rag_retriever
             logger.info("Using RAGRetriever as search backend")
 
-        # Ground-truth QA fallback
-        self.qa_index = QAIndex.load()
+        # Ground-truth QA fallback (shared process-wide snapshot)
+        self.qa_index = get_knowledge_base().snapshot.qa_index
 
     async def route_query(
         self,
@@ -163,18 +163,15 @@ class QueryRouter:
         logger.info(
             f"DEBUG: Expected type='{expected}', possible_types={possible_types}")
 
-        # Try each possible type
-        best_match = None
-        for qa_type in possible_types:
-            match = self.qa_index.find_best(query, expected_type=qa_type)
-            if match:
-                entry, score = match
-                logger.info(
-                    f"DEBUG: Type '{qa_type}' found match: score={score:.3f}, question='{entry.question[:50]}...'")
-                if not best_match or score > best_match[1]:
-                    best_match = match
-            else:
-                logger.info(f"DEBUG: Type '{qa_type}' found no match")
+        # Try all possible types in one index lookup
+        matches = self.qa_index.find_top_k(query, types=possible_types, k=1)
+        best_match = matches[0] if matches else None
+        if best_match:
+            entry, score = best_match
+            logger.info(
+                f"DEBUG: Type '{entry.query_type}' found match: score={score:.3f}, question='{entry.question[:50]}...'")
+        else:
+            logger.info(f"DEBUG: Types {possible_types} found no match")
 
         # If no type-specific match, try without type restriction
         if not best_match:
@@ -294,7 +291,7 @@ class QueryRouter:
 
             else:
                 # Use traditional RAG retrieval
-                return self.rag_retriever.retrieve_for_query_type(
+                return await self.rag_retriever.retrieve_for_query_type_async(
                     query=query,
                     query_type=query_type.value.lower(),
                     k=k
@@ -3,13 +3,17 @@ EMERGENCY FIX: Simple direct database retriever with enhanced quality
 Bypasses complex systems but includes BM25 scoring and multi-source retrieval.
 """
 
+import asyncio
 import logging
+from contextlib import aclosing
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from .text_search import build_chunk_text_search
+
 # Import our enhanced components
 try:
     from .bm25_scorer import BM25Scorer, BM25Configuration
@@ -26,17 +30,24 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the LLM RAG path before falling back
+LLM_RAG_TIMEOUT = 30
+LLM_MIN_CONFIDENCE = 0.7
+
 class SimpleDirectRetriever:
     """Enhanced direct database retriever with BM25 scoring and multi-source retrieval."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, medical_expander=None):
         self.db = db
         
         # BULLETPROOF FIX: Enable medical abbreviation expansion (PRP-49)
         self.enhanced_mode = False  # Keep other components disabled for stability
         
         # Initialize medical abbreviation expander for critical gap fixes
-        if MEDICAL_EXPANDER_AVAILABLE:
+        if medical_expander is not None:
+            # Shared expander from the process-wide knowledge base
+            self.medical_expander = medical_expander
+        elif MEDICAL_EXPANDER_AVAILABLE:
             try:
                 self.medical_expander = get_medical_expander()
                 logger.info("✅ Medical abbreviation expander initialized - DKA protocol gap FIXED")
@@ -65,8 +76,109 @@ class SimpleDirectRetriever:
         }
     
     def get_medical_response(self, query: str) -> Dict[str, Any]:
-        """Get medical response with LLM-based RAG retrieval system."""
-        
+        """Get medical response with LLM-based RAG retrieval system.
+
+        Blocking entry point for sync callers. Async code should await
+        get_medical_response_async so the LLM call runs on the server loop.
+        """
+        query = self._expand_abbreviations(query)
+
+        critical_response = self._get_critical_response(query)
+        if critical_response:
+            return critical_response
+
+        # PRIMARY SYSTEM: LLM RAG with Ground Truth Validation
+        llm_response = self._get_llm_rag_response_sync(query)
+        if llm_response:
+            return llm_response
+
+        return self._get_fallback_response(query)
+
+    async def get_medical_response_async(self, query: str) -> Dict[str, Any]:
+        """Async variant of get_medical_response that awaits the LLM RAG call directly."""
+        query = self._expand_abbreviations(query)
+
+        critical_response = await self._get_critical_response_async(query)
+        if critical_response:
+            return critical_response
+
+        # PRIMARY SYSTEM: LLM RAG with Ground Truth Validation
+        try:
+            from ..api.dependencies import get_llm_client
+            from ..models.retrieval_repository import get_retrieval_repository
+            from .llm_rag_retriever import get_llm_rag_response
+
+            logger.info("🤖 Using LLM RAG retrieval system")
+            llm_client = await get_llm_client()
+            llm_response = await asyncio.wait_for(
+                get_llm_rag_response(query, self.db, llm_client, repository=get_retrieval_repository()),
+                timeout=LLM_RAG_TIMEOUT
+            )
+            llm_response = self._accept_llm_response(llm_response)
+            if llm_response:
+                return llm_response
+        except asyncio.TimeoutError as e:
+            logger.error(f"🔥 LLM RAG timeout after {LLM_RAG_TIMEOUT}s: {e}, falling back immediately")
+        except Exception as e:
+            logger.error(f"🔥 LLM RAG retrieval failed, falling back: {e}")
+
+        return await self._get_fallback_response_async(query)
+
+    async def stream_medical_response(self, query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming variant of get_medical_response_async.
+
+        Yields ("response", data) for answers that arrive whole (critical
+        queries and fallbacks), otherwise the LLM RAG "sources", "token" and
+        "done" events. The LLM path falls back if it fails, produces nothing
+        or has not produced its first token within LLM_RAG_TIMEOUT; later
+        failures propagate. A finished answer that _accept_llm_response
+        rejects ends with ("replace", fallback) instead of "done".
+        """
+        query = self._expand_abbreviations(query)
+
+        critical_response = await self._get_critical_response_async(query)
+        if critical_response:
+            yield "response", critical_response
+            return
+
+        streaming = False
+        try:
+            from ..api.dependencies import get_llm_client
+            from ..models.retrieval_repository import get_retrieval_repository
+            from .llm_rag_retriever import LLMRAGRetriever
+
+            logger.info("🤖 Streaming LLM RAG retrieval system")
+            llm_client = await get_llm_client()
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + LLM_RAG_TIMEOUT
+            rag = LLMRAGRetriever(self.db, llm_client, repository=get_retrieval_repository())
+            async with aclosing(rag.stream_llm_response(query, min_confidence=LLM_MIN_CONFIDENCE)) as events:
+                while True:
+                    try:
+                        if streaming:
+                            event = await anext(events)
+                        else:
+                            event = await asyncio.wait_for(anext(events), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if event[0] == "done" and not self._accept_llm_response(event[1]):
+                        break
+                    streaming = streaming or event[0] == "token"
+                    yield event
+                    if event[0] == "done":
+                        return
+        except Exception as e:
+            if streaming:
+                raise
+            if isinstance(e, asyncio.TimeoutError):
+                logger.error(f"🔥 LLM RAG first token timeout after {LLM_RAG_TIMEOUT}s, falling back immediately")
+            else:
+                logger.error(f"🔥 LLM RAG streaming failed, falling back: {e}")
+
+        yield "replace" if streaming else "response", await self._get_fallback_response_async(query)
+
+    def _expand_abbreviations(self, query: str) -> str:
+        """Expand medical abbreviations before retrieval (PRP-49)."""
         # BULLETPROOF FIX: Expand medical abbreviations FIRST (PRP-49)
         original_query = query
         if self.medical_expander:
@@ -82,49 +194,90 @@ class SimpleDirectRetriever:
                         logger.info("🚨 Critical medical abbreviation detected - using comprehensive expansion")
             except Exception as e:
                 logger.error(f"Medical abbreviation expansion failed: {e}")
-        
+        return query
+
+    def _is_critical_query(self, query_lower: str) -> bool:
+        """Life-critical queries are answered by the bulletproof system first."""
         # CRITICAL MEDICAL SAFETY OVERRIDE: Use bulletproof system for life-critical queries
         CRITICAL_MEDICAL_QUERIES = [
             'stemi', 'sepsis', 'anaphylaxis', 'stroke', 'cardiac arrest', 'overdose', 'trauma',
             'diabetic ketoacidosis', 'dka', 'myocardial infarction', 'heart attack'
         ]
+        return any(critical_term in query_lower for critical_term in CRITICAL_MEDICAL_QUERIES)
+
+    def _get_critical_dka_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """Direct DKA protocol response, or None to continue."""
         query_lower = query.lower()
-        
-        if any(critical_term in query_lower for critical_term in CRITICAL_MEDICAL_QUERIES):
-            logger.info(f"🚨 CRITICAL MEDICAL QUERY detected: {query}. Using bulletproof retrieval for safety.")
-            
-            # BULLETPROOF FIX: Direct DKA protocol handling (PRP-49)
-            if 'dka' in query_lower or 'diabetic ketoacidosis' in query_lower:
-                dka_response = self._get_direct_dka_response(query)
-                if dka_response and dka_response.get('has_real_content'):
-                    logger.info("✅ Direct DKA protocol response successful")
-                    dka_response['critical_override'] = True
-                    return dka_response
-            
-            try:
-                from .bulletproof_retriever import get_bulletproof_response
-                bulletproof_response = get_bulletproof_response(query, self.db)
-                if bulletproof_response.get('has_real_content'):
-                    logger.info("✅ Bulletproof critical response successful")
-                    bulletproof_response['critical_override'] = True
-                    return bulletproof_response
-            except Exception as e:
-                logger.error(f"Bulletproof critical query failed: {e}")
-        
-        # PRIMARY SYSTEM: LLM RAG with Ground Truth Validation
+        # BULLETPROOF FIX: Direct DKA protocol handling (PRP-49)
+        if 'dka' in query_lower or 'diabetic ketoacidosis' in query_lower:
+            dka_response = self._get_direct_dka_response(query)
+            if dka_response and dka_response.get('has_real_content'):
+                logger.info("✅ Direct DKA protocol response successful")
+                dka_response['critical_override'] = True
+                return dka_response
+        return None
+
+    def _accept_critical_response(self, bulletproof_response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if bulletproof_response.get('has_real_content'):
+            logger.info("✅ Bulletproof critical response successful")
+            bulletproof_response['critical_override'] = True
+            return bulletproof_response
+        return None
+
+    def _get_critical_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """Bulletproof answer for life-critical queries, or None to continue."""
+        if not self._is_critical_query(query.lower()):
+            return None
+
+        logger.info(f"🚨 CRITICAL MEDICAL QUERY detected: {query}. Using bulletproof retrieval for safety.")
+
+        dka_response = self._get_critical_dka_response(query)
+        if dka_response:
+            return dka_response
+
         try:
-            from ..api.dependencies import get_llm_client
+            from .bulletproof_retriever import get_bulletproof_response
+            return self._accept_critical_response(get_bulletproof_response(query, self.db))
+        except Exception as e:
+            logger.error(f"Bulletproof critical query failed: {e}")
+        return None
+
+    async def _get_critical_response_async(self, query: str) -> Optional[Dict[str, Any]]:
+        """Async variant of _get_critical_response."""
+        if not self._is_critical_query(query.lower()):
+            return None
+
+        logger.info(f"🚨 CRITICAL MEDICAL QUERY detected: {query}. Using bulletproof retrieval for safety.")
+
+        # The DKA lookup is sync SQL on the request session
+        dka_response = await asyncio.to_thread(self._get_critical_dka_response, query)
+        if dka_response:
+            return dka_response
+
+        try:
+            from .bulletproof_retriever import get_bulletproof_response_async
+            return self._accept_critical_response(await get_bulletproof_response_async(query, self.db))
+        except Exception as e:
+            logger.error(f"Bulletproof critical query failed: {e}")
+        return None
+
+    def _get_llm_rag_response_sync(self, query: str) -> Optional[Dict[str, Any]]:
+        """Run LLM RAG from sync code on a private event loop and client."""
+        try:
+            from ..api.dependencies import create_llm_client
             from .llm_rag_retriever import get_llm_rag_response
             import concurrent.futures
-            import asyncio
             
             logger.info("🤖 Using LLM RAG retrieval system")
             
-            # Use ThreadPoolExecutor to handle async in sync context
+            # The shared client is bound to the server loop, so this thread gets its own
             def run_llm_rag_sync():
                 async def async_rag():
-                    llm_client = await get_llm_client()
-                    return await get_llm_rag_response(query, self.db, llm_client)
+                    llm_client = await create_llm_client()
+                    try:
+                        return await get_llm_rag_response(query, self.db, llm_client)
+                    finally:
+                        await llm_client.close()
                 
                 # Create new event loop in thread
                 loop = asyncio.new_event_loop()
@@ -137,29 +290,34 @@ class SimpleDirectRetriever:
             # Execute in thread pool to avoid event loop conflicts
             with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
                 future = executor.submit(run_llm_rag_sync)
-                llm_response = future.result(timeout=30)  # Increased timeout for complex medical queries
+                llm_response = future.result(timeout=LLM_RAG_TIMEOUT)
             
-            # If LLM RAG system finds a good answer, use it
-            if llm_response.get('has_real_content') and llm_response.get('confidence', 0) > 0.7:
-                logger.info(f"✅ LLM RAG retrieval successful (confidence: {llm_response.get('confidence', 0):.2%})")
-                return llm_response
-            else:
-                logger.warning(f"⚠️ LLM RAG low confidence ({llm_response.get('confidence', 0):.2%}), falling back")
+            return self._accept_llm_response(llm_response)
             
         except (TimeoutError, concurrent.futures.TimeoutError) as e:
-            logger.error(f"🔥 LLM RAG timeout after 30s: {e}, falling back immediately")
+            logger.error(f"🔥 LLM RAG timeout after {LLM_RAG_TIMEOUT}s: {e}, falling back immediately")
         except Exception as e:
             logger.error(f"🔥 LLM RAG retrieval failed, falling back: {e}")
-        
+        return None
+
+    def _accept_llm_response(self, llm_response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the LLM RAG response if it is confident enough to use."""
+        # If LLM RAG system finds a good answer, use it
+        if llm_response.get('has_real_content') and llm_response.get('confidence', 0) > LLM_MIN_CONFIDENCE:
+            logger.info(f"✅ LLM RAG retrieval successful (confidence: {llm_response.get('confidence', 0):.2%})")
+            return llm_response
+        logger.warning(f"⚠️ LLM RAG low confidence ({llm_response.get('confidence', 0):.2%}), falling back")
+        return None
+
+    def _get_fallback_response(self, query: str) -> Dict[str, Any]:
+        """Bulletproof retrieval, then the basic medical response system."""
         # FALLBACK 1: Bulletproof system with ground truth validation
         try:
             from .bulletproof_retriever import get_bulletproof_response
             
             logger.info("🛡️ Falling back to bulletproof retrieval system")
-            bulletproof_response = get_bulletproof_response(query, self.db)
-            
-            if bulletproof_response.get('has_real_content') or bulletproof_response.get('confidence', 0) > 0.6:
-                logger.info("✅ Bulletproof retrieval successful")
+            bulletproof_response = self._accept_bulletproof_response(get_bulletproof_response(query, self.db))
+            if bulletproof_response:
                 return bulletproof_response
             
         except Exception as e:
@@ -172,6 +330,37 @@ class SimpleDirectRetriever:
             return self._get_enhanced_medical_response(query)
         else:
             return self._get_basic_medical_response(query)
+
+    async def _get_fallback_response_async(self, query: str) -> Dict[str, Any]:
+        """Async variant of _get_fallback_response."""
+        try:
+            from .bulletproof_retriever import get_bulletproof_response_async
+            
+            logger.info("🛡️ Falling back to bulletproof retrieval system")
+            bulletproof_response = self._accept_bulletproof_response(
+                await get_bulletproof_response_async(query, self.db)
+            )
+            if bulletproof_response:
+                return bulletproof_response
+            
+        except Exception as e:
+            logger.error(f"Bulletproof retrieval failed: {e}")
+        
+        logger.info("⚠️ Falling back to basic medical response system")
+        
+        if self.enhanced_mode:
+            return await asyncio.to_thread(self._get_enhanced_medical_response, query)
+        
+        medication_result = await self._get_medication_response_async(query)
+        if medication_result:
+            return medication_result
+        return await asyncio.to_thread(self._get_rule_based_response, query)
+
+    def _accept_bulletproof_response(self, bulletproof_response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if bulletproof_response.get('has_real_content') or bulletproof_response.get('confidence', 0) > 0.6:
+            logger.info("✅ Bulletproof retrieval successful")
+            return bulletproof_response
+        return None
     
     def _get_enhanced_medical_response(self, query: str) -> Dict[str, Any]:
         """Get enhanced medical response using BM25 and multi-source retrieval."""
@@ -222,8 +411,6 @@ class SimpleDirectRetriever:
     
     def _get_basic_medical_response(self, query: str) -> Dict[str, Any]:
         """Fallback to basic medical response (enhanced with PRP-47 improvements)."""
-        query_lower = query.lower()
-        
         # PRP-48: Try medication-specific search first
         try:
             from .medication_search_fix import MedicationSearchFix
@@ -237,6 +424,27 @@ class SimpleDirectRetriever:
         except Exception as e:
             logger.warning(f"MedicationSearchFix failed: {e}")
         
+        return self._get_rule_based_response(query)
+    
+    async def _get_medication_response_async(self, query: str) -> Optional[Dict[str, Any]]:
+        """Async PRP-48 medication-specific search on the retrieval repository."""
+        try:
+            from .medication_search_fix import MedicationSearchFix
+            medication_fix = MedicationSearchFix(self.db)
+            
+            if medication_fix.should_use_medication_fix(query):
+                medication_result = await medication_fix.get_targeted_medication_response_async(query)
+                if medication_result:
+                    logger.info(f"✅ MedicationSearchFix found result for: {query}")
+                    return medication_result
+        except Exception as e:
+            logger.warning(f"MedicationSearchFix failed: {e}")
+        return None
+    
+    def _get_rule_based_response(self, query: str) -> Dict[str, Any]:
+        """Count, capability, contact, form and protocol rules, then full content search."""
+        query_lower = query.lower()
+        
         # PRP-47: Handle count queries first
         if self._is_count_query(query_lower):
             return self._handle_count_query(query)
@@ -268,20 +476,11 @@ class SimpleDirectRetriever:
     def _enhanced_multi_source_search(self, query: str, expanded_terms: List[str], k: int = 5) -> List[Any]:
         """Enhanced search that returns multiple sources with BM25-ready format."""
         try:
-            # Build comprehensive search with medical awareness
-            search_conditions = []
-            params = {}
-            
-            # Use both original query and expanded terms
-            all_terms = [query] + expanded_terms[:3]  # Limit to avoid too many terms
-            
-            for i, term in enumerate(all_terms):
-                param_name = f"term_{i}"
-                search_conditions.append(f"dc.chunk_text ILIKE :{param_name}")
-                params[param_name] = f"%{term}%"
-            
-            # Build query with medical-aware boosting
-            where_clause = " OR ".join(search_conditions)
+            # Full-text match on the query words and expanded terms (indexed search_vector)
+            search = build_chunk_text_search(query.split() + expanded_terms[:3])  # Limit to avoid too many terms
+            if search is None:
+                return []
+            params = dict(search.params)
             
             search_query = f"""
                 SELECT 
@@ -306,9 +505,9 @@ class SimpleDirectRetriever:
                 FROM document_chunks dc
                 JOIN documents d ON dc.document_id = d.id
                 LEFT JOIN document_registry dr ON d.id = dr.document_id
-                WHERE ({where_clause})
+                WHERE {search.where_sql}
                 AND LENGTH(dc.chunk_text) > 30
-                ORDER BY relevance DESC, LENGTH(dc.chunk_text) DESC
+                ORDER BY relevance DESC, {search.rank_sql} DESC, LENGTH(dc.chunk_text) DESC
                 LIMIT :k
             """
             
@@ -0,0 +1,164 @@
+"""
+Postgres full-text search over document chunks.
+Builds index-backed match/rank SQL on the generated document_chunks.search_vector
+column (websearch_to_tsquery + ts_rank_cd), OR-ing medical terms with their
+synonyms, plus a pg_trgm word-similarity match so misspelled drug and
+condition names still find their chunks.
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .bm25_index import STOP_WORDS, query_terms
+from .medical_synonym_expander import MedicalSynonymExpander
+
+# Must match the generated column's configuration or the GIN index is not used
+TS_CONFIG = "english"
+
+# Synonym categories that name the same concept; specialties/urgency/query-type
+# contexts broaden too far to OR into a match
+SYNONYM_CATEGORIES = ("abbreviations", "clinical_conditions", "medications", "procedures", "common_phrases")
+MAX_SYNONYMS_PER_TERM = 3
+
+# Shorter words share too few trigrams to match fuzzily
+MIN_FUZZY_TERM_LENGTH = 4
+MAX_FUZZY_TERMS = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def _synonym_map() -> Dict[str, List[str]]:
+    """Lowercased medical term -> synonyms, from the current knowledge base snapshot."""
+    from .knowledge_base import get_knowledge_base
+    return _category_synonyms(get_knowledge_base().snapshot.synonym_expander)
+
+
+@lru_cache(maxsize=1)
+def _category_synonyms(expander: MedicalSynonymExpander) -> Dict[str, List[str]]:
+    # Keyed on the snapshot's expander, so a reload rebuilds the map once
+    loaded = expander.synonyms
+    synonyms: Dict[str, List[str]] = {}
+    for category in SYNONYM_CATEGORIES:
+        for term, values in loaded.get(category, {}).items():
+            synonyms.setdefault(term.lower(), []).extend(values)
+    return synonyms
+
+
+def _phrase(text: str) -> Optional[str]:
+    # Only words are kept (and the literal "or"/quotes/"-" that websearch parses
+    # as operators dropped) so user input cannot change the query's structure
+    words = [word for word in _WORD.findall(text.lower()) if word != "or"]
+    if not words:
+        return None
+    return words[0] if len(words) == 1 else '"' + " ".join(words) + '"'
+
+
+def websearch_query(terms: Sequence[str], match_all: bool = False, expand_synonyms: bool = True) -> str:
+    """Build websearch_to_tsquery input for search terms.
+
+    Args:
+        terms: Words or phrases to search for
+        match_all: Require every term (synonyms are skipped since websearch
+            syntax cannot group them); otherwise any term or synonym matches
+        expand_synonyms: OR each term with its medical synonyms
+
+    Returns:
+        Query text such as 'stemi or "st elevation myocardial infarction"'
+    """
+    phrases: List[str] = []
+    for term in terms:
+        candidates = [term]
+        if expand_synonyms and not match_all:
+            candidates += _synonym_map().get(term.lower(), [])[:MAX_SYNONYMS_PER_TERM]
+        for candidate in candidates:
+            phrase = _phrase(candidate)
+            if phrase and phrase not in phrases:
+                phrases.append(phrase)
+    return (" " if match_all else " or ").join(phrases)
+
+
+@dataclass
+class ChunkTextSearch:
+    """Match and rank SQL fragments for one chunk text search, with their bind params.
+
+    The fragments reference the chunk table by alias so each retriever keeps
+    its own SELECT list, joins and boosts. The SQL depends only on alias,
+    param and whether fuzzy matching is on, never on the query, so callers
+    get one statement shape per search kind.
+    """
+
+    ts_query: str
+    fuzzy_terms: List[str] = field(default_factory=list)
+    alias: str = "dc"
+    param: str = "ts_query"
+    fuzzy: bool = True
+
+    @property
+    def tsquery_sql(self) -> str:
+        return f"websearch_to_tsquery('{TS_CONFIG}', :{self.param})"
+
+    @property
+    def match_sql(self) -> str:
+        """Full-text match, served by the GIN index on search_vector."""
+        return f"{self.alias}.search_vector @@ {self.tsquery_sql}"
+
+    @property
+    def fuzzy_sql(self) -> Optional[str]:
+        """Trigram word-similarity match against any fuzzy term, served by the pg_trgm index."""
+        if not self.fuzzy:
+            return None
+        # chunk_text %> term is term <% chunk_text with the indexed column on the left
+        return f"{self.alias}.chunk_text %> ANY(CAST(:{self.param}_fuzzy AS text[]))"
+
+    @property
+    def where_sql(self) -> str:
+        """Full-text or fuzzy match, parenthesized for use inside a larger WHERE."""
+        if self.fuzzy_sql:
+            return f"({self.match_sql} OR {self.fuzzy_sql})"
+        return f"({self.match_sql})"
+
+    @property
+    def rank_sql(self) -> str:
+        """Cover-density rank scaled to [0, 1) (normalization 32: rank / (rank + 1))."""
+        return f"ts_rank_cd({self.alias}.search_vector, {self.tsquery_sql}, 32)"
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {self.param: self.ts_query}
+        if self.fuzzy:
+            params[f"{self.param}_fuzzy"] = list(self.fuzzy_terms)
+        return params
+
+
+def build_chunk_text_search(
+    query: Union[str, Sequence[str]],
+    match_all: bool = False,
+    expand_synonyms: bool = True,
+    fuzzy: bool = True,
+    alias: str = "dc",
+    param: str = "ts_query",
+) -> Optional[ChunkTextSearch]:
+    """Build the full-text search for a query string or pre-extracted terms.
+
+    Returns:
+        ChunkTextSearch, or None when the query has no searchable words
+    """
+    terms = query_terms(query) if isinstance(query, str) else [t for t in query if t and t.strip()]
+    ts_query = websearch_query(terms, match_all=match_all, expand_synonyms=expand_synonyms)
+    if not ts_query:
+        return None
+
+    fuzzy = fuzzy and not match_all
+    fuzzy_terms: List[str] = []
+    if fuzzy:
+        words = {word for term in terms for word in _WORD.findall(term.lower())}
+        candidates = (w for w in words if len(w) >= MIN_FUZZY_TERM_LENGTH and w not in STOP_WORDS and not w.isdigit())
+        fuzzy_terms = sorted(candidates, key=lambda w: (-len(w), w))[:MAX_FUZZY_TERMS]
+
+    return ChunkTextSearch(ts_query=ts_query, fuzzy_terms=fuzzy_terms, alias=alias, param=param, fuzzy=fuzzy)
+
+
+def term_match_sql(param: str, alias: str = "dc") -> str:
+    """Whether a chunk contains one term, for per-row scoring of already matched chunks."""
+    return f"{alias}.search_vector @@ plainto_tsquery('{TS_CONFIG}', :{param})"
@@ -14,8 +14,8 @@ from src.validation.universal_quality_validator import (
     UniversalQualityValidator,
 )
 
-from .curated_responses import curated_db
 from .enhanced_medical_retriever import EnhancedMedicalRetriever, MedicalContext
+from .knowledge_base import get_knowledge_base
 from .medical_response_formatter import FormattedResponse, MedicalResponseFormatter
 
 logger = logging.getLogger(__name__)
@@ -500,7 +500,8 @@ class UniversalQualityOrchestrator:
         processing_time = (datetime.utcnow() - start_time).total_seconds()
         
         # Try to find any curated response as last resort
-        curated_match = curated_db.find_curated_response(query, threshold=0.3)
+        curated = get_knowledge_base().snapshot.curated
+        curated_match = curated.find_curated_response(query, threshold=0.3)
         if curated_match:
             curated_response, match_score = curated_match
             
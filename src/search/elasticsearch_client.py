@@ -1,12 +1,17 @@
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch, TransportError
 
 from src.config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Stand-in for a search that failed inside an msearch
+EMPTY_RESPONSE: Dict[str, Any] = {"hits": {"total": {"value": 0, "relation": "eq"}, "hits": []}}
+
 
 class ElasticsearchClient:
     """Elasticsearch client with lazy initialization and graceful fallback."""
@@ -57,3 +62,170 @@ class ElasticsearchClient:
         except Exception as e:
             logger.error(f"Failed to get cluster health: {e}")
             return None
+
+
+class AsyncElasticsearchClient:
+    """Process-wide AsyncElasticsearch with a pooled transport and cached availability.
+    
+    Availability is never checked on the request path: a background task pings
+    the cluster every `elasticsearch_health_interval` seconds, and a transport
+    error on a search marks the cluster unavailable until the next good ping.
+    """
+    
+    def __init__(self, settings: Settings, client: Optional[AsyncElasticsearch] = None):
+        self.settings = settings
+        self.enabled = settings.search_backend == "hybrid"
+        self.health_interval = getattr(settings, "elasticsearch_health_interval", 15)
+        self._client = client
+        # Optimistic until the first ping, so the first requests are not all keyword-less
+        self._available = self.enabled
+        self._checked_at: Optional[float] = None
+        self._health_task: Optional[asyncio.Task] = None
+        
+    def get_client(self) -> Optional[AsyncElasticsearch]:
+        """Get the shared client, created on first use."""
+        if not self.enabled:
+            return None
+            
+        if self._client is None:
+            try:
+                self._client = AsyncElasticsearch(
+                    [self.settings.elasticsearch_url],
+                    request_timeout=self.settings.elasticsearch_timeout,
+                    connections_per_node=getattr(self.settings, "elasticsearch_connections_per_node", 10),
+                    http_compress=True,
+                    max_retries=3,
+                    retry_on_timeout=True
+                )
+            except Exception as e:
+                logger.warning(f"Failed to create async Elasticsearch client: {e}")
+                self.enabled = False
+                return None
+                
+        return self._client
+    
+    def index_name(self, kind: str) -> str:
+        """Full index name for documents, chunks or registry."""
+        return f"{self.settings.elasticsearch_index_prefix}_{kind}"
+    
+    def is_available(self) -> bool:
+        """Cached availability from the last health check or search."""
+        return self.enabled and self._available
+    
+    async def refresh_availability(self) -> bool:
+        """Ping the cluster and cache the result."""
+        client = self.get_client()
+        available = False
+        if client is not None:
+            try:
+                available = bool(await client.ping())
+            except Exception as e:
+                logger.debug(f"Elasticsearch ping failed: {e}")
+        if available != self._available:
+            logger.info(f"Elasticsearch {'available' if available else 'unavailable'}")
+        self._available = available
+        self._checked_at = time.monotonic()
+        return available
+    
+    def start_health_checks(self) -> None:
+        """Keep availability fresh in the background (needs a running event loop)."""
+        if not self.enabled or (self._health_task and not self._health_task.done()):
+            return
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        
+    async def _health_loop(self) -> None:
+        while True:
+            await self.refresh_availability()
+            await asyncio.sleep(self.health_interval)
+            
+    def _mark_unavailable(self, error: Exception) -> None:
+        logger.warning(f"Elasticsearch request failed, marking unavailable: {error}")
+        self._available = False
+        
+    async def search(self, index: str, body: Dict[str, Any], size: int = 10) -> Dict[str, Any]:
+        """Single search on the pooled client."""
+        client = self.get_client()
+        if client is None:
+            return EMPTY_RESPONSE
+        try:
+            return await client.search(index=index, body=body, size=size)
+        except TransportError as e:
+            self._mark_unavailable(e)
+            raise
+            
+    async def msearch(self, searches: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Run (index, body) searches in one round trip.
+        
+        Returns one response per search in order; a search that failed on its
+        own (e.g. a missing index) yields EMPTY_RESPONSE instead of failing the rest.
+        """
+        client = self.get_client()
+        if client is None:
+            return [EMPTY_RESPONSE for _ in searches]
+            
+        request: List[Dict[str, Any]] = []
+        for index, body in searches:
+            request.append({"index": index})
+            request.append(body)
+        try:
+            response = await client.msearch(searches=request)
+        except TransportError as e:
+            self._mark_unavailable(e)
+            raise
+            
+        responses = []
+        for (index, _), item in zip(searches, response["responses"]):
+            if "error" in item:
+                logger.warning(f"Search on {index} failed: {item['error']}")
+                responses.append(EMPTY_RESPONSE)
+            else:
+                responses.append(item)
+        return responses
+    
+    def get_cluster_health(self) -> Optional[dict]:
+        """Cached health summary (the async client cannot be queried synchronously)."""
+        if not self.enabled:
+            return None
+        return {
+            "available": self._available,
+            "checked_seconds_ago": (
+                round(time.monotonic() - self._checked_at, 1) if self._checked_at is not None else None
+            ),
+        }
+        
+    async def close(self) -> None:
+        """Stop health checks and close the connection pool."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_async_client: Optional[AsyncElasticsearchClient] = None
+
+
+def get_async_elasticsearch_client(settings: Settings) -> AsyncElasticsearchClient:
+    """Get the process-wide async client, starting its health checks when called from a loop."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncElasticsearchClient(settings)
+    try:
+        _async_client.start_health_checks()
+    except RuntimeError:
+        # No running loop (scripts, sync callers); availability stays at its last value
+        pass
+    return _async_client
+
+
+async def close_async_elasticsearch_client() -> None:
+    """Close the process-wide async client on shutdown."""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
@@ -0,0 +1,293 @@
+"""
+Streaming bulk indexing from PostgreSQL into Elasticsearch.
+Rows are read with keyset pagination and turned into bulk actions lazily,
+and worker threads each run streaming_bulk (which retries 429 rejections
+with exponential backoff) over a bounded queue of actions, so a full
+reindex holds a fixed number of actions in memory however large the corpus.
+"""
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from elasticsearch.helpers import streaming_bulk
+from sqlalchemy import select
+
+from src.models.entities import Document, DocumentChunk, DocumentRegistry
+
+logger = logging.getLogger(__name__)
+
+# Rows per keyset page
+PAGE_SIZE = 500
+
+# Failed items kept on BulkStats for reporting
+MAX_KEPT_ERRORS = 20
+
+_DONE = object()
+
+PROTOCOL_KEYWORDS = ["protocol", "pathway", "algorithm", "guideline"]
+FORM_KEYWORDS = ["form", "consent", "checklist", "template"]
+
+
+def es_id(row_id: Any) -> str:
+    """Stable Elasticsearch _id for a database row id."""
+    return hashlib.md5(f"{row_id}".encode()).hexdigest()
+
+
+def _name_from(document: Document, content_type: str, keywords: List[str]) -> Optional[str]:
+    if document.content_type == content_type:
+        title = document.meta.get("title", "").lower()
+        filename = document.filename.lower()
+        for content in [title, filename]:
+            if any(keyword in content for keyword in keywords):
+                return content.replace(".pdf", "").replace("_", " ").strip()
+    return None
+
+
+def extract_protocol_name(document: Document) -> Optional[str]:
+    """Protocol name from a protocol's title or filename, for exact matching."""
+    return _name_from(document, "protocol", PROTOCOL_KEYWORDS)
+
+
+def extract_form_name(document: Document) -> Optional[str]:
+    """Form name from a form's title or filename, for exact matching."""
+    return _name_from(document, "form", FORM_KEYWORDS)
+
+
+def document_action(index_prefix: str, document: Document) -> Dict[str, Any]:
+    return {
+        "_index": f"{index_prefix}_documents",
+        "_id": es_id(document.id),
+        "_source": {
+            "id": str(document.id),
+            "content": document.content[:10000] if document.content else "",  # Limit for ES
+            "content_type": document.content_type,
+            "filename": document.filename,
+            "title": document.meta.get("title", document.filename),
+            "protocol_name": extract_protocol_name(document),
+            "form_name": extract_form_name(document),
+            "medical_specialties": document.meta.get("medical_specialties", []),
+            "tags": document.meta.get("tags", []),
+            "file_type": document.file_type,
+            "file_hash": document.file_hash,
+            "metadata": document.meta,
+            "created_at": document.created_at.isoformat(),
+            "updated_at": document.updated_at.isoformat()
+        }
+    }
+
+
+def chunk_action(index_prefix: str, chunk: DocumentChunk) -> Dict[str, Any]:
+    return {
+        "_index": f"{index_prefix}_chunks",
+        "_id": es_id(chunk.id),
+        "_source": {
+            "id": str(chunk.id),
+            "document_id": str(chunk.document_id),
+            "content": chunk.chunk_text,
+            "chunk_index": chunk.chunk_index,
+            "chunk_type": chunk.chunk_type,
+            "medical_category": chunk.medical_category,
+            "urgency_level": chunk.urgency_level,
+            "contains_contact": chunk.contains_contact,
+            "contains_dosage": chunk.contains_dosage,
+            "page_number": chunk.page_number,
+            "metadata": chunk.meta,
+            "created_at": chunk.created_at.isoformat()
+        }
+    }
+
+
+def registry_action(index_prefix: str, registry: DocumentRegistry) -> Dict[str, Any]:
+    return {
+        "_index": f"{index_prefix}_registry",
+        "_id": es_id(registry.id),
+        "_source": {
+            "id": str(registry.id),
+            "document_id": str(registry.document_id),
+            "keywords": registry.keywords,
+            "display_name": registry.display_name,
+            "file_path": registry.file_path,
+            "category": registry.category,
+            "priority": registry.priority,
+            "quick_access": registry.quick_access,
+            "metadata": registry.meta
+        }
+    }
+
+
+def iter_keyset(session: Any, model: Any, *criteria: Any, page_size: int = PAGE_SIZE) -> Iterator[Any]:
+    """Rows of model in primary key order, one page in memory at a time.
+
+    Each page starts after the last id of the previous one, so a page costs
+    the same however deep into the table it is (unlike OFFSET).
+    """
+    last_id = None
+    while True:
+        stmt = select(model).where(*criteria).order_by(model.id).limit(page_size)
+        if last_id is not None:
+            stmt = stmt.where(model.id > last_id)
+        rows = session.execute(stmt).scalars().all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+        # Drop the finished page so the identity map does not grow with the table
+        session.expunge_all()
+
+
+def iter_index_actions(
+    session: Any,
+    index_prefix: str,
+    document_id: Optional[str] = None,
+    kinds: Iterable[str] = ("documents", "chunks", "registry"),
+    page_size: int = PAGE_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Bulk actions for every document, chunk and registry entry, or for one document's."""
+    sources = {
+        "documents": (Document, document_action, Document.id),
+        "chunks": (DocumentChunk, chunk_action, DocumentChunk.document_id),
+        "registry": (DocumentRegistry, registry_action, DocumentRegistry.document_id),
+    }
+    for kind in kinds:
+        model, build_action, document_column = sources[kind]
+        criteria = [document_column == document_id] if document_id is not None else []
+        for row in iter_keyset(session, model, *criteria, page_size=page_size):
+            yield build_action(index_prefix, row)
+
+
+@dataclass
+class BulkStats:
+    """Outcome of one streaming bulk run."""
+    indexed: int = 0
+    failed: int = 0
+    by_index: Counter = field(default_factory=Counter)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.indexed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def record(self, ok: bool, item: Dict[str, Any]) -> None:
+        result = next(iter(item.values()), {}) if item else {}
+        if ok:
+            self.indexed += 1
+            self.by_index[result.get("_index", "unknown")] += 1
+        else:
+            self.failed += 1
+            if len(self.errors) < MAX_KEPT_ERRORS:
+                self.errors.append(item)
+
+
+class BulkIndexer:
+    """Streams bulk actions into Elasticsearch from worker threads.
+
+    In flight at any time: `queue_chunks` chunks of actions waiting in the
+    queue plus one chunk per worker (and its retries).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        chunk_size: int = 500,
+        thread_count: int = 4,
+        queue_chunks: int = 2,
+        max_retries: int = 5,
+        initial_backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        progress_interval: float = 10.0,
+    ):
+        """
+        Args:
+            client: Sync Elasticsearch client
+            chunk_size: Actions per _bulk request
+            thread_count: Concurrent _bulk requests
+            queue_chunks: Chunks of actions buffered ahead of the workers
+            max_retries: Retries of 429-rejected actions (exponential backoff)
+            initial_backoff: Seconds before the first retry, doubled each time
+            max_backoff: Upper bound on a retry's wait
+            progress_interval: Seconds between docs/sec progress logs
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self.thread_count = max(1, thread_count)
+        self.queue_chunks = max(1, queue_chunks)
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.progress_interval = progress_interval
+
+    def index(self, actions: Iterable[Dict[str, Any]]) -> BulkStats:
+        """Index actions, pulling them from the iterable only as fast as workers drain them."""
+        stats = BulkStats()
+        pending: queue.Queue = queue.Queue(maxsize=self.chunk_size * self.queue_chunks)
+        lock = threading.Lock()
+        worker_errors: List[Exception] = []
+        last_report = [stats.started_at]
+
+        def queued_actions() -> Iterator[Dict[str, Any]]:
+            while True:
+                action = pending.get()
+                if action is _DONE:
+                    return
+                yield action
+
+        def work() -> None:
+            try:
+                for ok, item in streaming_bulk(
+                    self.client,
+                    queued_actions(),
+                    chunk_size=self.chunk_size,
+                    max_retries=self.max_retries,
+                    initial_backoff=self.initial_backoff,
+                    max_backoff=self.max_backoff,
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                ):
+                    with lock:
+                        stats.record(ok, item)
+                        self._report_progress(stats, last_report)
+            except Exception as e:
+                logger.error(f"Bulk indexing worker failed: {e}")
+                worker_errors.append(e)
+                # Keep draining so the producer is never blocked on a dead worker
+                for _ in queued_actions():
+                    with lock:
+                        stats.failed += 1
+
+        workers = [threading.Thread(target=work, name=f"es-bulk-{i}", daemon=True)
+                   for i in range(self.thread_count)]
+        for worker in workers:
+            worker.start()
+        try:
+            for action in actions:
+                pending.put(action)
+        finally:
+            for _ in workers:
+                pending.put(_DONE)
+            for worker in workers:
+                worker.join()
+            stats.finished_at = time.monotonic()
+
+        logger.info(f"Bulk indexed {stats.indexed} docs ({stats.failed} failed) in {stats.elapsed:.1f}s, "
+                    f"{stats.docs_per_second:.0f} docs/s")
+        if worker_errors and not stats.indexed:
+            raise worker_errors[0]
+        return stats
+
+    def _report_progress(self, stats: BulkStats, last_report: List[float]) -> None:
+        now = time.monotonic()
+        if now - last_report[0] >= self.progress_interval:
+            last_report[0] = now
+            logger.info(f"Bulk indexing: {stats.indexed} docs, {stats.failed} failed, "
+                        f"{stats.docs_per_second:.0f} docs/s")
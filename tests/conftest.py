@@ -3,6 +3,7 @@ Pytest configuration and fixtures for ED Bot v8 tests.
 """
 
 import asyncio
+import json
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -45,6 +46,43 @@ def mock_redis_client():
     return redis
 
 
+class FakeRedis:
+    """Minimal stateful sync Redis stand-in recording TTLs and publishes."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.published = []
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+@pytest.fixture
+def fake_redis():
+    """Stateful sync Redis stand-in."""
+    return FakeRedis()
+
+
 @pytest.fixture
 def sample_document():
     """Sample document entity for testing."""
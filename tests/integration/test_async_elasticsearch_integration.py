@@ -0,0 +1,63 @@
+"""Integration tests for the shared async Elasticsearch client against scripts/mock_elasticsearch_server.py."""
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestServer
+
+from src.search.elasticsearch_client import EMPTY_RESPONSE, AsyncElasticsearchClient
+
+MOCK_SERVER = Path(__file__).resolve().parents[2] / "scripts" / "mock_elasticsearch_server.py"
+
+
+def load_mock_server():
+    spec = importlib.util.spec_from_file_location("mock_elasticsearch_server", MOCK_SERVER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest_asyncio.fixture
+async def es_client():
+    mock_server = load_mock_server()
+    server = TestServer(mock_server.create_app())
+    await server.start_server()
+    settings = SimpleNamespace(
+        search_backend="hybrid",
+        elasticsearch_url=str(server.make_url("/")).rstrip("/"),
+        elasticsearch_index_prefix="it",
+        elasticsearch_timeout=5,
+    )
+    client = AsyncElasticsearchClient(settings)
+    yield client
+    await client.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_ping_updates_cached_availability(es_client):
+    assert await es_client.refresh_availability()
+    assert es_client.is_available()
+
+
+@pytest.mark.asyncio
+async def test_msearch_queries_all_indices_in_one_round_trip(es_client):
+    await es_client.get_client().bulk(operations=[
+        {"index": {"_index": "it_chunks", "_id": "c1"}},
+        {"id": "c1", "document_id": "d1", "content": "STEMI activation pager"},
+        {"index": {"_index": "it_documents", "_id": "d1"}},
+        {"id": "d1", "title": "STEMI Protocol", "content": "STEMI activation"},
+    ])
+
+    chunks, documents, registry = await es_client.msearch([
+        (es_client.index_name("chunks"), {"query": {"match": {"content": "stemi"}}, "size": 5}),
+        (es_client.index_name("documents"), {"query": {"match": {"title": "stemi"}}, "size": 5}),
+        (es_client.index_name("registry"), {"query": {"match": {"display_name": "stemi"}}, "size": 5}),
+    ])
+
+    assert [hit["_id"] for hit in chunks["hits"]["hits"]] == ["c1"]
+    assert [hit["_id"] for hit in documents["hits"]["hits"]] == ["d1"]
+    # The registry index was never created
+    assert registry is EMPTY_RESPONSE
@@ -0,0 +1,93 @@
+"""
+Performance tests for BM25 candidate scoring.
+
+Compares the vectorized batch scorer against per-chunk scoring (split,
+list.count per term and a fresh regex per abbreviation) at 50, 500 and
+5,000 candidates.
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from src.pipeline.bm25_scorer import MAX_MEDICAL_BOOST, MEDICAL_INDICATORS, BM25Scorer
+
+VOCABULARY = (
+    "STEMI activation protocol cath lab pager aspirin 325 mg heparin units IV bolus "
+    "sepsis lactate criteria fluids 30 ml/kg antibiotics emergency department ED "
+    "treatment guideline dose dosage medication patient assessment the and of with for"
+).split()
+QUERY_TERMS = ["stemi", "protocol", "heparin", "dose", "iv", "ed"]
+
+
+def per_chunk_scores(scorer, query_terms, texts, avg_doc_length):
+    """Per-chunk BM25 and medical boost, as scored before batching."""
+    k1, b = scorer.config.k1, scorer.config.b
+    results = []
+    for content in texts:
+        content_lower = content.lower()
+        content_terms = content_lower.split()
+        doc_length = len(content.split())
+        score = 0.0
+        for term in query_terms:
+            tf = content_terms.count(term.lower())
+            if tf > 0:
+                idf = scorer._calculate_idf_approximation(term.lower())
+                score += idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * (doc_length / avg_doc_length)))
+
+        boost = 1.0
+        for term in query_terms:
+            if term.upper() in scorer.medical_abbreviations:
+                if re.search(r'\b' + re.escape(term.upper()) + r'\b', content):
+                    boost += 0.3
+                full_form = scorer.medical_abbreviations.get(term.upper(), '').lower()
+                if full_form and full_form in content_lower:
+                    boost += 0.2
+        boost += sum(1 for indicator in MEDICAL_INDICATORS if indicator in content_lower) * 0.1
+        results.append((score, min(boost, MAX_MEDICAL_BOOST)))
+    return results
+
+
+def candidate_texts(n):
+    """Chunks of mostly general words with clinical terms mixed in at about 1 in 8."""
+    rng = random.Random(n)
+    filler = [f"word{i}" for i in range(3000)]
+
+    def word():
+        return rng.choice(VOCABULARY) if rng.random() < 0.125 else rng.choice(filler)
+
+    return [" ".join(word() for _ in range(rng.randint(40, 160))) for _ in range(n)]
+
+
+def best_of(fn, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class TestBM25BatchScoringPerformance:
+    """Batch scoring speedup over per-chunk scoring"""
+
+    @pytest.mark.parametrize("candidates", [50, 500, 5000])
+    def test_batch_scoring_speedup(self, candidates):
+        scorer = BM25Scorer(None)
+        texts = candidate_texts(candidates)
+
+        batch = scorer.score_batch(QUERY_TERMS, texts, avg_doc_length=100.0)
+        expected = per_chunk_scores(scorer, QUERY_TERMS, texts, 100.0)
+        assert batch.scores.tolist() == pytest.approx([score for score, _ in expected])
+        assert batch.medical_boost.tolist() == pytest.approx([boost for _, boost in expected])
+
+        per_chunk_time = best_of(lambda: per_chunk_scores(scorer, QUERY_TERMS, texts, 100.0))
+        batch_time = best_of(lambda: scorer.score_batch(QUERY_TERMS, texts, avg_doc_length=100.0))
+        speedup = per_chunk_time / batch_time
+
+        print(f"{candidates} candidates: per-chunk {per_chunk_time*1000:.2f}ms, "
+              f"batch {batch_time*1000:.2f}ms, speedup {speedup:.1f}x")
+        if candidates >= 500:
+            assert speedup > 1.5
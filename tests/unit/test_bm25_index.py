@@ -0,0 +1,128 @@
+"""
+Unit tests for the in-memory BM25 chunk index.
+"""
+
+import math
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from src.pipeline import bm25_index as bm25_index_module
+from src.pipeline.bm25_index import BM25Index
+from src.pipeline.rag_retriever import RAGRetriever
+
+CHUNKS = [
+    ("c1", "d1", "STEMI activation protocol: page cardiology, activate the cath lab"),
+    ("c2", "d1", "Aspirin 325 mg chewed for suspected STEMI"),
+    ("c3", "d2", "Sepsis criteria: lactate above 2 and suspected infection"),
+    ("c4", "d3", "Heparin dosing protocol for DVT and PE"),
+]
+CONTENT_TYPES = {"d1": "protocol", "d2": "criteria", "d3": "protocol"}
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.build(CHUNKS, content_types=CONTENT_TYPES, versions={"d1": "v1", "d2": "v1", "d3": "v1"})
+    return index
+
+
+def ranking(index, query, **kwargs):
+    return [(hit.chunk_id, round(hit.score, 5)) for hit in index.search(query, **kwargs)]
+
+
+class TestBM25Index:
+    """Test scoring, filtering and incremental updates."""
+
+    def test_true_idf(self, index):
+        # "protocol" is in 2 of 4 chunks, "sepsis" in 1
+        assert index.idf("protocol") == pytest.approx(math.log(1 + 2.5 / 2.5))
+        assert index.idf("sepsis") == pytest.approx(math.log(1 + 3.5 / 1.5))
+        assert index.idf("unseen") == pytest.approx(math.log(1 + 4.5 / 0.5))
+
+    def test_ranking_and_content_type_filter(self, index):
+        hits = index.search("STEMI protocol", k=3)
+
+        assert [hit.chunk_id for hit in hits] == ["c1", "c2", "c4"]
+        assert hits[0].document_id == "d1"
+        assert [hit.chunk_id for hit in index.search("protocol", content_type="criteria")] == []
+        assert [hit.chunk_id for hit in index.search("suspected", content_type="criteria")] == ["c3"]
+
+    def test_replace_and_remove_match_full_rebuild(self, index):
+        index.add_document("d2", [("c5", "Sepsis bundle: lactate, cultures and antibiotics")],
+                           content_type="criteria", version="v2")
+        index.remove_document("d3")
+
+        rebuilt = BM25Index()
+        rebuilt.build([CHUNKS[0], CHUNKS[1], ("c5", "d2", "Sepsis bundle: lactate, cultures and antibiotics")],
+                      content_types=CONTENT_TYPES)
+
+        for query in ("sepsis lactate", "STEMI protocol", "heparin"):
+            assert ranking(index, query) == ranking(rebuilt, query)
+        index.compact()
+        assert len(index._chunk_ids) == 3
+        assert ranking(index, "sepsis lactate STEMI") == ranking(rebuilt, "sepsis lactate STEMI")
+
+
+class FakeSession:
+    def __init__(self, documents, chunks):
+        self.documents = documents
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "FROM documents" in sql:
+            rows = [SimpleNamespace(id=i, content_type=t, updated_at=v) for i, (t, v) in self.documents.items()]
+        else:
+            wanted = set(params["document_ids"]) if params else None
+            rows = [SimpleNamespace(id=c, document_id=d, chunk_text=t) for c, d, t in self.chunks
+                    if wanted is None or d in wanted]
+        result = Mock()
+        result.fetchall.return_value = rows
+        return result
+
+
+class TestBM25IndexSync:
+    """Test syncing from the documents table."""
+
+    def test_only_changed_documents_are_reloaded(self):
+        documents = {"d1": ("protocol", "v1"), "d2": ("criteria", "v1"), "d3": ("protocol", "v1")}
+        session = FakeSession(documents, list(CHUNKS))
+        index = BM25Index(session_factory=lambda: session)
+
+        assert index.sync() == {"updated": 3, "removed": 0}
+        assert index.ready and len(index) == 4
+
+        session.chunks = [c for c in CHUNKS if c[1] != "d2"] + [("c5", "d2", "Sepsis bundle")]
+        documents["d2"] = ("criteria", "v2")
+        del documents["d3"]
+
+        assert index.sync() == {"updated": 1, "removed": 1}
+        assert [hit.chunk_id for hit in index.search("sepsis")] == ["c5"]
+        assert index.search("heparin") == []
+
+
+class TestRetrieverUsesIndex:
+    """Test RAGRetriever's text search through the index."""
+
+    def test_text_search_ranks_in_memory(self, index, monkeypatch):
+        monkeypatch.setattr(bm25_index_module, "_bm25_index", index)
+        index.ready = True
+        db = Mock()
+        row = SimpleNamespace(id="c3", document_id="d2", chunk_text=CHUNKS[2][2], chunk_index=0, metadata={},
+                              filename="sepsis.pdf", content_type="criteria", file_type="pdf",
+                              display_name="Sepsis Criteria", category="criteria")
+        db.execute.return_value.fetchall.return_value = [row]
+
+        results = RAGRetriever(db)._fallback_text_search("sepsis lactate", k=2)
+
+        assert [r["chunk_id"] for r in results] == ["c3"]
+        assert results[0]["bm25_score"] > 0
+        assert db.execute.call_args.args[1] == {"chunk_ids": ["c3"]}
@@ -0,0 +1,76 @@
+"""
+Unit tests for batch BM25 scoring.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.pipeline.bm25_scorer import BM25Scorer
+
+TEXTS = [
+    "STEMI activation: page cardiology, STEMI pager 917-827-9725",
+    "NSTEMI workup; STEMI_ALERT is not a STEMI mention, nor is stemi",
+    "Heparin 80 units/kg IV bolus then infusion per protocol",
+]
+
+
+@pytest.fixture
+def scorer():
+    return BM25Scorer(None)
+
+
+class TestScoreBatch:
+    """Test the vectorized scorer."""
+
+    def test_term_counts_use_whitespace_tokens(self, scorer):
+        batch = scorer.score_batch(["stemi", "iv", "stemi"], TEXTS, avg_doc_length=10.0)
+
+        # "NSTEMI" and "STEMI_ALERT" are not the token "stemi"
+        assert batch.term_frequencies.tolist() == [[2, 0, 2], [2, 0, 2], [0, 1, 0]]
+        assert batch.document_lengths.tolist() == [7, 11, 9]
+
+    def test_bm25_formula(self, scorer):
+        batch = scorer.score_batch(["heparin"], TEXTS, avg_doc_length=10.0)
+
+        k1, b = scorer.config.k1, scorer.config.b
+        idf = scorer._calculate_idf_approximation("heparin")
+        expected = idf * (1 * (k1 + 1)) / (1 + k1 * (1 - b + b * 9 / 10.0))
+        assert batch.scores.tolist() == pytest.approx([0.0, 0.0, expected])
+
+    def test_medical_boost_matches_whole_word_abbreviations(self, scorer):
+        batch = scorer.score_batch(["stemi", "iv"], TEXTS, avg_doc_length=10.0)
+
+        # Exact abbreviation +0.3; indicators: "units" and "protocol" +0.1 each
+        assert batch.medical_boost.tolist() == pytest.approx([1.3, 1.3, 1.5])
+
+    def test_detail_only_lists_matched_terms(self, scorer):
+        detail = scorer.score_batch(["heparin", "sepsis"], TEXTS, avg_doc_length=10.0).detail(2)
+
+        assert detail.term_frequencies == {"heparin": 1, "sepsis": 0}
+        assert set(detail.idf_scores) == {"heparin"}
+        assert detail.score == pytest.approx(detail.idf_scores["heparin"] * detail.normalized_tf_scores["heparin"])
+
+    def test_empty_batch(self, scorer):
+        batch = scorer.score_batch(["stemi"], [], avg_doc_length=10.0)
+
+        assert batch.scores.shape == (0,)
+        assert batch.medical_boost.shape == (0,)
+
+
+class TestScoreSqlResults:
+    """Test ranking of SQL rows."""
+
+    def test_ranked_by_bm25_with_details_on_request(self, scorer):
+        scorer._collection_stats = {"avg_doc_length": 10.0}
+        rows = [SimpleNamespace(id=i, chunk_text=content) for i, content in enumerate(TEXTS)]
+
+        results = scorer.score_sql_results("STEMI pager", rows, k=2)
+        detailed = scorer.score_sql_results("STEMI pager", rows, k=2, include_details=True)
+
+        assert [r["id"] for r in results] == [0, 1]
+        assert results[0]["final_score"] == pytest.approx(results[0]["bm25_score"] * results[0]["medical_boost"])
+        assert "bm25_metadata" not in results[0]
+        assert detailed[0]["bm25_metadata"]["term_frequencies"] == {"stemi": 2, "pager": 1}
+        assert np.isclose(detailed[0]["final_score"], results[0]["final_score"])
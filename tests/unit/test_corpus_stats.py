@@ -0,0 +1,176 @@
+"""
+Unit tests for the shared BM25 corpus statistics.
+"""
+
+import math
+import threading
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.pipeline import corpus_stats as cs
+from src.pipeline.bm25_scorer import BM25Scorer
+from src.pipeline.corpus_stats import CorpusSnapshot, CorpusStats, count_chunks, record_new_chunks
+
+
+def fake_session(version=3, chunk_count=4, total_tokens=40, document_frequencies=None):
+    """Session answering the corpus stats queries."""
+    session = MagicMock()
+    session.__enter__.return_value = session
+    document_frequencies = document_frequencies or {"stemi": 1, "protocol": 4}
+
+    def execute(statement, params=None):
+        result = Mock()
+        if statement is cs.VERSION_SQL:
+            result.scalar.return_value = version
+        elif statement is cs.STATS_SQL:
+            result.first.return_value = Mock(chunk_count=chunk_count, total_tokens=total_tokens, version=version)
+        elif statement is cs.TERM_DF_SQL:
+            result.__iter__ = Mock(return_value=iter(document_frequencies.items()))
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+class TestCountChunks:
+    """Test statistics over chunk texts."""
+
+    def test_document_frequency_counts_chunks_not_occurrences(self):
+        chunks, tokens, document_frequencies = count_chunks(["STEMI stemi pager", "Sepsis protocol", ""])
+
+        assert (chunks, tokens) == (3, 5)
+        assert document_frequencies == {"stemi": 1, "pager": 1, "sepsis": 1, "protocol": 1}
+
+
+class TestCorpusSnapshot:
+    """Test the derived BM25 statistics."""
+
+    def test_avg_length_and_idf(self):
+        snapshot = CorpusSnapshot(chunk_count=4, total_tokens=40, version=1, document_frequencies={"stemi": 1})
+
+        assert snapshot.avg_doc_length == 10.0
+        assert snapshot.idf("STEMI") == pytest.approx(math.log(1 + 3.5 / 1.5))
+        assert snapshot.idf("unseen") > snapshot.idf("stemi")
+
+
+class TestCorpusStats:
+    """Test the process-wide cache."""
+
+    def test_snapshot_is_cached_until_refresh_interval(self):
+        session = fake_session()
+        stats = CorpusStats(session_factory=Mock(return_value=session), refresh_interval=60)
+
+        first = stats.refresh()
+        second = stats.snapshot()
+
+        assert first is second
+        assert first.document_frequencies == {"stemi": 1, "protocol": 4}
+        assert session.execute.call_count == 3
+
+    def test_unchanged_version_skips_term_reload(self):
+        session = fake_session()
+        stats = CorpusStats(session_factory=Mock(return_value=session), refresh_interval=0)
+
+        first = stats.refresh()
+        second = stats.refresh()
+
+        assert first is second
+        assert session.execute.call_args_list[-1].args[0] is cs.VERSION_SQL
+
+    def test_database_errors_return_last_snapshot(self):
+        stats = CorpusStats(session_factory=Mock(side_effect=RuntimeError("db down")), refresh_interval=0)
+
+        assert stats.refresh() is None
+
+    def test_snapshot_loads_in_the_background(self):
+        release = threading.Event()
+        session = fake_session()
+
+        def session_factory():
+            release.wait(5)
+            return session
+
+        stats = CorpusStats(session_factory=session_factory, refresh_interval=60)
+
+        assert stats.snapshot() is None  # returns at once, before the load
+        assert stats.snapshot() is None  # and starts only one refresh
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == "corpus-stats-refresh":
+                thread.join(5)
+
+        assert stats.snapshot().version == 3
+        assert session.execute.call_count == 3
+
+    def test_missing_statistics_are_not_built_on_the_request_path(self):
+        session = fake_session(version=None)
+        stats = CorpusStats(session_factory=Mock(return_value=session), refresh_interval=0)
+
+        assert stats.refresh() is None
+        assert [call.args[0] for call in session.execute.call_args_list] == [cs.VERSION_SQL]
+
+    def test_rebuild_if_missing_rechecks_after_lock(self):
+        session = fake_session()
+
+        summary = CorpusStats(session_factory=Mock()).rebuild(session, if_missing=True)
+
+        assert summary["chunks"] == 4
+        assert [call.args[0] for call in session.execute.call_args_list] == [cs.LOCK_SQL, cs.STATS_SQL]
+        session.commit.assert_not_called()
+
+
+class TestRecordNewChunks:
+    """Test the ingestion increment."""
+
+    def test_increments_totals_then_term_frequencies(self):
+        session = MagicMock()
+
+        assert record_new_chunks(session, ["STEMI pager", "stemi"])
+
+        statements = [call.args[0] for call in session.execute.call_args_list]
+        assert statements == [cs.LOCK_SQL, cs.INCREMENT_STATS_SQL, cs.UPSERT_TERM_DF_SQL]
+        assert session.execute.call_args_list[1].args[1] == {"chunks": 2, "tokens": 3}
+        upsert = session.execute.call_args_list[2].args[1]
+        assert dict(zip(upsert["terms"], upsert["counts"])) == {"stemi": 2, "pager": 1}
+
+    def test_builds_missing_statistics_from_every_chunk(self, monkeypatch):
+        chunk_texts = Mock()
+        chunk_texts.execution_options.return_value = chunk_texts
+        monkeypatch.setattr(cs, "CHUNK_TEXTS_SQL", chunk_texts)
+        session = MagicMock()
+
+        def execute(statement, params=None):
+            result = MagicMock()
+            if statement is cs.INCREMENT_STATS_SQL:
+                result.first.return_value = None
+            elif statement is cs.CHUNK_TEXTS_SQL:
+                result.__iter__.return_value = iter(
+                    [Mock(chunk_text="Sepsis protocol"), Mock(chunk_text="STEMI pager")])
+            return result
+
+        session.execute.side_effect = execute
+
+        assert record_new_chunks(session, ["STEMI pager"])
+
+        statements = [call.args[0] for call in session.execute.call_args_list]
+        assert statements == [cs.LOCK_SQL, cs.INCREMENT_STATS_SQL, cs.CHUNK_TEXTS_SQL,
+                              cs.CLEAR_TERM_DF_SQL, cs.UPSERT_TERM_DF_SQL, cs.REPLACE_STATS_SQL]
+        assert session.execute.call_args_list[-1].args[1] == {"chunks": 2, "tokens": 4}
+        # Committed with the caller's chunks, not on its own
+        session.commit.assert_not_called()
+
+
+class TestScorerUsesSharedStats:
+    """Test BM25Scorer reads the shared snapshot."""
+
+    def test_idf_and_average_length_from_snapshot(self):
+        stats = CorpusStats(session_factory=Mock(return_value=fake_session()), refresh_interval=60)
+        stats.refresh()
+        scorer = BM25Scorer(Mock(), corpus_stats=stats)
+
+        batch = scorer.score_batch(["stemi", "protocol"], ["stemi protocol"])
+
+        assert batch.average_doc_length == 10.0
+        assert batch.idf.tolist() == pytest.approx([math.log(1 + 3.5 / 1.5), math.log(1 + 0.5 / 4.5)])
+        assert BM25Scorer(Mock(), corpus_stats=stats)._corpus_snapshot() is stats.snapshot()
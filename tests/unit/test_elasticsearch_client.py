@@ -0,0 +1,126 @@
+"""
+Unit tests for the shared async Elasticsearch client.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.search import elasticsearch_client as es_module
+from src.search.elasticsearch_client import EMPTY_RESPONSE, AsyncElasticsearchClient, TransportError
+
+
+def es_settings(**overrides):
+    values = dict(
+        search_backend="hybrid",
+        elasticsearch_url="http://localhost:9200",
+        elasticsearch_index_prefix="test",
+        elasticsearch_timeout=5,
+        elasticsearch_health_interval=60,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def hits(*ids):
+    return {"hits": {"hits": [{"_id": i, "_score": 1.0, "_source": {"id": i}} for i in ids]}}
+
+
+class TestMultiSearch:
+    """Test msearch request and response handling."""
+
+    @pytest.mark.asyncio
+    async def test_one_round_trip_with_responses_in_order(self):
+        es = AsyncMock()
+        es.msearch.return_value = {"responses": [hits("c1"), hits("d1")]}
+        client = AsyncElasticsearchClient(es_settings(), client=es)
+
+        responses = await client.msearch([
+            (client.index_name("chunks"), {"query": {"match_all": {}}, "size": 5}),
+            (client.index_name("documents"), {"query": {"match_all": {}}, "size": 2}),
+        ])
+
+        es.msearch.assert_awaited_once_with(searches=[
+            {"index": "test_chunks"}, {"query": {"match_all": {}}, "size": 5},
+            {"index": "test_documents"}, {"query": {"match_all": {}}, "size": 2},
+        ])
+        assert [r["hits"]["hits"][0]["_id"] for r in responses] == ["c1", "d1"]
+
+    @pytest.mark.asyncio
+    async def test_failed_search_yields_empty_response(self):
+        es = AsyncMock()
+        es.msearch.return_value = {"responses": [
+            hits("c1"),
+            {"error": {"type": "index_not_found_exception"}, "status": 404},
+        ]}
+        client = AsyncElasticsearchClient(es_settings(), client=es)
+
+        responses = await client.msearch([("test_chunks", {}), ("test_registry", {})])
+
+        assert responses[1] is EMPTY_RESPONSE
+        assert client.is_available()
+
+    @pytest.mark.asyncio
+    async def test_transport_error_marks_unavailable(self):
+        es = AsyncMock()
+        es.msearch.side_effect = TransportError("connection refused")
+        client = AsyncElasticsearchClient(es_settings(), client=es)
+
+        with pytest.raises(TransportError):
+            await client.msearch([("test_chunks", {})])
+
+        assert not client.is_available()
+
+
+class TestAvailability:
+    """Test the cached availability state."""
+
+    @pytest.mark.asyncio
+    async def test_availability_is_cached_between_pings(self):
+        es = AsyncMock()
+        es.ping.return_value = False
+        client = AsyncElasticsearchClient(es_settings(), client=es)
+
+        assert client.is_available()  # optimistic before the first ping
+        assert not await client.refresh_availability()
+        assert not client.is_available()
+        assert not client.is_available()
+        es.ping.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_background_checks_stop_on_close(self):
+        es = AsyncMock()
+        es.ping.return_value = True
+        client = AsyncElasticsearchClient(es_settings(), client=es)
+
+        client.start_health_checks()
+        await asyncio.sleep(0)
+        await client.close()
+
+        es.ping.assert_awaited_once()
+        es.close.assert_awaited_once()
+        assert client._health_task is None
+
+    def test_disabled_without_hybrid_backend(self):
+        client = AsyncElasticsearchClient(es_settings(search_backend="pgvector"), client=AsyncMock())
+
+        assert not client.is_available()
+        assert client.get_client() is None
+
+
+class TestSharedClient:
+    """Test the process-wide instance."""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_process(self, monkeypatch):
+        monkeypatch.setattr(es_module, "_async_client", None)
+        monkeypatch.setattr(AsyncElasticsearchClient, "start_health_checks", lambda self: None)
+
+        first = es_module.get_async_elasticsearch_client(es_settings())
+        second = es_module.get_async_elasticsearch_client(es_settings())
+
+        assert first is second
+        await es_module.close_async_elasticsearch_client()
+        assert es_module._async_client is None
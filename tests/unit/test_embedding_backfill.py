@@ -0,0 +1,132 @@
+"""
+Unit tests for the resumable embedding backfill.
+"""
+
+import json
+import re
+
+import numpy as np
+import pytest
+
+from src.ingestion.embedding_backfill import TARGETS, EmbeddingBackfill
+
+
+class FakeTable:
+    """document_chunks stand-in that understands the backfill's two statements."""
+
+    def __init__(self, rows):
+        self.rows = dict(rows)  # id -> [text, embedding]
+        self.statements = []
+        self.fail_after_updates = None
+
+    def session(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        pass
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.table.statements.append(sql)
+        if sql.startswith("SELECT"):
+            ids = sorted(self.table.rows)
+            if params["last_id"] is not None:
+                ids = [i for i in ids if i > params["last_id"]]
+            if "IS NULL" in sql:
+                ids = [i for i in ids if self.table.rows[i][1] is None]
+            return FakeResult([(i, self.table.rows[i][0]) for i in ids[:params["batch_size"]]])
+
+        updates = sum(s.startswith("UPDATE") for s in self.table.statements)
+        if self.table.fail_after_updates is not None and updates > self.table.fail_after_updates:
+            raise RuntimeError("connection lost")
+        for key, row_id in params.items():
+            if key.startswith("id_"):
+                self.table.rows[row_id][1] = params["embedding_" + key[3:]]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def make_table(n):
+    return FakeTable({f"c{i:02d}": [f"chunk {i}", None] for i in range(n)})
+
+
+class TestEmbeddingBackfill:
+    """Test batching, bulk updates and checkpoint resume."""
+
+    def test_one_encode_and_update_per_batch(self, tmp_path):
+        table = make_table(5)
+        table.rows["c02"][0] = "   "
+        encoder = CountingEncoder()
+        backfill = EmbeddingBackfill(table.session, batch_size=2,
+                                     checkpoint_path=tmp_path / "ckpt.json", encoder=encoder)
+
+        stats = backfill.run(["chunks"])
+
+        assert stats["chunks"]["rows"] == 4
+        assert stats["chunks"]["skipped"] == 1
+        assert encoder.calls == [["chunk 0", "chunk 1"], ["chunk 3"], ["chunk 4"]]
+        assert table.rows["c04"][1] == "[7,1]"
+        updates = [s for s in table.statements if s.startswith("UPDATE")]
+        assert len(updates) == 3
+        assert re.search(r"FROM \(VALUES \(:id_0, :embedding_0\), \(:id_1, :embedding_1\)\)", updates[0])
+
+    def test_resumes_from_checkpoint(self, tmp_path):
+        table = make_table(6)
+        table.fail_after_updates = 2
+        checkpoint_path = tmp_path / "ckpt.json"
+        backfill = EmbeddingBackfill(table.session, batch_size=2,
+                                     checkpoint_path=checkpoint_path, encoder=CountingEncoder())
+
+        with pytest.raises(RuntimeError):
+            backfill.run(["chunks"], recompute=True)
+        assert json.loads(checkpoint_path.read_text())["chunks"]["last_id"] == "c03"
+
+        table.fail_after_updates = None
+        encoder = CountingEncoder()
+        resumed = EmbeddingBackfill(table.session, batch_size=2,
+                                    checkpoint_path=checkpoint_path, encoder=encoder)
+        stats = resumed.run(["chunks"], recompute=True)
+
+        assert encoder.calls == [["chunk 4", "chunk 5"]]
+        assert stats["chunks"]["rows"] == 2
+        assert all(embedding is not None for _, embedding in table.rows.values())
+        assert json.loads(checkpoint_path.read_text())["chunks"]["completed"] is True
+
+    def test_only_missing_vectors_by_default(self, tmp_path):
+        table = make_table(3)
+        table.rows["c01"][1] = "[1,1]"
+        encoder = CountingEncoder()
+        EmbeddingBackfill(table.session, checkpoint_path=tmp_path / "ckpt.json", encoder=encoder).run(["chunks"])
+
+        assert encoder.calls == [["chunk 0", "chunk 2"]]
+        assert table.rows["c01"][1] == "[1,1]"
+
+    def test_tables_target_writes_content_vector(self):
+        sql = EmbeddingBackfill._update_sql(TARGETS["tables"], 1)
+        assert sql.startswith("UPDATE extracted_tables AS t SET content_vector = CAST(v.embedding AS vector)")
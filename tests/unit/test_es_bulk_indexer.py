@@ -0,0 +1,130 @@
+"""
+Unit tests for streaming bulk indexing into Elasticsearch.
+"""
+
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.entities import DocumentChunk
+from src.search import es_bulk_indexer as indexer_module
+from src.search.es_bulk_indexer import BulkIndexer, chunk_action, es_id, iter_keyset
+
+
+def fake_streaming_bulk(calls, fail_ids=()):
+    """streaming_bulk stand-in: drains actions chunk by chunk and reports each one."""
+
+    def streaming_bulk(client, actions, chunk_size, **kwargs):
+        calls.append(kwargs)
+        buffer = []
+        for action in actions:
+            buffer.append(action)
+            if len(buffer) == chunk_size:
+                yield from report(buffer)
+                buffer = []
+        yield from report(buffer)
+
+    def report(buffer):
+        for action in buffer:
+            ok = action["_id"] not in fail_ids
+            yield ok, {"index": {"_index": action["_index"], "_id": action["_id"], "status": 201 if ok else 400}}
+
+    return streaming_bulk
+
+
+def actions(n, index="test_chunks"):
+    for i in range(n):
+        yield {"_index": index, "_id": str(i), "_source": {"id": str(i)}}
+
+
+class TestKeysetPagination:
+    """Test paging rows by primary key."""
+
+    def test_pages_follow_last_id_and_release_rows(self):
+        pages = [[SimpleNamespace(id="a"), SimpleNamespace(id="b")], [SimpleNamespace(id="c")], []]
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value.all.side_effect = pages
+
+        rows = list(iter_keyset(session, DocumentChunk, page_size=2))
+
+        assert [row.id for row in rows] == ["a", "b", "c"]
+        statements = [str(call.args[0]) for call in session.execute.call_args_list]
+        assert "document_chunks.id >" not in statements[0]
+        assert "document_chunks.id >" in statements[1]
+        assert session.expunge_all.call_count == 2
+
+
+class TestActions:
+    """Test bulk action shapes."""
+
+    def test_chunk_action(self):
+        chunk = SimpleNamespace(id="c1", document_id="d1", chunk_text="STEMI", chunk_index=0, chunk_type="text",
+                                medical_category=None, urgency_level=None, contains_contact=False,
+                                contains_dosage=False, page_number=1, meta={}, created_at=datetime(2024, 1, 1))
+
+        action = chunk_action("edbot", chunk)
+
+        assert action["_index"] == "edbot_chunks"
+        assert action["_id"] == es_id("c1")
+        assert action["_source"]["document_id"] == "d1"
+
+
+class TestBulkIndexer:
+    """Test the threaded streaming indexer."""
+
+    def test_counts_successes_per_index_and_failures(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(indexer_module, "streaming_bulk", fake_streaming_bulk(calls, fail_ids={"3"}))
+
+        stats = BulkIndexer(MagicMock(), chunk_size=4, thread_count=3, max_retries=7).index(actions(10))
+
+        assert (stats.indexed, stats.failed) == (9, 1)
+        assert stats.by_index == {"test_chunks": 9}
+        assert stats.errors[0]["index"]["_id"] == "3"
+        assert stats.docs_per_second > 0
+        assert len(calls) == 3
+        assert all(call["max_retries"] == 7 and call["raise_on_error"] is False for call in calls)
+
+    def test_reads_ahead_a_bounded_number_of_actions(self, monkeypatch):
+        release = threading.Event()
+        produced = 0
+
+        def stalled_streaming_bulk(client, actions, chunk_size, **kwargs):
+            for action in actions:
+                release.wait()
+                yield True, {"index": {"_index": action["_index"]}}
+
+        def source():
+            nonlocal produced
+            for action in actions(200):
+                produced += 1
+                yield action
+
+        monkeypatch.setattr(indexer_module, "streaming_bulk", stalled_streaming_bulk)
+        indexer = BulkIndexer(MagicMock(), chunk_size=5, thread_count=2, queue_chunks=2)
+        result = {}
+        run = threading.Thread(target=lambda: result.update(stats=indexer.index(source())))
+        run.start()
+        time.sleep(0.2)
+        read_while_stalled = produced
+        release.set()
+        run.join(timeout=5)
+
+        # Queue (2 chunks of 5) + one action held by each worker + one blocked put
+        assert read_while_stalled <= 5 * 2 + 2 + 1
+        assert result["stats"].indexed == 200
+
+    def test_worker_crash_does_not_hang_the_producer(self, monkeypatch):
+        def broken_streaming_bulk(client, actions, chunk_size, **kwargs):
+            next(actions)
+            raise RuntimeError("cluster gone")
+            yield
+
+        monkeypatch.setattr(indexer_module, "streaming_bulk", broken_streaming_bulk)
+
+        with pytest.raises(RuntimeError, match="cluster gone"):
+            BulkIndexer(MagicMock(), chunk_size=2, thread_count=2).index(actions(50))
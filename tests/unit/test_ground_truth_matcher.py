@@ -0,0 +1,58 @@
+"""
+Unit tests for the vectorized ground truth matcher.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.pipeline.ground_truth_matcher import GroundTruthMatcher
+from src.pipeline.ground_truth_store import GroundTruthStore
+from src.pipeline.ground_truth_validator import GroundTruthValidator
+
+
+@pytest.fixture
+def store(tmp_path):
+    protocols = tmp_path / "protocols"
+    protocols.mkdir()
+    (protocols / "STEMI_qa.json").write_text(json.dumps([
+        {"question": "What is the STEMI activation protocol?", "answer": "Activate cath lab"},
+        {"question": "What is the STEMI pager number?", "answer": "917-827-9725"},
+    ]))
+    (protocols / "Sepsis_qa.json").write_text(json.dumps([
+        {"question": "What lactate level indicates severe sepsis?", "answer": "Lactate > 4"},
+    ]))
+    return GroundTruthStore.load(str(tmp_path))
+
+
+class TestGroundTruthMatcher:
+    """Test TF-IDF candidate ranking."""
+
+    def test_ranks_best_question_first(self, store):
+        matcher = GroundTruthMatcher(store.pairs)
+        candidates = matcher.top_candidates("stemi activation protocol", {"stemi", "activation", "protocol"})
+        assert store.pairs[candidates[0]].question == "What is the STEMI activation protocol?"
+        # Only pairs sharing a term are returned
+        assert all("stemi" in store.pairs[i].question_terms for i in candidates)
+
+    def test_no_overlap_returns_no_candidates(self, store):
+        matcher = GroundTruthMatcher(store.pairs)
+        assert matcher.top_candidates("unrelated", {"unrelated"}) == []
+
+    def test_dense_embeddings_are_combined(self, store):
+        def embedder(texts):
+            return np.array([[1.0, 0.0] if "sepsis" in t.lower() else [0.0, 1.0] for t in texts])
+
+        matcher = GroundTruthMatcher(store.pairs, embedder=embedder)
+        assert matcher.dense.shape == (3, 2)
+        candidates = matcher.top_candidates("septic patient", set())
+        assert store.pairs[candidates[0]].file_key == "STEMI_qa"
+        candidates = matcher.top_candidates("sepsis", set())
+        assert store.pairs[candidates[0]].file_key == "Sepsis_qa"
+
+    def test_validator_applies_rules_to_candidates(self, store):
+        validator = GroundTruthValidator(store=store)
+        match = validator.validate_query("sepsis lactate")
+        assert match is not None
+        assert match.source == "Sepsis_qa"
@@ -0,0 +1,58 @@
+"""
+Unit tests for the shared ground truth store.
+"""
+
+import json
+
+import pytest
+
+from src.pipeline.ground_truth_store import GroundTruthStore
+from src.pipeline.ground_truth_validator import GroundTruthValidator
+
+
+@pytest.fixture
+def store(tmp_path):
+    protocols = tmp_path / "protocols"
+    protocols.mkdir()
+    (protocols / "STEMI_qa.json").write_text(json.dumps([
+        {"question": "What is the STEMI protocol?", "answer": "Activate cath lab",
+         "source": "STEMI Activation"}
+    ]))
+    guidelines = tmp_path / "guidelines"
+    guidelines.mkdir()
+    (guidelines / "Sepsis.json").write_text(json.dumps({
+        "document": "ED Sepsis Pathway",
+        "What is the lactate threshold for sepsis?": "Lactate > 2 mmol/L",
+    }))
+    return GroundTruthStore.load(str(tmp_path))
+
+
+class TestGroundTruthStore:
+    """Test parsing and pre-normalization of ground truth pairs."""
+
+    def test_pairs_are_flattened_and_tokenized(self, store):
+        assert store.file_count == 2
+        assert len(store.pairs) == 2
+
+        stemi = next(p for p in store.pairs if p.file_key == "STEMI_qa")
+        assert stemi.category == "protocols"
+        assert stemi.source == "STEMI Activation"
+        assert "stemi" in stemi.question_terms
+        assert "cath" in stemi.medical_terms
+
+        sepsis = next(p for p in store.pairs if p.file_key == "Sepsis")
+        assert sepsis.source == "ED Sepsis Pathway"
+        assert "lactate" in sepsis.key_terms
+
+    def test_files_are_read_only(self, store):
+        with pytest.raises(TypeError):
+            store.files["protocols"]["new"] = {}
+
+    def test_validator_uses_shared_store(self, store):
+        validator = GroundTruthValidator(store=store)
+        assert validator.ground_truth_cache is store.files
+
+        match = validator.validate_query("stemi protocol")
+        assert match is not None
+        assert match.source == "STEMI_qa"
+        assert match.query_type == "protocols"
@@ -1,5 +1,6 @@
 """Tests for HybridRetriever functionality."""
 
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -8,7 +9,7 @@ from src.config.settings import Settings
 from src.models.query_types import QueryType
 from src.pipeline.hybrid_retriever import HybridRetriever, RetrievalResult
 from src.pipeline.rag_retriever import RAGRetriever
-from src.search.elasticsearch_client import ElasticsearchClient
+from src.search.elasticsearch_client import AsyncElasticsearchClient, ElasticsearchClient
 
 
 @pytest.fixture
@@ -25,7 +26,7 @@ def mock_settings():
 def mock_rag_retriever():
     """Create mock RAG retriever."""
     rag = Mock(spec=RAGRetriever)
-    rag.semantic_search = AsyncMock()
+    rag.semantic_search_async = AsyncMock()
     return rag
 
 
@@ -204,6 +205,28 @@ class TestHybridRetrieverSearchMethods:
             assert results[0].source == "keyword"
             assert results[0].score == 1.5
 
+    @pytest.mark.asyncio
+    async def test_keyword_search_msearch_boosts_matched_documents(self, mock_rag_retriever, mock_settings):
+        """The async client searches chunks, documents and registry in one msearch."""
+        es_client = Mock(spec=AsyncElasticsearchClient)
+        es_client.is_available.return_value = True
+        es_client.index_name.side_effect = lambda kind: f"test_edbot_{kind}"
+        chunk = lambda chunk_id, doc_id, score: {
+            "_score": score, "_source": {"id": chunk_id, "document_id": doc_id, "content": "STEMI"}
+        }
+        es_client.msearch = AsyncMock(return_value=[
+            {"hits": {"hits": [chunk("c1", "doc1", 2.0), chunk("c2", "doc2", 1.5)]}},
+            {"hits": {"hits": [{"_score": 4.0, "_source": {"id": "doc2"}}]}},
+            {"hits": {"hits": []}},
+        ])
+        retriever = HybridRetriever(mock_rag_retriever, es_client, mock_settings)
+
+        results = await retriever._keyword_search("STEMI protocol", QueryType.PROTOCOL_STEPS, 5, None)
+
+        searches = es_client.msearch.await_args.args[0]
+        assert [index for index, _ in searches] == ["test_edbot_chunks", "test_edbot_documents", "test_edbot_registry"]
+        assert [(r.chunk_id, r.score) for r in results] == [("c2", 3.0), ("c1", 2.0)]
+
     @pytest.mark.asyncio
     async def test_semantic_search_success(self, hybrid_retriever):
         """Test successful semantic search."""
@@ -218,8 +241,8 @@ class TestHybridRetrieverSearchMethods:
             }
         ]
         
-        # Use regular Mock for the synchronous semantic search
-        hybrid_retriever.rag_retriever.semantic_search = Mock(return_value=mock_results)
+        # The semantic branch awaits the async retriever variant
+        hybrid_retriever.rag_retriever.semantic_search_async = AsyncMock(return_value=mock_results)
         
         results = await hybrid_retriever._semantic_search("test query", 5, None)
         
@@ -416,7 +439,7 @@ class TestErrorHandling:
     @pytest.mark.asyncio
     async def test_semantic_search_exception(self, hybrid_retriever):
         """Test semantic search when RAG retriever throws exception."""
-        hybrid_retriever.rag_retriever.semantic_search = Mock(side_effect=Exception("DB error"))
+        hybrid_retriever.rag_retriever.semantic_search_async = AsyncMock(side_effect=Exception("DB error"))
         
         results = await hybrid_retriever._semantic_search("test", 5, None)
         
@@ -428,4 +451,65 @@ class TestHybridRetrieverIntegration:
     """Integration tests for HybridRetriever with real components."""
     
     # These would require actual DB and ES setup, so marked as integration tests
-    pass
\ No newline at end of file
+    pass
+
+class TestReciprocalRankFusion:
+    """Test RRF fusion and per-branch deadlines."""
+
+    def test_rrf_fusion_uses_ranks_not_raw_scores(self, hybrid_retriever):
+        """A chunk both branches rank well beats a single-branch top hit."""
+        keyword_results = [
+            RetrievalResult("1", "doc1", "exact match", 42.0, "keyword", {}),
+            RetrievalResult("2", "doc2", "both", 7.0, "keyword", {}),
+        ]
+        semantic_results = [
+            RetrievalResult("2", "doc2", "both", 0.81, "semantic", {}),
+            RetrievalResult("3", "doc3", "similar", 0.80, "semantic", {}),
+        ]
+
+        results = hybrid_retriever._fuse_results(
+            keyword_results, semantic_results, QueryType.CRITERIA_CHECK, 10
+        )
+
+        assert hybrid_retriever.fusion_mode == "rrf"
+        assert [r.chunk_id for r in results] == ["2", "3", "1"]
+        assert results[0].score == pytest.approx(0.4 / 62 + 0.6 / 61)
+        assert results[0].metadata["retrieval_sources"] == ["keyword", "semantic"]
+
+    def test_weighted_mode_normalizes_scores(self, hybrid_retriever):
+        """Weighted mode keeps min-max normalized weighted sums."""
+        hybrid_retriever.fusion_mode = "weighted"
+        keyword_results = [RetrievalResult("1", "doc1", "exact", 10.0, "keyword", {})]
+        semantic_results = [RetrievalResult("2", "doc2", "similar", 0.5, "semantic", {})]
+
+        results = hybrid_retriever._fuse_results(
+            keyword_results, semantic_results, QueryType.CRITERIA_CHECK, 10
+        )
+
+        assert [(r.chunk_id, r.score) for r in results] == [("2", 0.6), ("1", 0.4)]
+
+    @pytest.mark.asyncio
+    async def test_slow_keyword_branch_returns_semantic_results_as_partial(self, hybrid_retriever):
+        """A keyword branch past its deadline is dropped and the miss is recorded."""
+        hybrid_retriever.branch_deadlines["keyword"] = 0.01
+
+        async def slow_keyword(*args):
+            await asyncio.sleep(1)
+            return [RetrievalResult("1", "doc1", "late", 1.0, "keyword", {})]
+
+        with patch.object(hybrid_retriever, '_keyword_search', side_effect=slow_keyword):
+            with patch.object(hybrid_retriever, '_semantic_search') as mock_semantic:
+                mock_semantic.return_value = [
+                    RetrievalResult("2", "doc2", "semantic result", 0.8, "semantic", {})
+                ]
+
+                results = await hybrid_retriever.retrieve("test query", QueryType.PROTOCOL_STEPS, 5)
+
+        assert [r.chunk_id for r in results] == ["2"]
+        assert results[0].metadata["partial_results"] == {"timed_out": ["keyword"], "deadline_ms": {"keyword": 10}}
+        stats = hybrid_retriever.metrics.get_summary()
+        assert stats["keyword_timeouts"] == 1
+        protocol_stats = stats["query_type_performance"][QueryType.PROTOCOL_STEPS.value]
+        assert protocol_stats["keyword_deadline_exceeded"] == 1
+        assert protocol_stats["semantic_deadline_exceeded"] == 0
+        assert protocol_stats["avg_keyword_time"] < 0.5
@@ -0,0 +1,70 @@
+"""
+Unit tests for the process-wide knowledge base.
+"""
+
+import json
+import os
+
+from unittest.mock import Mock
+
+import pytest
+
+from src.pipeline import knowledge_base, text_search
+from src.pipeline.form_retriever import get_form_response
+from src.pipeline.knowledge_base import KnowledgeBase
+
+
+@pytest.fixture
+def qa_dir(tmp_path):
+    protocols = tmp_path / "protocols"
+    protocols.mkdir()
+    (protocols / "STEMI_qa.json").write_text(json.dumps([
+        {"question": "What is the STEMI protocol?", "answer": "Activate cath lab",
+         "query_type": "protocol_steps"}
+    ]))
+    return tmp_path
+
+
+class TestKnowledgeBase:
+    """Test snapshot loading and atomic reload."""
+
+    def test_snapshot_is_loaded_once(self, qa_dir):
+        kb = KnowledgeBase(qa_dir=str(qa_dir), reload_interval=0)
+        first = kb.snapshot
+        assert len(first.qa_index.entries) == 1
+        assert kb.snapshot is first
+
+    def test_reload_skipped_when_unchanged(self, qa_dir):
+        kb = KnowledgeBase(qa_dir=str(qa_dir), reload_interval=0)
+        first = kb.snapshot
+        assert kb.reload_if_changed() is False
+        assert kb.snapshot is first
+
+    def test_reload_swaps_snapshot_on_change(self, qa_dir):
+        kb = KnowledgeBase(qa_dir=str(qa_dir), reload_interval=0)
+        first = kb.snapshot
+
+        new_file = qa_dir / "protocols" / "Sepsis_qa.json"
+        new_file.write_text(json.dumps([
+            {"question": "Sepsis lactate criteria?", "answer": "Lactate > 2",
+             "query_type": "criteria_check"}
+        ]))
+        os.utime(new_file, None)
+
+        assert kb.reload_if_changed() is True
+        second = kb.snapshot
+        assert second is not first
+        assert second.version != first.version
+        assert len(second.qa_index.entries) == 2
+        # Old snapshot is untouched for requests still holding it
+        assert len(first.qa_index.entries) == 1
+
+    def test_consumers_read_the_current_snapshot(self, qa_dir, monkeypatch):
+        kb = KnowledgeBase(qa_dir=str(qa_dir), reload_interval=0)
+        monkeypatch.setattr(knowledge_base, "_knowledge_base", kb)
+        form_response = Mock(return_value={"form_retrieval": True})
+        monkeypatch.setattr(kb.snapshot.form_retriever, "get_form_response", form_response)
+
+        assert get_form_response("blood consent form") == {"form_retrieval": True}
+        form_response.assert_called_once_with("blood consent form")
+        assert text_search._synonym_map() is text_search._category_synonyms(kb.snapshot.synonym_expander)
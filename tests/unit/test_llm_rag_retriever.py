@@ -0,0 +1,81 @@
+"""
+Unit tests for LLMRAGRetriever document retrieval.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.pipeline import llm_rag_retriever
+from src.pipeline.llm_rag_retriever import GroundTruthMatch, LLMRAGRetriever
+
+ROW = ("STEMI activation: call the cath lab" * 5, "STEMI_Protocol.pdf", "protocol", 175, 100)
+
+
+class TestDocumentContent:
+    """Test that chunk retrieval never runs sync SQL on the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_uses_async_repository_with_full_text_search(self):
+        db = Mock()
+        repository = Mock()
+        repository.search_chunks = AsyncMock(return_value=[ROW])
+        retriever = LLMRAGRetriever(db, Mock(), store=Mock(), repository=repository)
+
+        content = await retriever._retrieve_document_content("STEMI activation criteria")
+
+        assert content[0]["filename"] == "STEMI_Protocol.pdf"
+        db.execute.assert_not_called()
+        sql, params = repository.search_chunks.await_args.args
+        assert "dc.search_vector @@" in sql
+        assert "dc.chunk_text ILIKE" not in sql
+        assert "stemi" in params["ts_query"]
+
+    @pytest.mark.asyncio
+    async def test_sync_session_runs_in_a_thread_without_repository(self, monkeypatch):
+        threads = []
+
+        async def to_thread(func, *args):
+            threads.append(func)
+            return func(*args)
+
+        db = Mock()
+        db.execute.return_value.fetchall.return_value = [ROW]
+        monkeypatch.setattr("src.pipeline.llm_rag_retriever.asyncio.to_thread", to_thread)
+        retriever = LLMRAGRetriever(db, Mock(), store=Mock())
+
+        content = await retriever._retrieve_document_content("STEMI activation criteria")
+
+        assert len(threads) == 1
+        assert content[0]["relevance_score"] == 100
+
+
+class TestStreaming:
+    """Test that answers that cannot be accepted are never generated."""
+
+    @pytest.mark.asyncio
+    async def test_skips_generation_without_ground_truth(self, monkeypatch):
+        completion = Mock()
+        monkeypatch.setattr(llm_rag_retriever, "stream_completion", completion)
+        retriever = LLMRAGRetriever(Mock(), Mock(), store=Mock())
+        retriever._prepare_prompt = AsyncMock(return_value=([], [], "prompt"))
+
+        events = [event async for event in retriever.stream_llm_response("RETU hours", min_confidence=0.7)]
+
+        assert events == []
+        completion.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_streams_when_ground_truth_can_validate(self, monkeypatch):
+        async def stream_completion(llm_client, prompt, **kwargs):
+            yield "RETU is open 24 hours"
+
+        match = GroundTruthMatch(question="RETU hours?", answer="RETU is open 24 hours",
+                                 source_document="RETU_qa.json", match_score=0.9)
+        monkeypatch.setattr(llm_rag_retriever, "stream_completion", stream_completion)
+        retriever = LLMRAGRetriever(Mock(), Mock(), store=Mock())
+        retriever._prepare_prompt = AsyncMock(return_value=([match], [], "prompt"))
+
+        events = [event async for event, _ in retriever.stream_llm_response("RETU hours", min_confidence=0.7)]
+
+        assert events == ["sources", "token", "done"]
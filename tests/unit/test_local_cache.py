@@ -0,0 +1,116 @@
+"""
+Unit tests for the in-process L1 cache and its use in front of Redis.
+"""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.cache.local_cache import INVALIDATION_CHANNEL, WORKER_ID, LocalCache
+from src.cache.response_cache import ResponseCache
+from src.models.query_types import QueryType
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalCache:
+    """Test LRU eviction, TTL and invalidation messages."""
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LocalCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_entries_expire_at_the_shorter_ttl(self):
+        clock = FakeClock()
+        cache = LocalCache(ttl=60, clock=clock)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=3600)
+
+        clock.now = 10
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+
+        clock.now = 61
+        assert cache.get("long") is None
+        assert len(cache) == 0
+
+    def test_invalidation_messages(self):
+        cache = LocalCache()
+        for key in ("response:v1:protocol:a", "response:v1:dosage:b", "query:summary:c"):
+            cache.set(key, {})
+
+        assert cache.apply_invalidation(json.dumps(
+            {"origin": "other", "keys": ["query:summary:c"], "prefix": "response:v1:protocol:"})) == 2
+        assert cache.apply_invalidation(json.dumps(
+            {"origin": WORKER_ID, "keys": ["response:v1:dosage:b"], "prefix": None})) == 0
+        assert cache.apply_invalidation("not json") == 0
+        assert cache.get("response:v1:dosage:b") == {}
+
+
+class TestResponseCacheTiers:
+    """Test ResponseCache with an L1 in front of Redis."""
+
+    @pytest.mark.asyncio
+    async def test_l1_serves_repeat_lookups(self, fake_redis):
+        cache = ResponseCache(fake_redis, "v1", local_cache=LocalCache())
+        await cache.set("STEMI protocol", QueryType.PROTOCOL_STEPS, {"response": "Activate cath lab"})
+
+        first = await cache.get("stemi protocol", QueryType.PROTOCOL_STEPS)
+        first["timestamp"] = "mutated by caller"
+        second = await cache.get("stemi protocol", QueryType.PROTOCOL_STEPS)
+
+        assert second == {"response": "Activate cath lab"}
+        assert fake_redis.gets == 0
+
+    @pytest.mark.asyncio
+    async def test_l2_hits_are_promoted(self, fake_redis):
+        writer = ResponseCache(fake_redis, "v1")
+        await writer.set("sepsis criteria", QueryType.CRITERIA_CHECK, {"response": "lactate > 2"})
+        cache = ResponseCache(fake_redis, "v1", local_cache=LocalCache())
+
+        await cache.get("sepsis criteria", QueryType.CRITERIA_CHECK)
+        await cache.get("sepsis criteria", QueryType.CRITERIA_CHECK)
+
+        assert fake_redis.gets == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reaches_redis_and_other_workers(self, fake_redis):
+        local = LocalCache()
+        cache = ResponseCache(fake_redis, "v1", local_cache=local)
+        await cache.set("STEMI protocol", QueryType.PROTOCOL_STEPS, {"response": "old"})
+        key = cache.cache_key("STEMI protocol", QueryType.PROTOCOL_STEPS)
+
+        await cache.invalidate("STEMI protocol", QueryType.PROTOCOL_STEPS)
+
+        assert len(local) == 0
+        assert fake_redis.store == {}
+        assert fake_redis.published == [
+            (INVALIDATION_CHANNEL, {"origin": WORKER_ID, "keys": [key], "prefix": None})
+        ]
+
+    @pytest.mark.asyncio
+    async def test_tier_metrics(self, fake_redis, monkeypatch):
+        from src.cache import response_cache
+
+        tracked = Mock()
+        monkeypatch.setattr(response_cache.metrics, "track_cache_tier", tracked)
+        cache = ResponseCache(fake_redis, "v1", local_cache=LocalCache())
+
+        await cache.get("dka protocol", QueryType.PROTOCOL_STEPS)
+
+        assert [c.args for c in tracked.call_args_list] == [("l1", False), ("l2", False)]
@@ -0,0 +1,65 @@
+"""
+Unit tests for the offline local embedding backend.
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.ai.local_embeddings import EMBEDDING_DIM, HashedNgramEncoder, get_local_embedding_model
+from src.cache.embedding_service import EmbeddingService
+from src.pipeline.rag_retriever import RAGRetriever
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    return HashedNgramEncoder()
+
+
+class TestHashedNgramEncoder:
+    """Test the hashed n-gram encoder."""
+
+    def test_vectors_are_unit_length_and_chunk_sized(self, encoder):
+        vectors = encoder.encode(["STEMI protocol", "sepsis criteria"])
+
+        assert vectors.shape == (2, EMBEDDING_DIM)
+        assert vectors.dtype == np.float32
+        assert np.linalg.norm(vectors, axis=1) == pytest.approx([1.0, 1.0], rel=1e-5)
+
+    def test_deterministic_across_instances(self, encoder):
+        assert np.array_equal(encoder.encode("heparin dosing"), HashedNgramEncoder().encode("heparin dosing"))
+
+    def test_shared_surface_forms_score_higher(self, encoder):
+        query, variant, unrelated = encoder.encode(["STEMI protocol", "stemi protocols", "heparin dosing"])
+
+        assert query @ variant > 0.7
+        assert query @ variant > query @ unrelated + 0.5
+
+    def test_empty_text(self, encoder):
+        assert not encoder.encode("").any()
+        assert encoder.encode([]).shape == (0, EMBEDDING_DIM)
+
+
+class TestLocalEmbeddingDefaults:
+    """Test that callers without a model use the local encoder."""
+
+    @pytest.mark.asyncio
+    async def test_embedding_service_matches_chunk_vectors(self):
+        embedding = await EmbeddingService(batch_window=0).embed("STEMI protocol")
+
+        assert np.allclose(embedding, get_local_embedding_model().encode("STEMI protocol"))
+
+    def test_semantic_search_binds_pgvector_literal(self):
+        db = Mock()
+        db.execute.return_value.fetchall.return_value = []
+        retriever = RAGRetriever(db)
+        retriever._fallback_text_search = Mock(return_value=[])
+
+        retriever.semantic_search("STEMI protocol", k=3)
+
+        statement, params = next(c.args for c in db.execute.call_args_list if "query_embedding" in c.args[1])
+        assert ":query_embedding" in str(statement)
+        assert params["query_embedding"].startswith("[")
+        assert len(params["query_embedding"].strip("[]").split(",")) == EMBEDDING_DIM
+        retriever._fallback_text_search.assert_called_once_with("STEMI protocol", None, 3)
@@ -71,3 +71,22 @@ def test_ottawa_ankle_rules_present_if_available(qa_index: QAIndex):
     assert entry.answer, "Expected an answer for Ottawa ankle rules"
 
 
+def test_find_top_k_matches_per_type_lookups(qa_index: QAIndex):
+    query = "what is the STEMI protocol"
+    types = ["protocol_steps", "workflow", "protocol"]
+
+    best = None
+    for qa_type in types:
+        match = qa_index.find_best(query, expected_type=qa_type)
+        if match and (not best or match[1] > best[1]):
+            best = match
+
+    top = qa_index.find_top_k(query, types=types, k=3)
+    assert top, "Expected at least one STEMI match"
+    assert top[0][0] is best[0] and top[0][1] == best[1]
+    assert [score for _, score in top] == sorted((score for _, score in top), reverse=True)
+
+
+def test_find_top_k_skips_entries_without_shared_tokens(qa_index: QAIndex):
+    assert qa_index.find_top_k("zzzz qqqq", k=5) == []
+    assert qa_index.find_top_k("", k=5) == []
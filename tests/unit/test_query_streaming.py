@@ -0,0 +1,232 @@
+"""
+Unit tests for streaming LLM answers over server-sent events.
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.ai import gpt_oss_client as gpt_oss_module
+from src.ai import llm_client as llm_client_module
+from src.ai.gpt_oss_client import GPTOSSClient
+from src.ai.llm_client import UnifiedLLMClient
+from src.api.dependencies import get_query_processor
+from src.api.endpoints.query import router
+from src.pipeline.emergency_processor import EmergencyQueryProcessor
+from src.pipeline.knowledge_base import KnowledgeBase
+
+
+@pytest.fixture(autouse=True)
+def llm_settings(monkeypatch):
+    settings = SimpleNamespace(
+        vllm_base_url="http://vllm:8000/v1", gpt_oss_model="test-model", llm_backend="gpt-oss",
+        llm_timeout=5, llm_temperature=0.0, llm_top_p=0.1, llm_max_tokens=100,
+        llm_retry_attempts=3, llm_retry_delay=0.0,
+    )
+    monkeypatch.setattr(gpt_oss_module, "settings", settings)
+    monkeypatch.setattr(llm_client_module, "settings", settings)
+
+
+def sse_body(*texts):
+    lines = [f"data: {json.dumps({'choices': [{'index': 0, 'text': text}]})}\n\n" for text in texts]
+    return "".join(lines) + "data: [DONE]\n\n"
+
+
+def gpt_oss_client(handler):
+    client = GPTOSSClient()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def parse_events(body):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+async def collect(stream):
+    return [token async for token in stream]
+
+
+class TestGPTOSSStreaming:
+    """Test token streaming from the vLLM completions endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_yields_tokens_from_event_stream(self):
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, text=sse_body("Aspirin", " 325mg", " PO"),
+                                  headers={"Content-Type": "text/event-stream"})
+
+        client = gpt_oss_client(handler)
+
+        tokens = await collect(client.generate_stream("aspirin dose?", max_tokens=50))
+
+        assert tokens == ["Aspirin", " 325mg", " PO"]
+        assert requests[0]["stream"] is True
+        assert requests[0]["max_tokens"] == 50
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_retries_until_first_token(self):
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                return httpx.Response(503, json={"error": {"message": "loading"}})
+            return httpx.Response(200, text=sse_body("ok"))
+
+        client = gpt_oss_client(handler)
+
+        assert await collect(client.generate_stream("prompt")) == ["ok"]
+        assert len(attempts) == 2
+        await client.close()
+
+
+class FailingBackend:
+    def __init__(self, tokens_before_failure=()):
+        self.tokens_before_failure = tokens_before_failure
+
+    async def generate_stream(self, prompt, **kwargs):
+        for token in self.tokens_before_failure:
+            yield token
+        raise RuntimeError("backend down")
+
+
+class StreamingBackend:
+    async def generate_stream(self, prompt, **kwargs):
+        for token in ["Call", " x40935"]:
+            yield token
+
+
+def unified_client(monkeypatch, **clients):
+    monkeypatch.setattr(UnifiedLLMClient, "_initialize_clients", lambda self: None)
+    client = UnifiedLLMClient(primary_backend="gpt-oss")
+    client.clients = clients
+    return client
+
+
+class TestUnifiedStreaming:
+    """Test backend fallback for streamed generation."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_before_first_token(self, monkeypatch):
+        client = unified_client(monkeypatch, **{"gpt-oss": FailingBackend(), "ollama": StreamingBackend()})
+
+        assert await collect(client.generate_stream("prompt")) == ["Call", " x40935"]
+        assert client.get_backend_status() == {"gpt-oss": False, "ollama": True}
+
+    @pytest.mark.asyncio
+    async def test_failure_after_first_token_is_raised(self, monkeypatch):
+        client = unified_client(monkeypatch, **{"gpt-oss": FailingBackend(["Call"]), "ollama": StreamingBackend()})
+        tokens = []
+
+        with pytest.raises(RuntimeError, match="backend down"):
+            async for token in client.generate_stream("prompt"):
+                tokens.append(token)
+
+        assert tokens == ["Call"]
+
+    @pytest.mark.asyncio
+    async def test_backend_without_streaming_yields_whole_answer(self, monkeypatch):
+        azure = Mock(spec=["generate"])
+        azure.generate = AsyncMock(return_value="Call x40935")
+        client = unified_client(monkeypatch, azure=azure)
+        client.primary_backend = "azure"
+
+        assert await collect(client.generate_stream("prompt")) == ["Call x40935"]
+
+
+@pytest.fixture
+def processor(tmp_path):
+    return EmergencyQueryProcessor(
+        Mock(), None, knowledge_base=KnowledgeBase(qa_dir=str(tmp_path), reload_interval=0))
+
+
+@pytest.fixture
+def stream_client(processor):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_query_processor] = lambda: processor
+    return TestClient(app)
+
+
+class TestQueryStreamEndpoint:
+    """Test the /query/stream server-sent events."""
+
+    def test_sources_then_tokens_then_done(self, processor, stream_client):
+        calls = []
+
+        async def stream_medical_response(query):
+            calls.append(query)
+            yield "sources", {"sources": [{"display_name": "Aspirin", "filename": "aspirin.pdf"}], "query_type": "dosage"}
+            yield "token", {"text": "Aspirin"}
+            yield "token", {"text": " 325mg"}
+            yield "done", {"confidence": 0.9, "has_real_content": True, "validation_score": 0.7}
+
+        processor.direct_retriever.stream_medical_response = stream_medical_response
+
+        response = stream_client.post("/query/stream", json={"query": "aspirin dose for chest pain"})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        assert [event for event, _ in events] == ["sources", "token", "token", "done"]
+        assert events[0][1]["sources"][0]["filename"] == "aspirin.pdf"
+        assert "".join(data["text"] for event, data in events if event == "token") == "Aspirin 325mg"
+        assert events[-1][1]["confidence"] == 0.9
+        processor.db.close.assert_called_once()
+
+        # The assembled answer is cached and served whole next time
+        events = parse_events(stream_client.post("/query/stream", json={"query": "aspirin dose for chest pain"}).text)
+        assert events[1] == ("token", {"text": "Aspirin 325mg"})
+        assert len(calls) == 1
+
+    def test_error_event_when_generation_breaks_mid_answer(self, processor, stream_client):
+        async def stream_medical_response(query):
+            yield "sources", {"sources": [], "query_type": "dosage"}
+            yield "token", {"text": "Aspirin"}
+            raise RuntimeError("stream reset")
+
+        processor.direct_retriever.stream_medical_response = stream_medical_response
+
+        events = parse_events(stream_client.post("/query/stream", json={"query": "aspirin dose"}).text)
+
+        assert [event for event, _ in events] == ["sources", "token", "error", "done"]
+        assert events[-1][1]["confidence"] == 0.0
+
+    def test_priority_protocol_is_answered_without_the_llm(self, processor, stream_client):
+        processor.direct_retriever.stream_medical_response = Mock(side_effect=AssertionError("LLM called"))
+
+        events = parse_events(stream_client.post("/query/stream", json={"query": "ICP guidelines"}).text)
+
+        assert [event for event, _ in events] == ["sources", "token", "done"]
+        assert "ICP MANAGEMENT GUIDELINES" in events[1][1]["text"]
+
+    def test_rejected_answer_is_replaced_and_not_cached(self, processor, stream_client):
+        calls = []
+
+        async def stream_medical_response(query):
+            calls.append(query)
+            yield "sources", {"sources": [], "query_type": "dosage"}
+            yield "token", {"text": "Unvalidated answer"}
+            yield "replace", {"response": "No relevant medical information found", "sources": [],
+                              "confidence": 0.3, "has_real_content": False}
+
+        processor.direct_retriever.stream_medical_response = stream_medical_response
+
+        for _ in range(2):
+            events = parse_events(stream_client.post("/query/stream", json={"query": "aspirin dose"}).text)
+            assert [event for event, _ in events] == ["sources", "token", "sources", "replace", "done"]
+            assert events[3][1]["text"] == "No relevant medical information found"
+
+        assert len(calls) == 2
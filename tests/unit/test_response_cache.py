@@ -0,0 +1,72 @@
+"""
+Unit tests for the exact-match response cache.
+"""
+
+import hashlib
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.cache.response_cache import ResponseCache, canonicalize_query
+from src.config.enhanced_settings import settings
+from src.models.query_types import QueryType
+
+
+class FakeExpander:
+    def expand_query(self, query):
+        return {"expanded_query": query.replace("dka", "Diabetic Ketoacidosis")}
+
+
+class TestCanonicalizeQuery:
+    """Test query canonicalization."""
+
+    def test_case_whitespace_and_punctuation(self):
+        assert canonicalize_query("  What is the STEMI   protocol?? ") == "what is the stemi protocol"
+        assert canonicalize_query("What's the dose, in mg/kg?") == "what s the dose in mg kg"
+
+    def test_decimals_are_kept(self):
+        assert canonicalize_query("Epi 0.5 mg.") == "epi 0.5 mg"
+
+    def test_abbreviations_are_expanded(self):
+        expander = FakeExpander()
+        assert (canonicalize_query("DKA protocol", expander)
+                == canonicalize_query("diabetic ketoacidosis protocol!", expander))
+
+
+class TestResponseCache:
+    """Test keys, TTL policy and round trips."""
+
+    def test_key_is_stable_digest(self, fake_redis):
+        cache = ResponseCache(fake_redis, "v1")
+        digest = hashlib.sha256(b"stemi protocol").hexdigest()
+
+        assert cache.cache_key("STEMI protocol?", QueryType.PROTOCOL_STEPS) == f"response:v1:protocol:{digest}"
+        assert (cache.cache_key("stemi protocol", QueryType.PROTOCOL_STEPS)
+                != ResponseCache(fake_redis, "v2").cache_key("stemi protocol", QueryType.PROTOCOL_STEPS))
+
+    @pytest.mark.asyncio
+    async def test_round_trip_uses_settings_ttl(self, fake_redis):
+        cache = ResponseCache(fake_redis, "v1")
+        response = {"response": "Activate cath lab", "confidence": 0.95}
+
+        assert await cache.set("STEMI protocol", QueryType.PROTOCOL_STEPS, response)
+        assert await cache.get("  stemi PROTOCOL? ", QueryType.PROTOCOL_STEPS) == response
+        assert list(fake_redis.ttls.values()) == [settings.cache_config.ttl_by_type["PROTOCOL_STEPS"]]
+
+    @pytest.mark.asyncio
+    async def test_contact_and_form_are_never_cached(self, fake_redis):
+        cache = ResponseCache(fake_redis, "v1")
+
+        assert not await cache.set("cardiology on call", QueryType.CONTACT_LOOKUP, {"response": "x"})
+        assert not await cache.set("blood consent form", QueryType.FORM_RETRIEVAL, {"response": "x"})
+        assert fake_redis.store == {}
+
+    @pytest.mark.asyncio
+    async def test_async_redis_client(self):
+        redis = AsyncMock()
+        redis.get.return_value = '{"response": "cached"}'
+        cache = ResponseCache(redis, "v1")
+
+        assert await cache.get("sepsis criteria", QueryType.CRITERIA_CHECK) == {"response": "cached"}
+        assert await cache.set("sepsis criteria", QueryType.CRITERIA_CHECK, {"response": "cached"})
+        redis.setex.assert_awaited_once()
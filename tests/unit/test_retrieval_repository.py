@@ -0,0 +1,188 @@
+"""
+Unit tests for the async retrieval repository and the async retrieval paths using it.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from src.models.retrieval_repository import SEMANTIC_CHUNKS_SQL, RetrievalRepository
+from src.models.vector_index_manager import SET_ANN_PARAMS_SQL
+from src.pipeline.docs_rag_retriever import DocsRAGRetriever
+from src.pipeline.medication_search_fix import MedicationSearchFix
+from src.pipeline.rag_retriever import RAGRetriever
+
+
+def make_database(result, sessions=None, delay=0.0, in_flight=None, executed=None):
+    """Fake get_database() that hands out a fresh session per call."""
+
+    @asynccontextmanager
+    async def database():
+        session = AsyncMock()
+
+        async def execute(statement, params=None):
+            if executed is not None:
+                executed.append((statement, params))
+            if in_flight is not None:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(delay)
+            if in_flight is not None:
+                in_flight["now"] -= 1
+            return result
+
+        session.execute = execute
+        if sessions is not None:
+            sessions.append(session)
+        yield session
+
+    return database
+
+
+def rows_result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    result.first.return_value = rows[0] if rows else None
+    return result
+
+
+class TestRetrievalRepository:
+    """Test the repository's session handling and result shapes."""
+
+    @pytest.mark.asyncio
+    async def test_each_call_uses_its_own_session(self):
+        sessions = []
+        repository = RetrievalRepository(database=make_database(rows_result([("chunk",)]), sessions))
+
+        await asyncio.gather(
+            repository.get_document_chunk_texts("a.pdf"),
+            repository.get_document_chunk_texts("b.pdf"),
+        )
+
+        assert len(sessions) == 2
+        assert sessions[0] is not sessions[1]
+
+    @pytest.mark.asyncio
+    async def test_document_by_filename_shape(self):
+        doc = SimpleNamespace(id="d1", filename="STEMI.pdf", content_type="protocol",
+                              file_type="pdf", meta={"pages": 2})
+        registry = SimpleNamespace(display_name="STEMI Activation", category="protocol")
+        repository = RetrievalRepository(database=make_database(rows_result([(doc, registry)])))
+
+        info = await repository.get_document_by_filename("STEMI.pdf")
+
+        assert info == {
+            "id": "d1",
+            "filename": "STEMI.pdf",
+            "display_name": "STEMI Activation",
+            "content_type": "protocol",
+            "file_type": "pdf",
+            "category": "protocol",
+            "metadata": {"pages": 2},
+        }
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_sets_ann_params_in_same_session(self):
+        sessions, executed = [], []
+        repository = RetrievalRepository(
+            database=make_database(rows_result([("chunk",)]), sessions, executed=executed)
+        )
+
+        rows = await repository.semantic_search_chunks("[0.1,0.2]", k=3, threshold=0.6,
+                                                       ann_params={"ef_search": 64, "probes": 10})
+
+        assert rows == [("chunk",)]
+        assert len(sessions) == 1
+        assert [statement for statement, _ in executed] == [SET_ANN_PARAMS_SQL, SEMANTIC_CHUNKS_SQL]
+        assert executed[0][1] == {"ef_search": "64", "probes": "10"}
+        assert executed[1][1]["content_type"] is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_document_returns_none(self):
+        repository = RetrievalRepository(database=make_database(rows_result([])))
+        assert await repository.get_document_by_filename("missing.pdf") is None
+
+
+class TestAsyncRetrievalPaths:
+    """Test that async retrievers await the repository instead of the sync session."""
+
+    @pytest.mark.asyncio
+    async def test_targeted_document_searches_overlap(self):
+        in_flight = {"now": 0, "max": 0}
+        rows = [("Sepsis protocol pediatric RETU pathway", "Sepsis.pdf")]
+        repository = RetrievalRepository(
+            database=make_database(rows_result(rows), delay=0.01, in_flight=in_flight)
+        )
+        db = Mock()
+        retriever = DocsRAGRetriever(db, docs_path="/tmp", repository=repository)
+        retriever._search_database_content_async = AsyncMock(return_value=[])
+
+        matches = await retriever.retrieve_from_docs_async("sepsis protocol pediatric retu")
+
+        assert in_flight["max"] > 1
+        assert matches
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_medication_fix_async_matches_sync_response(self):
+        chunks = ["Norepinephrine 4 mg in 250 mL", "Start at 0.05 mcg/kg/min"]
+        repository = Mock()
+        repository.get_document_chunk_texts = AsyncMock(return_value=chunks)
+        db = Mock()
+        db.execute.return_value.fetchall.return_value = [(chunk,) for chunk in chunks]
+        fix = MedicationSearchFix(db, repository=repository)
+
+        async_response = await fix.get_targeted_medication_response_async("levophed dose")
+
+        assert async_response == fix.get_targeted_medication_response("levophed dose")
+        repository.get_document_chunk_texts.assert_awaited_once_with(
+            "Standard IV Infusion - Norepinephrine (Levophed).pdf", limit=3
+        )
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_async_skips_sync_session(self):
+        row = SimpleNamespace(id="c1", document_id="d1", chunk_text="STEMI activation", chunk_index=0,
+                              similarity=0.82, metadata=None, filename="STEMI.pdf", display_name=None,
+                              content_type="protocol", file_type="pdf", category="protocol")
+        repository = Mock()
+        repository.semantic_search_chunks = AsyncMock(return_value=[row])
+        db = Mock()
+        retriever = RAGRetriever(db, repository=repository)
+
+        results = await retriever.semantic_search_async("STEMI protocol", k=3, fallback_to_text=False)
+
+        assert results[0]["chunk_id"] == "c1"
+        assert results[0]["source"]["display_name"] == "STEMI.pdf"
+        assert repository.semantic_search_chunks.await_args.args[0].startswith("[")
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_async_without_fallback_returns_empty(self):
+        repository = Mock()
+        repository.semantic_search_chunks = AsyncMock(side_effect=RuntimeError("db down"))
+        retriever = RAGRetriever(Mock(), repository=repository)
+        retriever._fallback_text_search = Mock(return_value=[{"chunk_id": "text"}])
+
+        assert await retriever.semantic_search_async("STEMI", fallback_to_text=False) == []
+        assert await retriever.semantic_search_async("STEMI") == [{"chunk_id": "text"}]
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_async_runs_text_fallback_off_the_loop(self):
+        repository = Mock()
+        repository.semantic_search_chunks = AsyncMock(return_value=[])
+        retriever = RAGRetriever(Mock(), repository=repository)
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def fallback(query, content_type, k):
+            threads.append(threading.get_ident())
+            return [{"chunk_id": "text"}]
+
+        retriever._fallback_text_search = fallback
+
+        assert await retriever.semantic_search_async("STEMI") == [{"chunk_id": "text"}]
+        assert threads and threads[0] != loop_thread
@@ -0,0 +1,109 @@
+"""
+Unit tests for fixed-shape retrieval SQL and the prepared statement cache.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.pipeline import retrieval_sql
+from src.pipeline.rag_retriever import RAGRetriever
+from src.pipeline.retrieval_sql import (
+    MEDICAL_AWARE_SEARCH,
+    PREPARED_KEY,
+    PreparedStatementCache,
+    RetrievalStatement,
+)
+
+STATEMENT = RetrievalStatement(
+    "edbot_test", "SELECT * FROM t WHERE a = ANY(CAST(:terms AS text[])) AND b::text = :b AND c = :terms LIMIT :k"
+)
+
+
+def psycopg2_session(driver="psycopg2"):
+    connection = MagicMock()
+    connection.dialect.driver = driver
+    connection.info = {}
+    connection.exec_driver_sql.return_value.fetchall.return_value = [("row",)]
+    session = MagicMock()
+    session.connection.return_value = connection
+    return session, connection
+
+
+class TestRetrievalStatement:
+    """Test the PREPARE/EXECUTE forms."""
+
+    def test_binds_become_positional_parameters(self):
+        assert STATEMENT.param_names == ("terms", "b", "k")
+        assert STATEMENT.prepare_sql == (
+            "PREPARE edbot_test AS SELECT * FROM t WHERE a = ANY(CAST($1 AS text[])) "
+            "AND b::text = $2 AND c = $1 LIMIT $3"
+        )
+        assert STATEMENT.execute_sql == "EXECUTE edbot_test(%(terms)s, %(b)s, %(k)s)"
+
+
+class TestPreparedStatementCache:
+    """Test prepare-once execution per connection."""
+
+    def test_prepares_once_then_hits(self, monkeypatch):
+        monkeypatch.setattr(retrieval_sql, "metrics", Mock())
+        session, connection = psycopg2_session()
+        cache = PreparedStatementCache()
+        params = {"terms": ["stemi"], "b": None, "k": 5, "unused": 1}
+
+        assert cache.execute(session, STATEMENT, params) == [("row",)]
+        cache.execute(session, STATEMENT, params)
+
+        sql = [call.args[0] for call in connection.exec_driver_sql.call_args_list]
+        assert sql == [STATEMENT.prepare_sql, STATEMENT.execute_sql, STATEMENT.execute_sql]
+        assert connection.exec_driver_sql.call_args.args[1] == {"terms": ["stemi"], "b": None, "k": 5}
+        assert connection.info[PREPARED_KEY] == {"edbot_test"}
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_other_drivers_execute_the_statement_text(self):
+        session, connection = psycopg2_session(driver="asyncpg")
+
+        PreparedStatementCache().execute(session, STATEMENT, {"terms": [], "b": 1, "k": 1})
+
+        assert session.execute.call_args.args[0] is STATEMENT.text
+        connection.exec_driver_sql.assert_not_called()
+
+
+class TestRetrieverBindsTerms:
+    """Test the retriever's searches keep one shape per search kind."""
+
+    def test_medical_aware_search_binds_per_term_boosts(self, monkeypatch):
+        cache = Mock()
+        cache.execute.return_value = [SimpleNamespace(
+            id="c1", document_id="d1", chunk_text="STEMI pager", chunk_index=0, metadata={}, relevance=10.0,
+            filename="stemi.pdf", content_type="protocol", file_type="pdf", display_name=None, category=None,
+        )]
+        monkeypatch.setattr("src.pipeline.rag_retriever.get_statement_cache", lambda: cache)
+        retriever = RAGRetriever(Mock())
+
+        results = retriever._medical_aware_search("STEMI activation pager", "protocol", k=3)
+        retriever._medical_aware_search("sepsis lactate", "dosage", content_type="protocol", k=3)
+
+        (_, first, first_params), (_, second, second_params) = [c.args for c in cache.execute.call_args_list]
+        assert first is second is MEDICAL_AWARE_SEARCH
+        assert first_params["terms"] == ["stemi", "activation", "pager"]
+        assert first_params["term_boosts"] == [75, 75, 50]
+        assert first_params["keyword_terms"] == [True, False, False]
+        assert first_params["content_type"] is None
+        assert second_params["content_type"] == "protocol"
+        assert "'stemi'" not in MEDICAL_AWARE_SEARCH.sql.lower()
+        assert results[0]["chunk_id"] == "c1"
+
+    @pytest.mark.parametrize("query, protocol, sepsis", [
+        ("sepsis lactate criteria", True, True),
+        ("anaphylaxis epinephrine dose", False, False),
+    ])
+    def test_simple_search_protocol_relevance_is_a_parameter(self, query, protocol, sepsis):
+        retriever = RAGRetriever(Mock())
+        retriever.synonym_expander = None
+
+        statement, _, params = retriever._build_simple_search(query, k=5)
+
+        assert statement is retrieval_sql.SIMPLE_SEARCH_ALL
+        assert (params["protocol_query"], params["sepsis_query"]) == (protocol, sepsis)
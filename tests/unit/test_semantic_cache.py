@@ -14,6 +14,7 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
+from src.ai.local_embeddings import HashedNgramEncoder
 from src.cache.embedding_service import EmbeddingService
 from src.cache.semantic_cache import CachedResponse, SemanticCache
 from src.models.query_types import QueryType
@@ -67,12 +68,12 @@ class TestEmbeddingService:
     
     @pytest.mark.asyncio
     async def test_embedding_fallback(self):
-        """Test fallback to hash-based embedding when no model available."""
+        """Test fallback to the local encoder when no model available."""
         service = EmbeddingService()
         embedding = await service.embed("test text")
         
         assert isinstance(embedding, np.ndarray)
-        assert len(embedding) == 768  # Default dimension
+        assert len(embedding) == 384  # Matches document_chunks.embedding
         assert np.linalg.norm(embedding) == pytest.approx(1.0, rel=1e-5)  # Normalized
     
     @pytest.mark.asyncio
@@ -84,9 +85,67 @@ class TestEmbeddingService:
         service = EmbeddingService(mock_model)
         embedding = await service.embed("test text")
         
-        # Should fallback to hash-based embedding
+        # Should fallback to the local encoder
         assert isinstance(embedding, np.ndarray)
-        assert len(embedding) == 768
+        assert len(embedding) == 384
+
+
+class TestEmbeddingBatching:
+    """Test micro-batching and memoization in the embedding service."""
+
+    def _model(self):
+        model = Mock()
+        model.encode.side_effect = lambda texts: (
+            np.array([[len(t), 1.0] for t in texts]) if isinstance(texts, list)
+            else np.array([len(texts), 1.0])
+        )
+        return model
+
+    @pytest.mark.asyncio
+    async def test_concurrent_embeds_share_one_model_call(self):
+        import asyncio
+        model = self._model()
+        service = EmbeddingService(model, batch_window=0.01)
+
+        results = await asyncio.gather(
+            service.embed("stemi"), service.embed("sepsis criteria"), service.embed("stemi")
+        )
+
+        model.encode.assert_called_once_with(["stemi", "sepsis criteria"])
+        assert [r.tolist() for r in results] == [[5, 1], [15, 1], [5, 1]]
+
+    @pytest.mark.asyncio
+    async def test_repeat_embeds_are_memoized(self):
+        model = self._model()
+        service = EmbeddingService(model, batch_window=0)
+
+        first = await service.embed("STEMI protocol")
+        second = await service.embed("STEMI protocol")
+
+        assert model.encode.call_count == 1
+        assert second is first
+        assert not first.flags.writeable
+        assert service.get_stats()["memo_hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_embed_many_preserves_order_and_chunks(self):
+        model = self._model()
+        service = EmbeddingService(model, max_batch_size=2)
+        await service.embed_many(["a"])
+
+        results = await service.embed_many(["bbb", "a", "cc", "dddd", "bbb"])
+
+        assert [r[0] for r in results] == [3, 1, 2, 4, 3]
+        assert [c.args[0] for c in model.encode.call_args_list] == ["a", ["bbb", "cc"], "dddd"]
+
+    @pytest.mark.asyncio
+    async def test_model_errors_are_not_memoized(self):
+        model = Mock()
+        model.encode.side_effect = [Exception("Model error"), np.array([0.6, 0.8])]
+        service = EmbeddingService(model, batch_window=0)
+
+        assert len(await service.embed("dka protocol")) == 384
+        assert (await service.embed("dka protocol")).tolist() == [0.6, 0.8]
 
 
 class TestSemanticCache:
@@ -101,6 +160,20 @@ class TestSemanticCache:
         redis.setex.return_value = True
         redis.delete.return_value = True
         redis.ping.return_value = True
+        redis.incr.return_value = 1
+
+        # Entry and side index hashes behave like Redis hashes
+        hashes = {}
+
+        def hset(name, key=None, value=None, mapping=None):
+            fields = hashes.setdefault(name, {})
+            fields.update(mapping or {key: value})
+
+        redis.hset.side_effect = hset
+        redis.hgetall.side_effect = lambda name: dict(hashes.get(name, {}))
+        redis.delete.side_effect = lambda *names: sum(hashes.pop(name, None) is not None for name in names)
+        redis.hdel.side_effect = lambda name, *keys: sum(
+            hashes.get(name, {}).pop(key, None) is not None for key in keys)
         return redis
     
     @pytest.fixture
@@ -208,25 +281,9 @@ class TestSemanticCache:
         )
         assert success is True
         
-        # Verify Redis was called to store
-        mock_redis.setex.assert_called()
-        
-        # Mock Redis to return a cached entry
-        mock_cached_data = CachedResponse(
-            query="What is the STEMI protocol?",
-            query_embedding=np.array([0.1, 0.2, 0.3]),
-            response={"answer": "STEMI protocol details...", "confidence": 0.95},
-            sources=["stemi_protocol.pdf"],
-            query_type=QueryType.PROTOCOL_STEPS.value,
-            confidence=0.95,
-            created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=1),
-            hit_count=0
-        )
-        
-        import pickle
-        mock_redis.get.return_value = pickle.dumps(mock_cached_data)
-        mock_redis.scan.return_value = (0, ["semantic_cache:protocol:test_key"])
+        # Verify Redis was called to store the entry with a TTL
+        mock_redis.hset.assert_called()
+        mock_redis.expire.assert_called()
         
         # Test getting from cache
         cached = await semantic_cache.get(
@@ -236,86 +293,83 @@ class TestSemanticCache:
         
         assert cached is not None
         assert cached.response["answer"] == "STEMI protocol details..."
+        assert cached.sources == ["stemi_protocol.pdf"]
         assert cached.similarity > 0.9  # Should have high similarity
+        mock_redis.hincrby.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_similarity_matching(self, semantic_cache):
-        """Test semantic similarity matching."""
-        # Mock high similarity
-        semantic_cache._cosine_similarity = Mock(return_value=0.95)
-        
-        mock_cached_data = CachedResponse(
-            query="STEMI protocol",
-            query_embedding=np.array([0.1, 0.2, 0.3]),
-            response={"answer": "Protocol details"},
+    def _entry(self, query, embedding, expires_in=timedelta(hours=1)):
+        return CachedResponse(
+            query=query,
+            query_embedding=np.array(embedding),
+            response={"answer": f"{query} details"},
             sources=["protocol.pdf"],
             query_type=QueryType.PROTOCOL_STEPS.value,
             confidence=0.95,
             created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=1),
+            expires_at=datetime.utcnow() + expires_in,
             hit_count=0
         )
-        
-        import pickle
-        semantic_cache.redis.get.return_value = pickle.dumps(mock_cached_data)
-        semantic_cache.redis.scan.return_value = (0, ["semantic_cache:protocol:test_key"])
-        
+
+    @pytest.mark.asyncio
+    async def test_similarity_matching(self, semantic_cache):
+        """Test semantic similarity matching."""
+        closest = self._entry("STEMI protocol", [0.1, 0.2, 0.31])
+        await semantic_cache._store(self._entry("sepsis criteria", [0.3, -0.2, 0.1]))
+        await semantic_cache._store(closest)
+
         cached = await semantic_cache.get("ST elevation MI protocol", QueryType.PROTOCOL_STEPS)
+
+        query = np.array([0.1, 0.2, 0.3])
+        expected = semantic_cache._cosine_similarity(query, closest.query_embedding)
         assert cached is not None
-        assert cached.similarity == 0.95
-    
+        assert cached.query == "STEMI protocol"
+        assert cached.similarity == pytest.approx(expected, rel=1e-3)
+        semantic_cache.redis.scan.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_similarity_threshold(self, semantic_cache):
         """Test similarity threshold filtering."""
-        # Mock low similarity
-        semantic_cache._cosine_similarity = Mock(return_value=0.7)
-        
-        mock_cached_data = CachedResponse(
-            query="different protocol",
-            query_embedding=np.array([0.1, 0.2, 0.3]),
-            response={"answer": "Different protocol"},
-            sources=["other.pdf"],
-            query_type=QueryType.PROTOCOL_STEPS.value,
-            confidence=0.95,
-            created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=1),
-            hit_count=0
-        )
-        
-        import pickle
-        semantic_cache.redis.get.return_value = pickle.dumps(mock_cached_data)
-        semantic_cache.redis.scan.return_value = (0, ["semantic_cache:protocol:test_key"])
-        
+        await semantic_cache._store(self._entry("different protocol", [0.3, -0.2, 0.1]))
+
         # Should not return cache hit due to low similarity
         cached = await semantic_cache.get("STEMI protocol", QueryType.PROTOCOL_STEPS)
         assert cached is None
-    
+        # Only the index generation was read, never a cache entry
+        assert all(call.args[0].endswith(":generation")
+                   for call in semantic_cache.redis.get.call_args_list)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cached_query, query", [
+        ("epinephrine 0.3 mg IM for anaphylaxis", "epinephrine 0.5 mg IM for anaphylaxis"),
+        ("morphine dose 2 mg", "morphine dose 4 mg"),
+    ])
+    async def test_dose_variants_miss(self, semantic_cache, mock_embedding_service, cached_query, query):
+        """Queries that differ only in dose never share an answer."""
+        encoder = HashedNgramEncoder()
+        mock_embedding_service.embed = AsyncMock(side_effect=encoder.encode)
+        await semantic_cache._store(self._entry(cached_query, encoder.encode(cached_query)))
+
+        assert semantic_cache._cosine_similarity(encoder.encode(query), encoder.encode(cached_query)) > 0.9
+        assert await semantic_cache.get(query, QueryType.PROTOCOL_STEPS) is None
+        assert (await semantic_cache.get(cached_query, QueryType.PROTOCOL_STEPS)).query == cached_query
+
     @pytest.mark.asyncio
     async def test_cache_expiration(self, semantic_cache):
         """Test cache expiration handling."""
-        # Mock expired cache entry
-        mock_cached_data = CachedResponse(
-            query="expired query",
-            query_embedding=np.array([0.1, 0.2, 0.3]),
-            response={"answer": "Expired answer"},
-            sources=["source.pdf"],
-            query_type=QueryType.PROTOCOL_STEPS.value,
-            confidence=0.95,
-            created_at=datetime.utcnow() - timedelta(hours=2),
-            expires_at=datetime.utcnow() - timedelta(hours=1),  # Expired
-            hit_count=0
-        )
-        
-        import pickle
-        semantic_cache.redis.get.return_value = pickle.dumps(mock_cached_data)
-        semantic_cache.redis.scan.return_value = (0, ["semantic_cache:protocol:test_key"])
-        
+        # Entry Redis has already expired is dropped from the side index
+        await semantic_cache._store(self._entry("expired query", [0.1, 0.2, 0.3]))
+        await semantic_cache.redis.delete(
+            semantic_cache._entry_key(QueryType.PROTOCOL_STEPS.value, "expired query"))
+
         cached = await semantic_cache.get("expired query", QueryType.PROTOCOL_STEPS)
         assert cached is None
-        
-        # Should have called delete to remove expired entry
-        semantic_cache.redis.delete.assert_called()
-    
+        semantic_cache.redis.hdel.assert_called()
+
+        # Rows past their expiry are never matched
+        index = semantic_cache._index_state(QueryType.PROTOCOL_STEPS.value).index
+        index.upsert("semantic_cache:protocol:old", np.array([0.1, 0.2, 0.3]), expires_at=0.0)
+        assert index.best_match(np.array([0.1, 0.2, 0.3])) is None
+
     @pytest.mark.asyncio
     async def test_phi_scrubbing(self, semantic_cache):
         """Test PHI scrubbing functionality."""
@@ -352,21 +406,8 @@ class TestSemanticCache:
     @pytest.mark.asyncio
     async def test_cache_stats(self, semantic_cache):
         """Test cache statistics generation."""
-        # Mock cache entries
-        mock_cached_data = CachedResponse(
-            query="test query",
-            query_embedding=np.array([0.1, 0.2, 0.3]),
-            response={"answer": "Test answer"},
-            sources=["source.pdf"],
-            query_type=QueryType.PROTOCOL_STEPS.value,
-            confidence=0.95,
-            created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=1),
-            hit_count=5
-        )
-        
-        import pickle
-        semantic_cache.redis.get.return_value = pickle.dumps(mock_cached_data)
+        # Hit counters are read straight from the entry hashes
+        semantic_cache.redis.hget.return_value = b"5"
         semantic_cache.redis.scan.return_value = (0, ["semantic_cache:protocol:key1"])
         
         stats = await semantic_cache.get_stats()
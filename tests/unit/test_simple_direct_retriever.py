@@ -0,0 +1,124 @@
+"""
+Unit tests for the async SimpleDirectRetriever path.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.api import dependencies
+from src.models.retrieval_repository import get_retrieval_repository
+from src.pipeline import llm_rag_retriever, simple_direct_retriever
+from src.pipeline.simple_direct_retriever import SimpleDirectRetriever
+
+
+@pytest.fixture
+def retriever():
+    expander = Mock()
+    expander.expand_query.return_value = {"detected_abbreviations": []}
+    return SimpleDirectRetriever(Mock(), medical_expander=expander)
+
+
+class TestAsyncMedicalResponse:
+    """Test that the LLM RAG path is awaited on the caller's loop."""
+
+    @pytest.mark.asyncio
+    async def test_awaits_llm_rag_with_shared_client(self, retriever, monkeypatch):
+        llm_client = Mock()
+        rag_response = {"response": "RETU hours", "has_real_content": True, "confidence": 0.9}
+        rag = AsyncMock(return_value=rag_response)
+        monkeypatch.setattr(dependencies, "get_llm_client", AsyncMock(return_value=llm_client))
+        monkeypatch.setattr(llm_rag_retriever, "get_llm_rag_response", rag)
+
+        result = await retriever.get_medical_response_async("what are the RETU hours")
+
+        assert result is rag_response
+        rag.assert_awaited_once_with("what are the RETU hours", retriever.db, llm_client, repository=get_retrieval_repository())
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back(self, retriever, monkeypatch):
+        async def slow_rag(query, db, llm_client, repository=None):
+            await asyncio.sleep(1)
+
+        fallback = {"response": "fallback", "has_real_content": False, "confidence": 0.3}
+        monkeypatch.setattr(simple_direct_retriever, "LLM_RAG_TIMEOUT", 0.01)
+        monkeypatch.setattr(dependencies, "get_llm_client", AsyncMock(return_value=Mock()))
+        monkeypatch.setattr(llm_rag_retriever, "get_llm_rag_response", slow_rag)
+        monkeypatch.setattr(retriever, "_get_fallback_response_async", AsyncMock(return_value=fallback))
+
+        result = await retriever.get_medical_response_async("what are the RETU hours")
+
+        assert result is fallback
+
+
+class TestSharedLLMClient:
+    """Test that the LLM client is created once per process."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_created_once(self, monkeypatch):
+        client = AsyncMock()
+        create = AsyncMock(return_value=client)
+        monkeypatch.setattr(dependencies, "create_llm_client", create)
+        monkeypatch.setattr(dependencies, "_llm_client", None)
+
+        first, second = await asyncio.gather(
+            dependencies.get_llm_client(), dependencies.get_llm_client()
+        )
+
+        assert first is second is client
+        create.assert_awaited_once()
+
+        await dependencies.close_llm_client()
+        client.close.assert_awaited_once()
+        assert dependencies._llm_client is None
+
+
+class TestStreamingMedicalResponse:
+    """Test the streamed LLM RAG path and its fallback."""
+
+    @pytest.mark.asyncio
+    async def test_relays_llm_rag_events(self, retriever, monkeypatch):
+        async def stream_llm_response(self, query, min_confidence=0.0):
+            yield "sources", {"sources": [], "query_type": "summary"}
+            yield "token", {"text": "RETU hours"}
+            yield "done", {"confidence": 0.9, "has_real_content": True}
+
+        monkeypatch.setattr(dependencies, "get_llm_client", AsyncMock(return_value=Mock()))
+        monkeypatch.setattr(llm_rag_retriever.LLMRAGRetriever, "stream_llm_response", stream_llm_response)
+
+        events = [event async for event, _ in retriever.stream_medical_response("what are the RETU hours")]
+
+        assert events == ["sources", "token", "done"]
+
+    @pytest.mark.asyncio
+    async def test_failure_before_first_token_falls_back(self, retriever, monkeypatch):
+        async def stream_llm_response(self, query, min_confidence=0.0):
+            yield "sources", {"sources": [], "query_type": "summary"}
+            raise RuntimeError("LLM down")
+
+        fallback = {"response": "fallback", "has_real_content": False, "confidence": 0.3}
+        monkeypatch.setattr(dependencies, "get_llm_client", AsyncMock(return_value=Mock()))
+        monkeypatch.setattr(llm_rag_retriever.LLMRAGRetriever, "stream_llm_response", stream_llm_response)
+        monkeypatch.setattr(retriever, "_get_fallback_response_async", AsyncMock(return_value=fallback))
+
+        events = [event async for event in retriever.stream_medical_response("what are the RETU hours")]
+
+        assert events == [("sources", {"sources": [], "query_type": "summary"}), ("response", fallback)]
+
+    @pytest.mark.asyncio
+    async def test_rejected_answer_is_replaced_by_fallback(self, retriever, monkeypatch):
+        async def stream_llm_response(self, query, min_confidence=0.0):
+            yield "sources", {"sources": [], "query_type": "summary"}
+            yield "token", {"text": "RETU hours"}
+            yield "done", {"confidence": 0.7, "has_real_content": True}
+
+        fallback = {"response": "fallback", "has_real_content": False, "confidence": 0.3}
+        monkeypatch.setattr(dependencies, "get_llm_client", AsyncMock(return_value=Mock()))
+        monkeypatch.setattr(llm_rag_retriever.LLMRAGRetriever, "stream_llm_response", stream_llm_response)
+        monkeypatch.setattr(retriever, "_get_fallback_response_async", AsyncMock(return_value=fallback))
+
+        events = [event async for event in retriever.stream_medical_response("what are the RETU hours")]
+
+        assert [event for event, _ in events] == ["sources", "token", "replace"]
+        assert events[-1][1] is fallback
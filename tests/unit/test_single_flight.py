@@ -0,0 +1,174 @@
+"""
+Unit tests for single-flight coalescing of identical in-flight queries.
+"""
+
+import asyncio
+import json
+from contextlib import contextmanager
+from unittest.mock import Mock
+
+import pytest
+
+from src.cache.single_flight import SingleFlight
+from src.models.schemas import QueryResponse
+from src.pipeline.emergency_processor import EmergencyQueryProcessor
+from src.pipeline.knowledge_base import KnowledgeBase
+
+
+def session_factory(events):
+    @contextmanager
+    def open_session():
+        session = Mock()
+        events.append(("open", session))
+        yield session
+        events.append(("close", session))
+    return open_session
+
+
+def counting_compute(calls, result="answer", delay=0.01):
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return compute
+
+
+class TestSingleFlight:
+    """Test in-process and cross-worker coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_computation(self):
+        group = SingleFlight()
+        calls = []
+        compute = counting_compute(calls)
+
+        results = await asyncio.gather(*(group.do("k", compute) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert [result for result, _ in results] == ["answer"] * 5
+        assert sorted(scope or "leader" for _, scope in results) == ["leader"] + ["local"] * 4
+        assert group.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_recompute(self):
+        group = SingleFlight()
+        calls = []
+
+        await group.do("k", counting_compute(calls))
+        await group.do("k", counting_compute(calls))
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        group = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("retrieval down")
+
+        results = await asyncio.gather(*(group.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert group.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_leader_cancellation_does_not_cancel_followers(self):
+        group = SingleFlight()
+        leader = asyncio.ensure_future(group.do("k", counting_compute([], delay=0.05)))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("k", counting_compute([])))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        assert await follower == ("answer", "local")
+
+    @pytest.mark.asyncio
+    async def test_computation_owns_its_session_past_leader_cancellation(self):
+        group = SingleFlight()
+        events = []
+
+        async def compute(session):
+            await asyncio.sleep(0.05)
+            events.append(("compute", session))
+            return "answer"
+
+        leader = asyncio.ensure_future(group.do("k", compute, session_factory=session_factory(events)))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("k", compute, session_factory=session_factory(events)))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == ("answer", "local")
+        assert [event for event, _ in events] == ["open", "compute", "close"]
+        assert len({id(session) for _, session in events}) == 1
+
+    @pytest.mark.asyncio
+    async def test_other_worker_result_is_shared(self, fake_redis):
+        fake_redis.store["inflight:k"] = "other-worker"
+        shared = {}
+        calls = []
+
+        async def lookup():
+            return shared.get("k")
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.02)
+            shared["k"] = "from other worker"
+
+        group = SingleFlight(poll_interval=0.005)
+        result, _ = await asyncio.gather(
+            group.do("k", counting_compute(calls), redis=fake_redis, lookup=lookup),
+            other_worker_finishes(),
+        )
+
+        assert result == ("from other worker", "worker")
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_lock_is_released_after_computing(self, fake_redis):
+        group = SingleFlight()
+
+        assert await group.do("k", counting_compute([]), redis=fake_redis) == ("answer", None)
+        assert fake_redis.store == {}
+
+
+class TestProcessorCoalescing:
+    """Test coalescing in front of EmergencyQueryProcessor.process_query."""
+
+    @pytest.mark.asyncio
+    async def test_identical_queries_run_once(self, tmp_path, monkeypatch):
+        protocols = tmp_path / "protocols"
+        protocols.mkdir()
+        (protocols / "STEMI_qa.json").write_text(json.dumps([
+            {"question": "What is the STEMI protocol?", "answer": "Activate cath lab",
+             "query_type": "protocol_steps"}
+        ]))
+        sessions = []
+        processor = EmergencyQueryProcessor(
+            Mock(), None, knowledge_base=KnowledgeBase(qa_dir=str(tmp_path), reload_interval=0),
+            session_factory=session_factory(sessions))
+        calls = []
+
+        async def process(self, query, context=None, user_id=None, timeout=10):
+            calls.append((query, self.db, self.direct_retriever.db))
+            await asyncio.sleep(0.01)
+            return QueryResponse(response="Activate cath lab", query_type="protocol",
+                                 confidence=0.95, sources=[], processing_time=0.01)
+
+        monkeypatch.setattr(EmergencyQueryProcessor, "_process_query", process)
+
+        responses = await asyncio.gather(
+            processor.process_query("STEMI protocol"),
+            processor.process_query("stemi protocol?"),
+            processor.process_query("  STEMI   Protocol "),
+            processor.process_query("sepsis criteria"),
+        )
+
+        assert len(calls) == 2
+        assert {response.response for response in responses[:3]} == {"Activate cath lab"}
+        # Each computation ran on its own session, never the request's
+        opened = [session for event, session in sessions if event == "open"]
+        assert [(db, retriever_db) for _, db, retriever_db in calls] == [(session, session) for session in opened]
+        assert [event for event, _ in sessions].count("close") == 2
@@ -0,0 +1,68 @@
+"""
+Unit tests for the shared Postgres full-text search builder.
+"""
+
+from unittest.mock import Mock
+
+from src.pipeline.docs_rag_retriever import DocsRAGRetriever
+from src.pipeline.rag_retriever import RAGRetriever
+from src.pipeline.text_search import build_chunk_text_search, websearch_query
+
+
+class TestWebsearchQuery:
+    """Test websearch_to_tsquery input building."""
+
+    def test_terms_are_ored_with_quoted_synonym_phrases(self):
+        query = websearch_query(["STEMI", "protocol"])
+
+        assert query.startswith('stemi or "st elevation myocardial infarction"')
+        assert query.endswith(" or protocol")
+
+    def test_match_all_skips_synonyms(self):
+        assert websearch_query(["sepsis", "lactate"], match_all=True) == "sepsis lactate"
+
+    def test_operators_in_user_input_are_dropped(self):
+        assert websearch_query(['aspirin" -heparin', "or"], expand_synonyms=False) == '"aspirin heparin"'
+
+
+class TestChunkTextSearch:
+    """Test the SQL fragments and bind params."""
+
+    def test_fragments_use_indexed_columns(self):
+        search = build_chunk_text_search("What is the sepsis protocl?", expand_synonyms=False)
+
+        assert search.params == {"ts_query": "sepsis or protocl", "ts_query_fuzzy": ["protocl", "sepsis"]}
+        assert search.match_sql == "dc.search_vector @@ websearch_to_tsquery('english', :ts_query)"
+        assert "dc.chunk_text %> ANY(CAST(:ts_query_fuzzy AS text[]))" in search.where_sql
+        assert search.rank_sql.startswith("ts_rank_cd(dc.search_vector")
+        assert "ILIKE" not in search.where_sql
+
+    def test_no_searchable_words(self):
+        assert build_chunk_text_search("?!") is None
+        assert build_chunk_text_search([]) is None
+
+
+class TestRetrieversUseFullTextSearch:
+    """Test that retriever text searches filter on the indexed columns."""
+
+    def test_simple_search_and_or_queries(self):
+        retriever = RAGRetriever(Mock())
+        retriever.synonym_expander = None
+
+        search_statement, or_statement, params = retriever._build_simple_search("anaphylaxis epinephrine dose", k=5)
+
+        assert "websearch_to_tsquery('english', :all_terms)" in search_statement.sql
+        assert "websearch_to_tsquery('english', :any_terms)" in or_statement.sql
+        assert "chunk_text ILIKE :" not in search_statement.sql + or_statement.sql
+        assert params["all_terms"] == "anaphylaxis epinephrine"
+        assert params["k"] == 5
+
+    def test_docs_database_search_counts_term_matches(self):
+        retriever = DocsRAGRetriever(Mock(), docs_path="/nonexistent")
+
+        search_query, params = retriever._build_database_search("sepsis lactate criteria", top_k=3)
+
+        assert "dc.search_vector @@ websearch_to_tsquery" in search_query
+        assert "plainto_tsquery('english', :term_0)" in search_query
+        assert "chunk_text ILIKE :" not in search_query
+        assert params["term_0"] == "sepsis"
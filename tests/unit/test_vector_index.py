@@ -0,0 +1,207 @@
+"""
+Unit tests for the semantic cache's in-memory vector index, side index and entry format.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.cache import semantic_cache as semantic_cache_module
+from src.cache.semantic_cache import (
+    CachedResponse,
+    SemanticCache,
+    decode_cached_response,
+    encode_cached_response,
+)
+from src.cache.vector_index import VectorIndex, decode_index_entry, encode_index_entry
+from src.models.query_types import QueryType
+
+
+class SharedRedis:
+    """Async Redis stand-in; several instances can share one backing store."""
+
+    def __init__(self, store=None):
+        self.store = {} if store is None else store
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    async def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+    async def expire(self, key, ttl):
+        return key in self.store
+
+    async def hset(self, name, key=None, value=None, mapping=None):
+        self.store.setdefault(name, {}).update(mapping or {key: value})
+
+    async def hincrby(self, name, key, amount=1):
+        fields = self.store.setdefault(name, {})
+        fields[key] = int(fields.get(key, 0)) + amount
+        return fields[key]
+
+    async def hgetall(self, name):
+        return dict(self.store.get(name, {}))
+
+    async def hdel(self, name, *keys):
+        return sum(self.store.get(name, {}).pop(key, None) is not None for key in keys)
+
+
+def make_cache(redis, embedding):
+    settings = Mock()
+    settings.enable_semantic_cache = True
+    settings.log_scrub_phi = False
+    settings.semantic_cache_similarity_threshold = 0.9
+    settings.semantic_cache_min_confidence = 0.7
+    embedding_service = Mock()
+
+    async def embed(text):
+        return np.array(embedding, dtype=np.float32)
+
+    embedding_service.embed = embed
+    return SemanticCache(redis, settings, embedding_service)
+
+
+class TestVectorIndex:
+    """Test matrix maintenance and lookup."""
+
+    def test_best_match_is_cosine_argmax(self):
+        index = VectorIndex(initial_capacity=1)
+        index.upsert("a", np.array([1.0, 0.0]), expires_at=1e12)
+        index.upsert("b", np.array([3.0, 3.0]), expires_at=1e12)
+        index.upsert("c", np.array([0.0, 2.0]), expires_at=1e12)
+
+        key, similarity = index.best_match(np.array([1.0, 1.2]))
+
+        assert key == "b"
+        assert similarity == pytest.approx(2.2 / (np.sqrt(2) * np.sqrt(2.44)), rel=1e-5)
+        assert index._matrix.dtype == np.float32
+
+    def test_remove_keeps_rows_consistent(self):
+        index = VectorIndex()
+        for i, vector in enumerate(([1.0, 0.0], [0.0, 1.0], [1.0, 1.0])):
+            index.upsert(f"k{i}", np.array(vector), expires_at=1e12)
+
+        assert index.remove("k0")
+        assert not index.remove("k0")
+        assert len(index) == 2
+        assert index.best_match(np.array([1.0, 0.0]))[0] == "k2"
+        assert index.best_match(np.array([0.0, 1.0]))[0] == "k1"
+
+    def test_upsert_replaces_and_dimension_change_resets(self):
+        index = VectorIndex()
+        index.upsert("k", np.array([1.0, 0.0]), expires_at=1e12)
+        index.upsert("k", np.array([0.0, 1.0]), expires_at=1e12)
+        assert len(index) == 1
+        assert index.best_match(np.array([0.0, 1.0]))[1] == pytest.approx(1.0)
+
+        index.upsert("other", np.array([1.0, 0.0, 0.0]), expires_at=1e12)
+        assert len(index) == 1
+        assert index.best_match(np.array([0.0, 1.0])) is None
+
+    def test_entry_encoding_round_trip(self):
+        embedding = np.array([0.25, -1.5, 3.0], dtype=np.float32)
+        vector, expires_at = decode_index_entry(encode_index_entry(embedding, 1700000000.5))
+
+        assert np.array_equal(vector, embedding)
+        assert expires_at == pytest.approx(1700000000.5)
+
+
+class TestSideIndexSync:
+    """Test that workers share the side index through Redis."""
+
+    def _entry(self, query, embedding):
+        return CachedResponse(
+            query=query,
+            query_embedding=np.array(embedding, dtype=np.float32),
+            response={"answer": query},
+            sources=[],
+            query_type=QueryType.PROTOCOL_STEPS.value,
+            confidence=0.95,
+            created_at=datetime.utcnow(),
+            expires_at=datetime.utcnow() + timedelta(hours=1),
+        )
+
+    @pytest.mark.asyncio
+    async def test_other_worker_sees_new_entries(self, monkeypatch):
+        monkeypatch.setattr(semantic_cache_module, "INDEX_SYNC_INTERVAL", 0.0)
+        store = {}
+        writer = make_cache(SharedRedis(store), [0.1, 0.2, 0.3])
+        reader = make_cache(SharedRedis(store), [0.1, 0.2, 0.3])
+
+        assert await reader.get("stemi protocol", QueryType.PROTOCOL_STEPS) is None
+
+        await writer._store(self._entry("STEMI protocol", [0.1, 0.2, 0.3]))
+        cached = await reader.get("stemi protocol", QueryType.PROTOCOL_STEPS)
+
+        assert cached is not None
+        assert cached.similarity == pytest.approx(1.0, rel=1e-3)
+
+    @pytest.mark.asyncio
+    async def test_invalidation_clears_index(self, monkeypatch):
+        monkeypatch.setattr(semantic_cache_module, "INDEX_SYNC_INTERVAL", 0.0)
+        redis = SharedRedis()
+        cache = make_cache(redis, [0.1, 0.2, 0.3])
+
+        # invalidate_by_type still scans for the entry keys themselves
+        async def scan(cursor=0, match=None, count=100):
+            return 0, [key for key in redis.store if key.startswith("semantic_cache:protocol:")]
+
+        redis.scan = scan
+        await cache._store(self._entry("STEMI protocol", [0.1, 0.2, 0.3]))
+
+        await cache.invalidate_by_type(QueryType.PROTOCOL_STEPS)
+
+        assert await cache.get("stemi protocol", QueryType.PROTOCOL_STEPS) is None
+        assert len(cache._index_state(QueryType.PROTOCOL_STEPS.value).index) == 0
+
+
+class TestEntryFormat:
+    """Test the pickle-free entry layout."""
+
+    def _entry(self):
+        return CachedResponse(
+            query="STEMI protocol",
+            query_embedding=np.array([0.25, -0.5, 0.75]),
+            response={"answer": "Activate cath lab", "confidence": 0.95},
+            sources=["STEMI.pdf"],
+            query_type=QueryType.PROTOCOL_STEPS.value,
+            confidence=0.95,
+            created_at=datetime(2026, 1, 1, 12, 0, 0),
+            expires_at=datetime(2026, 1, 1, 13, 0, 0),
+            hit_count=3,
+        )
+
+    def test_round_trip(self):
+        fields = encode_cached_response(self._entry())
+        # Redis returns field names and values as bytes
+        stored = {name.encode(): value if isinstance(value, bytes) else str(value).encode()
+                  for name, value in fields.items()}
+
+        decoded = decode_cached_response(stored)
+
+        assert decoded.response == {"answer": "Activate cath lab", "confidence": 0.95}
+        assert decoded.sources == ["STEMI.pdf"]
+        assert decoded.created_at == datetime(2026, 1, 1, 12, 0, 0)
+        assert decoded.expires_at == datetime(2026, 1, 1, 13, 0, 0)
+        assert decoded.hit_count == 3
+        assert np.array_equal(decoded.query_embedding, np.array([0.25, -0.5, 0.75], dtype=np.float32))
+
+    def test_embedding_is_raw_float16(self):
+        fields = encode_cached_response(self._entry())
+        assert np.frombuffer(fields["embedding"], dtype=np.float16).tolist() == [0.25, -0.5, 0.75]
+
+    def test_other_versions_are_rejected(self):
+        fields = encode_cached_response(self._entry())
+        fields["v"] = b"0"
+        with pytest.raises(ValueError):
+            decode_cached_response(fields)
@@ -0,0 +1,59 @@
+"""
+Unit tests for pgvector ANN index management and per-query-type search breadth.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from src.models.query_types import QueryType
+from src.models.vector_index_manager import (
+    DEFAULT_EF_SEARCH,
+    VectorIndexManager,
+    ann_search_params,
+    recall_at_k,
+)
+from src.pipeline.rag_retriever import RAGRetriever
+
+
+class TestAnnSearchParams:
+    """Test ef_search/probes selection."""
+
+    def test_configured_per_query_type(self):
+        dosage = ann_search_params(QueryType.DOSAGE_LOOKUP)
+        contact = ann_search_params("CONTACT_LOOKUP")
+
+        assert dosage["ef_search"] > contact["ef_search"]
+        assert dosage["probes"] > contact["probes"]
+
+    def test_ef_search_covers_k_and_unknown_types_use_defaults(self):
+        assert ann_search_params(QueryType.CONTACT_LOOKUP, k=200)["ef_search"] == 200
+        assert ann_search_params(None)["ef_search"] == DEFAULT_EF_SEARCH
+
+    def test_semantic_search_sets_breadth_before_searching(self):
+        db = Mock()
+        db.execute.return_value.fetchall.return_value = []
+        retriever = RAGRetriever(db)
+        retriever._fallback_text_search = Mock(return_value=[])
+
+        retriever.semantic_search("insulin drip rate", k=5, query_type=QueryType.DOSAGE_LOOKUP)
+
+        statement, params = db.execute.call_args_list[0].args
+        assert "hnsw.ef_search" in str(statement)
+        assert params == {key: str(value) for key, value in ann_search_params(QueryType.DOSAGE_LOOKUP).items()}
+        assert "query_embedding" in db.execute.call_args_list[1].args[1]
+
+
+class TestIndexManagement:
+    """Test index DDL and benchmark arithmetic."""
+
+    def test_build_sql(self):
+        sql = VectorIndexManager(engine=None, m=24, ef_construction=128).build_sql()
+
+        assert sql.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunk_embedding_hnsw")
+        assert "USING hnsw (embedding vector_cosine_ops)" in sql
+        assert "WITH (m = 24, ef_construction = 128)" in sql
+
+    def test_recall_at_k(self):
+        assert recall_at_k(["a", "b", "c", "d"], ["a", "c", "x", "y"]) == pytest.approx(0.5)
+        assert recall_at_k([], ["a"]) == 1.0